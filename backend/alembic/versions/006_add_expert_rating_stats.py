@@ -0,0 +1,165 @@
+"""Add incremental expert rating statistics
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 09:00:00.000000
+
+This migration creates:
+- expert_rating_stats: per-expert count, sum, sum of squares and 1-5 histogram
+- expert_rating_daily: per-expert daily count/sum buckets for rolling windows
+- A trigger on ratings that keeps both tables up to date in the same transaction
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Expert Rating Stats Table (one row per expert)
+    op.create_table(
+        'expert_rating_stats',
+        sa.Column('expert_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('rating_sum_squares', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('count_1', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_2', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_3', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_4', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_5', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['expert_id'], ['users.id'], ondelete='CASCADE'),
+    )
+
+    # Expert Rating Daily Table (rolling windows read a handful of rows by PK)
+    op.create_table(
+        'expert_rating_daily',
+        sa.Column('expert_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('expert_id', 'day'),
+        sa.ForeignKeyConstraint(['expert_id'], ['users.id'], ondelete='CASCADE'),
+    )
+
+    # Trigger function: apply +1/-1 deltas for inserted/deleted ratings.
+    # Updates are handled as delete-old + insert-new.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION apply_expert_rating_delta(
+            p_question_id UUID, p_expert_id UUID, p_score INTEGER,
+            p_created_at TIMESTAMPTZ, p_sign INTEGER
+        ) RETURNS VOID AS $$
+        DECLARE
+            v_expert_id UUID;
+        BEGIN
+            v_expert_id := COALESCE(
+                p_expert_id,
+                (SELECT expert_id FROM questions WHERE id = p_question_id)
+            );
+            IF v_expert_id IS NULL THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO expert_rating_stats AS s (
+                expert_id, rating_count, rating_sum, rating_sum_squares,
+                count_1, count_2, count_3, count_4, count_5, updated_at
+            ) VALUES (
+                v_expert_id, p_sign, p_sign * p_score, p_sign * p_score * p_score,
+                CASE WHEN p_score = 1 THEN p_sign ELSE 0 END,
+                CASE WHEN p_score = 2 THEN p_sign ELSE 0 END,
+                CASE WHEN p_score = 3 THEN p_sign ELSE 0 END,
+                CASE WHEN p_score = 4 THEN p_sign ELSE 0 END,
+                CASE WHEN p_score = 5 THEN p_sign ELSE 0 END,
+                NOW()
+            )
+            ON CONFLICT (expert_id) DO UPDATE SET
+                rating_count = s.rating_count + EXCLUDED.rating_count,
+                rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+                rating_sum_squares = s.rating_sum_squares + EXCLUDED.rating_sum_squares,
+                count_1 = s.count_1 + EXCLUDED.count_1,
+                count_2 = s.count_2 + EXCLUDED.count_2,
+                count_3 = s.count_3 + EXCLUDED.count_3,
+                count_4 = s.count_4 + EXCLUDED.count_4,
+                count_5 = s.count_5 + EXCLUDED.count_5,
+                updated_at = NOW();
+
+            INSERT INTO expert_rating_daily AS d (expert_id, day, rating_count, rating_sum)
+            VALUES (v_expert_id, (p_created_at AT TIME ZONE 'UTC')::date, p_sign, p_sign * p_score)
+            ON CONFLICT (expert_id, day) DO UPDATE SET
+                rating_count = d.rating_count + EXCLUDED.rating_count,
+                rating_sum = d.rating_sum + EXCLUDED.rating_sum;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ratings_update_expert_stats() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM apply_expert_rating_delta(
+                    OLD.question_id, OLD.expert_id, OLD.score, OLD.created_at, -1
+                );
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM apply_expert_rating_delta(
+                    NEW.question_id, NEW.expert_id, NEW.score, NEW.created_at, 1
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE TRIGGER trg_ratings_expert_stats
+        AFTER INSERT OR UPDATE OF score, expert_id, question_id OR DELETE ON ratings
+        FOR EACH ROW EXECUTE FUNCTION ratings_update_expert_stats();
+    """)
+
+    # Backfill from existing ratings
+    op.execute("""
+        INSERT INTO expert_rating_stats (
+            expert_id, rating_count, rating_sum, rating_sum_squares,
+            count_1, count_2, count_3, count_4, count_5
+        )
+        SELECT
+            COALESCE(r.expert_id, q.expert_id),
+            COUNT(*),
+            SUM(r.score),
+            SUM(r.score * r.score),
+            COUNT(*) FILTER (WHERE r.score = 1),
+            COUNT(*) FILTER (WHERE r.score = 2),
+            COUNT(*) FILTER (WHERE r.score = 3),
+            COUNT(*) FILTER (WHERE r.score = 4),
+            COUNT(*) FILTER (WHERE r.score = 5)
+        FROM ratings r
+        JOIN questions q ON r.question_id = q.id
+        WHERE COALESCE(r.expert_id, q.expert_id) IS NOT NULL
+        GROUP BY COALESCE(r.expert_id, q.expert_id)
+    """)
+    op.execute("""
+        INSERT INTO expert_rating_daily (expert_id, day, rating_count, rating_sum)
+        SELECT
+            COALESCE(r.expert_id, q.expert_id),
+            (r.created_at AT TIME ZONE 'UTC')::date,
+            COUNT(*),
+            SUM(r.score)
+        FROM ratings r
+        JOIN questions q ON r.question_id = q.id
+        WHERE COALESCE(r.expert_id, q.expert_id) IS NOT NULL
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_ratings_expert_stats ON ratings")
+    op.execute("DROP FUNCTION IF EXISTS ratings_update_expert_stats()")
+    op.execute("DROP FUNCTION IF EXISTS apply_expert_rating_delta(UUID, UUID, INTEGER, TIMESTAMPTZ, INTEGER)")
+    op.drop_table('expert_rating_daily')
+    op.drop_table('expert_rating_stats')
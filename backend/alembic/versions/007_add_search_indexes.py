@@ -0,0 +1,63 @@
+"""Add full-text and trigram search indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 10:00:00.000000
+
+This migration adds:
+- questions.search_vector: generated tsvector over subject (weight A) and question text (weight B)
+- GIN index on questions.search_vector for ranked full-text search
+- pg_trgm GIN indexes for substring/prefix matching on question subject and user email/names
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    # Generated column keeps the vector in sync on every insert/update
+    op.execute("""
+        ALTER TABLE questions
+        ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', COALESCE(subject, '')), 'A') ||
+            setweight(to_tsvector('english', COALESCE(question_text, '')), 'B')
+        ) STORED
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_questions_search_vector
+        ON questions USING GIN (search_vector)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_questions_subject_trgm
+        ON questions USING GIN (subject gin_trgm_ops)
+    """)
+    
+    # Trigram indexes back the email/name ILIKE '%term%' filters
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_email_trgm
+        ON users USING GIN (email gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_first_name_trgm
+        ON users USING GIN (first_name gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_last_name_trgm
+        ON users USING GIN (last_name gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_users_last_name_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_users_first_name_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_users_email_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_questions_subject_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_questions_search_vector")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS search_vector")
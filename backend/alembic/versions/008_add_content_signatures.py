@@ -0,0 +1,39 @@
+"""Add MinHash content signatures
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 11:00:00.000000
+
+This migration creates content_signatures, which stores the MinHash
+signature of every indexed question/answer so the in-process LSH index
+can be reloaded at startup without re-shingling the whole corpus.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'content_signatures',
+        sa.Column('content_type', sa.String(20), nullable=False),
+        sa.Column('content_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('num_perm', sa.Integer(), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('content_type', 'content_id'),
+        sa.CheckConstraint("content_type IN ('question', 'answer')", name='content_signatures_type_check'),
+    )
+    op.create_index('idx_content_signatures_created_at', 'content_signatures', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_content_signatures_created_at', table_name='content_signatures')
+    op.drop_table('content_signatures')
@@ -0,0 +1,62 @@
+"""Add answer reuse offers
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 12:00:00.000000
+
+This migration adds:
+- questions.text_fingerprint: md5 of the normalized question text (lowercased,
+  runs of non-alphanumerics collapsed to one space), indexed for delivered questions
+- answer_reuse_offers: previously delivered answers offered as drafts for new questions
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Must match app.utils.answer_reuse.text_fingerprint
+    op.execute("""
+        ALTER TABLE questions
+        ADD COLUMN text_fingerprint TEXT
+        GENERATED ALWAYS AS (
+            md5(btrim(regexp_replace(lower(COALESCE(question_text, '')), '[^a-z0-9]+', ' ', 'g')))
+        ) STORED
+    """)
+    op.execute("""
+        CREATE INDEX idx_questions_text_fingerprint_delivered
+        ON questions (text_fingerprint, delivered_at DESC)
+        WHERE status = 'delivered'
+    """)
+
+    op.create_table(
+        'answer_reuse_offers',
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('source_question_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('source_answer_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('match_type', sa.String(20), nullable=False),  # 'exact', 'near'
+        sa.Column('similarity', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='offered'),  # 'offered', 'accepted', 'system_accepted', 'declined'
+        sa.Column('accepted_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('created_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('resolved_at', postgresql.TIMESTAMPTZ(), nullable=True),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['source_question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['accepted_by'], ['users.id'], ondelete='SET NULL'),
+    )
+    op.create_index('idx_answer_reuse_offers_created_at', 'answer_reuse_offers', ['created_at'])
+    op.create_index('idx_answer_reuse_offers_status', 'answer_reuse_offers', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_answer_reuse_offers_status', table_name='answer_reuse_offers')
+    op.drop_index('idx_answer_reuse_offers_created_at', table_name='answer_reuse_offers')
+    op.drop_table('answer_reuse_offers')
+    op.execute("DROP INDEX IF EXISTS idx_questions_text_fingerprint_delivered")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS text_fingerprint")
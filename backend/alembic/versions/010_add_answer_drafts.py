@@ -0,0 +1,35 @@
+"""Add answer draft checkpoints
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 12:00:00.000000
+
+This migration adds:
+- answer_drafts: periodic checkpoints of AI drafts streamed to clients, so a
+  reconnecting client can resume from an offset when Redis does not have the text
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'answer_drafts',
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('draft_text', sa.Text(), nullable=False, server_default=''),
+        sa.Column('draft_length', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='streaming'),  # 'streaming', 'complete'
+        sa.Column('updated_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('answer_drafts')
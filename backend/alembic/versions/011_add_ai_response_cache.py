@@ -0,0 +1,42 @@
+"""Add AI response cache
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 12:00:00.000000
+
+This migration adds:
+- ai_response_cache: zlib-compressed provider responses keyed by a hash of the
+  normalized prompt, model and parameters (second tier behind Redis)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ai_response_cache',
+        sa.Column('cache_key', sa.String(64), primary_key=True),  # sha256 hex
+        sa.Column('provider', sa.String(50), nullable=False),
+        sa.Column('model', sa.String(100), nullable=False),
+        sa.Column('response', sa.LargeBinary(), nullable=False),  # zlib-compressed JSON
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('last_hit_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('expires_at', postgresql.TIMESTAMPTZ(), nullable=False),
+    )
+    op.create_index('idx_ai_response_cache_expires_at', 'ai_response_cache', ['expires_at'])
+    op.create_index('idx_ai_response_cache_last_hit_at', 'ai_response_cache', ['last_hit_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ai_response_cache_last_hit_at', table_name='ai_response_cache')
+    op.drop_index('idx_ai_response_cache_expires_at', table_name='ai_response_cache')
+    op.drop_table('ai_response_cache')
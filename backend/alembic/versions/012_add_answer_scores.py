@@ -0,0 +1,39 @@
+"""Add answer AI-content scores
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 12:00:00.000000
+
+This migration adds:
+- answers.ai_content_score: likelihood the answer text is AI-written (0-1);
+  answers.ai_confidence stays the generating model's confidence
+- answers.originality_score (if missing) and answers.scored_at, written by
+  the batched scoring stage
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        ALTER TABLE answers
+        ADD COLUMN IF NOT EXISTS ai_content_score FLOAT,
+        ADD COLUMN IF NOT EXISTS originality_score FLOAT,
+        ADD COLUMN IF NOT EXISTS scored_at TIMESTAMPTZ
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_answers_unscored
+        ON answers (created_at)
+        WHERE scored_at IS NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_answers_unscored")
+    op.execute("ALTER TABLE answers DROP COLUMN IF EXISTS scored_at")
+    op.execute("ALTER TABLE answers DROP COLUMN IF EXISTS ai_content_score")
@@ -0,0 +1,36 @@
+"""Add OCR results
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 12:00:00.000000
+
+This migration adds:
+- ocr_results: text extracted from question images, keyed by the SHA-256 of
+  the image bytes so re-uploaded images are not read again
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ocr_results',
+        sa.Column('content_hash', sa.String(64), primary_key=True),  # sha256 hex of the image bytes
+        sa.Column('extracted_text', sa.Text(), nullable=False),
+        sa.Column('skew_angle', sa.Float(), nullable=True),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('processing_ms', sa.Float(), nullable=True),
+        sa.Column('created_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ocr_results')
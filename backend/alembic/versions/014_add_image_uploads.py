@@ -0,0 +1,42 @@
+"""Add image uploads
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19 13:00:00.000000
+
+This migration adds:
+- image_uploads: one row per distinct uploaded image, keyed by the SHA-256 of
+  its bytes, with the storage keys of the original and its thumbnail
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'image_uploads',
+        sa.Column('sha256', sa.String(64), primary_key=True),
+        sa.Column('content_type', sa.String(50), nullable=False),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('storage_backend', sa.String(20), nullable=False),
+        sa.Column('storage_key', sa.String(255), nullable=False),
+        sa.Column('thumbnail_key', sa.String(255), nullable=True),
+        sa.Column('original_filename', sa.String(255), nullable=True),
+        sa.Column('uploaded_by', postgresql.UUID(as_uuid=True), nullable=True),  # first uploader
+        sa.Column('created_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+    op.create_index('idx_image_uploads_uploaded_by', 'image_uploads', ['uploaded_by'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_image_uploads_uploaded_by', table_name='image_uploads')
+    op.drop_table('image_uploads')
@@ -0,0 +1,197 @@
+"""Add time-series metrics
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19 14:00:00.000000
+
+This migration creates:
+- metrics_hourly: per-hour deltas of each metric and dimension
+- metrics_totals: running all-time value of each metric and dimension
+- Triggers on questions, ratings and users that record their changes in both
+  tables in the same transaction
+
+Metrics:
+- questions.created (no dimension), questions.subject (subject) and
+  questions.status (status): bucketed by question creation time, except
+  status changes, which are bucketed by the time they happen
+- ratings.count, ratings.sum: bucketed by rating creation time
+- users.role (role)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Metrics Hourly Table (range reads by metric and bucket)
+    op.create_table(
+        'metrics_hourly',
+        sa.Column('metric', sa.String(50), nullable=False),
+        sa.Column('dimension', sa.String(100), nullable=False, server_default=''),
+        sa.Column('bucket', postgresql.TIMESTAMPTZ(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('metric', 'dimension', 'bucket'),
+    )
+    op.create_index('idx_metrics_hourly_metric_bucket', 'metrics_hourly', ['metric', 'bucket'])
+
+    # Metrics Totals Table (one row per metric and dimension)
+    op.create_table(
+        'metrics_totals',
+        sa.Column('metric', sa.String(50), nullable=False),
+        sa.Column('dimension', sa.String(100), nullable=False, server_default=''),
+        sa.Column('value', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('metric', 'dimension'),
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_metric(
+            p_metric VARCHAR, p_dimension VARCHAR, p_at TIMESTAMPTZ, p_delta DOUBLE PRECISION
+        ) RETURNS VOID AS $$
+        BEGIN
+            IF p_delta = 0 THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO metrics_hourly AS h (metric, dimension, bucket, value)
+            VALUES (p_metric, COALESCE(p_dimension, ''), date_trunc('hour', p_at, 'UTC'), p_delta)
+            ON CONFLICT (metric, dimension, bucket) DO UPDATE SET
+                value = h.value + EXCLUDED.value;
+
+            INSERT INTO metrics_totals AS t (metric, dimension, value)
+            VALUES (p_metric, COALESCE(p_dimension, ''), p_delta)
+            ON CONFLICT (metric, dimension) DO UPDATE SET
+                value = t.value + EXCLUDED.value;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Deletes are recorded against the original bucket, so windowed counts
+    # match what a scan of the remaining rows would return
+    op.execute("""
+        CREATE OR REPLACE FUNCTION questions_record_metrics() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM record_metric('questions.created', '', NEW.created_at, 1);
+                IF NEW.subject IS NOT NULL THEN
+                    PERFORM record_metric('questions.subject', NEW.subject, NEW.created_at, 1);
+                END IF;
+                PERFORM record_metric('questions.status', NEW.status, NEW.created_at, 1);
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM record_metric('questions.created', '', OLD.created_at, -1);
+                IF OLD.subject IS NOT NULL THEN
+                    PERFORM record_metric('questions.subject', OLD.subject, OLD.created_at, -1);
+                END IF;
+                PERFORM record_metric('questions.status', OLD.status, OLD.created_at, -1);
+            ELSE
+                IF NEW.subject IS DISTINCT FROM OLD.subject THEN
+                    IF OLD.subject IS NOT NULL THEN
+                        PERFORM record_metric('questions.subject', OLD.subject, OLD.created_at, -1);
+                    END IF;
+                    IF NEW.subject IS NOT NULL THEN
+                        PERFORM record_metric('questions.subject', NEW.subject, NEW.created_at, 1);
+                    END IF;
+                END IF;
+                IF NEW.status IS DISTINCT FROM OLD.status THEN
+                    PERFORM record_metric('questions.status', OLD.status, NOW(), -1);
+                    PERFORM record_metric('questions.status', NEW.status, NOW(), 1);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE TRIGGER trg_questions_metrics
+        AFTER INSERT OR UPDATE OF status, subject OR DELETE ON questions
+        FOR EACH ROW EXECUTE FUNCTION questions_record_metrics();
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ratings_record_metrics() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM record_metric('ratings.count', '', OLD.created_at, -1);
+                PERFORM record_metric('ratings.sum', '', OLD.created_at, -OLD.score);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM record_metric('ratings.count', '', NEW.created_at, 1);
+                PERFORM record_metric('ratings.sum', '', NEW.created_at, NEW.score);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE TRIGGER trg_ratings_metrics
+        AFTER INSERT OR UPDATE OF score OR DELETE ON ratings
+        FOR EACH ROW EXECUTE FUNCTION ratings_record_metrics();
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users_record_metrics() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM record_metric('users.role', OLD.role, NOW(), -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM record_metric('users.role', NEW.role, NOW(), 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE TRIGGER trg_users_metrics
+        AFTER INSERT OR UPDATE OF role OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION users_record_metrics();
+    """)
+
+    # Backfill from existing rows. Status history is not kept, so each
+    # question's current status is recorded at its creation time.
+    op.execute("""
+        INSERT INTO metrics_hourly (metric, dimension, bucket, value)
+        SELECT 'questions.created', '', date_trunc('hour', created_at, 'UTC'), COUNT(*)
+        FROM questions GROUP BY 3
+        UNION ALL
+        SELECT 'questions.subject', subject, date_trunc('hour', created_at, 'UTC'), COUNT(*)
+        FROM questions WHERE subject IS NOT NULL GROUP BY 2, 3
+        UNION ALL
+        SELECT 'questions.status', COALESCE(status, ''), date_trunc('hour', created_at, 'UTC'), COUNT(*)
+        FROM questions GROUP BY 2, 3
+        UNION ALL
+        SELECT 'ratings.count', '', date_trunc('hour', created_at, 'UTC'), COUNT(*)
+        FROM ratings GROUP BY 3
+        UNION ALL
+        SELECT 'ratings.sum', '', date_trunc('hour', created_at, 'UTC'), SUM(score)
+        FROM ratings GROUP BY 3
+        UNION ALL
+        SELECT 'users.role', COALESCE(role, ''), date_trunc('hour', created_at, 'UTC'), COUNT(*)
+        FROM users GROUP BY 2, 3
+    """)
+    op.execute("""
+        INSERT INTO metrics_totals (metric, dimension, value)
+        SELECT metric, dimension, SUM(value)
+        FROM metrics_hourly
+        GROUP BY metric, dimension
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_users_metrics ON users")
+    op.execute("DROP TRIGGER IF EXISTS trg_ratings_metrics ON ratings")
+    op.execute("DROP TRIGGER IF EXISTS trg_questions_metrics ON questions")
+    op.execute("DROP FUNCTION IF EXISTS users_record_metrics()")
+    op.execute("DROP FUNCTION IF EXISTS ratings_record_metrics()")
+    op.execute("DROP FUNCTION IF EXISTS questions_record_metrics()")
+    op.execute("DROP FUNCTION IF EXISTS record_metric(VARCHAR, VARCHAR, TIMESTAMPTZ, DOUBLE PRECISION)")
+    op.drop_table('metrics_totals')
+    op.drop_table('metrics_hourly')
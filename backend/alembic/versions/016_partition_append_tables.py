@@ -0,0 +1,210 @@
+"""Partition append-only tables by month
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19 15:00:00.000000
+
+This migration converts admin_actions, audit_logs, notifications and
+transactions into tables range-partitioned by created_at, one partition per
+UTC month (<table>_pYYYYMM) plus a default partition (<table>_default) for
+rows outside them. Existing rows are copied into the partitions, which cover
+their first month through PARTITION_MONTHS_AHEAD months from now.
+
+- Primary keys become (id, created_at): the partition key has to be part of
+  them. Secondary indexes and foreign keys are recreated on the parent and
+  cascade to every partition.
+- create_month_partition(parent, month): creates one month's partition,
+  moving any of that month's rows out of the default partition first. The
+  partition maintenance task (app/utils/partitions.py) calls it ahead of time.
+- archive: schema that detached partitions past their retention are moved to.
+
+The copy rewrites each table once under an exclusive lock; run it in a
+maintenance window on large databases.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+PARTITIONED_TABLES = ('admin_actions', 'audit_logs', 'notifications', 'transactions')
+PARTITION_MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+
+    # Bounds are UTC months whatever the session time zone
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_month_partition(p_parent TEXT, p_month DATE)
+        RETURNS BOOLEAN AS $$
+        DECLARE
+            v_from DATE := date_trunc('month', p_month)::date;
+            v_to DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+            v_name TEXT := p_parent || '_p' || to_char(p_month, 'YYYYMM');
+            v_default TEXT := p_parent || '_default';
+            v_moved BIGINT := 0;
+        BEGIN
+            IF to_regclass(v_name) IS NOT NULL THEN
+                RETURN FALSE;
+            END IF;
+
+            -- The new partition cannot be created while the default one holds
+            -- rows of its month; take them out and put them back through the parent
+            IF to_regclass(v_default) IS NOT NULL THEN
+                EXECUTE format('CREATE TEMP TABLE _partition_rows (LIKE %I) ON COMMIT DROP', p_parent);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO _partition_rows SELECT * FROM moved',
+                    v_default, v_from, v_to
+                );
+                GET DIAGNOSTICS v_moved = ROW_COUNT;
+            END IF;
+
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                v_name, p_parent, v_from, v_to
+            );
+
+            IF to_regclass(v_default) IS NOT NULL THEN
+                IF v_moved > 0 THEN
+                    EXECUTE format('INSERT INTO %I SELECT * FROM _partition_rows', p_parent);
+                END IF;
+                DROP TABLE _partition_rows;
+            END IF;
+            RETURN TRUE;
+        END;
+        $$ LANGUAGE plpgsql SET TimeZone = 'UTC';
+    """)
+
+    # One-off conversion, dropped again below
+    op.execute("""
+        CREATE OR REPLACE FUNCTION _partition_by_month(p_table TEXT, p_months_ahead INT)
+        RETURNS VOID AS $$
+        DECLARE
+            v_legacy TEXT := p_table || '_unpartitioned';
+            v_key TEXT;
+            v_indexes TEXT[];
+            v_foreign_keys TEXT[];
+            v_statement TEXT;
+            v_month DATE;
+            v_last DATE := (date_trunc('month', now()) + make_interval(months => p_months_ahead))::date;
+        BEGIN
+            IF to_regclass(p_table) IS NULL
+                    OR EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(p_table)) THEN
+                RETURN;
+            END IF;
+            IF EXISTS (
+                SELECT 1 FROM pg_index
+                WHERE indrelid = to_regclass(p_table) AND indisunique AND NOT indisprimary
+            ) THEN
+                RAISE EXCEPTION '% has a unique index without created_at and cannot be partitioned', p_table;
+            END IF;
+
+            SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY k.ord) INTO v_key
+            FROM pg_constraint c
+            CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+            WHERE c.conrelid = to_regclass(p_table) AND c.contype = 'p';
+
+            -- Definitions still name the original table, which is the new parent by the time they run
+            SELECT array_agg(pg_get_indexdef(indexrelid)) INTO v_indexes
+            FROM pg_index
+            WHERE indrelid = to_regclass(p_table) AND NOT indisprimary;
+
+            SELECT array_agg(format('ALTER TABLE %I ADD CONSTRAINT %I %s', p_table, conname, pg_get_constraintdef(oid)))
+            INTO v_foreign_keys
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(p_table) AND contype = 'f';
+
+            EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, v_legacy);
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS) '
+                'PARTITION BY RANGE (created_at)',
+                p_table, v_legacy
+            );
+
+            EXECUTE format('SELECT date_trunc(''month'', MIN(created_at))::date FROM %I', v_legacy) INTO v_month;
+            v_month := LEAST(COALESCE(v_month, v_last), date_trunc('month', now())::date);
+            WHILE v_month <= v_last LOOP
+                PERFORM create_month_partition(p_table, v_month);
+                v_month := (v_month + INTERVAL '1 month')::date;
+            END LOOP;
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', p_table || '_default', p_table);
+
+            EXECUTE format('INSERT INTO %I SELECT * FROM %I', p_table, v_legacy);
+            EXECUTE format('DROP TABLE %I', v_legacy);
+
+            -- Built after the copy, once per partition
+            EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (%s, created_at)', p_table, v_key);
+            FOREACH v_statement IN ARRAY COALESCE(v_indexes, '{}') LOOP
+                EXECUTE v_statement;
+            END LOOP;
+            FOREACH v_statement IN ARRAY COALESCE(v_foreign_keys, '{}') LOOP
+                EXECUTE v_statement;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql SET TimeZone = 'UTC';
+    """)
+
+    for table in PARTITIONED_TABLES:
+        op.execute(f"SELECT _partition_by_month('{table}', {PARTITION_MONTHS_AHEAD})")
+    op.execute("DROP FUNCTION _partition_by_month(TEXT, INT)")
+
+
+def downgrade() -> None:
+    # Partitions already detached (or archived) by retention are left as they are
+    op.execute("""
+        CREATE OR REPLACE FUNCTION _unpartition(p_table TEXT)
+        RETURNS VOID AS $$
+        DECLARE
+            v_partitioned TEXT := p_table || '_partitioned';
+            v_key TEXT;
+            v_indexes TEXT[];
+            v_foreign_keys TEXT[];
+            v_statement TEXT;
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(p_table)) THEN
+                RETURN;
+            END IF;
+
+            SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY k.ord) INTO v_key
+            FROM pg_constraint c
+            CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+            WHERE c.conrelid = to_regclass(p_table) AND c.contype = 'p' AND a.attname <> 'created_at';
+
+            SELECT array_agg(replace(pg_get_indexdef(indexrelid), ' ON ONLY ', ' ON ')) INTO v_indexes
+            FROM pg_index
+            WHERE indrelid = to_regclass(p_table) AND NOT indisprimary;
+
+            SELECT array_agg(format('ALTER TABLE %I ADD CONSTRAINT %I %s', p_table, conname, pg_get_constraintdef(oid)))
+            INTO v_foreign_keys
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(p_table) AND contype = 'f' AND conparentid = 0;
+
+            EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, v_partitioned);
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS)',
+                p_table, v_partitioned
+            );
+            EXECUTE format('INSERT INTO %I SELECT * FROM %I', p_table, v_partitioned);
+            EXECUTE format('DROP TABLE %I', v_partitioned);
+
+            EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (%s)', p_table, v_key);
+            FOREACH v_statement IN ARRAY COALESCE(v_indexes, '{}') LOOP
+                EXECUTE v_statement;
+            END LOOP;
+            FOREACH v_statement IN ARRAY COALESCE(v_foreign_keys, '{}') LOOP
+                EXECUTE v_statement;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    for table in PARTITIONED_TABLES:
+        op.execute(f"SELECT _unpartition('{table}')")
+    op.execute("DROP FUNCTION _unpartition(TEXT)")
+    op.execute("DROP FUNCTION IF EXISTS create_month_partition(TEXT, DATE)")
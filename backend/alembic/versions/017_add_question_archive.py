@@ -0,0 +1,64 @@
+"""Add the question archive
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19 16:00:00.000000
+
+This migration adds:
+- questions.archived_at: set when the question's bodies were moved to the
+  archive; the row itself stays as a stub (ids, status, dates, credits) so
+  counts, stats and foreign keys are unaffected
+- archive.questions: one row per archived question, with its question,
+  answers, expert reviews and ratings as zlib-compressed JSON
+- Partial index on questions.delivered_at over the questions not archived
+  yet, for the archiver's scan
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+
+    op.add_column('questions', sa.Column('archived_at', postgresql.TIMESTAMPTZ(), nullable=True))
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_questions_unarchived_delivered_at
+        ON questions (delivered_at)
+        WHERE archived_at IS NULL AND delivered_at IS NOT NULL
+    """)
+
+    op.create_table(
+        'questions',
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('client_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('delivered_at', postgresql.TIMESTAMPTZ(), nullable=True),
+        sa.Column('archived_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('bundle', postgresql.BYTEA(), nullable=False),
+        sa.Column('raw_bytes', sa.Integer(), nullable=False),
+        schema='archive',
+    )
+    # Bundles are compressed already; keep Postgres from trying again
+    op.execute("ALTER TABLE archive.questions ALTER COLUMN bundle SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    # Archived bodies only exist in the bundles; refuse rather than lose them
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM archive.questions) THEN
+                RAISE EXCEPTION 'archive.questions is not empty; restore the archived questions first';
+            END IF;
+        END;
+        $$;
+    """)
+    op.drop_table('questions', schema='archive')
+    op.execute("DROP INDEX IF EXISTS idx_questions_unarchived_delivered_at")
+    op.drop_column('questions', 'archived_at')
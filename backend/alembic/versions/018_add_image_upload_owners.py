@@ -0,0 +1,42 @@
+"""Add image upload owners
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19 17:00:00.000000
+
+This migration adds:
+- image_upload_owners: every user who uploaded an image. Identical bytes are
+  stored once, so image_uploads.uploaded_by only names the first uploader;
+  an image is served to its uploaders, admins and users who can see a
+  question referencing it
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'image_upload_owners',
+        sa.Column('sha256', sa.String(64), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', postgresql.TIMESTAMPTZ(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('sha256', 'user_id'),
+        sa.ForeignKeyConstraint(['sha256'], ['image_uploads.sha256'], ondelete='CASCADE'),
+    )
+    op.execute("""
+        INSERT INTO image_upload_owners (sha256, user_id, created_at)
+        SELECT sha256, uploaded_by, created_at
+        FROM image_uploads
+        WHERE uploaded_by IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('image_upload_owners')
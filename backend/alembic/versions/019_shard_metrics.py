@@ -0,0 +1,140 @@
+"""Shard the metrics counters
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-19 18:00:00.000000
+
+Every question insert upserted the same metrics_totals row and the same
+metrics_hourly bucket, so concurrent submissions queued on those row locks
+until each other's transactions committed.
+
+This migration:
+- Adds a shard column to metrics_hourly and metrics_totals and makes it part
+  of their primary keys
+- Makes record_metric write to the shard of the calling backend
+  (pg_backend_pid() % 16), so concurrent transactions on different
+  connections update different rows
+
+A metric's value is now the sum over its shards; readers aggregate them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+METRIC_SHARDS = 16
+
+
+def upgrade() -> None:
+    op.add_column('metrics_hourly', sa.Column('shard', sa.SmallInteger(), nullable=False, server_default='0'))
+    op.drop_constraint('metrics_hourly_pkey', 'metrics_hourly', type_='primary')
+    op.create_primary_key('metrics_hourly_pkey', 'metrics_hourly', ['metric', 'dimension', 'bucket', 'shard'])
+
+    op.add_column('metrics_totals', sa.Column('shard', sa.SmallInteger(), nullable=False, server_default='0'))
+    op.drop_constraint('metrics_totals_pkey', 'metrics_totals', type_='primary')
+    op.create_primary_key('metrics_totals_pkey', 'metrics_totals', ['metric', 'dimension', 'shard'])
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION record_metric(
+            p_metric VARCHAR, p_dimension VARCHAR, p_at TIMESTAMPTZ, p_delta DOUBLE PRECISION
+        ) RETURNS VOID AS $$
+        DECLARE
+            v_shard SMALLINT := pg_backend_pid() % {METRIC_SHARDS};
+        BEGIN
+            IF p_delta = 0 THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO metrics_hourly AS h (metric, dimension, bucket, shard, value)
+            VALUES (p_metric, COALESCE(p_dimension, ''), date_trunc('hour', p_at, 'UTC'), v_shard, p_delta)
+            ON CONFLICT (metric, dimension, bucket, shard) DO UPDATE SET
+                value = h.value + EXCLUDED.value;
+
+            INSERT INTO metrics_totals AS t (metric, dimension, shard, value)
+            VALUES (p_metric, COALESCE(p_dimension, ''), v_shard, p_delta)
+            ON CONFLICT (metric, dimension, shard) DO UPDATE SET
+                value = t.value + EXCLUDED.value;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    # Restore the unsharded writer first so nothing lands in a shard while folding
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_metric(
+            p_metric VARCHAR, p_dimension VARCHAR, p_at TIMESTAMPTZ, p_delta DOUBLE PRECISION
+        ) RETURNS VOID AS $$
+        BEGIN
+            IF p_delta = 0 THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO metrics_hourly AS h (metric, dimension, bucket, shard, value)
+            VALUES (p_metric, COALESCE(p_dimension, ''), date_trunc('hour', p_at, 'UTC'), 0, p_delta)
+            ON CONFLICT (metric, dimension, bucket, shard) DO UPDATE SET
+                value = h.value + EXCLUDED.value;
+
+            INSERT INTO metrics_totals AS t (metric, dimension, shard, value)
+            VALUES (p_metric, COALESCE(p_dimension, ''), 0, p_delta)
+            ON CONFLICT (metric, dimension, shard) DO UPDATE SET
+                value = t.value + EXCLUDED.value;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Fold every shard into shard 0
+    op.execute("""
+        WITH moved AS (
+            DELETE FROM metrics_hourly WHERE shard <> 0
+            RETURNING metric, dimension, bucket, value
+        )
+        INSERT INTO metrics_hourly AS h (metric, dimension, bucket, shard, value)
+        SELECT metric, dimension, bucket, 0, SUM(value) FROM moved GROUP BY 1, 2, 3
+        ON CONFLICT (metric, dimension, bucket, shard) DO UPDATE SET
+            value = h.value + EXCLUDED.value
+    """)
+    op.execute("""
+        WITH moved AS (
+            DELETE FROM metrics_totals WHERE shard <> 0
+            RETURNING metric, dimension, value
+        )
+        INSERT INTO metrics_totals AS t (metric, dimension, shard, value)
+        SELECT metric, dimension, 0, SUM(value) FROM moved GROUP BY 1, 2
+        ON CONFLICT (metric, dimension, shard) DO UPDATE SET
+            value = t.value + EXCLUDED.value
+    """)
+
+    op.drop_constraint('metrics_totals_pkey', 'metrics_totals', type_='primary')
+    op.create_primary_key('metrics_totals_pkey', 'metrics_totals', ['metric', 'dimension'])
+    op.drop_column('metrics_totals', 'shard')
+
+    op.drop_constraint('metrics_hourly_pkey', 'metrics_hourly', type_='primary')
+    op.create_primary_key('metrics_hourly_pkey', 'metrics_hourly', ['metric', 'dimension', 'bucket'])
+    op.drop_column('metrics_hourly', 'shard')
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_metric(
+            p_metric VARCHAR, p_dimension VARCHAR, p_at TIMESTAMPTZ, p_delta DOUBLE PRECISION
+        ) RETURNS VOID AS $$
+        BEGIN
+            IF p_delta = 0 THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO metrics_hourly AS h (metric, dimension, bucket, value)
+            VALUES (p_metric, COALESCE(p_dimension, ''), date_trunc('hour', p_at, 'UTC'), p_delta)
+            ON CONFLICT (metric, dimension, bucket) DO UPDATE SET
+                value = h.value + EXCLUDED.value;
+
+            INSERT INTO metrics_totals AS t (metric, dimension, value)
+            VALUES (p_metric, COALESCE(p_dimension, ''), p_delta)
+            ON CONFLICT (metric, dimension) DO UPDATE SET
+                value = t.value + EXCLUDED.value;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
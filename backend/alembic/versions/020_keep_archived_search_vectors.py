@@ -0,0 +1,104 @@
+"""Keep the search vectors of archived questions
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-19 19:00:00.000000
+
+questions.search_vector was generated from question_text (migration 007), so
+emptying the text of an archived question (migration 017) emptied its vector
+too and the question dropped out of admin search.
+
+This migration:
+- Replaces the generated column with a plain one kept by a BEFORE trigger:
+  computed from subject and question_text as before, except that an archived
+  stub (archived_at set, text emptied) keeps the vector it had; restoring the
+  question recomputes it
+- Rebuilds the vectors of questions already archived from their bundles
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '020'
+down_revision = '019'
+branch_labels = None
+depends_on = None
+
+VECTOR = """
+    setweight(to_tsvector('english', COALESCE({row}subject, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE({text}, '')), 'B')
+"""
+
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_questions_search_vector")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE questions ADD COLUMN search_vector tsvector")
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION questions_search_vector() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NEW.archived_at IS NOT NULL AND COALESCE(NEW.question_text, '') = '' THEN
+                -- Archived stub: the text lives in the bundle, keep its vector
+                NEW.search_vector := OLD.search_vector;
+            ELSE
+                NEW.search_vector := {VECTOR.format(row='NEW.', text='NEW.question_text')};
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_questions_search_vector
+        BEFORE INSERT OR UPDATE OF subject, question_text, archived_at ON questions
+        FOR EACH ROW EXECUTE FUNCTION questions_search_vector();
+    """)
+
+    op.execute(f"UPDATE questions SET search_vector = {VECTOR.format(row='', text='question_text')}")
+
+    # Archived texts are only in the (zlib) bundles, so decompress them here
+    bind = op.get_bind()
+    after = None
+    while True:
+        rows = bind.execute(sa.text("""
+            SELECT question_id, bundle FROM archive.questions
+            WHERE CAST(:after AS uuid) IS NULL OR question_id > CAST(:after AS uuid)
+            ORDER BY question_id
+            LIMIT :limit
+        """), {"after": after, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        for question_id, bundle in rows:
+            text = json.loads(zlib.decompress(bundle))["question"].get("question_text") or ""
+            bind.execute(sa.text(f"""
+                UPDATE questions SET search_vector = {VECTOR.format(row='', text='CAST(:text AS text)')}
+                WHERE id = :id
+            """), {"id": question_id, "text": text})
+        after = str(rows[-1][0])
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_questions_search_vector
+        ON questions USING GIN (search_vector)
+    """)
+
+
+def downgrade() -> None:
+    # Archived questions lose their vectors again (their text is emptied)
+    op.execute("DROP TRIGGER IF EXISTS trg_questions_search_vector ON questions")
+    op.execute("DROP FUNCTION IF EXISTS questions_search_vector()")
+    op.execute("DROP INDEX IF EXISTS idx_questions_search_vector")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS search_vector")
+    op.execute(f"""
+        ALTER TABLE questions
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS ({VECTOR.format(row='', text='question_text')}) STORED
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_questions_search_vector
+        ON questions USING GIN (search_vector)
+    """)
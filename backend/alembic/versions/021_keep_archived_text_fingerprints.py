@@ -0,0 +1,106 @@
+"""Keep the text fingerprints of archived questions
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-19 20:00:00.000000
+
+questions.text_fingerprint was generated from question_text (migration 009),
+so emptying the text of an archived question (migration 017) turned it into
+md5('') and the question stopped matching new ones as an exact answer reuse.
+
+This migration, like 020 did for search_vector:
+- Replaces the generated column with a plain one kept by a BEFORE trigger:
+  computed from question_text as before, except that an archived stub
+  (archived_at set, text emptied) keeps the fingerprint it had; restoring the
+  question recomputes it
+- Rebuilds the fingerprints of questions already archived from their bundles
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '021'
+down_revision = '020'
+branch_labels = None
+depends_on = None
+
+# Must match app.utils.answer_reuse.text_fingerprint
+FINGERPRINT = "md5(btrim(regexp_replace(lower(COALESCE({text}, '')), '[^a-z0-9]+', ' ', 'g')))"
+
+FINGERPRINT_FUNCTION = f"""
+    CREATE OR REPLACE FUNCTION questions_text_fingerprint() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.archived_at IS NOT NULL AND COALESCE(NEW.question_text, '') = '' THEN
+            -- Archived stub: the text lives in the bundle, keep its fingerprint
+            NEW.text_fingerprint := OLD.text_fingerprint;
+        ELSE
+            NEW.text_fingerprint := {FINGERPRINT.format(text='NEW.question_text')};
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+BATCH_SIZE = 500
+
+
+def _create_index() -> None:
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_questions_text_fingerprint_delivered
+        ON questions (text_fingerprint, delivered_at DESC)
+        WHERE status = 'delivered'
+    """)
+
+
+def upgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_questions_text_fingerprint_delivered")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS text_fingerprint")
+    op.execute("ALTER TABLE questions ADD COLUMN text_fingerprint TEXT")
+
+    op.execute(FINGERPRINT_FUNCTION)
+    op.execute("""
+        CREATE TRIGGER trg_questions_text_fingerprint
+        BEFORE INSERT OR UPDATE OF question_text, archived_at ON questions
+        FOR EACH ROW EXECUTE FUNCTION questions_text_fingerprint();
+    """)
+
+    op.execute(f"UPDATE questions SET text_fingerprint = {FINGERPRINT.format(text='question_text')}")
+
+    # Archived texts are only in the (zlib) bundles, so decompress them here
+    bind = op.get_bind()
+    after = None
+    while True:
+        rows = bind.execute(sa.text("""
+            SELECT question_id, bundle FROM archive.questions
+            WHERE CAST(:after AS uuid) IS NULL OR question_id > CAST(:after AS uuid)
+            ORDER BY question_id
+            LIMIT :limit
+        """), {"after": after, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        for question_id, bundle in rows:
+            text = json.loads(zlib.decompress(bundle))["question"].get("question_text") or ""
+            bind.execute(sa.text(f"""
+                UPDATE questions SET text_fingerprint = {FINGERPRINT.format(text='CAST(:text AS text)')}
+                WHERE id = :id
+            """), {"id": question_id, "text": text})
+        after = str(rows[-1][0])
+
+    _create_index()
+
+
+def downgrade() -> None:
+    # Archived questions lose their fingerprints again (their text is emptied)
+    op.execute("DROP TRIGGER IF EXISTS trg_questions_text_fingerprint ON questions")
+    op.execute("DROP FUNCTION IF EXISTS questions_text_fingerprint()")
+    op.execute("DROP INDEX IF EXISTS idx_questions_text_fingerprint_delivered")
+    op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS text_fingerprint")
+    op.execute(f"""
+        ALTER TABLE questions
+        ADD COLUMN text_fingerprint TEXT
+        GENERATED ALWAYS AS ({FINGERPRINT.format(text='question_text')}) STORED
+    """)
+    _create_index()
@@ -0,0 +1,17 @@
+-- Notify the user directory (app/utils/user_directory.py) of profile changes
+-- Run against existing auth databases; new ones get it from complete_schema.sql.
+-- Safe to run more than once.
+
+CREATE OR REPLACE FUNCTION notify_user_directory()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('user_directory', COALESCE(NEW.user_id, OLD.user_id)::text);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS notify_users_user_directory ON users;
+
+CREATE TRIGGER notify_users_user_directory
+    AFTER INSERT OR DELETE OR UPDATE OF email, first_name, last_name, role, is_active, is_banned ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_user_directory();
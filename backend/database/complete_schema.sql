@@ -430,6 +430,19 @@ CREATE TRIGGER update_answers_updated_at BEFORE UPDATE ON answers
 CREATE TRIGGER update_expert_reviews_updated_at BEFORE UPDATE ON expert_reviews
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Notify the user directory (app/utils/user_directory.py) of profile changes
+CREATE OR REPLACE FUNCTION notify_user_directory()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('user_directory', COALESCE(NEW.user_id, OLD.user_id)::text);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER notify_users_user_directory
+    AFTER INSERT OR DELETE OR UPDATE OF email, first_name, last_name, role, is_active, is_banned ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_user_directory();
+
 -- ============================================
 -- VIEWS
 -- ============================================
@@ -14,7 +14,8 @@ from app.schemas.admin.api_key import (
     APIKeyUpdate,
     APIKeyResponse,
     APIKeyListResponse,
-    APIKeyTestResponse
+    APIKeyTestResponse,
+    ResponseCacheStatsResponse
 )
 from app.models.user import User
 
@@ -34,6 +35,16 @@ async def list_api_keys(
     return APIKeyListResponse(**result)
 
 
+@router.get("/response-cache/stats", response_model=ResponseCacheStatsResponse)
+async def get_response_cache_stats(
+    current_admin: User = Depends(require_admin_or_super),
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Get AI response cache hit rates per model and cache size"""
+    stats = await api_key_service.get_response_cache_stats(db)
+    return ResponseCacheStatsResponse(**stats)
+
+
 @router.post("", response_model=APIKeyResponse)
 async def create_api_key(
     api_key_data: APIKeyCreate,
@@ -111,5 +122,6 @@ async def test_api_key(
 ):
     """Test API key connection"""
     result = await api_key_service.test_api_key(db, key_id)
+    if result["status"] == "not_found":
+        raise HTTPException(status_code=404, detail=result["message"])
     return APIKeyTestResponse(**result)
-
@@ -8,7 +8,7 @@ import asyncpg
 from uuid import UUID
 from datetime import datetime
 from app.dependencies.admin import require_admin_or_super
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, read_from_primary
 from app.services.admin.compliance_service import ComplianceService
 from app.schemas.admin.compliance import (
     AuditLogResponse,
@@ -33,7 +33,7 @@ async def get_audit_logs(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Get audit logs with filters"""
     result = await compliance_service.get_audit_logs(
@@ -63,7 +63,7 @@ async def get_flagged_content(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Get flagged content (AI >10%, plagiarism, VPN, etc.)"""
     result = await compliance_service.get_flagged_content(
@@ -106,10 +106,10 @@ async def flag_content(
 @router.get("/compliance/stats", response_model=ComplianceStatsResponse, summary="Get compliance statistics")
 async def get_compliance_stats(
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    primary: bool = Depends(read_from_primary)
 ):
     """Get compliance statistics"""
-    stats = await compliance_service.get_compliance_stats(db)
+    stats = await compliance_service.get_compliance_stats(primary)
     return ComplianceStatsResponse(**stats)
 
 
@@ -121,7 +121,7 @@ async def export_audit_logs(
     date_from: Optional[datetime] = Query(None, description="Filter from date"),
     date_to: Optional[datetime] = Query(None, description="Filter to date"),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Export audit logs"""
     result = await compliance_service.export_audit_logs(
@@ -4,11 +4,11 @@ Provides overview statistics and data for admin dashboard
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from app.db.session import read_from_primary
 from app.dependencies.admin import require_admin_or_super
-from app.db.session import get_db
 from app.models.user import User
-from app.services.admin.admin_service import AdminService
-import asyncpg
+from app.services.admin.admin_service import AdminService, empty_dashboard_stats
+from app.utils.composite import Section, load_sections
 
 router = APIRouter()
 admin_service = AdminService()
@@ -17,29 +17,36 @@ admin_service = AdminService()
 @router.get("/dashboard", summary="Get admin dashboard overview")
 async def get_admin_dashboard(
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    primary: bool = Depends(read_from_primary)
 ):
     """
-    Get dashboard overview with statistics, charts, and recent activity
+    Get dashboard overview with statistics, charts, and recent activity.
+    The three sections load concurrently; any that fail or time out are
+    listed in `unavailable_sections`.
     """
     try:
-        # Get statistics from various services
-        stats = await admin_service.get_dashboard_stats(db)
-        
-        # Get chart data
-        charts = await admin_service.get_dashboard_charts(db)
-        
-        # Get recent activity
-        recent_activity = await admin_service.get_recent_activity(db, limit=10)
-        
+        result = await load_sections("admin_dashboard", [
+            Section("stats", admin_service.get_dashboard_stats, default=empty_dashboard_stats()),
+            Section("charts", admin_service.get_dashboard_charts, default={
+                "questions_per_day": [], "top_subjects": []
+            }),
+            # Recent activity is never cached
+            Section(
+                "recent_activity",
+                lambda conn: admin_service.get_recent_activity(conn, limit=10),
+                default=[],
+                cache_ttl=0
+            ),
+        ], primary=primary)
+
         return {
             "success": True,
             "data": {
-                "stats": stats,
-                "charts": charts,
-                "recent_activity": recent_activity
+                "stats": result["stats"],
+                "charts": result["charts"],
+                "recent_activity": result["recent_activity"],
+                "unavailable_sections": result.unavailable
             }
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load dashboard: {str(e)}")
-
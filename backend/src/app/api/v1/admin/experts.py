@@ -7,7 +7,7 @@ from typing import Optional
 import asyncpg
 from uuid import UUID
 from app.dependencies.admin import require_admin_or_super, require_super_admin
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, read_from_primary
 from app.services.admin.expert_service import ExpertService
 from app.schemas.admin.expert import (
     ExpertListResponse,
@@ -32,7 +32,7 @@ async def list_experts(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """List all experts with filters"""
     result = await expert_service.get_experts(
@@ -57,10 +57,10 @@ async def get_expert(
 @router.get("/stats", response_model=ExpertStatsResponse)
 async def get_expert_stats(
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    primary: bool = Depends(read_from_primary)
 ):
     """Get expert statistics"""
-    stats = await expert_service.get_expert_stats(db)
+    stats = await expert_service.get_expert_stats(primary)
     return ExpertStatsResponse(**stats)
 
 
@@ -69,7 +69,7 @@ async def get_expert_performance(
     expert_id: UUID,
     period: str = Query("all_time", description="Period: today, week, month, all_time"),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Get expert performance metrics"""
     performance = await expert_service.get_expert_performance(db, expert_id, period)
@@ -139,7 +139,7 @@ async def get_expert_leaderboard(
     period: str = Query("all_time", description="Period: week, month, all_time"),
     limit: int = Query(50, ge=1, le=100),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Get expert leaderboard"""
     result = await expert_service.get_expert_leaderboard(db, period, limit)
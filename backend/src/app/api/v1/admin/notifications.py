@@ -7,7 +7,7 @@ from typing import Optional
 import asyncpg
 from uuid import UUID
 from app.dependencies.admin import require_admin_or_super
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.admin.notification_service import NotificationService
 from app.schemas.admin.notification import (
     NotificationBroadcastRequest,
@@ -66,7 +66,7 @@ async def get_notification_history(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Get notification broadcast history"""
     result = await notification_service.get_notification_history(
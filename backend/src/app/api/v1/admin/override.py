@@ -15,7 +15,8 @@ from app.schemas.admin.override import (
     OriginalityPassRequest,
     ConfidenceOverrideRequest,
     HumanizationSkipRequest,
-    ExpertBypassRequest
+    ExpertBypassRequest,
+    ResponseCacheBypassRequest
 )
 from app.models.user import User
 
@@ -148,3 +149,27 @@ async def bypass_expert_review(
         overridden_by=current_admin.id
     )
 
+
+@router.post("/cache-bypass/{question_id}", response_model=OverrideResponse, summary="Bypass AI response cache")
+async def bypass_response_cache(
+    question_id: UUID,
+    request_body: ResponseCacheBypassRequest,
+    request: Request,
+    current_admin: User = Depends(require_super_admin),
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Generate fresh AI answers for a question instead of serving cached ones (super_admin only)"""
+    result = await override_service.bypass_response_cache(
+        db, question_id, current_admin.id, request_body.reason,
+        request.client.host if request.client else None,
+        request.headers.get("user-agent")
+    )
+    return OverrideResponse(
+        success=result["success"],
+        override_id=result["override_id"],
+        action=result["action"],
+        target_id=result["target_id"],
+        reason=request_body.reason,
+        overridden_at=datetime.utcnow(),
+        overridden_by=current_admin.id
+    )
@@ -8,7 +8,7 @@ import asyncpg
 from uuid import UUID
 from datetime import datetime
 from app.dependencies.admin import require_admin_or_super, require_super_admin
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.admin.question_service import QuestionService
 from app.schemas.admin.question import (
     QuestionListResponse,
@@ -18,7 +18,8 @@ from app.schemas.admin.question import (
     QuestionRejectRequest,
     QuestionPlagiarismFlag,
     QuestionEscalateRequest,
-    QuestionStatsResponse
+    QuestionStatsResponse,
+    AnswerReuseStatsResponse
 )
 from app.models.user import User
 
@@ -34,17 +35,21 @@ async def list_questions(
     expert_id: Optional[UUID] = Query(None, description="Filter by expert ID"),
     date_from: Optional[datetime] = Query(None, description="Filter from date"),
     date_to: Optional[datetime] = Query(None, description="Filter to date"),
-    search: Optional[str] = Query(None, description="Search in question text"),
+    search: Optional[str] = Query(None, description="Full-text search in question text and subject"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous search page"),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """List all questions with filters"""
-    result = await question_service.get_questions(
-        db, status, subject, client_id, expert_id,
-        date_from, date_to, search, page, page_size
-    )
+    try:
+        result = await question_service.get_questions(
+            db, status, subject, client_id, expert_id,
+            date_from, date_to, search, page, page_size, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return QuestionListResponse(**result)
 
 
@@ -154,9 +159,19 @@ async def escalate_question(
 @router.get("/stats", response_model=QuestionStatsResponse)
 async def get_question_stats(
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Get question statistics"""
     stats = await question_service.get_question_stats(db)
     return QuestionStatsResponse(**stats)
 
+
+@router.get("/answer-reuse/stats", response_model=AnswerReuseStatsResponse)
+async def get_answer_reuse_stats(
+    days: int = Query(30, ge=1, le=365),
+    current_admin: User = Depends(require_admin_or_super),
+    db: asyncpg.Connection = Depends(get_read_db)
+):
+    """Get answer reuse hit rate and estimated savings"""
+    stats = await question_service.get_answer_reuse_stats(db, days)
+    return AnswerReuseStatsResponse(**stats)
@@ -8,7 +8,7 @@ import asyncpg
 from uuid import UUID
 from datetime import datetime
 from app.dependencies.admin import require_admin_or_super
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, read_from_primary
 from app.services.admin.revenue_service import RevenueService
 from app.schemas.admin.revenue import (
     RevenueDashboardResponse,
@@ -27,10 +27,10 @@ revenue_service = RevenueService()
 @router.get("/dashboard", response_model=RevenueDashboardResponse, summary="Get revenue dashboard")
 async def get_revenue_dashboard(
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    primary: bool = Depends(read_from_primary)
 ):
     """Get revenue dashboard statistics"""
-    result = await revenue_service.get_revenue_dashboard(db)
+    result = await revenue_service.get_revenue_dashboard(primary)
     return RevenueDashboardResponse(**result)
 
 
@@ -44,7 +44,7 @@ async def get_transactions(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Get transactions with filters"""
     result = await revenue_service.get_transactions(
@@ -94,9 +94,9 @@ async def revoke_credits(
 @router.get("/credits/stats", response_model=CreditsStatsResponse, summary="Get credits statistics")
 async def get_credits_stats(
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    primary: bool = Depends(read_from_primary)
 ):
     """Get credits statistics"""
-    result = await revenue_service.get_credits_stats(db)
+    result = await revenue_service.get_credits_stats(primary)
     return CreditsStatsResponse(**result)
 
@@ -22,6 +22,7 @@ from app.schemas.admin.setting import (
     MaintenanceModeRequest
 )
 from app.models.user import User
+from app.utils.runtime_settings import runtime_settings
 from datetime import datetime
 
 router = APIRouter()
@@ -56,6 +57,7 @@ async def update_setting(
         db, key, setting_update.value,
         setting_update.description, current_admin.id
     )
+    await runtime_settings.changed(key)
     
     # Log action
     await log_admin_action(
@@ -102,6 +104,7 @@ async def toggle_maintenance_mode(
         {"enabled": maintenance_request.enabled, "message": maintenance_request.message},
         "Platform maintenance mode", current_admin.id
     )
+    await runtime_settings.changed("maintenance_mode")
     
     # Log action
     await log_admin_action(
@@ -11,7 +11,7 @@ from app.dependencies.admin import (
     get_current_admin,
     log_admin_action
 )
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.admin.user_service import UserService
 from app.schemas.admin.user import (
     UserListResponse,
@@ -36,13 +36,17 @@ async def list_users(
     search: Optional[str] = Query(None, description="Search by email/name"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous search page"),
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """List all users with filters"""
-    result = await user_service.get_users(
-        db, role, is_banned, is_active, search, page, page_size
-    )
+    try:
+        result = await user_service.get_users(
+            db, role, is_banned, is_active, search, page, page_size, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return UserListResponse(**result)
 
 
@@ -145,7 +149,7 @@ async def promote_to_expert(
 @router.get("/stats", response_model=UserStatsResponse)
 async def get_user_stats(
     current_admin: User = Depends(require_admin_or_super),
-    db: asyncpg.Connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_read_db)
 ):
     """Get user statistics"""
     stats = await user_service.get_user_stats(db)
@@ -3,7 +3,7 @@ Authentication endpoints
 Login and registration
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -14,6 +14,7 @@ from app.db.session import get_auth_db, get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 import asyncpg
 from app.core.security import SecurityUtils
+from app.core.tokens import token_verifier
 from app.core.config import settings
 from pydantic import BaseModel, EmailStr
 import logging
@@ -54,10 +55,29 @@ class LoginResponse(BaseModel):
     success: bool
     message: str
     access_token: Optional[str] = None
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
+    expires_in: Optional[int] = None  # access token lifetime in seconds
     user: Optional[UserResponse] = None
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
+def issue_tokens(user_id: str, role: str, email: str) -> dict:
+    """Access and refresh token pair for a user"""
+    return {
+        "access_token": token_verifier.create_access_token(user_id, role, email),
+        "refresh_token": token_verifier.create_refresh_token(user_id, role, email),
+        "expires_in": settings.jwt_access_token_minutes * 60
+    }
+
+
 @router.post("/register", response_model=LoginResponse)
 async def register(
     request: RegisterRequest,
@@ -153,17 +173,13 @@ async def register(
             logger.warning(f"Failed to create user in main database: {main_db_error}. User created in auth DB only.")
             # Continue - user can still login, main DB entry can be created later
         
-        # Generate JWT token
-        token = SecurityUtils.generate_jwt_token(
-            user_id=str(user_data['user_id']),
-            role=user_data['role'],
-            email=user_data['email']
-        )
+        # Generate JWT tokens
+        tokens = issue_tokens(str(user_data['user_id']), user_data['role'], user_data['email'])
         
         return LoginResponse(
             success=True,
             message="Registration successful",
-            access_token=token,
+            **tokens,
             user=UserResponse(
                 user_id=str(user_data['user_id']),
                 email=user_data['email'],
@@ -238,12 +254,8 @@ async def login(
             WHERE user_id = $1
         """, user['user_id'])
         
-        # Generate JWT token
-        token = SecurityUtils.generate_jwt_token(
-            user_id=str(user['user_id']),
-            role=user['role'],
-            email=user['email']
-        )
+        # Generate JWT tokens
+        tokens = issue_tokens(str(user['user_id']), user['role'], user['email'])
         
         # Record login activity for achievements (clients only)
         if user['role'] == 'client':
@@ -263,7 +275,7 @@ async def login(
         return LoginResponse(
             success=True,
             message="Login successful",
-            access_token=token,
+            **tokens,
             user=UserResponse(
                 user_id=str(user['user_id']),
                 email=user['email'],
@@ -284,3 +296,62 @@ async def login(
             detail=f"Login failed: {str(e)}"
         )
 
+
+@router.post("/refresh", response_model=LoginResponse)
+async def refresh(
+    request: RefreshRequest,
+    auth_db: asyncpg.Connection = Depends(get_auth_db)
+):
+    """
+    Exchange a refresh token for a new access/refresh token pair.
+    The presented refresh token is claimed (revoked) atomically first, so of
+    concurrent requests with the same token only one succeeds.
+    """
+    claims = await token_verifier.verify(request.refresh_token, token_type="refresh")
+    if not claims or not await token_verifier.claim(claims):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
+    
+    user = await auth_db.fetchrow("""
+        SELECT user_id, email, first_name, last_name, role, is_active, email_verified as is_verified, is_banned
+        FROM users
+        WHERE user_id = $1
+    """, claims["user_id"])
+    if not user or not user['is_active'] or user['is_banned']:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is not active"
+        )
+    
+    return LoginResponse(
+        success=True,
+        message="Token refreshed",
+        **issue_tokens(str(user['user_id']), user['role'], user['email']),
+        user=UserResponse(
+            user_id=str(user['user_id']),
+            email=user['email'],
+            first_name=user['first_name'],
+            last_name=user['last_name'],
+            role=user['role'],
+            is_active=user['is_active'],
+            is_verified=user['is_verified']
+        )
+    )
+
+
+@router.post("/logout")
+async def logout(http_request: Request, request: Optional[LogoutRequest] = None):
+    """Revoke the bearer access token and, if given, the refresh token"""
+    authorization = http_request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        claims = token_verifier.decode(token)
+        if claims:
+            await token_verifier.revoke(claims)
+    if request and request.refresh_token:
+        claims = token_verifier.decode(request.refresh_token, token_type="refresh")
+        if claims:
+            await token_verifier.revoke(claims)
+    return {"success": True, "message": "Logged out"}
@@ -6,9 +6,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile
 from typing import Optional, List
 import asyncpg
 from uuid import UUID
+from app.core.config import settings
 from app.dependencies.client import require_client
 from app.db.session import get_db
 from app.services.client.question_service import QuestionService
+from app.services.client.upload_service import UploadService
+from app.utils.uploads import UploadTooLargeError, receive_upload_file
 from app.schemas.client.question import (
     QuestionSubmissionRequest,
     QuestionSubmissionResponse,
@@ -28,16 +31,30 @@ async def submit_question(
     subject: Optional[str] = Form(None),
     priority: Optional[str] = Form("normal"),
     images: Optional[List[UploadFile]] = File(None),
+    image_urls: Optional[List[str]] = Form(None),
     current_user: User = Depends(require_client),
     db: asyncpg.Connection = Depends(get_db)
 ):
-    """Submit a new question"""
-    # TODO: Handle image uploads
-    image_urls = []
+    """Submit a new question; images may be attached directly or by URL (e.g. from /uploads/images)"""
+    image_urls = list(image_urls or [])
     if images:
-        # Process and upload images
-        # For now, just collect filenames
-        image_urls = [img.filename for img in images if img.filename]
+        # Store the images; the OCR stage reads them back from storage
+        for img in images:
+            if not img.filename:
+                continue
+            try:
+                incoming = await receive_upload_file(img, settings.max_file_size_mb * 1024 * 1024)
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            try:
+                stored = await UploadService.store_image(db, current_user.id, incoming)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            finally:
+                incoming.discard()
+            image_urls.append(stored["url"])
     
     try:
         result = await question_service.submit_question(
@@ -0,0 +1,102 @@
+"""
+Client upload endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from fastapi.responses import FileResponse, RedirectResponse
+import asyncpg
+from app.core.config import settings
+from app.dependencies.admin import get_current_user
+from app.dependencies.client import require_client
+from app.db.pool_classes import PoolBusyError
+from app.db.session import db as database, get_db
+from app.services.client.upload_service import UploadService
+from app.schemas.client.upload import ImageUploadBatchResponse
+from app.utils.storage import get_storage
+from app.utils.uploads import UploadTooLargeError, receive_image_uploads
+from app.models.user import User
+
+router = APIRouter()
+upload_service = UploadService()
+
+# Content-addressed, so a stored image never changes
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+@router.post("/images", response_model=ImageUploadBatchResponse, summary="Upload images")
+async def upload_images(
+    request: Request,
+    current_user: User = Depends(require_client)
+):
+    """
+    Upload images as multipart/form-data in the `files` field.
+    The body is read as it streams in; oversized and non-image files are
+    rejected before the rest of the body is read.
+    """
+    try:
+        incoming = await receive_image_uploads(
+            request,
+            max_file_bytes=settings.max_file_size_mb * 1024 * 1024,
+            max_files=settings.upload_max_files
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # A connection is only taken once the (possibly slow) body has been received
+    try:
+        async with database.acquire("interactive") as conn:
+            images = [
+                await upload_service.store_image(conn, current_user.id, upload)
+                for upload in incoming
+            ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PoolBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+    finally:
+        for upload in incoming:
+            upload.discard()
+    return ImageUploadBatchResponse(images=images)
+
+
+async def _serve_image(db: asyncpg.Connection, sha256: str, user: User, thumbnail: bool):
+    # Images the user may not see are reported as missing, not forbidden
+    if not await upload_service.can_view_image(db, sha256, user):
+        raise HTTPException(status_code=404, detail="Image not found")
+    location = await upload_service.get_image_location(db, sha256, thumbnail)
+    if not location:
+        raise HTTPException(status_code=404, detail="Image not found")
+    upload, key, url = location
+    if url:
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    return FileResponse(
+        get_storage().path(key),
+        media_type="image/jpeg" if thumbnail else upload["content_type"],
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    )
+
+
+@router.get("/images/{sha256}", summary="Get uploaded image")
+async def get_image(
+    sha256: str = Path(..., pattern="^[0-9a-f]{64}$"),
+    current_user: User = Depends(get_current_user),
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Uploaded image (redirects to a presigned URL when stored in S3)"""
+    return await _serve_image(db, sha256, current_user, thumbnail=False)
+
+
+@router.get("/images/{sha256}/thumbnail", summary="Get uploaded image thumbnail")
+async def get_image_thumbnail(
+    sha256: str = Path(..., pattern="^[0-9a-f]{64}$"),
+    current_user: User = Depends(get_current_user),
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """JPEG thumbnail of an uploaded image"""
+    return await _serve_image(db, sha256, current_user, thumbnail=True)
@@ -9,6 +9,7 @@ import asyncpg
 from datetime import datetime
 
 from app.db.session import db, get_db, get_redis
+from app.db.statements import statements
 from app.utils.queue import queue_service
 from app.core.config import settings
 
@@ -177,6 +178,18 @@ async def db_health_check() -> Dict[str, Any]:
         )
 
 
+@router.get("/pools")
+async def pool_health_check() -> Dict[str, Any]:
+    """Connection pool sizes, per-route-class utilization and wait times, and statement reuse"""
+    return {
+        "status": "healthy" if db.pool else "not_connected",
+        "pools": db.pool_stats(),
+        "statements": statements.stats(),
+        "adaptive": settings.db_pool_adaptive,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
 @router.get("/cache")
 async def cache_health_check() -> Dict[str, Any]:
     """Check cache (Redis) health"""
@@ -57,3 +57,16 @@ async def start_task(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+
+@router.post("/{task_id}/reuse-answer", summary="Use the offered answer as draft")
+async def accept_reuse_offer(
+    task_id: UUID,
+    current_user: User = Depends(require_expert),
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Start from a previously delivered answer to the same question"""
+    try:
+        result = await task_service.accept_reuse_offer(db, task_id, current_user.id)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -3,10 +3,16 @@ WebSocket endpoints for real-time updates
 """
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from typing import Optional
-import jwt
+from typing import Optional, Dict
+from uuid import UUID
+import asyncio
+import json
 import logging
-from app.core.config import settings
+from app.core.tokens import token_verifier
+from app.crud.client import questions as question_crud
+from app.db.pool_classes import PoolBusyError
+from app.db.session import db
+from app.utils.draft_stream import DraftSubscriber, draft_streams
 
 logger = logging.getLogger(__name__)
 
@@ -23,19 +29,64 @@ ALLOWED_ORIGINS = [
 
 async def verify_websocket_token(token: str) -> Optional[dict]:
     """Verify JWT token for WebSocket connection"""
+    return await token_verifier.verify(token)
+
+
+async def forward_draft(websocket: WebSocket, subscriber: DraftSubscriber, send_lock: asyncio.Lock):
+    """Send a subscriber's draft frames to the socket until it is unsubscribed"""
+    while True:
+        frame = await subscriber.next_frame()
+        async with send_lock:
+            await websocket.send_json(frame)
+        if frame["type"] == "draft_complete":
+            return
+
+
+async def subscribe_draft(
+    websocket: WebSocket,
+    user_id: str,
+    message: dict,
+    streams: Dict[str, tuple],
+    send_lock: asyncio.Lock
+) -> None:
+    """Handle a subscribe_draft message: {"type", "question_id", "offset"}"""
     try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret_key,
-            algorithms=["HS256"]
-        )
-        return payload
-    except jwt.ExpiredSignatureError:
-        logger.warning("WebSocket token expired")
-        return None
-    except jwt.InvalidTokenError:
-        logger.warning("WebSocket token invalid")
-        return None
+        question_id = UUID(str(message.get("question_id")))
+        offset = max(int(message.get("offset") or 0), 0)
+    except (ValueError, TypeError):
+        async with send_lock:
+            await websocket.send_json({"type": "error", "message": "Invalid question_id or offset"})
+        return
+    
+    allowed = False
+    if db.pool:
+        try:
+            async with db.acquire("interactive") as conn:
+                allowed = await question_crud.question_belongs_to_client(conn, question_id, UUID(str(user_id)))
+        except PoolBusyError:
+            async with send_lock:
+                await websocket.send_json({"type": "error", "message": "Server busy, please retry"})
+            return
+    if not allowed:
+        async with send_lock:
+            await websocket.send_json({"type": "error", "message": "Question not found"})
+        return
+    
+    unsubscribe_draft(str(question_id), streams)
+    subscriber = draft_streams.subscribe(question_id, offset)
+    task = asyncio.create_task(forward_draft(websocket, subscriber, send_lock))
+    streams[str(question_id)] = (subscriber, task)
+    async with send_lock:
+        await websocket.send_json({"type": "draft_subscribed", "question_id": str(question_id), "offset": offset})
+
+
+def unsubscribe_draft(question_id: str, streams: Dict[str, tuple]) -> None:
+    """Stop forwarding a question's draft"""
+    stream = streams.pop(question_id, None)
+    if stream:
+        subscriber, task = stream
+        subscriber.close()
+        task.cancel()
 
 
 @router.websocket("/ws/client")
@@ -80,6 +131,10 @@ async def websocket_client(websocket: WebSocket, token: Optional[str] = Query(No
     await websocket.accept()
     logger.info(f"WebSocket connection established for client {user_id}")
     
+    # question_id -> (subscriber, forwarding task)
+    draft_subscriptions: Dict[str, tuple] = {}
+    send_lock = asyncio.Lock()
+    
     try:
         # Send welcome message
         await websocket.send_json({
@@ -96,16 +151,31 @@ async def websocket_client(websocket: WebSocket, token: Optional[str] = Query(No
                 data = await websocket.receive_text()
                 logger.debug(f"Received message from client {user_id}: {data}")
                 
+                try:
+                    message = json.loads(data)
+                except ValueError:
+                    message = None
+                message_type = message.get("type") if isinstance(message, dict) else None
+                
+                # Stream AI drafts: {"type": "subscribe_draft", "question_id": ..., "offset": 0}
+                if message_type == "subscribe_draft":
+                    await subscribe_draft(websocket, user_id, message, draft_subscriptions, send_lock)
+                    continue
+                if message_type == "unsubscribe_draft":
+                    unsubscribe_draft(str(message.get("question_id")), draft_subscriptions)
+                    continue
+                
                 # Echo back (you can implement actual message handling here)
-                await websocket.send_json({
-                    "type": "echo",
-                    "message": f"Received: {data}",
-                    "source": "client"
-                })
+                async with send_lock:
+                    await websocket.send_json({
+                        "type": "echo",
+                        "message": f"Received: {data}",
+                        "source": "client"
+                    })
             except WebSocketDisconnect:
                 logger.info(f"WebSocket disconnected for client {user_id}")
                 break
-                
+    
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for client {user_id}")
     except Exception as e:
@@ -114,6 +184,9 @@ async def websocket_client(websocket: WebSocket, token: Optional[str] = Query(No
             await websocket.close(code=1011, reason="Internal server error")
         except:
             pass
+    finally:
+        for question_id in list(draft_subscriptions):
+            unsubscribe_draft(question_id, draft_subscriptions)
 
 
 @router.websocket("/ws/expert")
@@ -183,7 +256,7 @@ async def websocket_expert(websocket: WebSocket, token: Optional[str] = Query(No
             except WebSocketDisconnect:
                 logger.info(f"WebSocket disconnected for expert {user_id}")
                 break
-                
+    
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for expert {user_id}")
     except Exception as e:
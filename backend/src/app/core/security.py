@@ -6,8 +6,7 @@ JWT, encryption, password hashing, and security helpers
 import hashlib
 import hmac
 import secrets
-import jwt
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional, Dict, Any
 from cryptography.fernet import Fernet
 from .config import settings
@@ -47,40 +46,15 @@ class SecurityUtils:
         email: str,
         expires_delta: Optional[timedelta] = None
     ) -> str:
-        """Generate a JWT token for user authentication"""
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(hours=settings.jwt_expiration_hours)
-        
-        payload = {
-            "sub": user_id,  # Subject (user ID)
-            "user_id": user_id,
-            "role": role,
-            "email": email,
-            "exp": expire,
-            "iat": datetime.utcnow(),
-            "type": "access"
-        }
-        
-        return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+        """Generate a JWT access token for user authentication"""
+        from .tokens import token_verifier
+        return token_verifier.create_access_token(user_id, role, email, expires_delta)
     
     @staticmethod
     def verify_jwt_token(token: str) -> Optional[Dict[str, Any]]:
-        """Verify and decode a JWT token"""
-        try:
-            payload = jwt.decode(
-                token, 
-                settings.jwt_secret_key, 
-                algorithms=[settings.jwt_algorithm]
-            )
-            return payload
-        except jwt.ExpiredSignatureError:
-            logger.warning("JWT token has expired")
-            return None
-        except jwt.InvalidTokenError as e:
-            logger.warning(f"Invalid JWT token: {e}")
-            return None
+        """Verify and decode a JWT access token (without the revocation check; see TokenVerifier.verify)"""
+        from .tokens import token_verifier
+        return token_verifier.decode(token)
     
     @staticmethod
     def encrypt_data(data: str) -> str:
@@ -0,0 +1,318 @@
+"""
+JWT issuing and verification
+One verifier for HTTP and WebSocket auth. Tokens are signed with the active
+key of a rotating key set (identified by the `kid` header); validated claims
+are cached per token (keyed by its SHA-256) until they expire, so a repeat
+request costs a dict lookup. Revoked token IDs are kept in Redis and screened
+locally through a bloom filter, so only possible matches cost a Redis round
+trip; refresh tokens are refused when such a match cannot be confirmed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KID = "default"
+REVOKED_KEY = "jwt:revoked"  # sorted set: jti -> exp
+REVOKED_CHANNEL = "jwt:revocations"
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings"""
+    
+    def __init__(self, size_bits: int, num_hashes: int = 7):
+        self.size_bits = size_bits
+        self.num_hashes = min(num_hashes, 8)
+        self.bits = bytearray((size_bits + 7) // 8)
+    
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        for i in range(self.num_hashes):
+            yield int.from_bytes(digest[i * 4:i * 4 + 4], "little") % self.size_bits
+    
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def parse_signing_keys(spec: str) -> Dict[str, str]:
+    """Parse "kid:secret,kid:secret" into a key set"""
+    keys = {}
+    for entry in spec.split(","):
+        kid, _, secret = entry.strip().partition(":")
+        if kid and secret:
+            keys[kid] = secret
+    return keys
+
+
+class TokenVerifier:
+    """Issues and verifies access/refresh tokens"""
+    
+    def __init__(self):
+        self._keys: Optional[Dict[str, str]] = None
+        self._claims: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._bloom = BloomFilter(settings.jwt_revocation_bloom_bits)
+        self._revoked: Dict[str, float] = {}  # revocations known to this worker: jti -> exp
+        self._tasks: list = []
+        self._pubsub = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.revocation_lookups = 0
+    
+    @property
+    def client(self):
+        """Shared async Redis client (None when Redis is unavailable)"""
+        from app.utils.cache import cache
+        return cache.client
+    
+    @property
+    def keys(self) -> Dict[str, str]:
+        """Verification keys by kid; JWT_SECRET_KEY is always accepted as the default key"""
+        if self._keys is None:
+            self._keys = {DEFAULT_KID: settings.jwt_secret_key, **parse_signing_keys(settings.jwt_signing_keys)}
+        return self._keys
+    
+    @property
+    def active_kid(self) -> str:
+        return settings.jwt_active_kid if settings.jwt_active_kid in self.keys else DEFAULT_KID
+    
+    # Issuing
+    
+    def issue(self, claims: Dict[str, Any], token_type: str, lifetime: timedelta) -> str:
+        """Sign `claims` with the active key as a token of `token_type`"""
+        now = datetime.now(timezone.utc)
+        payload = dict(
+            claims,
+            type=token_type,
+            jti=uuid.uuid4().hex,
+            iat=now,
+            exp=now + lifetime
+        )
+        kid = self.active_kid
+        return jwt.encode(payload, self.keys[kid], algorithm=settings.jwt_algorithm, headers={"kid": kid})
+    
+    def create_access_token(
+        self,
+        user_id: str,
+        role: str,
+        email: str,
+        expires_delta: Optional[timedelta] = None
+    ) -> str:
+        return self.issue(
+            {"sub": user_id, "user_id": user_id, "role": role, "email": email},
+            "access",
+            expires_delta or timedelta(minutes=settings.jwt_access_token_minutes)
+        )
+    
+    def create_refresh_token(self, user_id: str, role: str, email: str) -> str:
+        return self.issue(
+            {"sub": user_id, "user_id": user_id, "role": role, "email": email},
+            "refresh",
+            timedelta(days=settings.jwt_refresh_token_days)
+        )
+    
+    # Verification
+    
+    def decode(self, token: str, token_type: Optional[str] = "access") -> Optional[Dict[str, Any]]:
+        """
+        Validated claims of a token (signature, expiry and type), or None.
+        Does not check revocation; use verify() to authenticate a request.
+        """
+        # Keyed by digest so bearer strings are not kept in memory
+        cache_key = hashlib.sha256(token.encode()).digest()
+        cached = self._claims.get(cache_key)
+        if cached is not None:
+            claims, exp = cached
+            if exp > time.time():
+                self.cache_hits += 1
+                return claims if token_type is None or claims.get("type", "access") == token_type else None
+            self._claims.pop(cache_key, None)
+        
+        self.cache_misses += 1
+        try:
+            kid = jwt.get_unverified_header(token).get("kid", DEFAULT_KID)
+            key = self.keys.get(kid)
+            if key is None:
+                logger.warning(f"JWT signed with unknown key {kid}")
+                return None
+            claims = jwt.decode(token, key, algorithms=[settings.jwt_algorithm])
+        except jwt.ExpiredSignatureError:
+            logger.warning("JWT token has expired")
+            return None
+        except jwt.InvalidTokenError as e:
+            logger.warning(f"Invalid JWT token: {e}")
+            return None
+        
+        self._claims[cache_key] = (claims, float(claims.get("exp", time.time() + 60)))
+        while len(self._claims) > settings.jwt_claims_cache_size:
+            self._claims.popitem(last=False)
+        return claims if token_type is None or claims.get("type", "access") == token_type else None
+    
+    async def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        """
+        Whether the token was revoked (tokens without a jti cannot be revoked).
+        A possible match that Redis cannot confirm counts as revoked for
+        refresh tokens; short-lived access tokens are let through.
+        """
+        jti = claims.get("jti")
+        if not jti:
+            return False
+        if jti in self._revoked:
+            return True
+        if jti not in self._bloom:
+            return False
+        # Possible match: confirm with Redis
+        fail_closed = claims.get("type") == "refresh"
+        if not self.client:
+            return fail_closed
+        self.revocation_lookups += 1
+        try:
+            exp = await self.client.zscore(REVOKED_KEY, jti)
+        except Exception as e:
+            logger.error(f"Token revocation lookup failed: {e}")
+            return fail_closed
+        if exp is not None:
+            self._revoked[jti] = float(exp)
+            return True
+        return False
+    
+    async def verify(self, token: str, token_type: str = "access") -> Optional[Dict[str, Any]]:
+        """Claims of a valid, unrevoked token of `token_type`, or None"""
+        claims = self.decode(token, token_type)
+        if claims is None or await self.is_revoked(claims):
+            return None
+        return claims
+    
+    async def claim(self, claims: Dict[str, Any]) -> bool:
+        """
+        Revoke a single-use token, atomically across workers. True for the one
+        caller that revoked it; False if it was revoked already or the claim
+        could not be recorded.
+        """
+        jti = claims.get("jti")
+        if not jti or jti in self._revoked:
+            return False
+        exp = float(claims.get("exp", time.time() + settings.jwt_refresh_token_days * 86400))
+        if self.client:
+            try:
+                claimed = await self.client.zadd(REVOKED_KEY, {jti: exp}, nx=True)
+            except Exception as e:
+                logger.error(f"Token claim failed: {e}")
+                return False
+            self._revoked[jti] = exp
+            self._bloom.add(jti)
+            if not claimed:
+                return False
+            try:
+                await self.client.publish(REVOKED_CHANNEL, jti)
+            except Exception as e:
+                logger.error(f"Token revocation could not be shared: {e}")
+            return True
+        # Without Redis the claim only holds within this worker
+        self._revoked[jti] = exp
+        self._bloom.add(jti)
+        return True
+    
+    async def revoke(self, claims: Dict[str, Any]) -> None:
+        """Revoke a token until it would have expired anyway"""
+        jti = claims.get("jti")
+        if not jti:
+            return
+        exp = float(claims.get("exp", time.time() + settings.jwt_refresh_token_days * 86400))
+        self._revoked[jti] = exp
+        self._bloom.add(jti)
+        if self.client:
+            try:
+                await self.client.zadd(REVOKED_KEY, {jti: exp})
+                await self.client.publish(REVOKED_CHANNEL, jti)
+            except Exception as e:
+                logger.error(f"Token revocation could not be shared: {e}")
+    
+    # Revocation list maintenance
+    
+    async def _sync(self) -> None:
+        """Rebuild the bloom filter from the Redis revocation set, dropping expired entries"""
+        now = time.time()
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        bloom = BloomFilter(settings.jwt_revocation_bloom_bits)
+        for jti in self._revoked:
+            bloom.add(jti)
+        if self.client:
+            await self.client.zremrangebyscore(REVOKED_KEY, "-inf", now)
+            async for jti, _ in self.client.zscan_iter(REVOKED_KEY):
+                bloom.add(jti)
+        self._bloom = bloom
+    
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self._sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token revocation sync failed: {e}")
+            await asyncio.sleep(settings.jwt_revocation_sync_seconds)
+    
+    async def _listen(self):
+        """Add revocations made by other workers to the bloom filter"""
+        while True:
+            try:
+                self._pubsub = self.client.pubsub()
+                await self._pubsub.subscribe(REVOKED_CHANNEL)
+                async for message in self._pubsub.listen():
+                    if message.get("type") == "message":
+                        self._bloom.add(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token revocation listener failed: {e}")
+                await asyncio.sleep(1)
+    
+    def start(self):
+        """Load the revocation set and follow new revocations (local-only without Redis)"""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._sync_loop()))
+        if self.client:
+            self._tasks.append(asyncio.create_task(self._listen()))
+        logger.info("Token revocation sync started")
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached_tokens": len(self._claims),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "revocation_lookups": self.revocation_lookups,
+            "known_revocations": len(self._revoked)
+        }
+
+
+# Global token verifier instance
+token_verifier = TokenVerifier()
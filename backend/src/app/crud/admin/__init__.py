@@ -16,6 +16,7 @@ from app.crud.admin.revenue import *
 from app.crud.admin.override import *
 from app.crud.admin.queues import *
 from app.crud.admin.backup import *
+from app.crud.admin.search import *
 
 __all__ = [
     # Users
@@ -33,6 +34,8 @@ __all__ = [
     "update_system_setting",
     # Admin Actions
     "log_admin_action",
+    "insert_admin_action",
+    "copy_admin_actions",
     "get_admin_actions",
     # Questions
     "get_questions",
@@ -43,19 +46,26 @@ __all__ = [
     "flag_plagiarism",
     "escalate_question",
     "get_question_stats",
+    # Search
+    "search_questions",
+    "search_users",
     # Experts
     "get_experts",
     "get_expert_by_id",
     "suspend_expert",
     "get_expert_performance",
     "get_expert_leaderboard",
+    "get_expert_leaderboard_totals",
+    "get_expert_summaries",
     "get_expert_stats",
     # Compliance
     "get_flagged_content",
     "get_user_compliance_history",
     "create_compliance_flag",
     "resolve_compliance_flag",
-    "get_compliance_stats",
+    "get_compliance_totals",
+    "get_compliance_counts_by_reason",
+    "get_compliance_counts_by_severity",
     "export_audit_logs",
 ]
 
@@ -6,7 +6,13 @@ from typing import Optional, List, Dict, Any
 import asyncpg
 from uuid import UUID
 from datetime import datetime
-import json
+
+
+# Column order of admin action rows (see app.utils.audit_log)
+ADMIN_ACTION_COLUMNS = (
+    "id", "admin_id", "action_type", "target_type", "target_id",
+    "details", "ip_address", "user_agent", "created_at"
+)
 
 
 async def log_admin_action(
@@ -19,15 +25,28 @@ async def log_admin_action(
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
 ) -> UUID:
-    """Log admin action"""
-    row = await db.fetchrow("""
+    """
+    Log admin action. Security-critical actions are inserted on `db` right
+    away; the rest are buffered and written in batches (see app.utils.audit_log).
+    """
+    from app.utils.audit_log import audit_log
+    return await audit_log.log(
+        db, admin_id, action_type, target_type, target_id, details, ip_address, user_agent
+    )
+
+
+async def insert_admin_action(db: asyncpg.Connection, row: tuple) -> None:
+    """Insert one admin action row (ADMIN_ACTION_COLUMNS order)"""
+    await db.execute("""
         INSERT INTO admin_actions 
-        (admin_id, action_type, target_type, target_id, details, ip_address, user_agent)
-        VALUES ($1, $2, $3, $4, $5, $6, $7)
-        RETURNING id
-    """, admin_id, action_type, target_type, target_id, 
-        json.dumps(details) if details else None, ip_address, user_agent)
-    return row['id']
+        (id, admin_id, action_type, target_type, target_id, details, ip_address, user_agent, created_at)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    """, *row)
+
+
+async def copy_admin_actions(db: asyncpg.Connection, rows: List[tuple]) -> None:
+    """Write a batch of admin action rows with COPY"""
+    await db.copy_records_to_table("admin_actions", records=rows, columns=ADMIN_ACTION_COLUMNS)
 
 
 async def get_admin_actions(
@@ -8,6 +8,7 @@ from uuid import UUID
 from datetime import datetime, timedelta
 import secrets
 import hashlib
+from app.crud.admin import admin_actions as action_crud
 
 
 async def get_admins(
@@ -97,10 +98,7 @@ async def create_admin_invitation(
     
     # Store invitation (using admin_actions table or create invitations table)
     # For now, we'll use a simple approach with admin_actions
-    await db.execute("""
-        INSERT INTO admin_actions (admin_id, action_type, target_type, target_id, details)
-        VALUES ($1, 'invite_admin', 'user', $2, $3::jsonb)
-    """, invited_by, user_id, {
+    await action_crud.log_admin_action(db, invited_by, "invite_admin", target_type="user", target_id=user_id, details={
         "email": email,
         "role": role,
         "token_hash": token_hash,
@@ -140,10 +138,7 @@ async def suspend_admin(
     
     # Log suspension action
     if suspended_by:
-        await db.execute("""
-            INSERT INTO admin_actions (admin_id, action_type, target_type, target_id, details)
-            VALUES ($1, 'suspend_admin', 'user', $2, $3::jsonb)
-        """, suspended_by, admin_id, {
+        await action_crud.log_admin_action(db, suspended_by, "suspend_admin", target_type="user", target_id=admin_id, details={
             "suspended": suspended,
             "reason": reason
         })
@@ -180,10 +175,7 @@ async def revoke_admin_access(
     """, admin_id)
     
     # Log revocation
-    await db.execute("""
-        INSERT INTO admin_actions (admin_id, action_type, target_type, target_id, details)
-        VALUES ($1, 'revoke_admin', 'user', $2, $3::jsonb)
-    """, revoked_by, admin_id, {
+    await action_crud.log_admin_action(db, revoked_by, "revoke_admin", target_type="user", target_id=admin_id, details={
         "previous_role": current["role"]
     })
     
@@ -0,0 +1,196 @@
+"""
+Answer reuse CRUD operations
+Lookups of previously delivered answers and the offers made from them
+"""
+
+from typing import Optional, List, Dict, Any
+import asyncpg
+from uuid import UUID
+from app.utils.question_archive import archived_answer, question_archive
+
+
+async def find_delivered_by_fingerprint(
+    db: asyncpg.Connection,
+    fingerprint: str,
+    exclude_question_id: UUID
+) -> Optional[Dict[str, Any]]:
+    """Get the most recently delivered question with the same normalized text, with its answer"""
+    row = await db.fetchrow("""
+        SELECT q.id as source_question_id, a.id as source_answer_id, a.answer_text
+        FROM questions q
+        JOIN answers a ON a.id = q.answer_id
+        WHERE q.text_fingerprint = $1
+        AND q.status = 'delivered'
+        AND q.id <> $2
+        AND a.answer_text IS NOT NULL
+        ORDER BY q.delivered_at DESC NULLS LAST
+        LIMIT 1
+    """, fingerprint, exclude_question_id)
+    if not row:
+        return None
+    return (await question_archive.fill_answer_texts(db, [dict(row)]))[0]
+
+
+async def get_delivered_answers(
+    db: asyncpg.Connection,
+    question_ids: List[UUID]
+) -> Dict[str, Dict[str, Any]]:
+    """Get delivered answers for the given questions, keyed by str(question_id)"""
+    if not question_ids:
+        return {}
+    rows = await db.fetch("""
+        SELECT q.id as source_question_id, a.id as source_answer_id, a.answer_text
+        FROM questions q
+        JOIN answers a ON a.id = q.answer_id
+        WHERE q.id = ANY($1::uuid[])
+        AND q.status = 'delivered'
+        AND a.answer_text IS NOT NULL
+    """, question_ids)
+    answers = await question_archive.fill_answer_texts(db, [dict(row) for row in rows])
+    return {str(answer["source_question_id"]): answer for answer in answers}
+
+
+async def create_reuse_offer(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    source_question_id: UUID,
+    source_answer_id: UUID,
+    match_type: str,
+    similarity: float
+) -> None:
+    """Record a reuse offer for a question (first offer wins)"""
+    await db.execute("""
+        INSERT INTO answer_reuse_offers
+        (question_id, source_question_id, source_answer_id, match_type, similarity)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (question_id) DO NOTHING
+    """, question_id, source_question_id, source_answer_id, match_type, similarity)
+
+
+async def get_reuse_offer(
+    db: asyncpg.Connection,
+    question_id: UUID
+) -> Optional[Dict[str, Any]]:
+    """Get the reuse offer for a question along with the offered answer text"""
+    row = await db.fetchrow("""
+        SELECT
+            o.question_id,
+            o.source_question_id,
+            o.source_answer_id,
+            o.match_type,
+            o.similarity,
+            o.status,
+            o.created_at,
+            a.answer_text
+        FROM answer_reuse_offers o
+        JOIN answers a ON a.id = o.source_answer_id
+        WHERE o.question_id = $1
+    """, question_id)
+    if not row:
+        return None
+    return (await question_archive.fill_answer_texts(db, [dict(row)]))[0]
+
+
+async def accept_reuse_offer(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    accepted_by: Optional[UUID] = None,
+    status: str = "accepted"
+) -> Optional[UUID]:
+    """
+    Copy the offered answer onto the question as its draft answer, resolving
+    the offer as `status` ('accepted' by an expert, or 'system_accepted' when
+    generation used it in place of a fresh draft).
+    Returns the new answer id, or None if there is no open offer.
+    """
+    async with db.transaction():
+        offer = await db.fetchrow("""
+            UPDATE answer_reuse_offers
+            SET status = $3, accepted_by = $2, resolved_at = NOW()
+            WHERE question_id = $1 AND status = 'offered'
+            RETURNING source_question_id, source_answer_id, match_type, similarity
+        """, question_id, accepted_by, status)
+        if not offer:
+            return None
+        
+        # The source answer's text is in its bundle if the source was archived
+        source = (await question_archive.load(db, [offer["source_question_id"]])).get(offer["source_question_id"])
+        archived = archived_answer(source, offer["source_answer_id"]) if source else None
+        
+        answer_id = await db.fetchval("""
+            INSERT INTO answers (question_id, answer_text, status, metadata, created_at)
+            SELECT $1, COALESCE(NULLIF(a.answer_text, ''), $6), 'draft', jsonb_build_object(
+                'reused_from_question_id', $2::text,
+                'reused_from_answer_id', $3::text,
+                'reuse_match_type', $4::text,
+                'reuse_similarity', $5::float
+            ), NOW()
+            FROM answers a
+            WHERE a.id = $3
+            ON CONFLICT (question_id)
+            DO UPDATE SET answer_text = EXCLUDED.answer_text, status = 'draft',
+                          metadata = COALESCE(answers.metadata, '{}'::jsonb) || EXCLUDED.metadata,
+                          updated_at = NOW()
+            RETURNING id
+        """, question_id, offer["source_question_id"], offer["source_answer_id"],
+            offer["match_type"], offer["similarity"], archived.get("answer_text") if archived else None)
+        
+        await db.execute("""
+            UPDATE questions SET answer_id = $1, updated_at = NOW() WHERE id = $2
+        """, answer_id, question_id)
+    return answer_id
+
+
+async def decline_reuse_offer(
+    db: asyncpg.Connection,
+    question_id: UUID
+) -> bool:
+    """Mark an open offer as declined"""
+    result = await db.execute("""
+        UPDATE answer_reuse_offers
+        SET status = 'declined', resolved_at = NOW()
+        WHERE question_id = $1 AND status = 'offered'
+    """, question_id)
+    return result == "UPDATE 1"
+
+
+async def get_answer_reuse_stats(
+    db: asyncpg.Connection,
+    days: int = 30
+) -> Dict[str, Any]:
+    """Get offer/acceptance counts and review time for reused vs. fresh answers"""
+    row = await db.fetchrow("""
+        WITH window_questions AS (
+            SELECT id FROM questions
+            WHERE created_at >= NOW() - ($1::int * INTERVAL '1 day')
+        )
+        SELECT
+            (SELECT COUNT(*) FROM window_questions) as questions,
+            COUNT(o.question_id) as offers,
+            COUNT(o.question_id) FILTER (WHERE o.match_type = 'exact') as exact_offers,
+            COUNT(o.question_id) FILTER (WHERE o.match_type = 'near') as near_offers,
+            COUNT(o.question_id) FILTER (WHERE o.status = 'accepted') as accepted,
+            COUNT(o.question_id) FILTER (WHERE o.status = 'system_accepted') as system_accepted,
+            COUNT(o.question_id) FILTER (WHERE o.status = 'declined') as declined
+        FROM window_questions wq
+        JOIN answer_reuse_offers o ON o.question_id = wq.id
+    """, days)
+    
+    review_times = await db.fetchrow("""
+        SELECT
+            AVG(er.review_time_seconds) FILTER (WHERE o.status IN ('accepted', 'system_accepted')) as reused,
+            AVG(er.review_time_seconds) FILTER (WHERE o.question_id IS NULL) as fresh
+        FROM expert_reviews er
+        LEFT JOIN answer_reuse_offers o ON o.question_id = er.question_id
+        WHERE er.created_at >= NOW() - ($1::int * INTERVAL '1 day')
+        AND er.review_time_seconds IS NOT NULL
+    """, days)
+    
+    stats = dict(row)
+    stats["avg_review_seconds_reused"] = (
+        float(review_times["reused"]) if review_times and review_times["reused"] is not None else None
+    )
+    stats["avg_review_seconds_fresh"] = (
+        float(review_times["fresh"]) if review_times and review_times["fresh"] is not None else None
+    )
+    return stats
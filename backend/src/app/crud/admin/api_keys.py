@@ -53,6 +53,16 @@ async def get_api_key_by_id(db: asyncpg.Connection, key_id: UUID) -> Optional[Di
     return dict(row) if row else None
 
 
+async def get_api_key_secret(db: asyncpg.Connection, key_id: UUID) -> Optional[Dict[str, Any]]:
+    """Get API key type and encrypted key (for connection tests)"""
+    row = await db.fetchrow("""
+        SELECT id, key_type, encrypted_key
+        FROM api_keys
+        WHERE id = $1
+    """, key_id)
+    return dict(row) if row else None
+
+
 async def create_api_key(
     db: asyncpg.Connection,
     name: str,
@@ -0,0 +1,142 @@
+"""
+Question archive CRUD operations
+Delivered questions past QUESTION_ARCHIVE_AFTER_MONTHS have their bodies
+(question and answer text, metadata, review notes, rating comments) moved
+into archive.questions as one compressed bundle per question (migration 017).
+The rows stay behind as stubs with the body columns emptied; their search
+vectors (migration 020) and text fingerprints (migration 021) are kept, so
+archived questions still turn up in admin search and as exact answer reuse
+matches, and the readers that show bodies (question details and history,
+admin search, expert ratings, answer reuse) fill them from the bundles.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import datetime
+from uuid import UUID
+import json
+import asyncpg
+
+# Columns emptied on the stub rows; everything else is left as it was
+BODY_COLUMNS = {
+    "questions": ("question_text", "metadata"),
+    "answers": ("answer_text", "metadata"),
+    "expert_reviews": ("rejection_reason", "corrections", "review_notes"),
+    "ratings": ("comment",),
+}
+
+
+async def get_archivable_bundles(
+    db: asyncpg.Connection,
+    delivered_before: datetime,
+    limit: int
+) -> List[asyncpg.Record]:
+    """
+    Lock up to `limit` questions delivered before `delivered_before` and not
+    archived yet (skipping ones another worker holds), with each question's
+    rows as one JSON document. Call inside a transaction.
+    """
+    return await db.fetch("""
+        WITH picked AS (
+            SELECT id FROM questions
+            WHERE delivered_at < $1 AND archived_at IS NULL
+            ORDER BY delivered_at
+            LIMIT $2
+            FOR UPDATE SKIP LOCKED
+        )
+        SELECT
+            q.id, q.client_id, q.delivered_at,
+            jsonb_build_object(
+                'question', to_jsonb(q) - 'search_vector',
+                'answers', COALESCE((
+                    SELECT jsonb_agg(to_jsonb(a) ORDER BY a.created_at) FROM answers a WHERE a.question_id = q.id
+                ), '[]'::jsonb),
+                'reviews', COALESCE((
+                    SELECT jsonb_agg(to_jsonb(er) ORDER BY er.created_at) FROM expert_reviews er WHERE er.question_id = q.id
+                ), '[]'::jsonb),
+                'ratings', COALESCE((
+                    SELECT jsonb_agg(to_jsonb(r) ORDER BY r.created_at) FROM ratings r WHERE r.question_id = q.id
+                ), '[]'::jsonb)
+            )::text AS document
+        FROM questions q
+        JOIN picked ON picked.id = q.id
+        ORDER BY q.delivered_at
+    """, delivered_before, limit)
+
+
+async def save_archived_questions(
+    db: asyncpg.Connection,
+    rows: Sequence[tuple]
+) -> None:
+    """
+    Store bundles and empty the archived bodies, in the caller's transaction.
+    `rows` are (question_id, client_id, delivered_at, bundle, raw_bytes).
+    """
+    question_ids = [row[0] for row in rows]
+    await db.execute("""
+        INSERT INTO archive.questions (question_id, client_id, delivered_at, bundle, raw_bytes)
+        SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::timestamptz[], $4::bytea[], $5::int[])
+        ON CONFLICT (question_id) DO UPDATE SET
+            bundle = EXCLUDED.bundle, raw_bytes = EXCLUDED.raw_bytes, archived_at = NOW()
+    """, *(list(column) for column in zip(*rows)))
+    await db.execute("""
+        UPDATE questions SET question_text = '', metadata = NULL, archived_at = NOW()
+        WHERE id = ANY($1::uuid[])
+    """, question_ids)
+    await db.execute("""
+        UPDATE answers SET answer_text = '', metadata = NULL
+        WHERE question_id = ANY($1::uuid[])
+    """, question_ids)
+    await db.execute("""
+        UPDATE expert_reviews SET rejection_reason = NULL, corrections = NULL, review_notes = NULL
+        WHERE question_id = ANY($1::uuid[])
+    """, question_ids)
+    await db.execute("""
+        UPDATE ratings SET comment = NULL
+        WHERE question_id = ANY($1::uuid[])
+    """, question_ids)
+
+
+async def get_archived_bundles(
+    db: asyncpg.Connection,
+    question_ids: Sequence[UUID]
+) -> Dict[UUID, bytes]:
+    """Compressed bundles of the given questions, where archived"""
+    rows = await db.fetch("""
+        SELECT question_id, bundle FROM archive.questions
+        WHERE question_id = ANY($1::uuid[])
+    """, list(question_ids))
+    return {row["question_id"]: row["bundle"] for row in rows}
+
+
+def _json(value: Any) -> Optional[str]:
+    return json.dumps(value) if value is not None else None
+
+
+async def restore_archived_question(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    bundle: Dict[str, Any]
+) -> None:
+    """Write a bundle's bodies back onto the stub rows and drop the bundle"""
+    async with db.transaction():
+        question = bundle["question"]
+        await db.execute("""
+            UPDATE questions SET question_text = $2, metadata = $3::jsonb, archived_at = NULL
+            WHERE id = $1
+        """, question_id, question.get("question_text") or "", _json(question.get("metadata")))
+        for answer in bundle.get("answers", []):
+            await db.execute("""
+                UPDATE answers SET answer_text = $2, metadata = $3::jsonb
+                WHERE id = $1 AND answer_text = ''
+            """, UUID(answer["id"]), answer.get("answer_text") or "", _json(answer.get("metadata")))
+        for review in bundle.get("reviews", []):
+            await db.execute("""
+                UPDATE expert_reviews SET rejection_reason = $2, corrections = $3::jsonb, review_notes = $4
+                WHERE id = $1
+            """, UUID(review["id"]), review.get("rejection_reason"), _json(review.get("corrections")),
+                review.get("review_notes"))
+        for rating in bundle.get("ratings", []):
+            await db.execute("""
+                UPDATE ratings SET comment = $2 WHERE id = $1
+            """, UUID(rating["id"]), rating.get("comment"))
+        await db.execute("DELETE FROM archive.questions WHERE question_id = $1", question_id)
@@ -175,8 +175,8 @@ async def resolve_compliance_flag(
     return result == "UPDATE 1"
 
 
-async def get_compliance_stats(db: asyncpg.Connection) -> Dict[str, Any]:
-    """Get compliance statistics"""
+async def get_compliance_totals(db: asyncpg.Connection) -> Dict[str, Any]:
+    """Flag counts: total, resolved/pending and per detection type"""
     stats = await db.fetchrow("""
         SELECT 
             COUNT(*) as total_flagged,
@@ -188,26 +188,27 @@ async def get_compliance_stats(db: asyncpg.Connection) -> Dict[str, Any]:
             COUNT(*) FILTER (WHERE reason = 'suspicious_activity') as suspicious_activity
         FROM compliance_flags
     """)
-    
-    # Get by reason
-    by_reason = await db.fetch("""
+    return dict(stats) if stats else {}
+
+
+async def get_compliance_counts_by_reason(db: asyncpg.Connection) -> Dict[str, int]:
+    """Flag counts by reason"""
+    rows = await db.fetch("""
         SELECT reason, COUNT(*) as count
         FROM compliance_flags
         GROUP BY reason
     """)
-    
-    # Get by severity
-    by_severity = await db.fetch("""
+    return {row["reason"]: row["count"] for row in rows}
+
+
+async def get_compliance_counts_by_severity(db: asyncpg.Connection) -> Dict[str, int]:
+    """Flag counts by severity"""
+    rows = await db.fetch("""
         SELECT severity, COUNT(*) as count
         FROM compliance_flags
         GROUP BY severity
     """)
-    
-    result = dict(stats) if stats else {}
-    result["by_reason"] = {row["reason"]: row["count"] for row in by_reason}
-    result["by_severity"] = {row["severity"]: row["count"] for row in by_severity}
-    
-    return result
+    return {row["severity"]: row["count"] for row in rows}
 
 
 async def export_audit_logs(
@@ -5,7 +5,9 @@ Expert management CRUD operations
 from typing import Optional, List, Dict, Any
 import asyncpg
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
+from app.crud.expert import rating_stats as stats_crud
+from app.db.statements import statements
 
 
 async def get_experts(
@@ -143,78 +145,156 @@ async def suspend_expert(
     return result == "UPDATE 1"
 
 
+EXPERT_PERFORMANCE = statements.register("admin.expert_performance", """
+    SELECT 
+        COUNT(*) as questions_answered,
+        SUM(e.earnings) as total_earnings,
+        AVG(EXTRACT(EPOCH FROM (q.delivered_at - q.created_at))/3600) as response_time_avg_hours,
+        COUNT(*) FILTER (WHERE q.status = 'rejected')::float / NULLIF(COUNT(*), 0) * 100 as rejection_rate,
+        COUNT(*) FILTER (WHERE q.delivered_at <= q.due_date)::float / NULLIF(COUNT(*), 0) * 100 as on_time_delivery_rate
+    FROM questions q
+    LEFT JOIN expert_earnings e ON q.expert_id = e.expert_id AND q.id = e.question_id
+    WHERE q.expert_id = $1 AND q.status = 'delivered'
+    AND ($2::date IS NULL OR q.created_at >= $2)
+""")
+
+
 async def get_expert_performance(
     db: asyncpg.Connection,
     expert_id: UUID,
     period: str = "all_time"
 ) -> Dict[str, Any]:
     """Get expert performance metrics for period"""
-    date_filter = ""
+    today = datetime.now(timezone.utc).date()
+    since = None
     if period == "today":
-        date_filter = "AND q.created_at::date = CURRENT_DATE"
+        since = today
     elif period == "week":
-        date_filter = "AND q.created_at >= CURRENT_DATE - INTERVAL '7 days'"
+        # Same rolling window as the 7d rating average
+        since = stats_crud.window_start(7, today)
     elif period == "month":
-        date_filter = "AND q.created_at >= DATE_TRUNC('month', CURRENT_DATE)"
+        since = today.replace(day=1)
     
-    row = await db.fetchrow(f"""
-        SELECT 
-            COUNT(*) as questions_answered,
-            AVG(r.rating) as average_rating,
-            SUM(e.earnings) as total_earnings,
-            AVG(EXTRACT(EPOCH FROM (q.delivered_at - q.created_at))/3600) as response_time_avg_hours,
-            COUNT(*) FILTER (WHERE q.status = 'rejected')::float / NULLIF(COUNT(*), 0) * 100 as rejection_rate,
-            COUNT(*) FILTER (WHERE q.delivered_at <= q.due_date)::float / NULLIF(COUNT(*), 0) * 100 as on_time_delivery_rate
-        FROM questions q
-        LEFT JOIN ratings r ON q.id = r.question_id
-        LEFT JOIN expert_earnings e ON q.expert_id = e.expert_id AND q.id = e.question_id
-        WHERE q.expert_id = $1 AND q.status = 'delivered'
-        {date_filter}
-    """, expert_id)
+    row = await EXPERT_PERFORMANCE.fetchrow(db, expert_id, since)
+    
+    performance = dict(row) if row else {}
     
-    return dict(row) if row else {}
+    # Ratings come from the incremental stats store instead of a ratings join
+    rating_window = await stats_crud.get_rating_window(db, expert_id, since)
+    performance["average_rating"] = rating_window["average_rating"]
+    
+    return performance
 
 
-async def get_expert_leaderboard(
-    db: asyncpg.Connection,
-    period: str = "all_time",
-    limit: int = 50
-) -> List[Dict[str, Any]]:
-    """Get expert leaderboard"""
-    date_filter = ""
+def _leaderboard_period_filter(period: str) -> str:
+    """Delivery-time filter for a leaderboard period (calendar week/month, UTC)"""
+    delivered_at = "COALESCE(q.delivered_at, q.updated_at)"
     if period == "week":
-        date_filter = "AND q.created_at >= CURRENT_DATE - INTERVAL '7 days'"
+        return f"AND {delivered_at} >= DATE_TRUNC('week', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
     elif period == "month":
-        date_filter = "AND q.created_at >= DATE_TRUNC('month', CURRENT_DATE)"
-    
-    rows = await db.fetch(f"""
+        return f"AND {delivered_at} >= DATE_TRUNC('month', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+    return ""
+
+
+def _leaderboard_query(period: str, limit_clause: str = "") -> str:
+    """
+    Per-expert leaderboard totals.
+    Ratings and earnings are aggregated per expert before joining so that
+    neither side fans out the other's rows.
+    """
+    return f"""
+        WITH delivered AS (
+            SELECT q.id, q.expert_id
+            FROM questions q
+            WHERE q.status = 'delivered' AND q.expert_id IS NOT NULL
+            {_leaderboard_period_filter(period)}
+        ),
+        answered AS (
+            SELECT expert_id, COUNT(*) as questions_answered
+            FROM delivered
+            GROUP BY expert_id
+        ),
+        rated AS (
+            SELECT d.expert_id, SUM(r.score) as rating_sum, COUNT(r.score) as rating_count
+            FROM delivered d
+            JOIN ratings r ON r.question_id = d.id
+            GROUP BY d.expert_id
+        ),
+        earned AS (
+            SELECT d.expert_id, SUM(e.earnings) as total_earnings
+            FROM delivered d
+            JOIN expert_earnings e ON e.question_id = d.id AND e.expert_id = d.expert_id
+            GROUP BY d.expert_id
+        )
         SELECT 
             u.id as expert_id,
             CONCAT(COALESCE(u.first_name, ''), ' ', COALESCE(u.last_name, '')) as expert_name,
-            COUNT(q.id) as questions_answered,
-            AVG(r.rating) as average_rating,
-            SUM(e.earnings) as total_earnings,
+            COALESCE(a.questions_answered, 0) as questions_answered,
+            COALESCE(rt.rating_sum, 0) as rating_sum,
+            COALESCE(rt.rating_count, 0) as rating_count,
+            rt.rating_sum::float / NULLIF(rt.rating_count, 0) as average_rating,
+            COALESCE(er.total_earnings, 0) as total_earnings,
             COALESCE(exp.compliance_score, 100) as compliance_score
         FROM users u
-        LEFT JOIN questions q ON u.id = q.expert_id AND q.status = 'delivered' {date_filter}
-        LEFT JOIN ratings r ON q.id = r.question_id
-        LEFT JOIN expert_earnings e ON q.expert_id = e.expert_id AND q.id = e.question_id
+        LEFT JOIN answered a ON a.expert_id = u.id
+        LEFT JOIN rated rt ON rt.expert_id = u.id
+        LEFT JOIN earned er ON er.expert_id = u.id
         LEFT JOIN experts exp ON u.id = exp.user_id
         WHERE u.role = 'expert' AND u.is_active = TRUE
-        GROUP BY u.id, u.first_name, u.last_name, exp.compliance_score
-        ORDER BY questions_answered DESC, average_rating DESC
-        LIMIT $1
-    """, limit)
+        ORDER BY questions_answered DESC, average_rating DESC NULLS LAST
+        {limit_clause}
+    """
+
+
+async def get_expert_leaderboard(
+    db: asyncpg.Connection,
+    period: str = "all_time",
+    limit: int = 50
+) -> List[Dict[str, Any]]:
+    """Get expert leaderboard straight from SQL (fallback when Redis is unavailable)"""
+    rows = await db.fetch(_leaderboard_query(period, "LIMIT $1"), limit)
     
     leaderboard = []
     for idx, row in enumerate(rows, 1):
         entry = dict(row)
+        entry.pop("rating_sum")
+        entry.pop("rating_count")
         entry["rank"] = idx
         leaderboard.append(entry)
     
     return leaderboard
 
 
+async def get_expert_leaderboard_totals(
+    db: asyncpg.Connection,
+    period: str = "all_time"
+) -> List[Dict[str, Any]]:
+    """Get raw leaderboard totals for every active expert (used to rebuild Redis)"""
+    rows = await db.fetch(_leaderboard_query(period))
+    return [dict(row) for row in rows]
+
+
+async def get_expert_summaries(
+    db: asyncpg.Connection,
+    expert_ids: List[UUID]
+) -> Dict[str, Dict[str, Any]]:
+    """Get display name and compliance score for a batch of active experts"""
+    if not expert_ids:
+        return {}
+    
+    rows = await db.fetch("""
+        SELECT 
+            u.id as expert_id,
+            CONCAT(COALESCE(u.first_name, ''), ' ', COALESCE(u.last_name, '')) as expert_name,
+            COALESCE(exp.compliance_score, 100) as compliance_score
+        FROM users u
+        LEFT JOIN experts exp ON u.id = exp.user_id
+        WHERE u.id = ANY($1::uuid[]) AND u.role = 'expert' AND u.is_active = TRUE
+    """, expert_ids)
+    
+    return {str(row["expert_id"]): dict(row) for row in rows}
+
+
 async def get_expert_stats(db: asyncpg.Connection) -> Dict[str, Any]:
     """Get expert statistics"""
     stats = await db.fetchrow("""
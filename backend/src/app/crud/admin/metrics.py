@@ -0,0 +1,119 @@
+"""
+Time-series metrics CRUD operations
+metrics_hourly and metrics_totals are maintained by triggers (migration 015)
+and sharded per backend (migration 019), so every read sums over the shards;
+these are the range reads over them.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+import asyncpg
+
+
+async def get_totals(
+    db: asyncpg.Connection,
+    metric: str,
+    dimensions: Optional[Iterable[str]] = None
+) -> Dict[str, float]:
+    """All-time value of a metric by dimension"""
+    if dimensions is None:
+        rows = await db.fetch("""
+            SELECT dimension, SUM(value) AS value FROM metrics_totals
+            WHERE metric = $1
+            GROUP BY dimension
+        """, metric)
+    else:
+        rows = await db.fetch("""
+            SELECT dimension, SUM(value) AS value FROM metrics_totals
+            WHERE metric = $1 AND dimension = ANY($2::varchar[])
+            GROUP BY dimension
+        """, metric, list(dimensions))
+    return {row["dimension"]: row["value"] for row in rows}
+
+
+async def get_window_sums(
+    db: asyncpg.Connection,
+    metrics: List[str],
+    start: datetime,
+    end: Optional[datetime] = None
+) -> Dict[str, Dict[str, float]]:
+    """Sum of each metric's hourly deltas in [start, end), by metric then dimension"""
+    rows = await db.fetch("""
+        SELECT metric, dimension, SUM(value) AS value
+        FROM metrics_hourly
+        WHERE metric = ANY($1::varchar[])
+        AND bucket >= $2
+        AND ($3::timestamptz IS NULL OR bucket < $3)
+        GROUP BY metric, dimension
+    """, metrics, start, end)
+    sums: Dict[str, Dict[str, float]] = {metric: {} for metric in metrics}
+    for row in rows:
+        sums[row["metric"]][row["dimension"]] = row["value"]
+    return sums
+
+
+async def get_daily_series(
+    db: asyncpg.Connection,
+    metric: str,
+    start: datetime,
+    dimension: str = ""
+) -> List[Dict]:
+    """Per-day (UTC) sums of a metric since `start`"""
+    rows = await db.fetch("""
+        SELECT (bucket AT TIME ZONE 'UTC')::date AS date, SUM(value) AS value
+        FROM metrics_hourly
+        WHERE metric = $1 AND dimension = $2 AND bucket >= $3
+        GROUP BY 1
+        HAVING SUM(value) <> 0
+        ORDER BY 1 ASC
+    """, metric, dimension, start)
+    return [dict(row) for row in rows]
+
+
+async def get_top_dimensions(
+    db: asyncpg.Connection,
+    metric: str,
+    limit: int = 5
+) -> List[Dict]:
+    """Dimensions with the highest all-time value"""
+    rows = await db.fetch("""
+        SELECT dimension, SUM(value) AS value FROM metrics_totals
+        WHERE metric = $1
+        GROUP BY dimension
+        HAVING SUM(value) > 0
+        ORDER BY 2 DESC
+        LIMIT $2
+    """, metric, limit)
+    return [dict(row) for row in rows]
+
+
+async def delete_hourly_before(db: asyncpg.Connection, before: datetime) -> int:
+    """Drop hourly buckets older than `before` (totals are unaffected)"""
+    result = await db.execute("DELETE FROM metrics_hourly WHERE bucket < $1", before)
+    return int(result.split()[-1])
+
+
+async def get_active_client_ids(
+    db: asyncpg.Connection,
+    start: datetime,
+    end: datetime
+) -> List[str]:
+    """Distinct clients that asked a question in [start, end)"""
+    rows = await db.fetch("""
+        SELECT DISTINCT client_id FROM questions
+        WHERE created_at >= $1 AND created_at < $2
+        AND client_id IS NOT NULL
+    """, start, end)
+    return [str(row["client_id"]) for row in rows]
+
+
+async def count_active_clients(
+    db: asyncpg.Connection,
+    start: datetime,
+    end: datetime
+) -> int:
+    """Exact distinct client count in [start, end) (fallback without Redis)"""
+    return await db.fetchval("""
+        SELECT COUNT(DISTINCT client_id) FROM questions
+        WHERE created_at >= $1 AND created_at < $2
+    """, start, end) or 0
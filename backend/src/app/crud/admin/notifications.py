@@ -7,6 +7,7 @@ import asyncpg
 from uuid import UUID
 from datetime import datetime
 import json
+from app.crud.admin import admin_actions as action_crud
 
 
 async def create_notification_broadcast(
@@ -43,11 +44,7 @@ async def create_notification_broadcast(
     
     # Create broadcast record (using a notifications table or admin_actions)
     # For now, we'll use admin_actions with a specific action type
-    broadcast_id = await db.fetchval("""
-        INSERT INTO admin_actions (admin_id, action_type, target_type, details)
-        VALUES ($1, 'broadcast_notification', 'system', $2::jsonb)
-        RETURNING id
-    """, sent_by, {
+    broadcast_id = await action_crud.log_admin_action(db, sent_by, "broadcast_notification", target_type="system", details={
         "title": title,
         "message": message,
         "notification_type": notification_type,
@@ -216,3 +216,28 @@ async def bypass_expert_review(
         "target_id": answer_id
     }
 
+
+async def bypass_response_cache(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    overridden_by: UUID,
+    reason: str
+) -> Dict[str, Any]:
+    """Bypass the AI response cache (always call the providers for this question)"""
+    await db.execute("""
+        UPDATE questions
+        SET metadata = COALESCE(metadata, '{}'::jsonb) || jsonb_build_object(
+            'response_cache_bypassed', TRUE,
+            'response_cache_bypass_reason', $1::text,
+            'response_cache_bypassed_by', $2::uuid::text,
+            'response_cache_bypassed_at', NOW()::text
+        )
+        WHERE id = $3
+    """, reason, overridden_by, question_id)
+    
+    return {
+        "success": True,
+        "override_id": question_id,
+        "action": "response_cache_bypass",
+        "target_id": question_id
+    }
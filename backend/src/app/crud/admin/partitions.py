@@ -0,0 +1,43 @@
+"""
+Table partition CRUD operations
+admin_actions, audit_logs, notifications and transactions are partitioned by
+UTC month of created_at (migration 016); these are the catalog reads and DDL
+the partition maintenance task runs.
+"""
+
+from typing import List
+from datetime import date
+import asyncpg
+
+ARCHIVE_SCHEMA = "archive"
+
+
+async def get_partitions(db: asyncpg.Connection, parent: str) -> List[str]:
+    """Names of the partitions attached to `parent` (empty if it is not partitioned)"""
+    rows = await db.fetch("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass($1)
+        ORDER BY c.relname
+    """, parent)
+    return [row["relname"] for row in rows]
+
+
+async def create_month_partition(db: asyncpg.Connection, parent: str, month: date) -> bool:
+    """Create the partition of `month` unless it exists; True if it was created"""
+    return await db.fetchval("SELECT create_month_partition($1, $2)", parent, month)
+
+
+async def detach_partition(db: asyncpg.Connection, parent: str, partition: str) -> None:
+    """Detach a partition; it stays in place as a standalone table"""
+    await db.execute(f'ALTER TABLE "{parent}" DETACH PARTITION "{partition}"')
+
+
+async def archive_partition(db: asyncpg.Connection, partition: str) -> None:
+    """Move a detached partition into the archive schema"""
+    await db.execute(f'ALTER TABLE "{partition}" SET SCHEMA {ARCHIVE_SCHEMA}')
+
+
+async def drop_partition(db: asyncpg.Connection, partition: str) -> None:
+    await db.execute(f'DROP TABLE IF EXISTS "{partition}"')
@@ -7,6 +7,40 @@ import asyncpg
 from uuid import UUID
 from datetime import datetime
 import json
+from app.crud.admin import search as search_crud
+from app.db.statements import statements
+from app.utils.question_archive import archived_answer, fill_row, question_archive
+
+
+_QUESTION_FILTERS = {
+    "status": "q.status = {}",
+    "subject": "q.subject ILIKE {}",
+    "client_id": "q.client_id = {}",
+    "expert_id": "q.expert_id = {}",
+    "date_from": "q.created_at >= {}",
+    "date_to": "q.created_at <= {}",
+}
+
+QUESTIONS_COUNT = statements.filtered("admin.questions_count", """
+    SELECT COUNT(*) FROM questions q WHERE {where}
+""", _QUESTION_FILTERS)
+
+QUESTIONS = statements.filtered("admin.questions", """
+    SELECT 
+        q.*,
+        u.email as client_email,
+        u.first_name as client_first_name,
+        u.last_name as client_last_name,
+        e.email as expert_email,
+        e.first_name as expert_first_name,
+        e.last_name as expert_last_name
+    FROM questions q
+    LEFT JOIN users u ON q.client_id = u.id
+    LEFT JOIN users e ON q.expert_id = e.id
+    WHERE {where}
+    ORDER BY q.created_at DESC
+    LIMIT {p1} OFFSET {p2}
+""", _QUESTION_FILTERS)
 
 
 async def get_questions(
@@ -19,80 +53,26 @@ async def get_questions(
     date_to: Optional[datetime] = None,
     search: Optional[str] = None,
     page: int = 1,
-    page_size: int = 50
+    page_size: int = 50,
+    cursor: Optional[str] = None
 ) -> Dict[str, Any]:
-    """Get questions with filters"""
-    offset = (page - 1) * page_size
-    conditions = []
-    params = []
-    param_count = 0
-    
-    if status:
-        param_count += 1
-        conditions.append(f"q.status = ${param_count}")
-        params.append(status)
-    
-    if subject:
-        param_count += 1
-        conditions.append(f"q.subject ILIKE ${param_count}")
-        params.append(f"%{subject}%")
-    
-    if client_id:
-        param_count += 1
-        conditions.append(f"q.client_id = ${param_count}")
-        params.append(client_id)
-    
-    if expert_id:
-        param_count += 1
-        conditions.append(f"q.expert_id = ${param_count}")
-        params.append(expert_id)
-    
-    if date_from:
-        param_count += 1
-        conditions.append(f"q.created_at >= ${param_count}")
-        params.append(date_from)
-    
-    if date_to:
-        param_count += 1
-        conditions.append(f"q.created_at <= ${param_count}")
-        params.append(date_to)
-    
+    """Get questions with filters (text search is ranked full-text, see crud.admin.search)"""
     if search:
-        param_count += 1
-        conditions.append(f"q.question_text ILIKE ${param_count}")
-        params.append(f"%{search}%")
-    
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-    
-    # Get total count
-    count_query = f"SELECT COUNT(*) FROM questions q WHERE {where_clause}"
-    total = await db.fetchval(count_query, *params)
-    
-    # Get questions with related data
-    param_count += 1
-    params.append(page_size)
-    param_count += 1
-    params.append(offset)
-    
-    query = f"""
-        SELECT 
-            q.*,
-            u.email as client_email,
-            u.first_name as client_first_name,
-            u.last_name as client_last_name,
-            e.email as expert_email,
-            e.first_name as expert_first_name,
-            e.last_name as expert_last_name
-        FROM questions q
-        LEFT JOIN users u ON q.client_id = u.id
-        LEFT JOIN users e ON q.expert_id = e.id
-        WHERE {where_clause}
-        ORDER BY q.created_at DESC
-        LIMIT ${param_count - 1} OFFSET ${param_count}
-    """
+        return await search_crud.search_questions(
+            db, search, status, subject, client_id, expert_id,
+            date_from, date_to, cursor, page, page_size
+        )
     
-    rows = await db.fetch(query, *params)
+    offset = (page - 1) * page_size
+    filters = {
+        "status": status or None, "subject": f"%{subject}%" if subject else None,
+        "client_id": client_id, "expert_id": expert_id, "date_from": date_from, "date_to": date_to
+    }
+    total = await QUESTIONS_COUNT.fetchval(db, filters)
+    rows = await QUESTIONS.fetch(db, filters, page_size, offset)
     questions = [dict(row) for row in rows]
+    for question in questions:
+        question.pop("search_vector", None)
     
     return {
         "questions": questions,
@@ -132,6 +112,14 @@ async def get_question_by_id(db: asyncpg.Connection, question_id: UUID) -> Optio
     if answer_row:
         question["answer_data"] = dict(answer_row)
     
+    # Archived questions: fill the emptied bodies from the bundle
+    if question.get("archived_at"):
+        bundle = (await question_archive.load(db, [question_id])).get(question_id)
+        if bundle:
+            fill_row(question, "questions", bundle["question"])
+            if answer_row:
+                fill_row(question["answer_data"], "answers", archived_answer(bundle, answer_row["id"]))
+    
     # Get admin actions related to this question
     actions = await db.fetch("""
         SELECT * FROM admin_actions 
@@ -6,7 +6,7 @@ from typing import Dict, Any, Optional, List
 import asyncpg
 from uuid import UUID
 from datetime import datetime
-import json
+from app.crud.admin import admin_actions as action_crud
 
 
 async def get_queue_status(
@@ -167,13 +167,10 @@ async def purge_queue(
     # This would typically connect to RabbitMQ to purge
     # For now, we'll log the action
     
-    await db.execute("""
-        INSERT INTO admin_actions (admin_id, action_type, target_type, details)
-        VALUES ($1, 'purge_queue', 'queue', $2::jsonb)
-    """, purged_by, json.dumps({
+    await action_crud.log_admin_action(db, purged_by, "purge_queue", target_type="queue", details={
         "queue_name": queue_name,
         "purged_at": datetime.utcnow().isoformat()
-    }))
+    })
     
     return {
         "success": True,
@@ -208,14 +205,11 @@ async def retry_failed_tasks(
     
     # Log action
     if retried_by:
-        await db.execute("""
-            INSERT INTO admin_actions (admin_id, action_type, target_type, details)
-            VALUES ($1, 'retry_failed_tasks', 'queue', $2::jsonb)
-        """, retried_by, json.dumps({
+        await action_crud.log_admin_action(db, retried_by, "retry_failed_tasks", target_type="queue", details={
             "queue_name": queue_name,
             "task_count": count,
             "retried_at": datetime.utcnow().isoformat()
-        }))
+        })
     
     return {
         "success": True,
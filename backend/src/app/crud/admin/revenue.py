@@ -9,104 +9,55 @@ from datetime import datetime, timedelta
 import json
 
 
-async def get_revenue_dashboard(
-    db: asyncpg.Connection
-) -> Dict[str, Any]:
-    """Get revenue dashboard statistics"""
-    # Total revenue (all time)
-    total_revenue = await db.fetchval("""
-        SELECT COALESCE(SUM(amount), 0) 
-        FROM transactions 
-        WHERE status = 'completed' AND transaction_type = 'purchase'
-    """) or 0.0
-    
-    # Today's revenue
-    revenue_today = await db.fetchval("""
-        SELECT COALESCE(SUM(amount), 0)
-        FROM transactions
-        WHERE status = 'completed' 
-        AND transaction_type = 'purchase'
-        AND DATE(created_at) = CURRENT_DATE
-    """) or 0.0
-    
-    # This week's revenue
-    revenue_this_week = await db.fetchval("""
-        SELECT COALESCE(SUM(amount), 0)
-        FROM transactions
-        WHERE status = 'completed'
-        AND transaction_type = 'purchase'
-        AND created_at >= DATE_TRUNC('week', CURRENT_DATE)
-    """) or 0.0
-    
-    # This month's revenue
-    revenue_this_month = await db.fetchval("""
-        SELECT COALESCE(SUM(amount), 0)
-        FROM transactions
-        WHERE status = 'completed'
-        AND transaction_type = 'purchase'
-        AND created_at >= DATE_TRUNC('month', CURRENT_DATE)
-    """) or 0.0
-    
-    # This year's revenue
-    revenue_this_year = await db.fetchval("""
-        SELECT COALESCE(SUM(amount), 0)
-        FROM transactions
-        WHERE status = 'completed'
-        AND transaction_type = 'purchase'
-        AND created_at >= DATE_TRUNC('year', CURRENT_DATE)
-    """) or 0.0
-    
-    # Credits sold
-    credits_sold = await db.fetchval("""
-        SELECT COALESCE(SUM(credits), 0)
-        FROM transactions
-        WHERE status = 'completed' AND transaction_type = 'purchase'
-    """) or 0
-    
-    credits_sold_today = await db.fetchval("""
-        SELECT COALESCE(SUM(credits), 0)
-        FROM transactions
-        WHERE status = 'completed'
-        AND transaction_type = 'purchase'
-        AND DATE(created_at) = CURRENT_DATE
-    """) or 0
-    
-    credits_sold_this_week = await db.fetchval("""
-        SELECT COALESCE(SUM(credits), 0)
-        FROM transactions
-        WHERE status = 'completed'
-        AND transaction_type = 'purchase'
-        AND created_at >= DATE_TRUNC('week', CURRENT_DATE)
-    """) or 0
-    
-    credits_sold_this_month = await db.fetchval("""
-        SELECT COALESCE(SUM(credits), 0)
-        FROM transactions
-        WHERE status = 'completed'
-        AND transaction_type = 'purchase'
-        AND created_at >= DATE_TRUNC('month', CURRENT_DATE)
-    """) or 0
+async def get_revenue_totals(db: asyncpg.Connection) -> Dict[str, Any]:
+    """Revenue, credits sold and transaction counts (all time and this day/week/month/year)"""
+    row = await db.fetchrow("""
+        SELECT
+            COALESCE(SUM(amount) FILTER (WHERE purchase), 0) AS total_revenue,
+            COALESCE(SUM(amount) FILTER (WHERE purchase AND created_at >= CURRENT_DATE), 0) AS revenue_today,
+            COALESCE(SUM(amount) FILTER (WHERE purchase AND created_at >= DATE_TRUNC('week', CURRENT_DATE)), 0) AS revenue_this_week,
+            COALESCE(SUM(amount) FILTER (WHERE purchase AND created_at >= DATE_TRUNC('month', CURRENT_DATE)), 0) AS revenue_this_month,
+            COALESCE(SUM(amount) FILTER (WHERE purchase AND created_at >= DATE_TRUNC('year', CURRENT_DATE)), 0) AS revenue_this_year,
+            COALESCE(SUM(credits) FILTER (WHERE purchase), 0) AS credits_sold,
+            COALESCE(SUM(credits) FILTER (WHERE purchase AND created_at >= CURRENT_DATE), 0) AS credits_sold_today,
+            COALESCE(SUM(credits) FILTER (WHERE purchase AND created_at >= DATE_TRUNC('week', CURRENT_DATE)), 0) AS credits_sold_this_week,
+            COALESCE(SUM(credits) FILTER (WHERE purchase AND created_at >= DATE_TRUNC('month', CURRENT_DATE)), 0) AS credits_sold_this_month,
+            COUNT(*) FILTER (WHERE purchase) AS total_transactions,
+            COUNT(*) FILTER (WHERE status = 'refunded') AS refunded_count
+        FROM (
+            SELECT amount, credits, created_at, status,
+                   status = 'completed' AND transaction_type = 'purchase' AS purchase
+            FROM transactions
+            WHERE (status = 'completed' AND transaction_type = 'purchase') OR status = 'refunded'
+        ) t
+    """)
     
-    # Average transaction value
-    total_transactions = await db.fetchval("""
-        SELECT COUNT(*)
-        FROM transactions
-        WHERE status = 'completed' AND transaction_type = 'purchase'
-    """) or 0
+    total_revenue = float(row["total_revenue"] or 0)
+    total_transactions = int(row["total_transactions"] or 0)
     
+    # Average transaction value and refund rate
     average_transaction_value = total_revenue / total_transactions if total_transactions > 0 else 0.0
+    refund_rate = (row["refunded_count"] / total_transactions * 100) if total_transactions > 0 else 0.0
     
-    # Refund rate
-    refunded_count = await db.fetchval("""
-        SELECT COUNT(*)
-        FROM transactions
-        WHERE status = 'refunded'
-    """) or 0
-    
-    refund_rate = (refunded_count / total_transactions * 100) if total_transactions > 0 else 0.0
-    
-    # Top spending users
-    top_spenders = await db.fetch("""
+    return {
+        "total_revenue": total_revenue,
+        "revenue_today": float(row["revenue_today"] or 0),
+        "revenue_this_week": float(row["revenue_this_week"] or 0),
+        "revenue_this_month": float(row["revenue_this_month"] or 0),
+        "revenue_this_year": float(row["revenue_this_year"] or 0),
+        "credits_sold": int(row["credits_sold"] or 0),
+        "credits_sold_today": int(row["credits_sold_today"] or 0),
+        "credits_sold_this_week": int(row["credits_sold_this_week"] or 0),
+        "credits_sold_this_month": int(row["credits_sold_this_month"] or 0),
+        "average_transaction_value": float(average_transaction_value),
+        "total_transactions": total_transactions,
+        "refund_rate": float(refund_rate)
+    }
+
+
+async def get_top_spenders(db: asyncpg.Connection, limit: int = 10) -> List[Dict[str, Any]]:
+    """Top spending users"""
+    rows = await db.fetch("""
         SELECT 
             u.id, u.email, u.first_name, u.last_name,
             SUM(t.amount) as total_spent,
@@ -116,11 +67,14 @@ async def get_revenue_dashboard(
         WHERE t.status = 'completed' AND t.transaction_type = 'purchase'
         GROUP BY u.id, u.email, u.first_name, u.last_name
         ORDER BY total_spent DESC
-        LIMIT 10
-    """)
-    
-    # Revenue trend (last 30 days)
-    revenue_trend = await db.fetch("""
+        LIMIT $1
+    """, limit)
+    return [dict(row) for row in rows]
+
+
+async def get_revenue_trend(db: asyncpg.Connection, days: int = 30) -> List[Dict[str, Any]]:
+    """Daily revenue (last `days` days)"""
+    rows = await db.fetch("""
         SELECT 
             DATE(created_at) as date,
             SUM(amount) as revenue,
@@ -128,27 +82,11 @@ async def get_revenue_dashboard(
         FROM transactions
         WHERE status = 'completed'
         AND transaction_type = 'purchase'
-        AND created_at >= CURRENT_DATE - INTERVAL '30 days'
+        AND created_at >= CURRENT_DATE - make_interval(days => $1)
         GROUP BY DATE(created_at)
         ORDER BY date ASC
-    """)
-    
-    return {
-        "total_revenue": float(total_revenue),
-        "revenue_today": float(revenue_today),
-        "revenue_this_week": float(revenue_this_week),
-        "revenue_this_month": float(revenue_this_month),
-        "revenue_this_year": float(revenue_this_year),
-        "credits_sold": int(credits_sold),
-        "credits_sold_today": int(credits_sold_today),
-        "credits_sold_this_week": int(credits_sold_this_week),
-        "credits_sold_this_month": int(credits_sold_this_month),
-        "average_transaction_value": float(average_transaction_value),
-        "total_transactions": int(total_transactions),
-        "refund_rate": float(refund_rate),
-        "top_spending_users": [dict(row) for row in top_spenders],
-        "revenue_trend": [dict(row) for row in revenue_trend]
-    }
+    """, days)
+    return [dict(row) for row in rows]
 
 
 async def get_transactions(
@@ -327,17 +265,30 @@ async def revoke_credits(
     }
 
 
-async def get_credits_stats(db: asyncpg.Connection) -> Dict[str, Any]:
-    """Get credits statistics"""
-    # Total credits sold
-    total_credits_sold = await db.fetchval("""
-        SELECT COALESCE(SUM(credits), 0)
+async def get_credits_totals(db: asyncpg.Connection) -> Dict[str, Any]:
+    """Credits sold, their revenue and the average per purchasing user"""
+    row = await db.fetchrow("""
+        SELECT
+            COALESCE(SUM(credits) FILTER (WHERE status = 'completed'), 0) AS total_credits_sold,
+            COALESCE(SUM(amount) FILTER (WHERE status = 'completed'), 0) AS total_revenue_from_credits,
+            COUNT(DISTINCT user_id) AS users_with_credits
         FROM transactions
-        WHERE status = 'completed' AND transaction_type = 'purchase'
-    """) or 0
+        WHERE transaction_type = 'purchase'
+    """)
+    total_credits_sold = int(row["total_credits_sold"] or 0)
+    users_with_credits = row["users_with_credits"] or 0
+    average_credits_per_user = total_credits_sold / users_with_credits if users_with_credits > 0 else 0.0
     
-    # Credits by package (assuming package info in details)
-    credits_by_package = await db.fetch("""
+    return {
+        "total_credits_sold": total_credits_sold,
+        "total_revenue_from_credits": float(row["total_revenue_from_credits"] or 0),
+        "average_credits_per_user": float(average_credits_per_user)
+    }
+
+
+async def get_credits_by_package(db: asyncpg.Connection) -> Dict[str, int]:
+    """Credits sold per package (assuming package info in details)"""
+    rows = await db.fetch("""
         SELECT 
             details->>'package' as package,
             SUM(credits) as credits
@@ -346,25 +297,12 @@ async def get_credits_stats(db: asyncpg.Connection) -> Dict[str, Any]:
         AND details->>'package' IS NOT NULL
         GROUP BY details->>'package'
     """)
-    
-    # Total revenue from credits
-    total_revenue_from_credits = await db.fetchval("""
-        SELECT COALESCE(SUM(amount), 0)
-        FROM transactions
-        WHERE status = 'completed' AND transaction_type = 'purchase'
-    """) or 0.0
-    
-    # Average credits per user
-    users_with_credits = await db.fetchval("""
-        SELECT COUNT(DISTINCT user_id)
-        FROM transactions
-        WHERE transaction_type = 'purchase'
-    """) or 0
-    
-    average_credits_per_user = total_credits_sold / users_with_credits if users_with_credits > 0 else 0.0
-    
-    # Top packages
-    top_packages = await db.fetch("""
+    return {row["package"]: row["credits"] for row in rows}
+
+
+async def get_top_packages(db: asyncpg.Connection, limit: int = 10) -> List[Dict[str, Any]]:
+    """Best-selling credit packages"""
+    rows = await db.fetch("""
         SELECT 
             details->>'package' as package,
             SUM(credits) as credits_sold,
@@ -375,14 +313,6 @@ async def get_credits_stats(db: asyncpg.Connection) -> Dict[str, Any]:
         AND details->>'package' IS NOT NULL
         GROUP BY details->>'package'
         ORDER BY credits_sold DESC
-        LIMIT 10
-    """)
-    
-    return {
-        "total_credits_sold": int(total_credits_sold),
-        "credits_by_package": {row["package"]: row["credits"] for row in credits_by_package},
-        "total_revenue_from_credits": float(total_revenue_from_credits),
-        "average_credits_per_user": float(average_credits_per_user),
-        "top_packages": [dict(row) for row in top_packages]
-    }
-
+        LIMIT $1
+    """, limit)
+    return [dict(row) for row in rows]
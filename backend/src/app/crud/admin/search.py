@@ -0,0 +1,271 @@
+"""
+Admin search CRUD operations
+Full-text question search (tsvector + GIN, see migration 007) and
+trigram-backed user search, with ranked results and cursor pagination
+"""
+
+from typing import Optional, List, Dict, Any, Tuple
+import asyncpg
+from uuid import UUID
+from datetime import datetime
+import base64
+import json
+from app.utils.question_archive import fill_row, question_archive
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+async def _fill_archived(db: asyncpg.Connection, questions: List[Dict[str, Any]], search: str) -> None:
+    """
+    Archived questions still match (their search vectors are kept, migration
+    020) but their text was emptied: fill it from the bundles and build their
+    snippets from it
+    """
+    archived = [question for question in questions if question.get("archived_at")]
+    if not archived:
+        return
+    bundles = await question_archive.load(db, [question["id"] for question in archived])
+    for question in archived:
+        bundle = bundles.get(question["id"])
+        if bundle:
+            fill_row(question, "questions", bundle["question"])
+    snippets = await db.fetch(f"""
+        SELECT ts_headline('english', t.text, websearch_to_tsquery('english', $1),
+                           '{HEADLINE_OPTIONS}') AS snippet
+        FROM unnest($2::text[]) WITH ORDINALITY AS t(text, position)
+        ORDER BY t.position
+    """, search, [question["question_text"] or "" for question in archived])
+    for question, row in zip(archived, snippets):
+        question["search_snippet"] = row["snippet"]
+
+
+def encode_cursor(score: float, row_id: UUID) -> str:
+    """Opaque keyset cursor for (score, id) ordering"""
+    payload = json.dumps({"s": score, "id": str(row_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, UUID]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return float(payload["s"]), UUID(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def search_questions(
+    db: asyncpg.Connection,
+    search: str,
+    status: Optional[str] = None,
+    subject: Optional[str] = None,
+    client_id: Optional[UUID] = None,
+    expert_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 50
+) -> Dict[str, Any]:
+    """
+    Ranked full-text question search with highlighted snippets.
+    Pass `cursor` (the previous response's next_cursor) for keyset pagination;
+    without it the page is located by offset and the total is counted.
+    """
+    conditions = ["q.search_vector @@ query"]
+    params: List[Any] = [search]
+    param_count = 1
+    
+    if status:
+        param_count += 1
+        conditions.append(f"q.status = ${param_count}")
+        params.append(status)
+    
+    if subject:
+        param_count += 1
+        conditions.append(f"q.subject ILIKE ${param_count}")
+        params.append(f"%{subject}%")
+    
+    if client_id:
+        param_count += 1
+        conditions.append(f"q.client_id = ${param_count}")
+        params.append(client_id)
+    
+    if expert_id:
+        param_count += 1
+        conditions.append(f"q.expert_id = ${param_count}")
+        params.append(expert_id)
+    
+    if date_from:
+        param_count += 1
+        conditions.append(f"q.created_at >= ${param_count}")
+        params.append(date_from)
+    
+    if date_to:
+        param_count += 1
+        conditions.append(f"q.created_at <= ${param_count}")
+        params.append(date_to)
+    
+    where_clause = " AND ".join(conditions)
+    
+    total = None
+    if cursor is None:
+        total = await db.fetchval(f"""
+            SELECT COUNT(*)
+            FROM questions q, websearch_to_tsquery('english', $1) query
+            WHERE {where_clause}
+        """, *params)
+    
+    page_params = list(params)
+    keyset_clause = ""
+    offset_clause = ""
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor)
+        keyset_clause = (
+            f"WHERE (m.rank < ${param_count + 1}::real "
+            f"OR (m.rank = ${param_count + 1}::real AND m.id < ${param_count + 2}))"
+        )
+        page_params.extend([last_rank, last_id])
+    else:
+        offset_clause = f"OFFSET {(page - 1) * page_size}"
+    page_params.append(page_size)
+    limit_param = len(page_params)
+    
+    # Rank all matches, page them, then build headlines only for the page
+    rows = await db.fetch(f"""
+        WITH matches AS (
+            SELECT q.id, ts_rank_cd(q.search_vector, query) as rank
+            FROM questions q, websearch_to_tsquery('english', $1) query
+            WHERE {where_clause}
+        ),
+        page AS (
+            SELECT m.id, m.rank
+            FROM matches m
+            {keyset_clause}
+            ORDER BY m.rank DESC, m.id DESC
+            LIMIT ${limit_param} {offset_clause}
+        )
+        SELECT
+            q.*,
+            p.rank as search_rank,
+            ts_headline('english', q.question_text, websearch_to_tsquery('english', $1),
+                        '{HEADLINE_OPTIONS}') as search_snippet,
+            u.email as client_email,
+            u.first_name as client_first_name,
+            u.last_name as client_last_name,
+            e.email as expert_email,
+            e.first_name as expert_first_name,
+            e.last_name as expert_last_name
+        FROM page p
+        JOIN questions q ON q.id = p.id
+        LEFT JOIN users u ON q.client_id = u.id
+        LEFT JOIN users e ON q.expert_id = e.id
+        ORDER BY p.rank DESC, p.id DESC
+    """, *page_params)
+    
+    questions = []
+    for row in rows:
+        question = dict(row)
+        question.pop("search_vector", None)
+        questions.append(question)
+    await _fill_archived(db, questions, search)
+    
+    next_cursor = None
+    if len(questions) == page_size:
+        last = questions[-1]
+        next_cursor = encode_cursor(last["search_rank"], last["id"])
+    
+    return {
+        "questions": questions,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor
+    }
+
+
+async def search_users(
+    db: asyncpg.Connection,
+    search: str,
+    role: Optional[str] = None,
+    is_banned: Optional[bool] = None,
+    is_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 50
+) -> Dict[str, Any]:
+    """
+    Ranked user search by email/name.
+    Substring and prefix matches use the trigram GIN indexes; results are
+    ordered by trigram similarity.
+    """
+    conditions = ["(email ILIKE $2 OR first_name ILIKE $2 OR last_name ILIKE $2)"]
+    params: List[Any] = [search, f"%{search}%"]
+    param_count = 2
+    
+    if role:
+        param_count += 1
+        conditions.append(f"role = ${param_count}")
+        params.append(role)
+    
+    if is_banned is not None:
+        param_count += 1
+        conditions.append(f"is_banned = ${param_count}")
+        params.append(is_banned)
+    
+    if is_active is not None:
+        param_count += 1
+        conditions.append(f"is_active = ${param_count}")
+        params.append(is_active)
+    
+    where_clause = " AND ".join(conditions)
+    
+    total = None
+    if cursor is None:
+        total = await db.fetchval(f"SELECT COUNT(*) FROM users WHERE {where_clause}", *params)
+    
+    page_params = list(params)
+    keyset_clause = ""
+    offset_clause = ""
+    if cursor:
+        last_score, last_id = decode_cursor(cursor)
+        keyset_clause = (
+            f"WHERE (m.search_rank < ${param_count + 1}::real "
+            f"OR (m.search_rank = ${param_count + 1}::real AND m.id < ${param_count + 2}))"
+        )
+        page_params.extend([last_score, last_id])
+    else:
+        offset_clause = f"OFFSET {(page - 1) * page_size}"
+    page_params.append(page_size)
+    limit_param = len(page_params)
+    
+    rows = await db.fetch(f"""
+        SELECT * FROM (
+            SELECT
+                users.*,
+                GREATEST(
+                    similarity(email, $1),
+                    word_similarity($1, CONCAT_WS(' ', first_name, last_name))
+                )::real as search_rank
+            FROM users
+            WHERE {where_clause}
+        ) m
+        {keyset_clause}
+        ORDER BY m.search_rank DESC, m.id DESC
+        LIMIT ${limit_param} {offset_clause}
+    """, *page_params)
+    
+    users = [dict(row) for row in rows]
+    
+    next_cursor = None
+    if len(users) == page_size:
+        last = users[-1]
+        next_cursor = encode_cursor(last["search_rank"], last["id"])
+    
+    return {
+        "users": users,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor
+    }
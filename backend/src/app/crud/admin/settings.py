@@ -7,6 +7,14 @@ import asyncpg
 from uuid import UUID
 import json
 
+# Runtime settings listeners reload on notifications on this channel
+SETTINGS_CHANNEL = "system_settings"
+
+
+async def notify_settings_changed(db: asyncpg.Connection, key: str) -> None:
+    """Notify LISTENing workers (delivered when the transaction commits)"""
+    await db.execute("SELECT pg_notify($1, $2)", SETTINGS_CHANNEL, key)
+
 
 async def get_system_settings(
     db: asyncpg.Connection,
@@ -43,6 +51,7 @@ async def create_system_setting(
         VALUES ($1, $2, $3, $4)
         RETURNING id
     """, key, json.dumps(value), description, updated_by)
+    await notify_settings_changed(db, key)
     return row['id']
 
 
@@ -60,7 +69,10 @@ async def update_system_setting(
             updated_by_id = $3, updated_at = NOW()
         WHERE key = $4
     """, json.dumps(value), description, updated_by, key)
-    return result == "UPDATE 1"
+    if result == "UPDATE 1":
+        await notify_settings_changed(db, key)
+        return True
+    return False
 
 
 async def upsert_system_setting(
@@ -82,11 +94,15 @@ async def upsert_system_setting(
             updated_at = NOW()
         RETURNING id
     """, key, json.dumps(value), description, updated_by)
+    await notify_settings_changed(db, key)
     return row['id']
 
 
 async def delete_system_setting(db: asyncpg.Connection, key: str) -> bool:
     """Delete system setting"""
     result = await db.execute("DELETE FROM system_settings WHERE key = $1", key)
-    return result == "DELETE 1"
+    if result == "DELETE 1":
+        await notify_settings_changed(db, key)
+        return True
+    return False
 
@@ -0,0 +1,93 @@
+"""
+Content similarity CRUD operations
+MinHash signature storage for the near-duplicate index
+"""
+
+from typing import Optional, List, Dict, Any, Tuple
+import asyncpg
+from uuid import UUID
+from datetime import datetime
+
+
+async def get_content_signatures(
+    db: asyncpg.Connection,
+    num_perm: int,
+    after: Optional[Tuple[datetime, str, UUID]] = None,
+    limit: int = 5000
+) -> List[Dict[str, Any]]:
+    """Get stored signatures in (created_at, content_type, content_id) order, starting after `after`"""
+    if after:
+        rows = await db.fetch("""
+            SELECT content_type, content_id, owner_id, signature, created_at
+            FROM content_signatures
+            WHERE num_perm = $1
+            AND (created_at, content_type, content_id) > ($2, $3, $4)
+            ORDER BY created_at, content_type, content_id
+            LIMIT $5
+        """, num_perm, after[0], after[1], after[2], limit)
+    else:
+        rows = await db.fetch("""
+            SELECT content_type, content_id, owner_id, signature, created_at
+            FROM content_signatures
+            WHERE num_perm = $1
+            ORDER BY created_at, content_type, content_id
+            LIMIT $2
+        """, num_perm, limit)
+    return [dict(row) for row in rows]
+
+
+async def get_unsigned_content(
+    db: asyncpg.Connection,
+    num_perm: int,
+    limit: int = 1000
+) -> List[Dict[str, Any]]:
+    """
+    Get the oldest questions and answers that have no stored signature yet.
+    Texts without a word to sign (blank, or emptied by the question archiver)
+    are skipped here, so they cannot fill every batch and stall the backfill.
+    """
+    rows = await db.fetch("""
+        (
+            SELECT 'question' as content_type, q.id as content_id, q.client_id as owner_id,
+                   q.question_text as text
+            FROM questions q
+            LEFT JOIN content_signatures s
+                ON s.content_type = 'question' AND s.content_id = q.id AND s.num_perm = $1
+            WHERE s.content_id IS NULL AND q.question_text ~* '[a-z0-9]'
+            ORDER BY q.created_at, q.id
+            LIMIT $2
+        )
+        UNION ALL
+        (
+            SELECT 'answer' as content_type, a.id as content_id, q.expert_id as owner_id,
+                   a.answer_text as text
+            FROM answers a
+            JOIN questions q ON a.question_id = q.id
+            LEFT JOIN content_signatures s
+                ON s.content_type = 'answer' AND s.content_id = a.id AND s.num_perm = $1
+            WHERE s.content_id IS NULL AND a.answer_text ~* '[a-z0-9]'
+            ORDER BY a.created_at, a.id
+            LIMIT $2
+        )
+    """, num_perm, limit)
+    return [dict(row) for row in rows]
+
+
+async def save_content_signatures(
+    db: asyncpg.Connection,
+    num_perm: int,
+    signatures: List[Tuple[str, UUID, Optional[UUID], bytes]]
+) -> None:
+    """Store (content_type, content_id, owner_id, signature) rows, replacing existing ones"""
+    if not signatures:
+        return
+    await db.executemany("""
+        INSERT INTO content_signatures (content_type, content_id, owner_id, num_perm, signature)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (content_type, content_id)
+        DO UPDATE SET owner_id = EXCLUDED.owner_id, num_perm = EXCLUDED.num_perm,
+                      signature = EXCLUDED.signature
+    """, [
+        (content_type, content_id, owner_id, num_perm, signature)
+        for content_type, content_id, owner_id, signature in signatures
+    ])
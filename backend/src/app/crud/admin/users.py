@@ -6,6 +6,26 @@ from typing import Optional, List, Dict, Any
 import asyncpg
 from uuid import UUID
 from datetime import datetime
+from app.crud.admin import search as search_crud
+from app.db.statements import statements
+
+
+_USER_FILTERS = {
+    "role": "role = {}",
+    "is_banned": "is_banned = {}",
+    "is_active": "is_active = {}",
+}
+
+USERS_COUNT = statements.filtered("admin.users_count", """
+    SELECT COUNT(*) FROM users WHERE {where}
+""", _USER_FILTERS)
+
+USERS = statements.filtered("admin.users", """
+    SELECT * FROM users 
+    WHERE {where}
+    ORDER BY created_at DESC
+    LIMIT {p1} OFFSET {p2}
+""", _USER_FILTERS)
 
 
 async def get_users(
@@ -15,54 +35,19 @@ async def get_users(
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
     page: int = 1,
-    page_size: int = 50
+    page_size: int = 50,
+    cursor: Optional[str] = None
 ) -> Dict[str, Any]:
-    """Get users with filters"""
-    offset = (page - 1) * page_size
-    conditions = []
-    params = []
-    param_count = 0
-    
-    if role:
-        param_count += 1
-        conditions.append(f"role = ${param_count}")
-        params.append(role)
-    
-    if is_banned is not None:
-        param_count += 1
-        conditions.append(f"is_banned = ${param_count}")
-        params.append(is_banned)
-    
-    if is_active is not None:
-        param_count += 1
-        conditions.append(f"is_active = ${param_count}")
-        params.append(is_active)
-    
+    """Get users with filters (search is trigram-ranked, see crud.admin.search)"""
     if search:
-        param_count += 1
-        conditions.append(f"(email ILIKE ${param_count} OR first_name ILIKE ${param_count} OR last_name ILIKE ${param_count})")
-        params.append(f"%{search}%")
-    
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-    
-    # Get total count
-    count_query = f"SELECT COUNT(*) FROM users WHERE {where_clause}"
-    total = await db.fetchval(count_query, *params)
-    
-    # Get users
-    param_count += 1
-    params.append(page_size)
-    param_count += 1
-    params.append(offset)
-    
-    query = f"""
-        SELECT * FROM users 
-        WHERE {where_clause}
-        ORDER BY created_at DESC
-        LIMIT ${param_count - 1} OFFSET ${param_count}
-    """
+        return await search_crud.search_users(
+            db, search, role, is_banned, is_active, cursor, page, page_size
+        )
     
-    rows = await db.fetch(query, *params)
+    offset = (page - 1) * page_size
+    filters = {"role": role or None, "is_banned": is_banned, "is_active": is_active}
+    total = await USERS_COUNT.fetchval(db, filters)
+    rows = await USERS.fetch(db, filters, page_size, offset)
     users = [dict(row) for row in rows]
     
     return {
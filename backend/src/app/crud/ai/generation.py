@@ -0,0 +1,166 @@
+"""
+AI generation CRUD operations
+"""
+
+from typing import Optional, Dict, Any, List
+import asyncpg
+from uuid import UUID
+import json
+
+
+async def claim_question(
+    db: asyncpg.Connection,
+    question_id: UUID
+) -> Optional[Dict[str, Any]]:
+    """Move a pending, unanswered question to 'processing'; None if it is not claimable"""
+    row = await db.fetchrow("""
+        UPDATE questions
+        SET status = 'processing', updated_at = NOW()
+        WHERE id = $1 AND status = 'pending' AND answer_id IS NULL
+        RETURNING id, client_id, question_text, subject, metadata
+    """, question_id)
+    if not row:
+        return None
+    question = dict(row)
+    if isinstance(question["metadata"], str):
+        question["metadata"] = json.loads(question["metadata"])
+    question["metadata"] = question["metadata"] or {}
+    return question
+
+
+async def release_question(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    error: str
+) -> None:
+    """
+    Return a question to 'pending' after a failed or cancelled generation,
+    recording the error and counting the attempt
+    """
+    await db.execute("""
+        UPDATE questions
+        SET status = 'pending',
+            metadata = COALESCE(metadata, '{}'::jsonb) || jsonb_build_object(
+                'generation_error', $2::text,
+                'generation_attempts', COALESCE((metadata->>'generation_attempts')::int, 0) + 1
+            ),
+            updated_at = NOW()
+        WHERE id = $1 AND status = 'processing'
+    """, question_id, error)
+
+
+async def release_stale_questions(
+    db: asyncpg.Connection,
+    lease_seconds: int
+) -> int:
+    """Return questions left in 'processing' longer than the lease (a worker died mid-generation) to 'pending'"""
+    result = await db.execute("""
+        UPDATE questions
+        SET status = 'pending',
+            metadata = COALESCE(metadata, '{}'::jsonb) || jsonb_build_object(
+                'generation_error', 'generation lease expired',
+                'generation_attempts', COALESCE((metadata->>'generation_attempts')::int, 0) + 1
+            ),
+            updated_at = NOW()
+        WHERE status = 'processing' AND answer_id IS NULL
+        AND updated_at < NOW() - ($1::int * INTERVAL '1 second')
+    """, lease_seconds)
+    return int(result.split()[-1]) if result else 0
+
+
+async def take_retryable_questions(
+    db: asyncpg.Connection,
+    retry_after_seconds: int,
+    max_attempts: int,
+    limit: int
+) -> List[UUID]:
+    """
+    Pending, unanswered questions untouched for `retry_after_seconds` that have
+    attempts left. Their updated_at is bumped so the next sweep (on any worker)
+    waits another interval before queueing them again.
+    """
+    rows = await db.fetch("""
+        UPDATE questions
+        SET updated_at = NOW()
+        WHERE id IN (
+            SELECT id FROM questions
+            WHERE status = 'pending' AND answer_id IS NULL
+            AND updated_at < NOW() - ($1::int * INTERVAL '1 second')
+            AND COALESCE((metadata->>'generation_attempts')::int, 0) < $2
+            ORDER BY updated_at
+            LIMIT $3
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id
+    """, retry_after_seconds, max_attempts, limit)
+    return [row["id"] for row in rows]
+
+
+async def save_generated_answer(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    answer_text: str,
+    ai_confidence: Optional[float],
+    metadata: Dict[str, Any]
+) -> UUID:
+    """Store the generated answer and mark the question 'ai_generated'"""
+    async with db.transaction():
+        answer_id = await db.fetchval("""
+            INSERT INTO answers (question_id, answer_text, ai_confidence, status, metadata, created_at)
+            VALUES ($1, $2, $3, 'ai_generated', $4::jsonb, NOW())
+            ON CONFLICT (question_id)
+            DO UPDATE SET answer_text = EXCLUDED.answer_text, ai_confidence = EXCLUDED.ai_confidence,
+                          status = 'ai_generated',
+                          metadata = COALESCE(answers.metadata, '{}'::jsonb) || EXCLUDED.metadata,
+                          updated_at = NOW()
+            RETURNING id
+        """, question_id, answer_text, ai_confidence, json.dumps(metadata))
+        
+        await db.execute("""
+            UPDATE questions
+            SET status = 'ai_generated', answer_id = $1, processed_at = NOW(), updated_at = NOW()
+            WHERE id = $2
+        """, answer_id, question_id)
+    return answer_id
+
+
+async def mark_reused(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    answer_id: UUID
+) -> None:
+    """Mark a question whose draft came from answer reuse as 'ai_generated'"""
+    await db.execute("""
+        UPDATE questions
+        SET status = 'ai_generated', answer_id = $1, processed_at = NOW(), updated_at = NOW()
+        WHERE id = $2
+    """, answer_id, question_id)
+
+
+async def save_draft_checkpoint(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    draft_text: str,
+    status: str
+) -> None:
+    """Upsert the streamed draft of a question ('streaming' or 'complete')"""
+    await db.execute("""
+        INSERT INTO answer_drafts (question_id, draft_text, draft_length, status, updated_at)
+        VALUES ($1, $2, $3, $4, NOW())
+        ON CONFLICT (question_id)
+        DO UPDATE SET draft_text = EXCLUDED.draft_text, draft_length = EXCLUDED.draft_length,
+                      status = EXCLUDED.status, updated_at = NOW()
+    """, question_id, draft_text, len(draft_text), status)
+
+
+async def get_draft_checkpoint(
+    db: asyncpg.Connection,
+    question_id: UUID
+) -> Optional[Dict[str, Any]]:
+    """Last checkpoint of a question's streamed draft"""
+    row = await db.fetchrow("""
+        SELECT draft_text, draft_length, status, updated_at
+        FROM answer_drafts
+        WHERE question_id = $1
+    """, question_id)
+    return dict(row) if row else None
@@ -0,0 +1,51 @@
+"""
+OCR CRUD operations
+"""
+
+from typing import Optional, Dict, Any, List
+import asyncpg
+from uuid import UUID
+import json
+
+
+async def get_ocr_result(
+    db: asyncpg.Connection,
+    content_hash: str
+) -> Optional[Dict[str, Any]]:
+    """Stored OCR result for an image hash"""
+    row = await db.fetchrow("""
+        SELECT extracted_text as text, skew_angle, width, height, processing_ms
+        FROM ocr_results
+        WHERE content_hash = $1
+    """, content_hash)
+    return dict(row) if row else None
+
+
+async def save_ocr_result(
+    db: asyncpg.Connection,
+    content_hash: str,
+    result: Dict[str, Any]
+) -> None:
+    """Store an OCR result (first write wins)"""
+    await db.execute("""
+        INSERT INTO ocr_results (content_hash, extracted_text, skew_angle, width, height, processing_ms)
+        VALUES ($1, $2, $3, $4, $5, $6)
+        ON CONFLICT (content_hash) DO NOTHING
+    """, content_hash, result["text"], result.get("skew_angle"), result.get("width"),
+        result.get("height"), result.get("processing_ms"))
+
+
+async def append_question_image_text(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    image_text: str,
+    images: List[Dict[str, Any]]
+) -> None:
+    """Append text read from the question's images and record per-image OCR details"""
+    await db.execute("""
+        UPDATE questions
+        SET question_text = question_text || $2,
+            metadata = jsonb_set(COALESCE(metadata, '{}'::jsonb), '{ocr}', $3::jsonb),
+            updated_at = NOW()
+        WHERE id = $1
+    """, question_id, image_text, json.dumps(images))
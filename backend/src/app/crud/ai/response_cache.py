@@ -0,0 +1,70 @@
+"""
+AI response cache CRUD operations
+Postgres tier of the provider response cache (see migration 011)
+"""
+
+from typing import Optional, Dict, Any
+import asyncpg
+
+
+async def get_cached_response(
+    db: asyncpg.Connection,
+    cache_key: str
+) -> Optional[bytes]:
+    """Compressed response for `cache_key` if present and unexpired; counts the hit"""
+    return await db.fetchval("""
+        UPDATE ai_response_cache
+        SET hit_count = hit_count + 1, last_hit_at = NOW()
+        WHERE cache_key = $1 AND expires_at > NOW()
+        RETURNING response
+    """, cache_key)
+
+
+async def save_cached_response(
+    db: asyncpg.Connection,
+    cache_key: str,
+    provider: str,
+    model: str,
+    response: bytes,
+    ttl_seconds: int
+) -> None:
+    """Store a compressed response, replacing any previous entry for the key"""
+    await db.execute("""
+        INSERT INTO ai_response_cache (cache_key, provider, model, response, size_bytes, expires_at)
+        VALUES ($1, $2, $3, $4, $5, NOW() + ($6::int * INTERVAL '1 second'))
+        ON CONFLICT (cache_key)
+        DO UPDATE SET response = EXCLUDED.response, size_bytes = EXCLUDED.size_bytes,
+                      created_at = NOW(), last_hit_at = NOW(), expires_at = EXCLUDED.expires_at
+    """, cache_key, provider, model, response, len(response), ttl_seconds)
+
+
+async def evict_cached_responses(
+    db: asyncpg.Connection,
+    max_bytes: int
+) -> int:
+    """Delete expired entries, then least recently used ones until the tier fits in `max_bytes`"""
+    expired = await db.execute("DELETE FROM ai_response_cache WHERE expires_at <= NOW()")
+    over_size = await db.execute("""
+        DELETE FROM ai_response_cache
+        WHERE cache_key IN (
+            SELECT cache_key FROM (
+                SELECT cache_key,
+                       SUM(size_bytes) OVER (ORDER BY last_hit_at DESC, cache_key) as running_bytes
+                FROM ai_response_cache
+            ) ranked
+            WHERE running_bytes > $1
+        )
+    """, max_bytes)
+    return int(expired.split()[-1]) + int(over_size.split()[-1])
+
+
+async def get_response_cache_usage(db: asyncpg.Connection) -> Dict[str, Any]:
+    """Entry count, compressed size and hits of the Postgres tier"""
+    row = await db.fetchrow("""
+        SELECT COUNT(*) as entries,
+               COALESCE(SUM(size_bytes), 0) as size_bytes,
+               COALESCE(SUM(hit_count), 0) as hits
+        FROM ai_response_cache
+        WHERE expires_at > NOW()
+    """)
+    return dict(row)
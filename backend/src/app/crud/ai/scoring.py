@@ -0,0 +1,57 @@
+"""
+Answer scoring CRUD operations
+"""
+
+from typing import List, Dict, Any, Tuple
+import asyncpg
+from uuid import UUID
+import json
+
+
+async def get_answers_for_scoring(
+    db: asyncpg.Connection,
+    answer_ids: List[UUID]
+) -> List[Dict[str, Any]]:
+    """Answer text, status and override flags for a batch of answers"""
+    rows = await db.fetch("""
+        SELECT a.id, a.question_id, a.answer_text, a.status,
+               COALESCE((a.metadata->>'originality_bypassed')::boolean, FALSE) as originality_bypassed,
+               COALESCE((q.metadata->>'ai_bypassed')::boolean, FALSE) as ai_bypassed,
+               q.client_id
+        FROM answers a
+        JOIN questions q ON q.id = a.question_id
+        WHERE a.id = ANY($1::uuid[])
+    """, answer_ids)
+    return [dict(row) for row in rows]
+
+
+async def get_unscored_answer_ids(
+    db: asyncpg.Connection,
+    limit: int = 1000
+) -> List[UUID]:
+    """Oldest answers that have not been scored yet"""
+    rows = await db.fetch("""
+        SELECT id FROM answers
+        WHERE scored_at IS NULL AND answer_text IS NOT NULL
+        ORDER BY created_at
+        LIMIT $1
+    """, limit)
+    return [row["id"] for row in rows]
+
+
+async def save_answer_scores(
+    db: asyncpg.Connection,
+    scores: List[Tuple[UUID, float, float, Dict[str, Any]]]
+) -> None:
+    """Write (answer_id, ai_content_score, originality_score, scoring metadata) for a batch"""
+    await db.executemany("""
+        UPDATE answers
+        SET ai_content_score = $2,
+            originality_score = $3,
+            scored_at = NOW(),
+            metadata = jsonb_set(COALESCE(metadata, '{}'::jsonb), '{scoring}', $4::jsonb)
+        WHERE id = $1
+    """, [
+        (answer_id, ai_content, originality, json.dumps(details))
+        for answer_id, ai_content, originality, details in scores
+    ])
@@ -88,10 +88,12 @@ async def get_dashboard_data(
     """, user_id)
     
     # Get recent answers (last 5)
-    # Note: Expert info removed since users table is in different database (qa_auth)
+    # Expert names are filled in by the service from the user directory
+    # (the users table is in a different database, qa_auth)
     recent_answers = await db.fetch("""
         SELECT 
             q.question_id,
+            q.expert_id,
             COALESCE(q.subject, 'Question') as question_text,
             COALESCE(a.humanized_response->>'text', a.ai_response->>'text', 'Answer') as answer_text,
             q.delivered_at,
@@ -110,7 +112,8 @@ async def get_dashboard_data(
             "question_id": row["question_id"],
             "question_text": row["question_text"][:100],  # Truncate
             "answer_text": row["answer_text"][:200],  # Truncate
-            "expert_name": "Expert",  # Placeholder - expert info requires cross-database query
+            "expert_id": row["expert_id"],
+            "expert_name": None,
             "delivered_at": row["delivered_at"],
             "rating": row["rating"]
         })
@@ -7,6 +7,29 @@ import asyncpg
 from uuid import UUID
 from datetime import datetime
 from typing import List
+from app.db.statements import statements
+
+
+NOTIFICATIONS_COUNT = statements.register("client.notifications_count", """
+    SELECT COUNT(*) FROM notifications
+    WHERE user_id = $1 AND ($2::boolean IS NULL OR read = $2)
+""", hot=True)
+
+UNREAD_COUNT = statements.register("client.notifications_unread_count", """
+    SELECT COUNT(*)
+    FROM notifications
+    WHERE user_id = $1 AND read = FALSE
+""", hot=True)
+
+NOTIFICATIONS = statements.register("client.notifications", """
+    SELECT 
+        id, title, message, notification_type, read,
+        created_at, action_url
+    FROM notifications
+    WHERE user_id = $1 AND ($2::boolean IS NULL OR read = $2)
+    ORDER BY created_at DESC
+    LIMIT $3 OFFSET $4
+""", hot=True)
 
 
 async def get_notifications(
@@ -18,45 +41,9 @@ async def get_notifications(
 ) -> Dict[str, Any]:
     """Get notifications for user"""
     offset = (page - 1) * page_size
-    conditions = ["user_id = $1"]
-    params = [user_id]
-    param_count = 1
-    
-    if read is not None:
-        param_count += 1
-        conditions.append(f"read = ${param_count}")
-        params.append(read)
-    
-    where_clause = " AND ".join(conditions)
-    
-    # Get total count
-    count_query = f"SELECT COUNT(*) FROM notifications WHERE {where_clause}"
-    total = await db.fetchval(count_query, *params)
-    
-    # Get unread count
-    unread_count = await db.fetchval("""
-        SELECT COUNT(*)
-        FROM notifications
-        WHERE user_id = $1 AND read = FALSE
-    """, user_id) or 0
-    
-    # Get notifications
-    param_count += 1
-    params.append(page_size)
-    param_count += 1
-    params.append(offset)
-    
-    query = f"""
-        SELECT 
-            id, title, message, notification_type, read,
-            created_at, action_url
-        FROM notifications
-        WHERE {where_clause}
-        ORDER BY created_at DESC
-        LIMIT ${param_count - 1} OFFSET ${param_count}
-    """
-    
-    rows = await db.fetch(query, *params)
+    total = await NOTIFICATIONS_COUNT.fetchval(db, user_id, read)
+    unread_count = await UNREAD_COUNT.fetchval(db, user_id) or 0
+    rows = await NOTIFICATIONS.fetch(db, user_id, read, page_size, offset)
     notifications = [dict(row) for row in rows] if rows else []
     
     return {
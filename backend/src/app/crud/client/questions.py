@@ -7,6 +7,8 @@ import asyncpg
 from uuid import UUID
 from datetime import datetime
 import json
+from app.db.statements import statements
+from app.utils.question_archive import fill_texts, question_archive
 
 
 async def submit_question(
@@ -70,13 +72,15 @@ async def get_question_status(
         SELECT 
             q.id, q.question_text, q.status, q.subject, q.priority,
             q.credits_used, q.created_at, q.delivered_at,
-            q.expert_id, q.answer_id,
+            q.expert_id, q.answer_id, q.archived_at,
             a.answer_text,
+            d.draft_text, d.status as draft_status,
             e.first_name as expert_first_name,
             e.last_name as expert_last_name,
             r.rating
         FROM questions q
         LEFT JOIN answers a ON q.answer_id = a.id
+        LEFT JOIN answer_drafts d ON d.question_id = q.id
         LEFT JOIN users e ON q.expert_id = e.id
         LEFT JOIN ratings r ON q.id = r.question_id AND r.client_id = $2
         WHERE q.id = $1 AND q.client_id = $2
@@ -89,11 +93,18 @@ async def get_question_status(
     if row["expert_first_name"] or row["expert_last_name"]:
         expert_name = f"{row['expert_first_name'] or ''} {row['expert_last_name'] or ''}".strip()
     
+    archived = await question_archive.load(db, [row["id"]]) if row["archived_at"] else {}
+    question_text, answer_text = fill_texts(
+        archived.get(row["id"]), row["answer_id"], row["question_text"], row["answer_text"]
+    )
+    
     return {
         "question_id": row["id"],
         "status": row["status"],
-        "question_text": row["question_text"],
-        "answer_text": row["answer_text"],
+        "question_text": question_text,
+        "answer_text": answer_text,
+        "draft_text": row["draft_text"],
+        "draft_status": row["draft_status"],
         "expert_id": row["expert_id"],
         "expert_name": expert_name,
         "submitted_at": row["created_at"],
@@ -103,6 +114,30 @@ async def get_question_status(
     }
 
 
+# Optional filters are part of the statement, so there is one text per query
+QUESTION_HISTORY_COUNT = statements.register("client.question_history_count", """
+    SELECT COUNT(*) FROM questions
+    WHERE client_id = $1 AND ($2::text IS NULL OR status = $2)
+""", hot=True)
+
+QUESTION_HISTORY = statements.register("client.question_history", """
+    SELECT 
+        q.id, q.question_text, q.status, q.credits_used,
+        q.created_at, q.delivered_at, q.expert_id, q.answer_id, q.archived_at,
+        a.answer_text,
+        e.first_name as expert_first_name,
+        e.last_name as expert_last_name,
+        r.rating
+    FROM questions q
+    LEFT JOIN answers a ON q.answer_id = a.id
+    LEFT JOIN users e ON q.expert_id = e.id
+    LEFT JOIN ratings r ON q.id = r.question_id AND r.client_id = $1
+    WHERE q.client_id = $1 AND ($2::text IS NULL OR q.status = $2)
+    ORDER BY q.created_at DESC
+    LIMIT $3 OFFSET $4
+""", hot=True)
+
+
 async def get_question_history(
     db: asyncpg.Connection,
     user_id: UUID,
@@ -112,45 +147,11 @@ async def get_question_history(
 ) -> Dict[str, Any]:
     """Get question history"""
     offset = (page - 1) * page_size
-    conditions = ["client_id = $1"]
-    params = [user_id]
-    param_count = 1
-    
-    if status:
-        param_count += 1
-        conditions.append(f"status = ${param_count}")
-        params.append(status)
-    
-    where_clause = " AND ".join(conditions)
-    
-    # Get total count
-    count_query = f"SELECT COUNT(*) FROM questions WHERE {where_clause}"
-    total = await db.fetchval(count_query, *params)
-    
-    # Get questions
-    param_count += 1
-    params.append(page_size)
-    param_count += 1
-    params.append(offset)
-    
-    query = f"""
-        SELECT 
-            q.id, q.question_text, q.status, q.credits_used,
-            q.created_at, q.delivered_at, q.expert_id, q.answer_id,
-            a.answer_text,
-            e.first_name as expert_first_name,
-            e.last_name as expert_last_name,
-            r.rating
-        FROM questions q
-        LEFT JOIN answers a ON q.answer_id = a.id
-        LEFT JOIN users e ON q.expert_id = e.id
-        LEFT JOIN ratings r ON q.id = r.question_id AND r.client_id = $1
-        WHERE {where_clause}
-        ORDER BY q.created_at DESC
-        LIMIT ${param_count - 1} OFFSET ${param_count}
-    """
-    
-    rows = await db.fetch(query, *params)
+    status = status or None
+    total = await QUESTION_HISTORY_COUNT.fetchval(db, user_id, status)
+    rows = await QUESTION_HISTORY.fetch(db, user_id, status, page_size, offset)
+    # Bodies of archived questions come from their bundles, one query per page
+    archived = await question_archive.load(db, [row["id"] for row in rows if row["archived_at"]])
     questions = []
     
     for row in rows:
@@ -158,11 +159,15 @@ async def get_question_history(
         if row["expert_first_name"] or row["expert_last_name"]:
             expert_name = f"{row['expert_first_name'] or ''} {row['expert_last_name'] or ''}".strip()
         
+        question_text, answer_text = fill_texts(
+            archived.get(row["id"]), row["answer_id"], row["question_text"], row["answer_text"]
+        )
+        
         questions.append({
             "question_id": row["id"],
             "status": row["status"],
-            "question_text": row["question_text"],
-            "answer_text": row["answer_text"],
+            "question_text": question_text,
+            "answer_text": answer_text,
             "expert_id": row["expert_id"],
             "expert_name": expert_name,
             "submitted_at": row["created_at"],
@@ -245,3 +250,13 @@ async def get_chat_thread(
         "expert_name": expert_name
     }
 
+
+async def question_belongs_to_client(
+    db: asyncpg.Connection,
+    question_id: UUID,
+    user_id: UUID
+) -> bool:
+    """True if the question was submitted by the client"""
+    return bool(await db.fetchval("""
+        SELECT EXISTS(SELECT 1 FROM questions WHERE id = $1 AND client_id = $2)
+    """, question_id, user_id))
@@ -0,0 +1,75 @@
+"""
+Image upload CRUD operations
+"""
+
+from typing import Optional, Dict, Any
+import asyncpg
+from uuid import UUID
+
+
+async def get_image_upload(
+    db: asyncpg.Connection,
+    sha256: str
+) -> Optional[Dict[str, Any]]:
+    """Stored image by content hash"""
+    row = await db.fetchrow("""
+        SELECT sha256, content_type, size_bytes, width, height, storage_backend,
+               storage_key, thumbnail_key, original_filename, uploaded_by, created_at
+        FROM image_uploads
+        WHERE sha256 = $1
+    """, sha256)
+    return dict(row) if row else None
+
+
+async def save_image_upload(
+    db: asyncpg.Connection,
+    upload: Dict[str, Any],
+    user_id: Optional[UUID]
+) -> Dict[str, Any]:
+    """Record a stored image; if the same bytes were recorded concurrently, that row wins"""
+    row = await db.fetchrow("""
+        INSERT INTO image_uploads
+        (sha256, content_type, size_bytes, width, height, storage_backend,
+         storage_key, thumbnail_key, original_filename, uploaded_by)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+        ON CONFLICT (sha256) DO UPDATE SET sha256 = EXCLUDED.sha256
+        RETURNING sha256, content_type, size_bytes, width, height, storage_backend,
+                  storage_key, thumbnail_key, original_filename, uploaded_by, created_at
+    """, upload["sha256"], upload["content_type"], upload["size_bytes"], upload.get("width"),
+        upload.get("height"), upload["storage_backend"], upload["storage_key"],
+        upload.get("thumbnail_key"), upload.get("original_filename"), user_id)
+    return dict(row)
+
+
+async def add_image_upload_owner(
+    db: asyncpg.Connection,
+    sha256: str,
+    user_id: UUID
+) -> None:
+    """Record that `user_id` uploaded the image"""
+    await db.execute("""
+        INSERT INTO image_upload_owners (sha256, user_id)
+        VALUES ($1, $2)
+        ON CONFLICT (sha256, user_id) DO NOTHING
+    """, sha256, user_id)
+
+
+async def can_view_image(
+    db: asyncpg.Connection,
+    sha256: str,
+    user_id: UUID
+) -> bool:
+    """True if the user uploaded the image or is the client or expert of a question referencing it"""
+    return await db.fetchval("""
+        SELECT EXISTS (
+            SELECT 1 FROM image_upload_owners
+            WHERE sha256 = $1 AND user_id = $2
+        ) OR EXISTS (
+            SELECT 1 FROM questions q
+            WHERE (q.client_id = $2 OR q.expert_id = $2)
+            AND EXISTS (
+                SELECT 1 FROM jsonb_array_elements_text(COALESCE(q.metadata->'image_urls', '[]'::jsonb)) url
+                WHERE url LIKE '%/uploads/images/' || $1
+            )
+        )
+    """, sha256, user_id)
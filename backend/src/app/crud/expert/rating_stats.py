@@ -0,0 +1,128 @@
+"""
+Expert rating statistics CRUD operations
+Reads the incremental expert_rating_stats / expert_rating_daily tables,
+which a trigger on ratings keeps up to date (see migration 006)
+"""
+
+from typing import Dict, Any, List, Optional
+import asyncpg
+from uuid import UUID
+from datetime import date, datetime, timedelta, timezone
+import math
+
+ROLLING_WINDOWS_DAYS = (7, 30, 90)
+
+
+def window_start(days: int, today: Optional[date] = None) -> date:
+    """First UTC day of the rolling `days`-day window: today and the days-1 before it"""
+    today = today or datetime.now(timezone.utc).date()
+    return today - timedelta(days=days - 1)
+
+
+def _summarize(count: int, total: int, total_squares: int) -> Dict[str, Any]:
+    """Average and standard deviation from count / sum / sum of squares"""
+    if not count:
+        return {"average_rating": 0.0, "rating_stddev": None}
+    average = total / count
+    variance = max(total_squares / count - average * average, 0.0)
+    return {"average_rating": average, "rating_stddev": math.sqrt(variance)}
+
+
+async def get_rating_stats(
+    db: asyncpg.Connection,
+    expert_id: UUID
+) -> Dict[str, Any]:
+    """Get lifetime rating count, average, stddev and 1-5 histogram for an expert"""
+    row = await db.fetchrow("""
+        SELECT
+            rating_count, rating_sum, rating_sum_squares,
+            count_1, count_2, count_3, count_4, count_5
+        FROM expert_rating_stats
+        WHERE expert_id = $1
+    """, expert_id)
+    
+    if not row:
+        return {
+            "total_ratings": 0,
+            "average_rating": 0.0,
+            "rating_stddev": None,
+            "rating_distribution": {}
+        }
+    
+    stats = _summarize(row["rating_count"], row["rating_sum"], row["rating_sum_squares"])
+    stats["total_ratings"] = row["rating_count"]
+    stats["rating_distribution"] = {
+        score: row[f"count_{score}"]
+        for score in range(5, 0, -1)
+        if row[f"count_{score}"]
+    }
+    return stats
+
+
+async def get_daily_rating_stats(
+    db: asyncpg.Connection,
+    expert_id: UUID,
+    days: int = 30
+) -> List[Dict[str, Any]]:
+    """Get per-day rating count and average for the last `days` days"""
+    rows = await db.fetch("""
+        SELECT day as date, rating_count as count, rating_sum
+        FROM expert_rating_daily
+        WHERE expert_id = $1
+        AND day >= (NOW() AT TIME ZONE 'UTC')::date - $2::int
+        AND rating_count > 0
+        ORDER BY day ASC
+    """, expert_id, days)
+    
+    return [
+        {
+            "date": row["date"],
+            "avg_score": row["rating_sum"] / row["count"],
+            "count": row["count"]
+        }
+        for row in rows
+    ]
+
+
+async def get_rating_window(
+    db: asyncpg.Connection,
+    expert_id: UUID,
+    since: Optional[date] = None
+) -> Dict[str, Any]:
+    """Get rating count and average for ratings on or after `since` (UTC day); None means all time"""
+    if since is None:
+        stats = await get_rating_stats(db, expert_id)
+        return {"count": stats["total_ratings"], "average_rating": stats["average_rating"] or None}
+    
+    row = await db.fetchrow("""
+        SELECT COALESCE(SUM(rating_count), 0) as count, COALESCE(SUM(rating_sum), 0) as total
+        FROM expert_rating_daily
+        WHERE expert_id = $1 AND day >= $2
+    """, expert_id, since)
+    
+    count = row["count"] if row else 0
+    return {
+        "count": count,
+        "average_rating": row["total"] / count if count else None
+    }
+
+
+async def get_rolling_averages(
+    db: asyncpg.Connection,
+    expert_id: UUID
+) -> Dict[str, Optional[float]]:
+    """Get average rating over each rolling window, keyed like '7d'"""
+    longest = max(ROLLING_WINDOWS_DAYS)
+    rows = await db.fetch("""
+        SELECT (NOW() AT TIME ZONE 'UTC')::date - day as age, rating_count, rating_sum
+        FROM expert_rating_daily
+        WHERE expert_id = $1
+        AND day >= $2::date
+    """, expert_id, window_start(longest))
+    
+    averages = {}
+    for window in ROLLING_WINDOWS_DAYS:
+        count = sum(row["rating_count"] for row in rows if row["age"] < window)
+        total = sum(row["rating_sum"] for row in rows if row["age"] < window)
+        averages[f"{window}d"] = total / count if count else None
+    return averages
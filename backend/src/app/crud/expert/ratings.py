@@ -6,6 +6,25 @@ from typing import Dict, Any, List
 import asyncpg
 from uuid import UUID
 from datetime import datetime, timedelta
+from app.crud.expert import rating_stats as stats_crud
+from app.utils.question_archive import fill, fill_texts, question_archive
+
+
+async def _fill_archived(db: asyncpg.Connection, rows: List[asyncpg.Record]) -> List[Dict[str, Any]]:
+    """Rating rows, with the bodies of archived questions filled from their bundles"""
+    rows = [dict(row) for row in rows]
+    archived = await question_archive.load(db, [row["question_id"] for row in rows if row["archived_at"]])
+    for row in rows:
+        bundle = archived.get(row["question_id"])
+        if not bundle:
+            continue
+        row["question_text"], row["answer_text"] = fill_texts(
+            bundle, row["answer_id"], row["question_text"], row["answer_text"]
+        )
+        for rating in bundle.get("ratings") or []:
+            if rating.get("id") == str(row["rating_id"]):
+                row["comment"] = fill(row["comment"], rating.get("comment"))
+    return rows
 
 
 async def get_expert_ratings(
@@ -17,12 +36,9 @@ async def get_expert_ratings(
     """Get expert ratings"""
     offset = (page - 1) * page_size
     
-    # Get total count
+    # Get total count (from the incremental stats row, not a ratings scan)
     total = await db.fetchval("""
-        SELECT COUNT(*)
-        FROM ratings r
-        JOIN questions q ON r.question_id = q.id
-        WHERE q.expert_id = $1
+        SELECT rating_count FROM expert_rating_stats WHERE expert_id = $1
     """, expert_id) or 0
     
     # Get ratings
@@ -31,6 +47,8 @@ async def get_expert_ratings(
             r.id as rating_id,
             r.question_id,
             q.question_text,
+            q.answer_id,
+            q.archived_at,
             a.answer_text,
             r.score,
             r.comment,
@@ -45,6 +63,7 @@ async def get_expert_ratings(
         ORDER BY r.created_at DESC
         LIMIT $2 OFFSET $3
     """, expert_id, page_size, offset)
+    rows = await _fill_archived(db, rows)
     
     ratings = []
     for row in rows:
@@ -76,35 +95,8 @@ async def get_expert_rating_stats(
     expert_id: UUID
 ) -> Dict[str, Any]:
     """Get expert rating statistics"""
-    # Average rating
-    avg_rating = await db.fetchval("""
-        SELECT AVG(r.score)
-        FROM ratings r
-        JOIN questions q ON r.question_id = q.id
-        WHERE q.expert_id = $1
-    """, expert_id)
-    
-    # Total ratings
-    total_ratings = await db.fetchval("""
-        SELECT COUNT(*)
-        FROM ratings r
-        JOIN questions q ON r.question_id = q.id
-        WHERE q.expert_id = $1
-    """, expert_id) or 0
-    
-    # Rating distribution
-    distribution = await db.fetch("""
-        SELECT 
-            r.score,
-            COUNT(*) as count
-        FROM ratings r
-        JOIN questions q ON r.question_id = q.id
-        WHERE q.expert_id = $1
-        GROUP BY r.score
-        ORDER BY r.score DESC
-    """, expert_id)
-    
-    rating_distribution = {row["score"]: row["count"] for row in distribution}
+    # Count, average, stddev and distribution in one indexed lookup
+    stats = await stats_crud.get_rating_stats(db, expert_id)
     
     # Recent ratings (last 10)
     recent_ratings = await db.fetch("""
@@ -112,6 +104,8 @@ async def get_expert_rating_stats(
             r.id as rating_id,
             r.question_id,
             q.question_text,
+            q.answer_id,
+            q.archived_at,
             a.answer_text,
             r.score,
             r.comment,
@@ -126,6 +120,7 @@ async def get_expert_rating_stats(
         ORDER BY r.created_at DESC
         LIMIT 10
     """, expert_id)
+    recent_ratings = await _fill_archived(db, recent_ratings)
     
     recent_list = []
     for row in recent_ratings:
@@ -144,26 +139,17 @@ async def get_expert_rating_stats(
             "created_at": row["created_at"]
         })
     
-    # Rating trend (last 30 days)
-    rating_trend = await db.fetch("""
-        SELECT 
-            DATE(r.created_at) as date,
-            AVG(r.score) as avg_score,
-            COUNT(*) as count
-        FROM ratings r
-        JOIN questions q ON r.question_id = q.id
-        WHERE q.expert_id = $1
-        AND r.created_at >= CURRENT_DATE - INTERVAL '30 days'
-        GROUP BY DATE(r.created_at)
-        ORDER BY date ASC
-    """, expert_id)
+    # Rating trend (last 30 days) and rolling averages from daily buckets
+    rating_trend = await stats_crud.get_daily_rating_stats(db, expert_id, 30)
+    rolling_averages = await stats_crud.get_rolling_averages(db, expert_id)
     
     return {
         "expert_id": expert_id,
-        "average_rating": float(avg_rating) if avg_rating else 0.0,
-        "total_ratings": total_ratings,
-        "rating_distribution": rating_distribution,
+        "average_rating": stats["average_rating"],
+        "rating_stddev": stats["rating_stddev"],
+        "total_ratings": stats["total_ratings"],
+        "rating_distribution": stats["rating_distribution"],
+        "rolling_averages": rolling_averages,
         "recent_ratings": recent_list,
-        "rating_trend": [dict(row) for row in rating_trend]
+        "rating_trend": rating_trend
     }
-
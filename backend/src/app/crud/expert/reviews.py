@@ -7,6 +7,7 @@ import asyncpg
 from uuid import UUID
 from datetime import datetime
 import json
+from app.db.statements import statements
 
 
 async def submit_review(
@@ -56,6 +57,7 @@ async def submit_review(
     """, "approved" if is_approved else "rejected", answer_id)
     
     # Calculate earnings (simplified: $5 per approved review)
+    earnings_amount = 0.0
     if is_approved:
         earnings_amount = 5.0
         await db.execute("""
@@ -73,10 +75,39 @@ async def submit_review(
         "answer_id": answer_id,
         "question_id": question_id,
         "status": "approved" if is_approved else "rejected",
-        "is_approved": is_approved
+        "is_approved": is_approved,
+        "earnings": earnings_amount
     }
 
 
+REVIEWS_COUNT = statements.register("expert.reviews_count", """
+    SELECT COUNT(*) FROM expert_reviews er
+    WHERE er.expert_id = $1 AND ($2::text IS NULL OR er.review_status = $2)
+""", hot=True)
+
+REVIEWS = statements.register("expert.reviews", """
+    SELECT 
+        er.id as review_id,
+        er.answer_id,
+        er.question_id,
+        q.question_text,
+        a.answer_text,
+        er.is_approved,
+        er.rejection_reason,
+        er.corrections,
+        er.review_notes,
+        er.review_time_seconds,
+        er.created_at,
+        er.completed_at
+    FROM expert_reviews er
+    JOIN questions q ON er.question_id = q.id
+    LEFT JOIN answers a ON er.answer_id = a.id
+    WHERE er.expert_id = $1 AND ($2::text IS NULL OR er.review_status = $2)
+    ORDER BY er.created_at DESC
+    LIMIT $3 OFFSET $4
+""", hot=True)
+
+
 async def get_expert_reviews(
     db: asyncpg.Connection,
     expert_id: UUID,
@@ -86,50 +117,9 @@ async def get_expert_reviews(
 ) -> Dict[str, Any]:
     """Get expert reviews"""
     offset = (page - 1) * page_size
-    conditions = ["er.expert_id = $1"]
-    params = [expert_id]
-    param_count = 1
-    
-    if status:
-        param_count += 1
-        conditions.append(f"er.review_status = ${param_count}")
-        params.append(status)
-    
-    where_clause = " AND ".join(conditions)
-    
-    # Get total count
-    count_query = f"SELECT COUNT(*) FROM expert_reviews er WHERE {where_clause}"
-    total = await db.fetchval(count_query, *params)
-    
-    # Get reviews
-    param_count += 1
-    params.append(page_size)
-    param_count += 1
-    params.append(offset)
-    
-    query = f"""
-        SELECT 
-            er.id as review_id,
-            er.answer_id,
-            er.question_id,
-            q.question_text,
-            a.answer_text,
-            er.is_approved,
-            er.rejection_reason,
-            er.corrections,
-            er.review_notes,
-            er.review_time_seconds,
-            er.created_at,
-            er.completed_at
-        FROM expert_reviews er
-        JOIN questions q ON er.question_id = q.id
-        LEFT JOIN answers a ON er.answer_id = a.id
-        WHERE {where_clause}
-        ORDER BY er.created_at DESC
-        LIMIT ${param_count - 1} OFFSET ${param_count}
-    """
-    
-    rows = await db.fetch(query, *params)
+    status = status or None
+    total = await REVIEWS_COUNT.fetchval(db, expert_id, status)
+    rows = await REVIEWS.fetch(db, expert_id, status, page_size, offset)
     reviews = []
     
     for row in rows:
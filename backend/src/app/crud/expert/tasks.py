@@ -6,6 +6,58 @@ from typing import Optional, List, Dict, Any
 import asyncpg
 from uuid import UUID
 from datetime import datetime
+from app.db.statements import statements
+
+
+# Without a status filter, the open statuses
+_TASK_FILTER = """
+    q.expert_id = $1
+    AND (
+        ($2::text IS NULL AND q.status IN ('pending', 'in_progress', 'reviewed'))
+        OR q.status = $2
+    )
+"""
+
+TASKS_COUNT = statements.register("expert.tasks_count", f"""
+    SELECT COUNT(*) FROM questions q WHERE {_TASK_FILTER}
+""", hot=True)
+
+TASK_STATUS_COUNTS = statements.register("expert.task_status_counts", """
+    SELECT
+        COUNT(*) FILTER (WHERE status = 'pending') as pending_count,
+        COUNT(*) FILTER (WHERE status = 'in_progress') as in_progress_count
+    FROM questions
+    WHERE expert_id = $1 AND status IN ('pending', 'in_progress')
+""", hot=True)
+
+TASKS = statements.register("expert.tasks", f"""
+    SELECT 
+        q.id as task_id,
+        q.id as question_id,
+        q.question_text,
+        a.answer_text,
+        q.status,
+        q.priority,
+        q.created_at as assigned_at,
+        q.metadata,
+        c.first_name as client_first_name,
+        c.last_name as client_last_name,
+        q.subject
+    FROM questions q
+    LEFT JOIN answers a ON q.answer_id = a.id
+    LEFT JOIN users c ON q.client_id = c.id
+    WHERE {_TASK_FILTER}
+    ORDER BY 
+        CASE q.priority
+            WHEN 'urgent' THEN 1
+            WHEN 'high' THEN 2
+            WHEN 'normal' THEN 3
+            WHEN 'low' THEN 4
+            ELSE 5
+        END,
+        q.created_at ASC
+    LIMIT $3 OFFSET $4
+""", hot=True)
 
 
 async def get_expert_tasks(
@@ -15,76 +67,14 @@ async def get_expert_tasks(
     page: int = 1,
     page_size: int = 50
 ) -> Dict[str, Any]:
-    """Get expert tasks"""
+    """Get expert tasks (pending, in progress and reviewed unless a status is given)"""
     offset = (page - 1) * page_size
-    conditions = ["expert_id = $1"]
-    params = [expert_id]
-    param_count = 1
-    
-    if status:
-        param_count += 1
-        conditions.append(f"status = ${param_count}")
-        params.append(status)
-    else:
-        # Default to pending and in_progress
-        param_count += 1
-        conditions.append(f"status IN ('pending', 'in_progress', 'reviewed')")
-    
-    where_clause = " AND ".join(conditions)
-    
-    # Get total count
-    count_query = f"SELECT COUNT(*) FROM questions WHERE {where_clause}"
-    total = await db.fetchval(count_query, *params)
-    
-    # Get pending and in_progress counts
-    pending_count = await db.fetchval("""
-        SELECT COUNT(*)
-        FROM questions
-        WHERE expert_id = $1 AND status = 'pending'
-    """, expert_id) or 0
-    
-    in_progress_count = await db.fetchval("""
-        SELECT COUNT(*)
-        FROM questions
-        WHERE expert_id = $1 AND status = 'in_progress'
-    """, expert_id) or 0
-    
-    # Get tasks
-    param_count += 1
-    params.append(page_size)
-    param_count += 1
-    params.append(offset)
-    
-    query = f"""
-        SELECT 
-            q.id as task_id,
-            q.id as question_id,
-            q.question_text,
-            a.answer_text,
-            q.status,
-            q.priority,
-            q.created_at as assigned_at,
-            q.metadata,
-            c.first_name as client_first_name,
-            c.last_name as client_last_name,
-            q.subject
-        FROM questions q
-        LEFT JOIN answers a ON q.answer_id = a.id
-        LEFT JOIN users c ON q.client_id = c.id
-        WHERE {where_clause}
-        ORDER BY 
-            CASE q.priority
-                WHEN 'urgent' THEN 1
-                WHEN 'high' THEN 2
-                WHEN 'normal' THEN 3
-                WHEN 'low' THEN 4
-                ELSE 5
-            END,
-            q.created_at ASC
-        LIMIT ${param_count - 1} OFFSET ${param_count}
-    """
-    
-    rows = await db.fetch(query, *params)
+    status = status or None
+    total = await TASKS_COUNT.fetchval(db, expert_id, status)
+    counts = await TASK_STATUS_COUNTS.fetchrow(db, expert_id)
+    pending_count = counts["pending_count"] or 0
+    in_progress_count = counts["in_progress_count"] or 0
+    rows = await TASKS.fetch(db, expert_id, status, page_size, offset)
     tasks = []
     
     for row in rows:
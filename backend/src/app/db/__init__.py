@@ -3,7 +3,7 @@ Database module
 Connection management, sessions, and database utilities
 """
 
-from .session import Database, db, get_db, get_auth_db, get_redis
+from .session import Database, db, get_db, get_read_db, get_auth_db, get_redis
 
-__all__ = ['Database', 'db', 'get_db', 'get_auth_db', 'get_redis']
+__all__ = ['Database', 'db', 'get_db', 'get_read_db', 'get_auth_db', 'get_redis']
 
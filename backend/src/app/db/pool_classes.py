@@ -0,0 +1,223 @@
+"""
+Connection pool classes
+Every route class gets a bounded share of the main pool, so one class cannot
+take every connection: a burst of admin exports or a background rebuild
+waits for its own slots while client requests keep getting connections.
+
+    interactive  client, auth and other public routes
+    expert       /api/v1/expert
+    reporting    /api/v1/admin (dashboards, stats, exports)
+    background   maintenance loops and AI workers
+
+The non-interactive limits together stay DB_POOL_INTERACTIVE_RESERVED below
+DB_POOL_MAX_SIZE (they are scaled down at startup if configured higher), so
+interactive requests always have connections the other classes cannot hold.
+
+Each class records how long acquisitions wait and how many slots are in use.
+With DB_POOL_ADAPTIVE on, the reporting and background limits are halved
+while interactive waits run above DB_POOL_INTERACTIVE_WAIT_TARGET_MS and
+grow back one slot at a time once they recover.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ROUTE_CLASSES = ("interactive", "expert", "reporting", "background")
+SHARED_CLASSES = ("expert", "reporting", "background")
+SHEDDABLE_CLASSES = ("reporting", "background")
+RECENT_WAITS = 1000
+
+
+class PoolBusyError(Exception):
+    """No connection could be had within DB_POOL_ACQUIRE_TIMEOUT_SECONDS"""
+
+
+def route_class(path: str) -> str:
+    """Route class of a request path"""
+    if path.startswith("/api/v1/admin"):
+        return "reporting"
+    if path.startswith("/api/v1/expert"):
+        return "expert"
+    return "interactive"
+
+
+def shared_limits() -> Dict[str, int]:
+    """Non-interactive class limits, scaled to leave the interactive reserve free"""
+    limits = {
+        "expert": max(1, settings.db_pool_expert_limit),
+        "reporting": max(1, settings.db_pool_reporting_limit),
+        "background": max(1, settings.db_pool_background_limit),
+    }
+    budget = max(len(limits), settings.db_pool_max_size - settings.db_pool_interactive_reserved)
+    total = sum(limits.values())
+    if total <= budget:
+        return limits
+    scaled = {name: max(1, limit * budget // total) for name, limit in limits.items()}
+    logger.warning(
+        f"Pool class limits {limits} exceed DB_POOL_MAX_SIZE minus the interactive "
+        f"reserve ({budget}); using {scaled}"
+    )
+    return scaled
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class PoolClass:
+    """Connection slots of one route class, with an adjustable limit"""
+    
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.max_limit = max(1, limit)
+        self.limit = self.max_limit
+        self.in_use = 0
+        self.peak = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent: Deque[float] = deque(maxlen=RECENT_WAITS)
+        self._window: List[float] = []  # waits since the last adaptive tick
+        self._cond = asyncio.Condition()
+    
+    async def enter(self, timeout: Optional[float]) -> None:
+        """Take a slot, waiting up to `timeout` seconds (asyncio.TimeoutError past it)"""
+        async with self._cond:
+            if self.in_use >= self.limit:
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(lambda: self.in_use < self.limit), timeout
+                    )
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    raise
+                finally:
+                    self.waiting -= 1
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+    
+    async def leave(self) -> None:
+        async with self._cond:
+            self.in_use -= 1
+            self._cond.notify()
+    
+    def record_wait(self, seconds: float) -> None:
+        """Time from asking for a connection to holding one (slot and pool)"""
+        self.acquired += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self._recent.append(seconds)
+        self._window.append(seconds)
+    
+    async def set_limit(self, limit: int) -> None:
+        async with self._cond:
+            self.limit = max(1, min(self.max_limit, limit))
+            self._cond.notify_all()
+    
+    def take_window(self) -> List[float]:
+        window, self._window = self._window, []
+        return window
+    
+    def stats(self) -> Dict[str, Any]:
+        recent = list(self._recent)
+        return {
+            "limit": self.limit,
+            "max_limit": self.max_limit,
+            "in_use": self.in_use,
+            "peak": self.peak,
+            "waiting": self.waiting,
+            "utilization": round(self.in_use / self.limit, 3),
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.wait_total / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "p95_wait_ms": round(_percentile(recent, 0.95) * 1000, 2),
+            "max_wait_ms": round(self.wait_max * 1000, 2)
+        }
+
+
+class PoolClasses:
+    """The route classes sharing the main pool, and their adaptive limits"""
+    
+    def __init__(self):
+        self.classes: Dict[str, PoolClass] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.configure()
+    
+    def configure(self) -> None:
+        """(Re)create the classes from settings"""
+        self.classes = {"interactive": PoolClass("interactive", settings.db_pool_interactive_limit)}
+        for name, limit in shared_limits().items():
+            self.classes[name] = PoolClass(name, limit)
+    
+    def get(self, name: str) -> PoolClass:
+        return self.classes.get(name) or self.classes["interactive"]
+    
+    async def adapt(self) -> None:
+        """
+        One adaptive step: shed reporting and background slots while
+        interactive waits are over target, add them back once they are well under
+        """
+        window = self.classes["interactive"].take_window()
+        for name in SHEDDABLE_CLASSES:
+            self.classes[name].take_window()
+        target = settings.db_pool_interactive_wait_target_ms / 1000
+        p95 = _percentile(window, 0.95)
+        for name in SHEDDABLE_CLASSES:
+            pool_class = self.classes[name]
+            if p95 > target:
+                limit = pool_class.limit // 2
+            elif p95 < target / 2:
+                limit = pool_class.limit + 1
+            else:
+                continue
+            limit = max(1, min(pool_class.max_limit, limit))
+            if limit != pool_class.limit:
+                logger.info(
+                    f"Pool class {name} limit {pool_class.limit} -> {limit} "
+                    f"(interactive p95 wait {p95 * 1000:.1f}ms)"
+                )
+                await pool_class.set_limit(limit)
+    
+    async def _adapt_loop(self):
+        while True:
+            await asyncio.sleep(settings.db_pool_adapt_interval_seconds)
+            try:
+                await self.adapt()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pool class adaptation failed: {e}")
+    
+    def start(self):
+        """Start adaptive resizing (when DB_POOL_ADAPTIVE is on)"""
+        if self._task is None and settings.db_pool_adaptive:
+            self._task = asyncio.create_task(self._adapt_loop())
+            logger.info("Adaptive pool class limits enabled")
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool_class.stats() for name, pool_class in self.classes.items()}
+
+
+# Global pool classes instance
+pool_classes = PoolClasses()
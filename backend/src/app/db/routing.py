@@ -0,0 +1,97 @@
+"""
+Read-your-writes routing
+A user who has just written (any successful non-GET request) has their
+reads pinned to the primary for DB_READ_YOUR_WRITES_SECONDS, so a replica
+that has not caught up yet never hides their own change. Pins are kept per
+worker and shared through Redis.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+from app.db.session import db
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_KEY_PREFIX = "db:pin:"
+MAX_LOCAL_PINS = 10000
+
+# user id -> monotonic time the pin ends
+_pins: "OrderedDict[str, float]" = OrderedDict()
+
+
+def session_identity(scope) -> Optional[str]:
+    """User id of the request's bearer token, or None"""
+    from app.core.tokens import token_verifier
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            # Cached after the first request, so usually a dict lookup
+            claims = token_verifier.decode(token)
+            return (claims.get("user_id") or claims.get("sub")) if claims else None
+    return None
+
+
+async def pin_to_primary(identity: str) -> None:
+    """Route the user's reads to the primary for the read-your-writes window"""
+    from app.utils.cache import cache
+    seconds = settings.db_read_your_writes_seconds
+    _pins[identity] = time.monotonic() + seconds
+    _pins.move_to_end(identity)
+    while len(_pins) > MAX_LOCAL_PINS:
+        _pins.popitem(last=False)
+    if cache.client:
+        try:
+            await cache.client.set(PIN_KEY_PREFIX + identity, "1", ex=seconds)
+        except Exception as e:
+            logger.error(f"Read-your-writes pin could not be shared: {e}")
+
+
+async def is_pinned_to_primary(scope) -> bool:
+    """Whether this request's reads must go to the primary"""
+    if not db.has_replicas or settings.db_read_your_writes_seconds <= 0:
+        return False
+    identity = session_identity(scope)
+    if identity is None:
+        return False
+    until = _pins.get(identity)
+    if until is not None:
+        if until > time.monotonic():
+            return True
+        _pins.pop(identity, None)
+    from app.utils.cache import cache
+    if cache.client:
+        try:
+            return bool(await cache.client.exists(PIN_KEY_PREFIX + identity))
+        except Exception as e:
+            logger.error(f"Read-your-writes pin lookup failed: {e}")
+            return True
+    return False
+
+
+class ReadYourWritesMiddleware:
+    """Pins a user's reads to the primary after each of their successful writes"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] in SAFE_METHODS
+                or not db.has_replicas):
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_and_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                identity = session_identity(scope)
+                if identity:
+                    await pin_to_primary(identity)
+            await send(message)
+        
+        await self.app(scope, receive, send_and_pin)
@@ -1,16 +1,43 @@
 """
 Database session management
-PostgreSQL connection pools and Redis client
+PostgreSQL connection pools and Redis client.
+Optional read replicas of the main database serve read-only endpoints
+(get_read_db); a replica is used only while its replication lag is within
+DB_REPLICA_MAX_LAG_SECONDS, otherwise reads fall back to the primary.
+Main-pool connections are handed out per route class (see pool_classes), so
+reporting and background work cannot starve client requests.
+With DB_PGBOUNCER_MODE the URLs point at a transaction pooler: pools start
+empty and open connections on demand, statements are not prepared by name,
+and LISTEN uses the direct URLs (or is skipped).
 """
 
+import asyncio
 import asyncpg
 import redis
-from typing import AsyncGenerator
+import time
+from contextlib import asynccontextmanager
+from fastapi import HTTPException, Request, status
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional
 from app.core.config import settings
+from app.db.pool_classes import PoolBusyError, pool_classes, route_class
+from app.db.statements import RegistryConnection, statement_cache_size, statements
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Seconds a replica is behind the primary (0 when fully replayed or not a standby)
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def parse_replica_urls(spec: str) -> List[str]:
+    return [url.strip() for url in spec.split(",") if url.strip()]
+
 
 class Database:
     """Database connection manager"""
@@ -19,28 +46,71 @@ class Database:
         self.pool = None
         self.auth_pool = None
         self.redis_client = None
+        self.replica_urls: List[str] = []
+        self.replica_pools: List[Optional[asyncpg.Pool]] = []
+        self.replica_lag: List[Optional[float]] = []  # None until checked or while unreachable
+        self._next_replica = 0
+        self._replica_task: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def _statement_options() -> dict:
+        """Pool options for the main database and its replicas (see app.db.statements)"""
+        return {
+            "connection_class": RegistryConnection,
+            "init": statements.init_connection,
+            "statement_cache_size": statement_cache_size(),
+            "max_cached_statement_lifetime": settings.db_max_cached_statement_lifetime
+        }
+    
+    @staticmethod
+    def _min_size(size: int) -> int:
+        """Connections opened up front (none in PgBouncer mode - the pooler holds the warm ones)"""
+        return 0 if settings.db_pgbouncer_mode else size
+    
+    @staticmethod
+    def listen_url(auth: bool = False) -> Optional[str]:
+        """
+        URL for a dedicated LISTEN connection. LISTEN is session state, so
+        in PgBouncer mode only a direct URL will do (None when not set).
+        """
+        if settings.db_pgbouncer_mode:
+            return (settings.auth_database_direct_url if auth else settings.database_direct_url) or None
+        return settings.auth_database_url if auth else settings.database_url
     
     async def connect(self):
         """Initialize database connection pool and Redis client"""
         try:
-            # Main PostgreSQL connection pool
+            # Main PostgreSQL connection pool, shared out per route class
             self.pool = await asyncpg.create_pool(
                 settings.database_url,
-                min_size=5,
-                max_size=20,
-                command_timeout=60
+                min_size=self._min_size(settings.db_pool_min_size),
+                max_size=settings.db_pool_max_size,
+                command_timeout=settings.db_command_timeout_seconds,
+                **self._statement_options()
             )
+            pool_classes.configure()
             logger.info("Main database connection pool created")
             
             # Auth database connection pool
             self.auth_pool = await asyncpg.create_pool(
                 settings.auth_database_url,
-                min_size=2,
-                max_size=10,
-                command_timeout=60
+                min_size=self._min_size(settings.auth_db_pool_min_size),
+                max_size=settings.auth_db_pool_max_size,
+                command_timeout=settings.db_command_timeout_seconds,
+                connection_class=RegistryConnection,
+                statement_cache_size=statement_cache_size(),
+                max_cached_statement_lifetime=settings.db_max_cached_statement_lifetime
             )
             logger.info("Auth database connection pool created")
             
+            # Read replica pools (optional - reads fall back to the primary)
+            self.replica_urls = parse_replica_urls(settings.database_replica_urls)
+            self.replica_pools = [None] * len(self.replica_urls)
+            self.replica_lag = [None] * len(self.replica_urls)
+            if self.replica_urls:
+                await self._check_replicas()
+                self._replica_task = asyncio.create_task(self._monitor_replicas())
+            
             # Redis client (optional - server can run without it)
             try:
                 self.redis_client = redis.from_url(
@@ -61,6 +131,18 @@ class Database:
     
     async def disconnect(self):
         """Close database connections"""
+        if self._replica_task:
+            self._replica_task.cancel()
+            try:
+                await self._replica_task
+            except asyncio.CancelledError:
+                pass
+            self._replica_task = None
+        for replica in self.replica_pools:
+            if replica:
+                await replica.close()
+        self.replica_pools = []
+        self.replica_lag = []
         if self.pool:
             await self.pool.close()
             logger.info("Main database pool closed")
@@ -72,11 +154,101 @@ class Database:
             logger.info("Redis connection closed")
         logger.info("All database connections closed")
     
-    async def get_connection(self) -> AsyncGenerator[asyncpg.Connection, None]:
+    @asynccontextmanager
+    async def acquire(self, route: str = "background", pool=None) -> AsyncIterator[asyncpg.Connection]:
+        """
+        A connection from `pool` (the main pool by default). Main-pool
+        connections count against the route class's limit; waiting past
+        DB_POOL_ACQUIRE_TIMEOUT_SECONDS raises PoolBusyError.
+        """
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized. Call connect() first.")
+        pool = pool or self.pool
+        if pool is not self.pool:
+            async with pool.acquire() as connection:
+                yield connection
+            return
+        
+        pool_class = pool_classes.get(route)
+        timeout = settings.db_pool_acquire_timeout_seconds
+        started = time.perf_counter()
+        try:
+            await pool_class.enter(timeout)
+        except asyncio.TimeoutError:
+            raise PoolBusyError(f"No {route} connection slot within {timeout}s")
+        try:
+            remaining = max(0.001, timeout - (time.perf_counter() - started))
+            try:
+                connection = await pool.acquire(timeout=remaining)
+            except asyncio.TimeoutError:
+                pool_class.timeouts += 1
+                raise PoolBusyError(f"No {route} connection within {timeout}s")
+            pool_class.record_wait(time.perf_counter() - started)
+            try:
+                yield connection
+            finally:
+                await pool.release(connection)
+        finally:
+            await pool_class.leave()
+    
+    async def get_connection(self, route: str = "interactive") -> AsyncGenerator[asyncpg.Connection, None]:
         """Get a database connection from the main pool"""
+        async with self.acquire(route) as connection:
+            yield connection
+    
+    async def _check_replicas(self) -> None:
+        """Measure each replica's lag, creating pools for replicas that were unreachable"""
+        for index, url in enumerate(self.replica_urls):
+            try:
+                if self.replica_pools[index] is None:
+                    self.replica_pools[index] = await asyncpg.create_pool(
+                        url,
+                        min_size=self._min_size(1),
+                        max_size=settings.db_replica_pool_max_size,
+                        command_timeout=settings.db_command_timeout_seconds,
+                        **self._statement_options()
+                    )
+                    logger.info(f"Read replica {index} connection pool created")
+                async with self.replica_pools[index].acquire(timeout=5) as conn:
+                    self.replica_lag[index] = float(await conn.fetchval(REPLICA_LAG_QUERY, timeout=5))
+            except Exception as e:
+                if self.replica_lag[index] is not None:
+                    logger.warning(f"Read replica {index} unavailable: {e}")
+                self.replica_lag[index] = None
+    
+    async def _monitor_replicas(self):
+        while True:
+            await asyncio.sleep(settings.db_replica_check_seconds)
+            try:
+                await self._check_replicas()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Read replica check failed: {e}")
+    
+    @property
+    def has_replicas(self) -> bool:
+        return any(replica is not None for replica in self.replica_pools)
+    
+    def read_pool(self):
+        """A replica pool within the lag limit (round robin), else the primary pool"""
+        healthy = [
+            replica for replica, lag in zip(self.replica_pools, self.replica_lag)
+            if replica is not None and lag is not None and lag <= settings.db_replica_max_lag_seconds
+        ]
+        if not healthy:
+            return self.pool
+        self._next_replica = (self._next_replica + 1) % len(healthy)
+        return healthy[self._next_replica]
+    
+    async def get_read_connection(
+        self, primary: bool = False, route: str = "interactive"
+    ) -> AsyncGenerator[asyncpg.Connection, None]:
+        """Get a connection for read-only queries (a replica unless `primary`)"""
         if not self.pool:
             raise RuntimeError("Database pool not initialized. Call connect() first.")
-        async with self.pool.acquire() as connection:
+        pool = self.pool if primary else self.read_pool()
+        async with self.acquire(route, pool) as connection:
             yield connection
     
     async def get_auth_connection(self) -> AsyncGenerator[asyncpg.Connection, None]:
@@ -86,6 +258,25 @@ class Database:
         async with self.auth_pool.acquire() as connection:
             yield connection
     
+    def pool_stats(self) -> Dict[str, object]:
+        """Pool sizes and per-route-class utilization and wait times"""
+        stats: Dict[str, object] = {"route_classes": pool_classes.stats()}
+        for name, pool in (("main", self.pool), ("auth", self.auth_pool)):
+            if pool is not None:
+                stats[name] = {
+                    "size": pool.get_size(),
+                    "idle": pool.get_idle_size(),
+                    "max_size": pool.get_max_size()
+                }
+        for index, replica in enumerate(self.replica_pools):
+            if replica is not None:
+                stats[f"replica_{index}"] = {
+                    "size": replica.get_size(),
+                    "idle": replica.get_idle_size(),
+                    "max_size": replica.get_max_size()
+                }
+        return stats
+    
     def get_redis(self) -> redis.Redis:
         """Get Redis client (returns None if Redis is not available)"""
         return self.redis_client  # Can be None if Redis is not available
@@ -114,6 +305,15 @@ class Database:
         except Exception as e:
             health_status["auth_postgresql"] = f"unhealthy: {str(e)}"
         
+        # Read replicas (lag in seconds)
+        for index, lag in enumerate(self.replica_lag):
+            if lag is None:
+                health_status[f"replica_{index}"] = "unhealthy: unreachable"
+            elif lag > settings.db_replica_max_lag_seconds:
+                health_status[f"replica_{index}"] = f"lagging: {lag:.1f}s"
+            else:
+                health_status[f"replica_{index}"] = "healthy"
+        
         # Check Redis
         if self.redis_client:
             try:
@@ -131,10 +331,42 @@ class Database:
 db = Database()
 
 
-async def get_db() -> AsyncGenerator[asyncpg.Connection, None]:
-    """Dependency for FastAPI to get main database connection"""
-    async for connection in db.get_connection():
-        yield connection
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Database is busy, please retry",
+        headers={"Retry-After": "1"}
+    )
+
+
+async def get_db(request: Request = None) -> AsyncGenerator[asyncpg.Connection, None]:
+    """Dependency for FastAPI to get main database connection (under the route's class limit)"""
+    route = route_class(request.scope["path"]) if request is not None else "interactive"
+    try:
+        async for connection in db.get_connection(route):
+            yield connection
+    except PoolBusyError:
+        raise _busy()
+
+
+async def read_from_primary(request: Request) -> bool:
+    """Dependency: whether the caller has written recently, so reads must use the primary"""
+    from app.db.routing import is_pinned_to_primary
+    return await is_pinned_to_primary(request.scope)
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[asyncpg.Connection, None]:
+    """
+    Dependency for read-only endpoints: a replica connection, or the primary
+    while the caller has written recently (read-your-writes)
+    """
+    primary = await read_from_primary(request)
+    route = route_class(request.scope["path"])
+    try:
+        async for connection in db.get_read_connection(primary=primary, route=route):
+            yield connection
+    except PoolBusyError:
+        raise _busy()
 
 
 async def get_auth_db() -> AsyncGenerator[asyncpg.Connection, None]:
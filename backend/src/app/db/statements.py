@@ -0,0 +1,206 @@
+"""
+Prepared statement registry
+List queries used to build their WHERE clause from whichever filters were
+given, so every filter combination was a different SQL text: asyncpg's
+per-connection statement cache kept evicting them and Postgres kept planning
+them again. Registered statements have one canonical text per query instead,
+are prepared once per connection - hot ones as soon as the connection opens -
+and record how often a prepared statement was reused.
+
+An optional filter next to a required indexed predicate can be written as
+`AND ($2::text IS NULL OR status = $2)`: the required predicate drives the
+plan either way. Queries made only of optional filters are FilteredStatements
+instead, with one registered variant per combination of filters actually
+used; a catch-all text gets a generic plan that cannot use the index of
+whichever filter is given.
+
+With DB_STATEMENT_CACHE_SIZE=0 or DB_PGBOUNCER_MODE (a transaction pooler
+hands each transaction whichever server connection is free) nothing is
+prepared by name: statements run as plain, unnamed queries.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncpg
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryConnection(asyncpg.Connection):
+    """Pool connection that keeps the registry's prepared statements"""
+    
+    __slots__ = ("prepared",)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Dict[str, asyncpg.prepared_stmt.PreparedStatement] = {}
+    
+    def get_reset_query(self) -> str:
+        # Behind a transaction pooler there is no session of ours to reset;
+        # skip the round trip on every release (open transactions still roll back)
+        if settings.db_pgbouncer_mode:
+            return ""
+        return super().get_reset_query()
+
+
+def statement_cache_size() -> int:
+    """asyncpg's per-connection statement cache size (0 behind PgBouncer)"""
+    return 0 if settings.db_pgbouncer_mode else settings.db_statement_cache_size
+
+
+def preparing_enabled() -> bool:
+    return statement_cache_size() > 0 and settings.db_prepare_statements
+
+
+class Statement:
+    """One registered statement"""
+    
+    __slots__ = ("name", "sql", "hot", "hits", "prepares", "unprepared")
+    
+    def __init__(self, name: str, sql: str, hot: bool = False):
+        self.name = name
+        self.sql = sql
+        self.hot = hot
+        self.hits = 0        # ran on a statement already prepared on that connection
+        self.prepares = 0    # had to be prepared (planned) first
+        self.unprepared = 0  # ran as a plain query (no registry connection, or preparing disabled)
+    
+    async def _prepared(self, conn) -> Optional[asyncpg.prepared_stmt.PreparedStatement]:
+        prepared = getattr(conn, "prepared", None)
+        if prepared is None or not preparing_enabled():
+            return None
+        statement = prepared.get(self.name)
+        if statement is not None:
+            self.hits += 1
+            return statement
+        statement = prepared[self.name] = await conn.prepare(self.sql)
+        self.prepares += 1
+        return statement
+    
+    async def _run(self, conn, method: str, *args):
+        statement = await self._prepared(conn)
+        if statement is None:
+            self.unprepared += 1
+            return await getattr(conn, method)(self.sql, *args)
+        try:
+            return await getattr(statement, method)(*args)
+        except asyncpg.exceptions.InvalidCachedStatementError:
+            # The schema changed under the statement; prepare it again once
+            conn.prepared.pop(self.name, None)
+            statement = await self._prepared(conn)
+            return await getattr(statement, method)(*args)
+    
+    async def fetch(self, conn, *args) -> List[asyncpg.Record]:
+        return await self._run(conn, "fetch", *args)
+    
+    async def fetchrow(self, conn, *args) -> Optional[asyncpg.Record]:
+        return await self._run(conn, "fetchrow", *args)
+    
+    async def fetchval(self, conn, *args) -> Any:
+        return await self._run(conn, "fetchval", *args)
+    
+    def stats(self) -> Dict[str, Any]:
+        prepared_runs = self.hits + self.prepares
+        return {
+            "hot": self.hot,
+            "hits": self.hits,
+            "prepares": self.prepares,
+            "unprepared": self.unprepared,
+            "hit_rate": round(self.hits / prepared_runs, 3) if prepared_runs else None
+        }
+
+
+class FilteredStatement:
+    """
+    A query whose WHERE clause is any combination of optional filters.
+    `predicates` maps each filter to its condition, with `{}` where its
+    parameter goes; the template has `{where}` for the combined conditions and
+    `{p1}`, `{p2}`... for the parameters that follow the filters'.
+    """
+    
+    __slots__ = ("registry", "name", "template", "predicates", "variants")
+    
+    def __init__(self, registry: "StatementRegistry", name: str, template: str, predicates: Dict[str, str]):
+        self.registry = registry
+        self.name = name
+        self.template = template
+        self.predicates = predicates
+        self.variants: Dict[Tuple[str, ...], Statement] = {}
+    
+    def bind(self, filters: Dict[str, Any]) -> Tuple[Statement, List[Any]]:
+        """The variant for the filters that are set (not None), and their values"""
+        keys = tuple(key for key in self.predicates if filters.get(key) is not None)
+        statement = self.variants.get(keys)
+        if statement is None:
+            where = " AND ".join(
+                self.predicates[key].format(f"${index}") for index, key in enumerate(keys, 1)
+            ) or "TRUE"
+            following = {f"p{index}": f"${len(keys) + index}" for index in range(1, 10)}
+            statement = self.variants[keys] = self.registry.register(
+                f"{self.name}[{','.join(keys)}]", self.template.format(where=where, **following)
+            )
+        return statement, [filters[key] for key in keys]
+    
+    async def fetch(self, conn, filters: Dict[str, Any], *args) -> List[asyncpg.Record]:
+        statement, values = self.bind(filters)
+        return await statement.fetch(conn, *values, *args)
+    
+    async def fetchval(self, conn, filters: Dict[str, Any], *args) -> Any:
+        statement, values = self.bind(filters)
+        return await statement.fetchval(conn, *values, *args)
+
+
+class StatementRegistry:
+    """The statements of the CRUD layer, by name"""
+    
+    def __init__(self):
+        self.statements: Dict[str, Statement] = {}
+    
+    def register(self, name: str, sql: str, hot: bool = False) -> Statement:
+        """
+        Register a read statement. `hot` statements are prepared as soon as a
+        pool connection opens, so the first request on it is not the one planning.
+        """
+        if name in self.statements:
+            raise ValueError(f"Statement {name} is already registered")
+        statement = self.statements[name] = Statement(name, sql, hot)
+        return statement
+    
+    def filtered(self, name: str, template: str, predicates: Dict[str, str]) -> FilteredStatement:
+        """A query of optional filters; its variants are registered as they are first used"""
+        return FilteredStatement(self, name, template, predicates)
+    
+    async def init_connection(self, conn) -> None:
+        """Pool `init` hook: prepare the hot statements on a new connection"""
+        if not preparing_enabled() or getattr(conn, "prepared", None) is None:
+            return
+        for statement in self.statements.values():
+            if not statement.hot:
+                continue
+            try:
+                conn.prepared[statement.name] = await conn.prepare(statement.sql)
+                statement.prepares += 1
+            except Exception as e:
+                # e.g. a table a pending migration adds; prepared on first use instead
+                logger.warning(f"Could not prepare statement {statement.name}: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        per_statement = {name: statement.stats() for name, statement in self.statements.items()}
+        hits = sum(statement.hits for statement in self.statements.values())
+        prepares = sum(statement.prepares for statement in self.statements.values())
+        return {
+            "preparing": preparing_enabled(),
+            "statement_cache_size": statement_cache_size(),
+            "hits": hits,
+            "prepares": prepares,
+            "unprepared": sum(statement.unprepared for statement in self.statements.values()),
+            "hit_rate": round(hits / (hits + prepares), 3) if hits + prepares else None,
+            "statements": per_statement
+        }
+
+
+# Global statement registry
+statements = StatementRegistry()
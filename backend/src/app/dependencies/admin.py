@@ -8,7 +8,7 @@ from typing import Optional
 import asyncpg
 from app.db.session import get_auth_db
 from app.models.user import User, UserRole
-from app.core.security import security
+from app.core.tokens import token_verifier
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,7 +46,7 @@ async def get_current_user(
         )
     
     # Verify JWT token
-    payload = security.verify_jwt_token(token)
+    payload = await token_verifier.verify(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
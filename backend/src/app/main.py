@@ -10,11 +10,28 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import logging
 
 from app.core.config import settings
+from app.core.tokens import token_verifier
 from app.db.session import db
+from app.db.pool_classes import pool_classes
+from app.db.routing import ReadYourWritesMiddleware
 from app.api.v1.router import api_router
 from app.utils.logging_config import setup_logging
 from app.utils.cache import cache
 from app.utils.queue import queue_service
+from app.utils.leaderboard import leaderboard
+from app.utils.metrics import metrics
+from app.utils.audit_log import audit_log
+from app.utils.partitions import partitions
+from app.utils.question_archive import question_archive
+from app.utils.user_directory import user_directory
+from app.utils.near_duplicates import near_duplicates
+from app.utils.draft_stream import draft_streams
+from app.utils.rate_limit import RateLimitMiddleware
+from app.utils.runtime_settings import MaintenanceModeMiddleware, runtime_settings
+from app.services.ai.generation_service import generation_service
+from app.services.ai.response_cache import response_cache
+from app.services.ai.scoring_service import scoring_service
+from app.services.ai.ocr_service import ocr_service
 
 # Setup logging
 setup_logging()
@@ -35,6 +52,9 @@ async def lifespan(app: FastAPI):
         await db.connect()
         logger.info("✓ Database connections established")
         
+        # Resize reporting/background pool limits under interactive load (if enabled)
+        pool_classes.start()
+        
         # Initialize cache
         try:
             await cache.connect()
@@ -42,6 +62,39 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠ Cache connection failed: {e}. Continuing without cache.")
         
+        # Load runtime system settings and follow changes
+        try:
+            await runtime_settings.start()
+        except Exception as e:
+            logger.warning(f"⚠ System settings failed to load: {e}. Using static settings.")
+        
+        # Follow JWT revocations (local-only without cache)
+        token_verifier.start()
+        
+        # Follow auth-DB user changes for the user directory
+        user_directory.start()
+        
+        # Start leaderboard rebuilds (Redis-backed, skipped without cache)
+        leaderboard.start()
+        
+        # Backfill active-client counters and prune old hourly metrics
+        metrics.start()
+        
+        # Batch non-critical admin audit entries (written inline until started)
+        audit_log.start()
+        
+        # Create upcoming monthly partitions and retire expired ones
+        partitions.start()
+        
+        # Move the bodies of old delivered questions to the archive
+        question_archive.start()
+        
+        # Load the near-duplicate index in the background
+        near_duplicates.start()
+        
+        # Relay AI draft streams across workers (in-process delivery without cache)
+        draft_streams.start()
+        
         # Initialize queue service
         try:
             await queue_service.connect()
@@ -49,6 +102,27 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠ Queue service connection failed: {e}. Continuing without queue.")
         
+        # Evict expired and over-size AI response cache entries
+        response_cache.start()
+        
+        # Start the OCR worker processes for image questions (queue consumer when RabbitMQ is up)
+        try:
+            await ocr_service.start()
+        except Exception as e:
+            logger.warning(f"⚠ OCR stage failed to start: {e}")
+        
+        # Batch AI-content/originality scoring (queue consumer when RabbitMQ is up)
+        try:
+            await scoring_service.start()
+        except Exception as e:
+            logger.warning(f"⚠ Answer scoring failed to start: {e}")
+        
+        # Consume the AI generation queue (in-process generation without RabbitMQ)
+        try:
+            await generation_service.start()
+        except Exception as e:
+            logger.warning(f"⚠ AI generation consumer failed to start: {e}")
+        
         logger.info("✓ Application startup complete")
         logger.info("=" * 60)
     except Exception as e:
@@ -62,6 +136,48 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
     
     try:
+        # Stop following system setting changes
+        await runtime_settings.stop()
+        
+        # Stop following JWT revocations
+        await token_verifier.stop()
+        
+        # Stop following user changes
+        await user_directory.stop()
+        
+        # Stop leaderboard rebuilds
+        await leaderboard.stop()
+        
+        # Stop metrics maintenance
+        await metrics.stop()
+        
+        # Drain buffered admin audit entries
+        await audit_log.stop()
+        
+        # Stop partition maintenance
+        await partitions.stop()
+        
+        # Stop question archiving
+        await question_archive.stop()
+        
+        # Stop loading the near-duplicate index
+        await near_duplicates.stop()
+        
+        # Stop AI generation and close provider connections
+        await generation_service.stop()
+        
+        # Stop the OCR worker processes
+        await ocr_service.stop()
+        
+        # Stop answer scoring
+        await scoring_service.stop()
+        
+        # Stop AI response cache eviction
+        await response_cache.stop()
+        
+        # Stop relaying AI draft streams
+        await draft_streams.stop()
+        
         # Close queue service
         try:
             await queue_service.disconnect()
@@ -76,7 +192,8 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠ Cache disconnect error: {e}")
         
-        # Close database connections
+        # Stop pool limit adaptation and close database connections
+        await pool_classes.stop()
         await db.disconnect()
         logger.info("✓ Database connections closed")
         
@@ -96,6 +213,15 @@ app = FastAPI(
     redoc_url="/redoc" if settings.debug else None,
 )
 
+# Pin a user's reads to the primary right after they write (only with read replicas)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Add maintenance mode middleware (reads the runtime settings snapshot)
+app.add_middleware(MaintenanceModeMiddleware)
+
+# Add rate limiting middleware (added before CORS so 429 responses carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +33,7 @@ __all__ = [
     "APIKeyResponse",
     "APIKeyListResponse",
     "APIKeyTestResponse",
+    "ResponseCacheStatsResponse",
     # Setting schemas
     "SystemSettingResponse",
     "SystemSettingUpdate",
@@ -45,6 +46,7 @@ __all__ = [
     "QuestionRejectRequest",
     "QuestionPlagiarismFlag",
     "QuestionStatsResponse",
+    "AnswerReuseStatsResponse",
     # Expert schemas
     "ExpertListResponse",
     "ExpertDetailResponse",
@@ -3,7 +3,7 @@ API Key management schemas
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
 
@@ -47,9 +47,11 @@ class APIKeyListResponse(BaseModel):
 class APIKeyTestResponse(BaseModel):
     """API key test response"""
     success: bool
+    status: str  # 'success', 'failed' or 'unsupported'
     message: str
     tested_at: datetime
     response_time_ms: Optional[float] = None
+    provider_health: Optional[Dict[str, Any]] = None
 
 
 class APIKeyRotateResponse(BaseModel):
@@ -58,3 +60,24 @@ class APIKeyRotateResponse(BaseModel):
     new_key_id: UUID
     rotated_at: datetime
 
+
+class ResponseCacheModelStats(BaseModel):
+    """Response cache hit rate for one provider:model"""
+    model: str
+    hits: int
+    redis_hits: int
+    db_hits: int
+    misses: int
+    hit_rate: float
+
+
+class ResponseCacheStatsResponse(BaseModel):
+    """AI response cache statistics response"""
+    enabled: bool
+    hits: int
+    misses: int
+    hit_rate: float
+    redis_entries: Optional[int] = None
+    db_entries: int
+    db_size_bytes: int
+    models: List[ResponseCacheModelStats]
@@ -75,6 +75,7 @@ class ComplianceStatsResponse(BaseModel):
     plagiarism_detections: int
     vpn_detections: int
     suspicious_activity: int
+    unavailable_sections: List[str] = []  # sections that failed or timed out (partial response)
 
 
 class ComplianceFlagRequest(BaseModel):
@@ -93,6 +93,7 @@ class ExpertStatsResponse(BaseModel):
     total_questions_answered: int
     total_earnings: float
     top_performers: List[ExpertLeaderboardEntry]
+    unavailable_sections: List[str] = []  # sections that failed or timed out (partial response)
 
 
 class ExpertSuspendRequest(BaseModel):
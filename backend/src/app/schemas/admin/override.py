@@ -49,3 +49,7 @@ class ExpertBypassRequest(OverrideRequest):
     """Expert bypass override request"""
     pass
 
+
+class ResponseCacheBypassRequest(OverrideRequest):
+    """AI response cache bypass override request"""
+    pass
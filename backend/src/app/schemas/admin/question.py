@@ -11,9 +11,10 @@ from uuid import UUID
 class QuestionListResponse(BaseModel):
     """Question list response"""
     questions: List[Dict[str, Any]]
-    total: int
+    total: Optional[int] = None  # Not counted when paging by cursor
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class QuestionDetailResponse(BaseModel):
@@ -77,3 +78,21 @@ class QuestionStatsResponse(BaseModel):
     average_response_time_hours: float
     rejection_rate: float
 
+
+class AnswerReuseStatsResponse(BaseModel):
+    """Answer reuse statistics response"""
+    period_days: int
+    questions: int
+    offers: int
+    exact_offers: int
+    near_offers: int
+    accepted: int
+    system_accepted: int = 0
+    declined: int
+    hit_rate: float
+    acceptance_rate: float
+    ai_generations_saved: int
+    estimated_cost_saved: float
+    avg_review_seconds_reused: Optional[float] = None
+    avg_review_seconds_fresh: Optional[float] = None
+    review_seconds_saved: Optional[float] = None
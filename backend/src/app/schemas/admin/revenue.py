@@ -24,6 +24,7 @@ class RevenueDashboardResponse(BaseModel):
     refund_rate: float
     top_spending_users: List[Dict[str, Any]]
     revenue_trend: List[Dict[str, Any]]  # Daily/weekly trend
+    unavailable_sections: List[str] = []  # sections that failed or timed out (partial response)
 
 
 class CreditsStatsResponse(BaseModel):
@@ -33,6 +34,7 @@ class CreditsStatsResponse(BaseModel):
     total_revenue_from_credits: float
     average_credits_per_user: float
     top_packages: List[Dict[str, Any]]
+    unavailable_sections: List[str] = []
 
 
 class TransactionResponse(BaseModel):
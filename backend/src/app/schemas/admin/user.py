@@ -31,9 +31,10 @@ class UserResponse(BaseModel):
 class UserListResponse(BaseModel):
     """User list response schema"""
     users: List[UserResponse]
-    total: int
+    total: Optional[int] = None  # Not counted when paging by cursor
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class UserRoleUpdate(BaseModel):
@@ -31,6 +31,8 @@ class QuestionStatusResponse(BaseModel):
     status: str  # pending, processing, reviewed, delivered, cancelled
     question_text: str
     answer_text: Optional[str] = None
+    draft_text: Optional[str] = None  # AI draft streamed so far (last checkpoint)
+    draft_status: Optional[str] = None  # streaming, complete
     expert_id: Optional[UUID] = None
     expert_name: Optional[str] = None
     submitted_at: datetime
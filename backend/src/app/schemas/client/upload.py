@@ -0,0 +1,23 @@
+"""
+Client upload schemas
+"""
+
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class ImageUploadResponse(BaseModel):
+    """A stored image"""
+    sha256: str
+    url: str
+    thumbnail_url: Optional[str] = None
+    content_type: str
+    size_bytes: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    original_filename: Optional[str] = None
+
+
+class ImageUploadBatchResponse(BaseModel):
+    """Images stored by one upload request"""
+    images: List[ImageUploadResponse]
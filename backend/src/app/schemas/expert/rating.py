@@ -24,8 +24,10 @@ class RatingStatsResponse(BaseModel):
     """Rating statistics response"""
     expert_id: UUID
     average_rating: float
+    rating_stddev: Optional[float] = None
     total_ratings: int
     rating_distribution: Dict[int, int]  # {1: count, 2: count, ...}
+    rolling_averages: Dict[str, Optional[float]] = {}  # {"7d": avg, "30d": avg, ...}
     recent_ratings: List[RatingResponse]
     rating_trend: List[Dict[str, Any]]  # Time series data
 
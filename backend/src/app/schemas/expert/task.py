@@ -49,4 +49,5 @@ class TaskDetailResponse(BaseModel):
     client_email: Optional[str] = None
     subject: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
+    reuse_offer: Optional[Dict[str, Any]] = None
 
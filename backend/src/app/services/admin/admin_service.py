@@ -3,14 +3,38 @@ Admin management service
 """
 
 from typing import Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
 import asyncpg
 from uuid import UUID
 from app.crud.admin import admins as admin_crud
 from app.crud.admin import admin_actions as action_crud
+from app.crud.admin import metrics as metrics_crud
+from app.utils.metrics import metrics, WINDOW_DAYS, day_start, hour_start
+from app.utils.user_directory import user_directory
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Question statuses counted as pending review on the dashboard
+PENDING_STATUSES = ("review", "processing")
+
+
+def empty_dashboard_stats() -> Dict[str, Any]:
+    """Dashboard statistics shown when they cannot be loaded"""
+    return {
+        "total_questions": 0,
+        "total_questions_trend": {"value": 0.0, "is_positive": True},
+        "pending_reviews": 0,
+        "pending_reviews_trend": {"value": 0.0, "is_positive": True},
+        "average_rating": 0.0,
+        "average_rating_trend": {"value": 0.0, "is_positive": True},
+        "active_users": 0,
+        "active_users_trend": {"value": 0.0, "is_positive": True},
+        "total_experts": 0,
+        "total_clients": 0,
+        "system_health": 100
+    }
+
 
 class AdminService:
     """Admin management service"""
@@ -96,6 +120,7 @@ class AdminService:
         
         if not success:
             raise ValueError("Failed to suspend admin")
+        await user_directory.invalidate(admin_id)
         
         return {
             "success": True,
@@ -121,6 +146,7 @@ class AdminService:
         
         if not success:
             raise ValueError("Failed to revoke admin access")
+        await user_directory.invalidate(admin_id)
         
         return {
             "success": True,
@@ -138,150 +164,96 @@ class AdminService:
     
     @staticmethod
     async def get_dashboard_stats(db: asyncpg.Connection) -> Dict[str, Any]:
-        """Get dashboard statistics with trend calculations"""
-        try:
-            # Get total questions (current)
-            total_questions = await db.fetchval("""
-                SELECT COUNT(*) FROM questions
-            """) or 0
-            
-            # Get total questions from previous period (30 days ago)
-            total_questions_previous = await db.fetchval("""
-                SELECT COUNT(*) FROM questions 
-                WHERE created_at <= NOW() - INTERVAL '30 days'
-            """) or 0
-            
-            # Get pending reviews (current)
-            pending_reviews = await db.fetchval("""
-                SELECT COUNT(*) FROM questions 
-                WHERE status IN ('review', 'processing')
-            """) or 0
-            
-            # Get pending reviews from previous period
-            pending_reviews_previous = await db.fetchval("""
-                SELECT COUNT(*) FROM questions 
-                WHERE status IN ('review', 'processing')
-                AND created_at <= NOW() - INTERVAL '30 days'
-            """) or 0
-            
-            # Get average rating (current)
-            avg_rating = await db.fetchval("""
-                SELECT COALESCE(AVG(score), 0) FROM ratings
-                WHERE created_at > NOW() - INTERVAL '30 days'
-            """) or 0.0
-            
-            # Get average rating from previous period
-            avg_rating_previous = await db.fetchval("""
-                SELECT COALESCE(AVG(score), 0) FROM ratings
-                WHERE created_at > NOW() - INTERVAL '60 days'
-                AND created_at <= NOW() - INTERVAL '30 days'
-            """) or 0.0
-            
-            # Get active users (last 30 days)
-            active_users = await db.fetchval("""
-                SELECT COUNT(DISTINCT client_id) FROM questions 
-                WHERE created_at > NOW() - INTERVAL '30 days'
-            """) or 0
-            
-            # Get active users from previous period (30-60 days ago)
-            active_users_previous = await db.fetchval("""
-                SELECT COUNT(DISTINCT client_id) FROM questions 
-                WHERE created_at > NOW() - INTERVAL '60 days'
-                AND created_at <= NOW() - INTERVAL '30 days'
-            """) or 0
-            
-            # Get total experts
-            total_experts = await db.fetchval("""
-                SELECT COUNT(*) FROM users WHERE role = 'expert'
-            """) or 0
-            
-            # Get total clients
-            total_clients = await db.fetchval("""
-                SELECT COUNT(*) FROM users WHERE role = 'client'
-            """) or 0
-            
-            # Calculate trends
-            def calculate_trend(current: float, previous: float) -> Dict[str, Any]:
-                if previous == 0:
-                    return {"value": 0.0, "is_positive": True}
-                change = ((current - previous) / previous) * 100
-                return {
-                    "value": abs(change),
-                    "is_positive": change >= 0
-                }
-            
-            return {
-                "total_questions": total_questions,
-                "total_questions_trend": calculate_trend(total_questions, total_questions_previous),
-                "pending_reviews": pending_reviews,
-                "pending_reviews_trend": calculate_trend(pending_reviews, pending_reviews_previous),
-                "average_rating": float(avg_rating),
-                "average_rating_trend": calculate_trend(avg_rating, avg_rating_previous),
-                "active_users": active_users,
-                "active_users_trend": calculate_trend(active_users, active_users_previous),
-                "total_experts": total_experts,
-                "total_clients": total_clients,
-                "system_health": 100
-            }
-        except Exception as e:
-            logger.error(f"Error getting dashboard stats: {e}")
+        """
+        Get dashboard statistics with trend calculations
+        (range reads over the hourly metrics, so cost does not grow with history).
+        Errors propagate, so the dashboard reports the section as unavailable
+        instead of showing zeros.
+        """
+        now = datetime.now(timezone.utc)
+        window_start = hour_start(now) - timedelta(days=WINDOW_DAYS)
+        previous_start = window_start - timedelta(days=WINDOW_DAYS)
+        
+        totals = await metrics_crud.get_totals(db, "questions.created")
+        status_totals = await metrics_crud.get_totals(db, "questions.status", PENDING_STATUSES)
+        role_totals = await metrics_crud.get_totals(db, "users.role", ("expert", "client"))
+        current = await metrics_crud.get_window_sums(
+            db, ["questions.created", "questions.status", "ratings.count", "ratings.sum"], window_start
+        )
+        previous = await metrics_crud.get_window_sums(
+            db, ["ratings.count", "ratings.sum"], previous_start, window_start
+        )
+        
+        # Totals 30 days ago = totals now minus what changed since
+        total_questions = int(totals.get("", 0))
+        total_questions_previous = total_questions - int(current["questions.created"].get("", 0))
+        pending_reviews = int(sum(status_totals.values()))
+        pending_reviews_previous = pending_reviews - int(sum(
+            current["questions.status"].get(status, 0) for status in PENDING_STATUSES
+        ))
+        
+        def average(sums: Dict[str, Dict[str, float]]) -> float:
+            count = sums["ratings.count"].get("", 0)
+            return sums["ratings.sum"].get("", 0) / count if count else 0.0
+        
+        avg_rating = average(current)
+        avg_rating_previous = average(previous)
+        
+        # Active users (distinct clients, last 30 days vs the 30 before)
+        today = day_start(now)
+        active_users = await metrics.count_active_clients(today - timedelta(days=WINDOW_DAYS - 1), WINDOW_DAYS)
+        active_users_previous = await metrics.count_active_clients(
+            today - timedelta(days=2 * WINDOW_DAYS - 1), WINDOW_DAYS
+        )
+        if active_users is None or active_users_previous is None:
+            active_users = await metrics_crud.count_active_clients(db, window_start, now)
+            active_users_previous = await metrics_crud.count_active_clients(db, previous_start, window_start)
+        
+        # Calculate trends
+        def calculate_trend(current: float, previous: float) -> Dict[str, Any]:
+            if previous == 0:
+                return {"value": 0.0, "is_positive": True}
+            change = ((current - previous) / previous) * 100
             return {
-                "total_questions": 0,
-                "total_questions_trend": {"value": 0.0, "is_positive": True},
-                "pending_reviews": 0,
-                "pending_reviews_trend": {"value": 0.0, "is_positive": True},
-                "average_rating": 0.0,
-                "average_rating_trend": {"value": 0.0, "is_positive": True},
-                "active_users": 0,
-                "active_users_trend": {"value": 0.0, "is_positive": True},
-                "total_experts": 0,
-                "total_clients": 0,
-                "system_health": 100
+                "value": abs(change),
+                "is_positive": change >= 0
             }
+        
+        return {
+            "total_questions": total_questions,
+            "total_questions_trend": calculate_trend(total_questions, total_questions_previous),
+            "pending_reviews": pending_reviews,
+            "pending_reviews_trend": calculate_trend(pending_reviews, pending_reviews_previous),
+            "average_rating": float(avg_rating),
+            "average_rating_trend": calculate_trend(avg_rating, avg_rating_previous),
+            "active_users": active_users,
+            "active_users_trend": calculate_trend(active_users, active_users_previous),
+            "total_experts": int(role_totals.get("expert", 0)),
+            "total_clients": int(role_totals.get("client", 0)),
+            "system_health": 100
+        }
     
     @staticmethod
     async def get_dashboard_charts(db: asyncpg.Connection) -> Dict[str, Any]:
         """Get dashboard chart data"""
-        try:
-            # Questions per day (last 30 days)
-            questions_per_day = await db.fetch("""
-                SELECT 
-                    DATE(created_at) as date,
-                    COUNT(*) as count
-                FROM questions
-                WHERE created_at > NOW() - INTERVAL '30 days'
-                GROUP BY DATE(created_at)
-                ORDER BY date ASC
-            """)
-            
-            # Top subjects
-            top_subjects = await db.fetch("""
-                SELECT 
-                    subject,
-                    COUNT(*) as count
-                FROM questions
-                WHERE subject IS NOT NULL
-                GROUP BY subject
-                ORDER BY count DESC
-                LIMIT 5
-            """)
-            
-            return {
-                "questions_per_day": [
-                    {"date": str(row["date"]), "count": row["count"]}
-                    for row in questions_per_day
-                ],
-                "top_subjects": [
-                    {"subject": row["subject"] or "Unknown", "count": row["count"]}
-                    for row in top_subjects
-                ]
-            }
-        except Exception as e:
-            logger.error(f"Error getting dashboard charts: {e}")
-            return {
-                "questions_per_day": [],
-                "top_subjects": []
-            }
+        # Questions per day (last 30 days)
+        questions_per_day = await metrics_crud.get_daily_series(
+            db, "questions.created", hour_start() - timedelta(days=WINDOW_DAYS)
+        )
+        
+        # Top subjects
+        top_subjects = await metrics_crud.get_top_dimensions(db, "questions.subject", limit=5)
+        
+        return {
+            "questions_per_day": [
+                {"date": str(row["date"]), "count": int(row["value"])}
+                for row in questions_per_day
+            ],
+            "top_subjects": [
+                {"subject": row["dimension"] or "Unknown", "count": int(row["value"])}
+                for row in top_subjects
+            ]
+        }
     
     @staticmethod
     async def get_recent_activity(db: asyncpg.Connection, limit: int = 10) -> list:
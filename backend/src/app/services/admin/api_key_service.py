@@ -5,9 +5,12 @@ API Key management service
 from typing import Dict, Any, Optional
 import asyncpg
 from uuid import UUID
+from datetime import datetime, timezone
 from app.crud.admin import api_keys as api_key_crud
 from app.crud.admin import admin_actions as action_crud
 from app.core.security import security
+from app.services.ai.generation_service import generation_service
+from app.services.ai.response_cache import response_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -112,19 +115,65 @@ class APIKeyService:
         db: asyncpg.Connection,
         key_id: UUID
     ) -> Dict[str, Any]:
-        """Test API key connection"""
-        # Get encrypted key
-        key_data = await api_key_crud.get_api_key_by_id(db, key_id)
+        """
+        Test API key connection with a real (list models) request to its provider.
+        The response includes the provider's live health: circuit breaker state and
+        latency percentiles per model. `status` is 'success', 'failed',
+        'unsupported' or 'not_found'.
+        """
+        key_data = await api_key_crud.get_api_key_secret(db, key_id)
         if not key_data:
-            return {"success": False, "message": "API key not found"}
+            return {"success": False, "status": "not_found", "message": "API key not found"}
         
-        # Decrypt and test (simplified - actual implementation would test each service)
-        # For now, just update test status
-        await api_key_crud.update_api_key_test_status(db, key_id, "success", 100.0)
+        tested_at = datetime.now(timezone.utc)
+        key_type = key_data["key_type"]
+        provider = generation_service.providers.get("poe" if key_type.startswith("poe") else key_type)
+        if not provider:
+            return {
+                "success": False,
+                "status": "unsupported",
+                "message": f"Connection test not supported for {key_type} keys",
+                "tested_at": tested_at
+            }
+        
+        health = {
+            "provider": provider.name,
+            "in_flight": provider.in_flight,
+            "tokens_used_last_minute": provider.budget.used(),
+            "models": provider.resilience.snapshot()
+        }
+        
+        try:
+            check = await provider.check(security.decrypt_data(key_data["encrypted_key"]))
+        except Exception as e:
+            logger.warning(f"API key test failed for {key_id}: {e}")
+            await api_key_crud.update_api_key_test_status(db, key_id, "failed")
+            return {
+                "success": False,
+                "status": "failed",
+                "message": f"Connection failed: {e}",
+                "tested_at": tested_at,
+                "provider_health": health
+            }
+        
+        status = "success" if check["ok"] else "failed"
+        await api_key_crud.update_api_key_test_status(db, key_id, status, check["response_time_ms"])
+        
+        message = "API key test successful" if check["ok"] else f"Provider returned HTTP {check['status_code']}"
+        open_circuits = [model for model, h in health["models"].items() if h["circuit"] != "closed"]
+        if open_circuits:
+            message += f"; circuit not closed for {', '.join(open_circuits)}"
         
         return {
-            "success": True,
-            "message": "API key test successful",
-            "tested_at": key_data.get("last_tested_at")
+            "success": check["ok"],
+            "status": status,
+            "message": message,
+            "tested_at": tested_at,
+            "response_time_ms": check["response_time_ms"],
+            "provider_health": health
         }
-
+    
+    @staticmethod
+    async def get_response_cache_stats(db: asyncpg.Connection) -> Dict[str, Any]:
+        """AI response cache hit rates per model and the size of both tiers"""
+        return await response_cache.get_stats(db)
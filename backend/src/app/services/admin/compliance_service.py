@@ -8,6 +8,7 @@ from uuid import UUID
 from datetime import datetime
 from app.crud.admin import compliance as compliance_crud
 from app.crud.admin import admin_actions as action_crud
+from app.utils.composite import Section, load_sections, invalidate
 import csv
 import io
 import json
@@ -92,12 +93,29 @@ class ComplianceService:
             ip_address=ip_address, user_agent=user_agent
         )
         
+        # Show the new flag in the stats right away
+        await invalidate("compliance_stats")
+        
         return {"success": True, "flag_id": flag_id, "content_id": content_id}
     
     @staticmethod
-    async def get_compliance_stats(db: asyncpg.Connection) -> Dict[str, Any]:
-        """Get compliance statistics"""
-        return await compliance_crud.get_compliance_stats(db)
+    async def get_compliance_stats(primary: bool = False) -> Dict[str, Any]:
+        """Get compliance statistics (sections load concurrently)"""
+        result = await load_sections("compliance_stats", [
+            Section("totals", compliance_crud.get_compliance_totals, default={
+                "total_flagged": 0, "resolved": 0, "pending": 0,
+                "ai_content_detections": 0, "plagiarism_detections": 0,
+                "vpn_detections": 0, "suspicious_activity": 0
+            }),
+            Section("by_reason", compliance_crud.get_compliance_counts_by_reason, default={}),
+            Section("by_severity", compliance_crud.get_compliance_counts_by_severity, default={}),
+        ], primary=primary)
+        return {
+            **result["totals"],
+            "by_reason": result["by_reason"],
+            "by_severity": result["by_severity"],
+            "unavailable_sections": result.unavailable
+        }
     
     @staticmethod
     async def export_audit_logs(
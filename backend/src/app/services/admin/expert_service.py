@@ -5,8 +5,12 @@ Expert management service
 from typing import Dict, Any, Optional
 import asyncpg
 from uuid import UUID
+from datetime import datetime
 from app.crud.admin import experts as expert_crud
 from app.crud.admin import admin_actions as action_crud
+from app.utils.composite import Section, load_sections
+from app.utils.leaderboard import leaderboard
+from app.utils.user_directory import user_directory
 import logging
 
 logger = logging.getLogger(__name__)
@@ -52,6 +56,7 @@ class ExpertService:
         success = await expert_crud.suspend_expert(db, expert_id, suspended)
         
         if success:
+            await user_directory.invalidate(expert_id)
             # Log action
             await action_crud.log_admin_action(
                 db, admin_id, "suspend_expert" if suspended else "activate_expert",
@@ -71,6 +76,32 @@ class ExpertService:
         """Get expert performance metrics"""
         return await expert_crud.get_expert_performance(db, expert_id, period)
     
+    @staticmethod
+    async def _leaderboard_entries(
+        db: asyncpg.Connection,
+        period: str,
+        limit: int
+    ) -> list:
+        """Leaderboard entries from Redis, falling back to SQL"""
+        entries = await leaderboard.get_top(period, limit)
+        if entries is None:
+            return await expert_crud.get_expert_leaderboard(db, period, limit)
+        
+        # Enrich with names/compliance in one query; experts deactivated since
+        # the last rebuild are dropped
+        summaries = await expert_crud.get_expert_summaries(
+            db, [entry["expert_id"] for entry in entries]
+        )
+        ranked = []
+        for entry in entries:
+            summary = summaries.get(entry["expert_id"])
+            if not summary:
+                continue
+            entry.update(summary)
+            entry["rank"] = len(ranked) + 1
+            ranked.append(entry)
+        return ranked
+    
     @staticmethod
     async def get_expert_leaderboard(
         db: asyncpg.Connection,
@@ -78,21 +109,31 @@ class ExpertService:
         limit: int = 50
     ) -> Dict[str, Any]:
         """Get expert leaderboard"""
-        leaderboard = await expert_crud.get_expert_leaderboard(db, period, limit)
+        entries = await ExpertService._leaderboard_entries(db, period, limit)
+        updated_at = await leaderboard.get_updated_at(period)
         return {
             "period": period,
-            "leaderboard": leaderboard,
-            "updated_at": None  # TODO: Add cache timestamp
+            "leaderboard": entries,
+            "updated_at": updated_at or datetime.utcnow()
         }
     
     @staticmethod
-    async def get_expert_stats(db: asyncpg.Connection) -> Dict[str, Any]:
-        """Get expert statistics"""
-        stats = await expert_crud.get_expert_stats(db)
-        
-        # Get top performers
-        top_performers = await expert_crud.get_expert_leaderboard(db, "all_time", 10)
-        stats["top_performers"] = top_performers
-        
+    async def get_expert_stats(primary: bool = False) -> Dict[str, Any]:
+        """Get expert statistics (sections load concurrently)"""
+        result = await load_sections("expert_stats", [
+            Section("stats", expert_crud.get_expert_stats, default={
+                "total_experts": 0, "active_experts": 0, "suspended_experts": 0,
+                "average_rating_all": None, "total_questions_answered": 0, "total_earnings": 0.0
+            }),
+            # Get top performers
+            Section(
+                "top_performers",
+                lambda conn: ExpertService._leaderboard_entries(conn, "all_time", 10),
+                default=[]
+            ),
+        ], primary=primary)
+        stats = dict(result["stats"])
+        stats["top_performers"] = result["top_performers"]
+        stats["unavailable_sections"] = result.unavailable
         return stats
 
@@ -131,4 +131,27 @@ class OverrideService:
         )
         
         return result
-
+    
+    @staticmethod
+    async def bypass_response_cache(
+        db: asyncpg.Connection,
+        question_id: UUID,
+        overridden_by: UUID,
+        reason: str,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Bypass the AI response cache"""
+        result = await override_crud.bypass_response_cache(
+            db, question_id, overridden_by, reason
+        )
+        
+        # Log admin action
+        await action_crud.log_admin_action(
+            db, overridden_by, "override_response_cache_bypass",
+            target_type="question", target_id=question_id,
+            details={"reason": reason},
+            ip_address=ip_address, user_agent=user_agent
+        )
+        
+        return result
@@ -8,6 +8,7 @@ from uuid import UUID
 from datetime import datetime
 from app.crud.admin import questions as question_crud
 from app.crud.admin import admin_actions as action_crud
+from app.utils.answer_reuse import answer_reuse
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,12 +28,13 @@ class QuestionService:
         date_to: Optional[datetime] = None,
         search: Optional[str] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """Get questions with filters"""
         return await question_crud.get_questions(
             db, status, subject, client_id, expert_id,
-            date_from, date_to, search, page, page_size
+            date_from, date_to, search, page, page_size, cursor
         )
     
     @staticmethod
@@ -170,4 +172,9 @@ class QuestionService:
     async def get_question_stats(db: asyncpg.Connection) -> Dict[str, Any]:
         """Get question statistics"""
         return await question_crud.get_question_stats(db)
+    
+    @staticmethod
+    async def get_answer_reuse_stats(db: asyncpg.Connection, days: int = 30) -> Dict[str, Any]:
+        """Get answer reuse hit rate and savings"""
+        return await answer_reuse.get_stats(db, days)
 
@@ -7,6 +7,7 @@ import asyncpg
 from uuid import UUID
 from app.crud.admin import queues as queue_crud
 from app.crud.admin import admin_actions as action_crud
+from app.services.ai.ocr_service import ocr_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,8 +21,15 @@ class QueueService:
         db: asyncpg.Connection,
         queue_name: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get queue status"""
-        return await queue_crud.get_queue_status(db, queue_name)
+        """Get queue status, including live in-process stages (OCR)"""
+        result = await queue_crud.get_queue_status(db, queue_name)
+        if queue_name in (None, "ocr"):
+            ocr = await ocr_service.queue_stats()
+            result["queues"] = [q for q in result["queues"] if q.get("queue_name") != "ocr"] + [ocr]
+            result["total_pending"] += ocr["pending_count"]
+            result["total_processing"] += ocr["processing_count"]
+            result["total_failed"] += ocr["failed_count"]
+        return result
     
     @staticmethod
     async def get_worker_status(
@@ -8,6 +8,7 @@ from uuid import UUID
 from datetime import datetime
 from app.crud.admin import revenue as revenue_crud
 from app.crud.admin import admin_actions as action_crud
+from app.utils.composite import Section, load_sections
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,11 +18,25 @@ class RevenueService:
     """Revenue management service"""
     
     @staticmethod
-    async def get_revenue_dashboard(
-        db: asyncpg.Connection
-    ) -> Dict[str, Any]:
-        """Get revenue dashboard statistics"""
-        return await revenue_crud.get_revenue_dashboard(db)
+    async def get_revenue_dashboard(primary: bool = False) -> Dict[str, Any]:
+        """Get revenue dashboard statistics (sections load concurrently)"""
+        result = await load_sections("revenue_dashboard", [
+            Section("totals", revenue_crud.get_revenue_totals, default={
+                "total_revenue": 0.0, "revenue_today": 0.0, "revenue_this_week": 0.0,
+                "revenue_this_month": 0.0, "revenue_this_year": 0.0,
+                "credits_sold": 0, "credits_sold_today": 0, "credits_sold_this_week": 0,
+                "credits_sold_this_month": 0, "average_transaction_value": 0.0,
+                "total_transactions": 0, "refund_rate": 0.0
+            }),
+            Section("top_spending_users", revenue_crud.get_top_spenders, default=[]),
+            Section("revenue_trend", revenue_crud.get_revenue_trend, default=[]),
+        ], primary=primary)
+        return {
+            **result["totals"],
+            "top_spending_users": result["top_spending_users"],
+            "revenue_trend": result["revenue_trend"],
+            "unavailable_sections": result.unavailable
+        }
     
     @staticmethod
     async def get_transactions(
@@ -105,9 +120,20 @@ class RevenueService:
             raise ValueError(str(e))
     
     @staticmethod
-    async def get_credits_stats(
-        db: asyncpg.Connection
-    ) -> Dict[str, Any]:
-        """Get credits statistics"""
-        return await revenue_crud.get_credits_stats(db)
+    async def get_credits_stats(primary: bool = False) -> Dict[str, Any]:
+        """Get credits statistics (sections load concurrently)"""
+        result = await load_sections("credits_stats", [
+            Section("totals", revenue_crud.get_credits_totals, default={
+                "total_credits_sold": 0, "total_revenue_from_credits": 0.0,
+                "average_credits_per_user": 0.0
+            }),
+            Section("credits_by_package", revenue_crud.get_credits_by_package, default={}),
+            Section("top_packages", revenue_crud.get_top_packages, default=[]),
+        ], primary=primary)
+        return {
+            **result["totals"],
+            "credits_by_package": result["credits_by_package"],
+            "top_packages": result["top_packages"],
+            "unavailable_sections": result.unavailable
+        }
 
@@ -8,6 +8,7 @@ from uuid import UUID
 from app.crud.admin import users as user_crud
 from app.crud.admin import admin_actions as action_crud
 from app.core.security import security
+from app.utils.user_directory import user_directory
 import secrets
 import logging
 
@@ -25,11 +26,12 @@ class UserService:
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """Get users with filters"""
         return await user_crud.get_users(
-            db, role, is_banned, is_active, search, page, page_size
+            db, role, is_banned, is_active, search, page, page_size, cursor
         )
     
     @staticmethod
@@ -60,6 +62,7 @@ class UserService:
         success = await user_crud.update_user_role(db, user_id, new_role, admin_id)
         
         if success:
+            await user_directory.invalidate(user_id)
             # Log action
             await action_crud.log_admin_action(
                 db, admin_id, "change_user_role",
@@ -84,6 +87,7 @@ class UserService:
         success = await user_crud.ban_user(db, user_id, banned, admin_id, reason)
         
         if success:
+            await user_directory.invalidate(user_id)
             # Log action
             await action_crud.log_admin_action(
                 db, admin_id, "ban_user" if banned else "unban_user",
@@ -144,6 +148,7 @@ class UserService:
         success = await user_crud.promote_to_expert(db, user_id, specialization)
         
         if success:
+            await user_directory.invalidate(user_id)
             # Log action
             await action_crud.log_admin_action(
                 db, admin_id, "promote_to_expert",
@@ -0,0 +1,4 @@
+"""
+AI services
+Answer generation against the configured AI providers
+"""
@@ -0,0 +1,326 @@
+"""
+AI answer generation service
+Fans a question out to the configured models concurrently; the first answer
+that clears the confidence threshold wins and the stragglers are cancelled.
+The lead model's tokens are streamed to the client as the draft is written.
+Responses are served from the response cache when the same normalized
+prompt was answered before.
+
+Failed and cancelled generations put the question back to 'pending'; a
+periodic sweep re-queues pending questions nobody picked up and reclaims
+ones left in 'processing' by a dead worker, up to AI_GENERATION_MAX_ATTEMPTS.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.utils.runtime_settings import runtime_settings
+from app.crud.ai import generation as generation_crud
+from app.db.session import db
+from app.services.ai.providers import ProviderClient, build_providers, resolve_model
+from app.services.ai.response_cache import response_cache, response_cache_key
+from app.services.ai.scoring_service import scoring_service
+from app.utils.answer_reuse import answer_reuse
+from app.utils.draft_stream import DraftWriter, draft_streams
+from app.utils.near_duplicates import near_duplicates
+from app.utils.queue import queue_service
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = "ai_generation"
+
+# Questions re-queued per sweep
+SWEEP_BATCH_SIZE = 100
+
+SYSTEM_PROMPT = (
+    "You are an expert tutor. Answer the student's question accurately and completely, "
+    "showing the key steps of your reasoning."
+)
+
+
+def build_messages(question_text: str, subject: Optional[str] = None) -> List[Dict[str, str]]:
+    """Chat messages for a question"""
+    system = SYSTEM_PROMPT if not subject else f"{SYSTEM_PROMPT} Subject: {subject}."
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": question_text},
+    ]
+
+
+class GenerationService:
+    """Concurrent multi-provider answer generation"""
+    
+    def __init__(
+        self,
+        providers: Optional[Dict[str, ProviderClient]] = None,
+        model_specs: Optional[List[str]] = None
+    ):
+        self.providers = providers if providers is not None else build_providers()
+        self.model_specs = model_specs
+        self._semaphore = asyncio.Semaphore(settings.ai_generation_workers)
+        self._tasks: set = set()
+        self._sweep_task: Optional[asyncio.Task] = None
+    
+    def models(self) -> List[Dict[str, str]]:
+        """Configured models that have a provider client and an API key"""
+        specs = self.model_specs or settings.ai_generation_models.split(",")
+        targets = []
+        for spec in specs:
+            target = resolve_model(spec)
+            if target and target["provider"] in self.providers:
+                targets.append(target)
+        return targets
+    
+    async def _call(
+        self,
+        target: Dict[str, str],
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        draft: Optional[DraftWriter] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        provider = self.providers[target["provider"]]
+        use_cache = use_cache and settings.ai_response_cache_enabled
+        if use_cache:
+            started = time.perf_counter()
+            key = response_cache_key(provider.name, target["model"], messages, max_tokens, temperature)
+            cached = await response_cache.get(provider.name, target["model"], key)
+            if cached is not None:
+                if draft:
+                    await draft.write(cached["text"])
+                cached.update(cached=True, latency_ms=(time.perf_counter() - started) * 1000)
+                return cached
+        
+        result = await provider.generate(
+            target["model"], target["api_key"], messages, max_tokens, temperature,
+            on_token=draft.write if draft else None
+        )
+        if use_cache and result["text"]:
+            await response_cache.put(provider.name, target["model"], key, result)
+        return result
+    
+    async def generate(
+        self,
+        question_text: str,
+        subject: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        targets: Optional[List[Dict[str, str]]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        draft: Optional[DraftWriter] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Ask every target model concurrently.
+        Returns as soon as one answer reaches `min_confidence` (default the
+        min_confidence_score runtime setting), cancelling the others; otherwise the
+        most confident answer once all have finished.
+        With `draft`, the first target streams its tokens into it and the stream
+        is finished with the chosen answer. `use_cache=False` skips the response
+        cache in both directions.
+        """
+        targets = targets if targets is not None else self.models()
+        if not targets:
+            raise RuntimeError("No AI models configured")
+        threshold = runtime_settings.get_float("min_confidence_score") if min_confidence is None else min_confidence
+        messages = build_messages(question_text, subject)
+        max_tokens = max_tokens or settings.ai_generation_max_tokens
+        temperature = settings.ai_generation_temperature if temperature is None else temperature
+        
+        tasks = {
+            asyncio.create_task(
+                self._call(target, messages, max_tokens, temperature, draft if idx == 0 else None, use_cache)
+            ): target
+            for idx, target in enumerate(targets)
+        }
+        pending = set(tasks)
+        best = None
+        attempts = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    target = tasks[task]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning(f"Generation failed on {target['provider']}:{target['model']}: {e}")
+                        attempts.append({"provider": target["provider"], "model": target["model"], "error": str(e)})
+                        continue
+                    attempts.append({
+                        "provider": result["provider"],
+                        "model": result["model"],
+                        "confidence": round(result["confidence"], 4),
+                        "latency_ms": result["latency_ms"],
+                        "cached": result.get("cached", False)
+                    })
+                    if best is None or result["confidence"] > best["confidence"]:
+                        best = result
+                if best is not None and best["confidence"] >= threshold:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        if draft is not None and best is not None:
+            await draft.finish(best["text"])
+        
+        return {
+            "answer": best,
+            "accepted": best is not None and best["confidence"] >= threshold,
+            "attempts": attempts,
+            "cancelled": len(pending)
+        }
+    
+    async def process_question(self, conn, question_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Produce the draft answer for a pending question: use an open answer reuse
+        offer if there is one, otherwise generate. Returns None if the question
+        was not claimable.
+        """
+        question = await generation_crud.claim_question(conn, question_id)
+        if not question:
+            return None
+        
+        try:
+            offer = await answer_reuse.get_offer(conn, question_id)
+            if offer and offer["status"] == "offered":
+                answer_id = await answer_reuse.use_for_draft(conn, question_id)
+                if answer_id:
+                    await generation_crud.mark_reused(conn, question_id, answer_id)
+                    await scoring_service.enqueue(answer_id)
+                    return {"question_id": question_id, "answer_id": answer_id, "reused": True}
+            
+            metadata = question["metadata"]
+            min_confidence = None
+            if metadata.get("confidence_overridden") and metadata.get("min_confidence_override") is not None:
+                min_confidence = float(metadata["min_confidence_override"])
+            
+            # Admins can force a fresh generation (override "cache-bypass")
+            result = await self.generate(
+                question["question_text"], question["subject"], min_confidence,
+                draft=draft_streams.writer(question_id, conn),
+                use_cache=not metadata.get("response_cache_bypassed")
+            )
+            answer = result["answer"]
+            if answer is None:
+                raise RuntimeError("All AI providers failed")
+            
+            answer_id = await generation_crud.save_generated_answer(
+                conn, question_id, answer["text"], answer["confidence"], {
+                    "provider": answer["provider"],
+                    "model": answer["model"],
+                    "latency_ms": answer["latency_ms"],
+                    "cached": answer.get("cached", False),
+                    "prompt_tokens": answer.get("prompt_tokens"),
+                    "completion_tokens": answer.get("completion_tokens"),
+                    "below_confidence_threshold": not result["accepted"],
+                    "attempts": result["attempts"]
+                }
+            )
+        except BaseException as e:
+            # Cancelled generations (stop(), worker shutdown) are released too
+            try:
+                await generation_crud.release_question(conn, question_id, str(e) or type(e).__name__)
+            except Exception as release_error:
+                logger.error(f"Could not release question {question_id}: {release_error}")
+            raise
+        
+        try:
+            await near_duplicates.check_and_index(conn, answer_id, "answer", answer["text"])
+        except Exception as e:
+            logger.warning(f"Near-duplicate check failed for answer {answer_id}: {e}")
+        await scoring_service.enqueue(answer_id)
+        
+        return {"question_id": question_id, "answer_id": answer_id, "reused": False}
+    
+    async def _run(self, question_id: UUID):
+        async with self._semaphore:
+            if not db.pool:
+                return
+            try:
+                async with db.acquire("background") as conn:
+                    await self.process_question(conn, question_id)
+            except Exception as e:
+                logger.error(f"Generation failed for question {question_id}: {e}")
+    
+    async def _on_message(self, message: Dict[str, Any]):
+        await self._run(UUID(message["question_id"]))
+    
+    async def enqueue(self, question_id: UUID):
+        """Queue a question for generation (RabbitMQ when connected, otherwise in-process)"""
+        if queue_service.channel:
+            try:
+                await queue_service.publish(QUEUE_NAME, {"question_id": str(question_id)})
+                return
+            except Exception as e:
+                logger.warning(f"Could not queue question {question_id}, generating in-process: {e}")
+        task = asyncio.create_task(self._run(question_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def requeue_orphans(self, conn) -> int:
+        """
+        Reclaim questions whose generation lease expired and queue pending,
+        unanswered questions again; returns how many were queued
+        """
+        released = await generation_crud.release_stale_questions(conn, settings.ai_generation_lease_seconds)
+        if released:
+            logger.warning(f"Reclaimed {released} questions abandoned mid-generation")
+        question_ids = await generation_crud.take_retryable_questions(
+            conn, settings.ai_generation_retry_after_seconds, settings.ai_generation_max_attempts, SWEEP_BATCH_SIZE
+        )
+        for question_id in question_ids:
+            await self.enqueue(question_id)
+        return len(question_ids)
+    
+    async def _sweep_loop(self):
+        while True:
+            try:
+                if db.pool:
+                    async with db.acquire("background") as conn:
+                        requeued = await self.requeue_orphans(conn)
+                    if requeued:
+                        logger.info(f"Re-queued {requeued} questions for generation")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Generation sweep failed: {e}")
+            await asyncio.sleep(settings.ai_generation_sweep_interval_seconds)
+    
+    async def start(self):
+        """
+        Consume the generation queue when RabbitMQ is connected and start the
+        sweep (AI_GENERATION_SWEEP_INTERVAL_SECONDS=0 disables it)
+        """
+        if self._sweep_task is None and settings.ai_generation_sweep_interval_seconds > 0:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+        if queue_service.channel:
+            await queue_service.consume(QUEUE_NAME, self._on_message)
+    
+    async def stop(self):
+        """Stop the sweep, cancel in-process generations and close provider connection pools"""
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for provider in self.providers.values():
+            await provider.close()
+
+
+# Global generation service instance
+generation_service = GenerationService()
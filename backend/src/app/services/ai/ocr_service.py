@@ -0,0 +1,323 @@
+"""
+OCR stage for image questions
+Reads question images in a process pool (Tesseract is CPU-bound), caches the
+text by image content hash (Redis, then Postgres) and appends it to the
+question before it is queued for AI generation. Questions wait for OCR in the
+"ocr" RabbitMQ queue, consumed by every worker that has Tesseract (in-process
+without RabbitMQ). External image URLs are only fetched from
+OCR_IMAGE_URL_HOSTS, never from private addresses, and redirects are refused.
+"""
+
+import asyncio
+import hashlib
+import ipaddress
+import json
+import logging
+import socket
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from uuid import UUID
+
+import httpx
+import numpy as np
+
+from app.core.config import settings
+from app.crud.ai import ocr as ocr_crud
+from app.db.session import db
+from app.utils.cache import cache
+from app.utils.ocr import run_ocr, tesseract_version
+from app.utils.queue import queue_service
+from app.utils.uploads import upload_hash_from_url
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = "ocr"
+CACHE_PREFIX = "ocr:"
+# Completed/failed/cache-hit counts of all workers
+STATS_KEY = "ocr:stats"
+LATENCY_SAMPLES = 500
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest of the image bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+async def check_image_url(url: str) -> None:
+    """Refuse image URLs outside OCR_IMAGE_URL_HOSTS or resolving to a non-public address"""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise ValueError("Image URL must be http(s)")
+    if host not in settings.ocr_image_url_hosts:
+        raise ValueError(f"Images are not fetched from {host}")
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, parts.port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM
+    )
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0])
+        if not address.is_global:
+            raise ValueError(f"{host} resolves to a non-public address")
+
+
+class OCRService:
+    """Process-pool OCR with a content-hash result cache"""
+    
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: set = set()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._consuming = False
+    
+    @property
+    def enabled(self) -> bool:
+        return self._executor is not None
+    
+    async def _count(self, field: str) -> None:
+        """Count an outcome on this worker and in the shared stats"""
+        setattr(self, field, getattr(self, field) + 1)
+        if cache.client:
+            try:
+                await cache.client.hincrby(STATS_KEY, field, 1)
+            except Exception as e:
+                logger.error(f"OCR stats update failed: {e}")
+    
+    async def _cached(self, digest: str) -> Optional[Dict[str, Any]]:
+        if cache.client:
+            try:
+                value = await cache.client.get(f"{CACHE_PREFIX}{digest}")
+                if value is not None:
+                    return json.loads(value)
+            except Exception as e:
+                logger.error(f"OCR cache read failed: {e}")
+        if db.pool:
+            async with db.acquire("background") as conn:
+                result = await ocr_crud.get_ocr_result(conn, digest)
+            if result:
+                await self._remember(digest, result)
+                return result
+        return None
+    
+    async def _remember(self, digest: str, result: Dict[str, Any]) -> None:
+        if cache.client:
+            try:
+                await cache.client.set(
+                    f"{CACHE_PREFIX}{digest}", json.dumps(result), ex=settings.ocr_cache_ttl_seconds
+                )
+            except Exception as e:
+                logger.error(f"OCR cache write failed: {e}")
+    
+    async def _run(self, data: bytes) -> Dict[str, Any]:
+        """Read one image in the process pool"""
+        # The pool reads ocr_workers images at a time; the rest wait in its queue
+        self.in_flight += 1
+        try:
+            return await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(
+                    self._executor, run_ocr, data, settings.ocr_max_dimension, settings.ocr_languages
+                ),
+                settings.ocr_timeout_seconds
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); replace the pool so later images still run
+            self._restart_pool()
+            raise RuntimeError("OCR worker process died")
+        finally:
+            self.in_flight -= 1
+    
+    async def extract(self, data: bytes) -> Dict[str, Any]:
+        """Text of one image; cached by content hash so the same image is only read once"""
+        digest = content_hash(data)
+        cached = await self._cached(digest)
+        if cached is not None:
+            await self._count("cache_hits")
+            return dict(cached, content_hash=digest, cached=True)
+        if not self.enabled:
+            raise RuntimeError("OCR is not available")
+        
+        started = time.perf_counter()
+        try:
+            result = await self._run(data)
+        except Exception:
+            await self._count("failed")
+            raise
+        await self._count("completed")
+        self._latencies.append((time.perf_counter() - started) * 1000)
+        
+        await self._remember(digest, result)
+        if db.pool:
+            async with db.acquire("background") as conn:
+                await ocr_crud.save_ocr_result(conn, digest, result)
+        return dict(result, content_hash=digest, cached=False)
+    
+    async def fetch_image(self, url: str) -> bytes:
+        """Download an image from an allowed host, refusing redirects and anything over max_file_size_mb"""
+        await check_image_url(url)
+        limit = settings.max_file_size_mb * 1024 * 1024
+        async with httpx.AsyncClient(timeout=settings.ocr_timeout_seconds, follow_redirects=False) as client:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > limit:
+                        raise ValueError(f"Image larger than {settings.max_file_size_mb}MB")
+                    chunks.append(chunk)
+        return b"".join(chunks)
+    
+    async def _load_image(self, source) -> bytes:
+        """Bytes of an image given as raw bytes, an upload URL of this API or an http(s) URL"""
+        if isinstance(source, bytes):
+            return source
+        upload_hash = upload_hash_from_url(source)
+        if upload_hash:
+            from app.services.client.upload_service import UploadService
+            async with db.acquire("background") as conn:
+                return await UploadService.read_image(conn, upload_hash)
+        return await self.fetch_image(source)
+    
+    async def _read_image(self, source) -> Dict[str, Any]:
+        try:
+            return await self.extract(await self._load_image(source))
+        except Exception as e:
+            logger.warning(f"OCR failed for image: {e}")
+            return {"error": str(e)}
+    
+    async def process_question(
+        self,
+        question_id: UUID,
+        images: List[bytes],
+        image_urls: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read the question's images (raw bytes, stored uploads and http(s) URLs) and append
+        their text to the question, then queue it for AI generation.
+        """
+        from app.services.ai.generation_service import generation_service
+        
+        sources: List[Any] = list(images) + [
+            url for url in image_urls or []
+            if upload_hash_from_url(url) or url.startswith(("http://", "https://"))
+        ]
+        results = []
+        try:
+            results = await asyncio.gather(*[self._read_image(source) for source in sources])
+            texts = [r["text"] for r in results if r.get("text")]
+            if texts and db.pool:
+                image_text = "".join(
+                    f"\n\n[Text from image {idx + 1}]\n{text}" for idx, text in enumerate(texts)
+                )
+                async with db.acquire("background") as conn:
+                    await ocr_crud.append_question_image_text(conn, question_id, image_text, [
+                        {key: r.get(key) for key in ("content_hash", "cached", "skew_angle", "processing_ms", "error")}
+                        for r in results
+                    ])
+        except Exception as e:
+            logger.error(f"OCR stage failed for question {question_id}: {e}")
+        finally:
+            await generation_service.enqueue(question_id)
+        return results
+    
+    async def _on_message(self, message: Dict[str, Any]):
+        await self.process_question(UUID(message["question_id"]), [], message.get("image_urls"))
+    
+    async def enqueue(
+        self,
+        question_id: UUID,
+        images: List[bytes],
+        image_urls: Optional[List[str]] = None
+    ) -> None:
+        """
+        Queue a question for the OCR stage (RabbitMQ when connected, otherwise
+        in-process); generation is queued when it finishes. Raw image bytes are
+        always read in-process.
+        """
+        if queue_service.channel and not images:
+            try:
+                await queue_service.publish(QUEUE_NAME, {
+                    "question_id": str(question_id),
+                    "image_urls": list(image_urls or [])
+                })
+                return
+            except Exception as e:
+                logger.warning(f"Could not queue question {question_id} for OCR, reading in-process: {e}")
+        task = asyncio.create_task(self.process_question(question_id, images, image_urls))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def queue_stats(self) -> Dict[str, Any]:
+        """
+        Queue depth and outcome counts across workers (RabbitMQ and Redis when
+        available, else this worker's), and this worker's per-image latency
+        """
+        latencies = np.fromiter(self._latencies, dtype=float)
+        counts = {"completed": self.completed, "failed": self.failed, "cache_hits": self.cache_hits}
+        if cache.client:
+            try:
+                shared = await cache.client.hgetall(STATS_KEY)
+                counts = {field: int(shared.get(field, 0)) for field in counts}
+            except Exception as e:
+                logger.error(f"OCR stats read failed: {e}")
+        queued = 0
+        try:
+            queued = await queue_service.message_count(QUEUE_NAME) or 0
+        except Exception as e:
+            logger.error(f"OCR queue depth read failed: {e}")
+        return {
+            "queue_name": "ocr",
+            "pending_count": queued + max(self.in_flight - settings.ocr_workers, 0),
+            "processing_count": min(self.in_flight, settings.ocr_workers),
+            "completed_count": counts["completed"],
+            "failed_count": counts["failed"],
+            "cache_hits": counts["cache_hits"],
+            "workers": settings.ocr_workers if self.enabled else 0,
+            "average_processing_time": float(latencies.mean()) if latencies.size else None,
+            "p95_processing_time": float(np.percentile(latencies, 95)) if latencies.size else None,
+            "status": "healthy" if self.enabled else "disabled"
+        }
+    
+    def _restart_pool(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = ProcessPoolExecutor(
+            max_workers=settings.ocr_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    
+    async def start(self):
+        """Start the OCR worker processes and consume the OCR queue when RabbitMQ is connected"""
+        if not settings.ocr_enabled or self._executor is not None:
+            return
+        try:
+            version = tesseract_version()
+        except RuntimeError as e:
+            logger.warning(f"{e}. Image questions will not be read.")
+            return
+        self._restart_pool()
+        logger.info(f"OCR process pool started with {settings.ocr_workers} workers (Tesseract {version})")
+        if queue_service.channel and not self._consuming:
+            await queue_service.consume(QUEUE_NAME, self._on_message)
+            self._consuming = True
+    
+    async def stop(self):
+        """Cancel running OCR stages and shut the process pool down"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global OCR service instance
+ocr_service = OCRService()
@@ -0,0 +1,481 @@
+"""
+AI provider clients
+One shared HTTP/2 connection pool, concurrency limit and token budget per provider
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from app.core.config import settings
+from app.services.ai.resilience import ProviderResilience
+
+logger = logging.getLogger(__name__)
+
+# Poe bots behind each settings.poe_api_key_* alias
+POE_BOTS = {
+    "chatgpt": "GPT-4o",
+    "claude": "Claude-Sonnet-4",
+    "gemini": "Gemini-2.5-Pro",
+    "grok": "Grok-4",
+    "qwen": "Qwen3-235B-A22B",
+    "deepseek": "DeepSeek-R1",
+    "gpt_oss": "GPT-OSS-120B",
+    "kimi": "Kimi-K2",
+}
+
+REFUSAL_PREFIXES = ("i'm sorry", "i am sorry", "i can't", "i cannot", "as an ai")
+TRUNCATED_FINISH_REASONS = ("length", "max_tokens", "MAX_TOKENS")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for budget reservations"""
+    return max(1, len(text or "") // 4)
+
+
+def score_confidence(result: Dict[str, Any]) -> float:
+    """
+    Confidence in a provider answer, 0..1.
+    Uses the mean token probability when the provider returns logprobs,
+    otherwise a fixed prior; truncated answers and refusals are penalized.
+    """
+    text = (result.get("text") or "").strip()
+    if not text:
+        return 0.0
+    if result.get("avg_logprob") is not None:
+        confidence = math.exp(result["avg_logprob"])
+    else:
+        confidence = 0.8
+    if result.get("finish_reason") in TRUNCATED_FINISH_REASONS:
+        confidence *= 0.5
+    if text.lower().startswith(REFUSAL_PREFIXES):
+        confidence *= 0.2
+    return max(0.0, min(1.0, confidence))
+
+
+class TokenBudget:
+    """Sliding one-minute token budget"""
+    
+    def __init__(self, tokens_per_minute: int, window_seconds: float = 60.0):
+        self.tokens_per_minute = tokens_per_minute
+        self.window_seconds = window_seconds
+        self._entries: deque = deque()
+    
+    def used(self) -> int:
+        """Tokens reserved or spent within the window"""
+        cutoff = time.monotonic() - self.window_seconds
+        while self._entries and self._entries[0][0] < cutoff:
+            self._entries.popleft()
+        return sum(entry[1] for entry in self._entries)
+    
+    def reserve(self, tokens: int) -> Optional[list]:
+        """Reserve `tokens`; returns a handle for settle(), or None if over budget"""
+        if self.tokens_per_minute and self.used() + tokens > self.tokens_per_minute:
+            return None
+        entry = [time.monotonic(), tokens]
+        self._entries.append(entry)
+        return entry
+    
+    @staticmethod
+    def settle(entry: list, actual_tokens: int) -> None:
+        """Replace a reservation with the tokens actually used"""
+        entry[1] = actual_tokens
+
+
+class ProviderClient:
+    """Base provider client; subclasses map requests and responses"""
+    
+    supports_logprobs = False
+    models_path = "/models"
+    
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        max_concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency or settings.ai_provider_max_concurrency
+        self.timeout = timeout or settings.ai_generation_timeout_seconds
+        self.budget = TokenBudget(
+            tokens_per_minute if tokens_per_minute is not None else settings.ai_provider_tokens_per_minute
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+        self.resilience = ProviderResilience(name)
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared connection pool, created on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self._client
+    
+    async def close(self):
+        """Close the connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def build_request(
+        self,
+        model: str,
+        api_key: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """(path, headers, json body) for a generation request"""
+        raise NotImplementedError
+    
+    def parse_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a provider response to text/finish_reason/token counts"""
+        raise NotImplementedError
+    
+    def auth_headers(self, api_key: str) -> Dict[str, str]:
+        """Authentication headers for the provider"""
+        raise NotImplementedError
+    
+    def build_stream_request(
+        self,
+        model: str,
+        api_key: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """(path, headers, json body) for a streaming (server-sent events) request"""
+        raise NotImplementedError
+    
+    def parse_stream_event(self, data: Dict[str, Any], state: Dict[str, Any]) -> Optional[str]:
+        """Text delta carried by one stream event; finish reason and usage go into `state`"""
+        raise NotImplementedError
+    
+    async def check(self, api_key: str) -> Dict[str, Any]:
+        """Cheap authenticated request (list models) to verify a key; returns status and latency"""
+        started = time.perf_counter()
+        response = await self.client.get(self.models_path, headers=self.auth_headers(api_key))
+        return {
+            "ok": response.status_code == 200,
+            "status_code": response.status_code,
+            "response_time_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    
+    async def _post(
+        self,
+        model: str,
+        api_key: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float
+    ) -> Dict[str, Any]:
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                path, headers, body = self.build_request(model, api_key, messages, max_tokens, temperature)
+                response = await self.client.post(path, headers=headers, json=body)
+                response.raise_for_status()
+                return self.parse_response(response.json())
+            finally:
+                self.in_flight -= 1
+    
+    async def _stream_post(
+        self,
+        model: str,
+        api_key: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        on_token: Callable[[str], Awaitable[None]]
+    ) -> Dict[str, Any]:
+        state: Dict[str, Any] = {"logprob_sum": 0.0, "logprob_count": 0}
+        parts = []
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                path, headers, body = self.build_stream_request(model, api_key, messages, max_tokens, temperature)
+                async with self.client.stream("POST", path, headers=headers, json=body) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        payload = line[5:].strip()
+                        if not payload or payload == "[DONE]":
+                            continue
+                        delta = self.parse_stream_event(json.loads(payload), state)
+                        if delta:
+                            parts.append(delta)
+                            await on_token(delta)
+            finally:
+                self.in_flight -= 1
+        return {
+            "text": "".join(parts),
+            "finish_reason": state.get("finish_reason"),
+            "prompt_tokens": state.get("prompt_tokens"),
+            "completion_tokens": state.get("completion_tokens"),
+            "avg_logprob": (
+                state["logprob_sum"] / state["logprob_count"] if state["logprob_count"] else None
+            ),
+        }
+    
+    async def generate(
+        self,
+        model: str,
+        api_key: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run one generation within the provider's concurrency limit and token budget,
+        behind its circuit breaker, adaptive timeout and request hedging.
+        A hedge is only sent when a connection slot is free and its tokens fit the budget.
+        With `on_token` the answer is streamed and each text delta is passed to it
+        (streamed calls are never hedged).
+        """
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        reservation = self.budget.reserve(prompt_tokens + max_tokens)
+        if reservation is None:
+            raise RuntimeError(f"{self.name} token budget exhausted")
+        
+        hedges = []
+        
+        def can_hedge() -> bool:
+            if on_token is not None or self._semaphore.locked():
+                return False
+            hedge = self.budget.reserve(prompt_tokens + max_tokens)
+            if hedge is None:
+                return False
+            hedges.append(hedge)
+            return True
+        
+        def call():
+            if on_token is not None:
+                return self._stream_post(model, api_key, messages, max_tokens, temperature, on_token)
+            return self._post(model, api_key, messages, max_tokens, temperature)
+        
+        spent = prompt_tokens
+        try:
+            started = time.perf_counter()
+            result = await self.resilience.call(model, call, can_hedge)
+            latency_ms = (time.perf_counter() - started) * 1000
+            spent = (result.get("prompt_tokens") or prompt_tokens) + (result.get("completion_tokens") or 0)
+        finally:
+            self.budget.settle(reservation, spent)
+            # The losing request was cancelled after its prompt was sent
+            for hedge in hedges:
+                self.budget.settle(hedge, prompt_tokens)
+        
+        result.update(provider=self.name, model=model, latency_ms=round(latency_ms, 1))
+        result["confidence"] = score_confidence(result)
+        return result
+
+
+class OpenAICompatibleProvider(ProviderClient):
+    """OpenAI chat completions API (also used by xAI and Poe)"""
+    
+    def __init__(self, name: str, base_url: str, supports_logprobs: bool = False, **kwargs):
+        super().__init__(name, base_url, **kwargs)
+        self.supports_logprobs = supports_logprobs
+    
+    def build_request(self, model, api_key, messages, max_tokens, temperature):
+        body = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if self.supports_logprobs:
+            body["logprobs"] = True
+        return "/chat/completions", self.auth_headers(api_key), body
+    
+    def auth_headers(self, api_key):
+        return {"Authorization": f"Bearer {api_key}"}
+    
+    def build_stream_request(self, model, api_key, messages, max_tokens, temperature):
+        path, headers, body = self.build_request(model, api_key, messages, max_tokens, temperature)
+        body["stream"] = True
+        body["stream_options"] = {"include_usage": True}
+        return path, headers, body
+    
+    def parse_stream_event(self, data, state):
+        usage = data.get("usage")
+        if usage:
+            state["prompt_tokens"] = usage.get("prompt_tokens")
+            state["completion_tokens"] = usage.get("completion_tokens")
+        choices = data.get("choices") or []
+        if not choices:
+            return None
+        choice = choices[0]
+        if choice.get("finish_reason"):
+            state["finish_reason"] = choice["finish_reason"]
+        for token in ((choice.get("logprobs") or {}).get("content")) or []:
+            state["logprob_sum"] += token["logprob"]
+            state["logprob_count"] += 1
+        return (choice.get("delta") or {}).get("content")
+    
+    def parse_response(self, data):
+        choice = (data.get("choices") or [{}])[0]
+        usage = data.get("usage") or {}
+        avg_logprob = None
+        tokens = ((choice.get("logprobs") or {}).get("content")) or []
+        if tokens:
+            avg_logprob = sum(t["logprob"] for t in tokens) / len(tokens)
+        return {
+            "text": (choice.get("message") or {}).get("content") or "",
+            "finish_reason": choice.get("finish_reason"),
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "avg_logprob": avg_logprob,
+        }
+
+
+class AnthropicProvider(ProviderClient):
+    """Anthropic messages API"""
+    
+    def build_request(self, model, api_key, messages, max_tokens, temperature):
+        system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+        body = {
+            "model": model,
+            "messages": [m for m in messages if m["role"] != "system"],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if system:
+            body["system"] = system
+        return "/messages", self.auth_headers(api_key), body
+    
+    def auth_headers(self, api_key):
+        return {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+    
+    def build_stream_request(self, model, api_key, messages, max_tokens, temperature):
+        path, headers, body = self.build_request(model, api_key, messages, max_tokens, temperature)
+        body["stream"] = True
+        return path, headers, body
+    
+    def parse_stream_event(self, data, state):
+        event_type = data.get("type")
+        if event_type == "message_start":
+            state["prompt_tokens"] = ((data.get("message") or {}).get("usage") or {}).get("input_tokens")
+        elif event_type == "message_delta":
+            state["finish_reason"] = (data.get("delta") or {}).get("stop_reason")
+            state["completion_tokens"] = (data.get("usage") or {}).get("output_tokens")
+        elif event_type == "content_block_delta":
+            delta = data.get("delta") or {}
+            if delta.get("type") == "text_delta":
+                return delta.get("text")
+        return None
+    
+    def parse_response(self, data):
+        usage = data.get("usage") or {}
+        return {
+            "text": "".join(
+                block.get("text", "") for block in data.get("content") or [] if block.get("type") == "text"
+            ),
+            "finish_reason": data.get("stop_reason"),
+            "prompt_tokens": usage.get("input_tokens"),
+            "completion_tokens": usage.get("output_tokens"),
+            "avg_logprob": None,
+        }
+
+
+class GoogleProvider(ProviderClient):
+    """Google Gemini generateContent API"""
+    
+    def build_request(self, model, api_key, messages, max_tokens, temperature):
+        system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+        body = {
+            "contents": [
+                {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+                for m in messages if m["role"] != "system"
+            ],
+            "generationConfig": {"maxOutputTokens": max_tokens, "temperature": temperature},
+        }
+        if system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        return f"/models/{model}:generateContent", self.auth_headers(api_key), body
+    
+    def auth_headers(self, api_key):
+        return {"x-goog-api-key": api_key}
+    
+    def build_stream_request(self, model, api_key, messages, max_tokens, temperature):
+        _, headers, body = self.build_request(model, api_key, messages, max_tokens, temperature)
+        return f"/models/{model}:streamGenerateContent?alt=sse", headers, body
+    
+    def parse_stream_event(self, data, state):
+        usage = data.get("usageMetadata") or {}
+        if usage:
+            state["prompt_tokens"] = usage.get("promptTokenCount")
+            state["completion_tokens"] = usage.get("candidatesTokenCount")
+        candidate = (data.get("candidates") or [{}])[0]
+        if candidate.get("finishReason"):
+            state["finish_reason"] = candidate["finishReason"]
+        parts = (candidate.get("content") or {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts) or None
+    
+    def parse_response(self, data):
+        candidate = (data.get("candidates") or [{}])[0]
+        usage = data.get("usageMetadata") or {}
+        parts = (candidate.get("content") or {}).get("parts") or []
+        return {
+            "text": "".join(part.get("text", "") for part in parts),
+            "finish_reason": candidate.get("finishReason"),
+            "prompt_tokens": usage.get("promptTokenCount"),
+            "completion_tokens": usage.get("candidatesTokenCount"),
+            "avg_logprob": candidate.get("avgLogprobs"),
+        }
+
+
+def build_providers() -> Dict[str, ProviderClient]:
+    """Provider clients for every provider the engine can call"""
+    return {
+        "openai": OpenAICompatibleProvider("openai", settings.openai_base_url, supports_logprobs=True),
+        "xai": OpenAICompatibleProvider("xai", settings.xai_base_url),
+        "poe": OpenAICompatibleProvider("poe", settings.poe_base_url),
+        "anthropic": AnthropicProvider("anthropic", settings.anthropic_base_url),
+        "google": GoogleProvider("google", settings.google_base_url),
+    }
+
+
+def resolve_model(spec: str) -> Optional[Dict[str, str]]:
+    """
+    Resolve a 'provider:model' spec to provider, model and API key.
+    Poe specs name the key alias ('poe:claude' uses settings.poe_api_key_claude).
+    Returns None for malformed specs and providers without a key.
+    """
+    provider, _, model = spec.strip().partition(":")
+    if not provider or not model:
+        return None
+    if provider == "poe":
+        api_key = getattr(settings, f"poe_api_key_{model}", "")
+        model = POE_BOTS.get(model, model)
+    else:
+        api_key = getattr(settings, f"{provider}_api_key", "")
+    if not api_key:
+        return None
+    return {"provider": provider, "model": model, "api_key": api_key}
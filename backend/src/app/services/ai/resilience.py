@@ -0,0 +1,243 @@
+"""
+Resilience for outbound AI provider calls
+Per provider/model circuit breakers, rolling latency histograms, adaptive
+timeouts and hedged requests
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Latency bucket upper bounds in ms: ~12% apart from 10ms to ~10 minutes
+LATENCY_BUCKETS_MS = [10 * 1.12 ** i for i in range(100)]
+
+MIN_SAMPLES = 20
+
+
+class RollingHistogram:
+    """Latency histogram over a sliding window, kept as time slices of bucket counts"""
+    
+    def __init__(self, window_seconds: float = 300.0, slices: int = 10):
+        self.slice_seconds = window_seconds / slices
+        self._counts = [[0] * (len(LATENCY_BUCKETS_MS) + 1) for _ in range(slices)]
+        self._slice_ids = [-1] * slices
+    
+    def _current(self) -> List[int]:
+        slice_id = int(time.monotonic() // self.slice_seconds)
+        idx = slice_id % len(self._counts)
+        if self._slice_ids[idx] != slice_id:
+            self._slice_ids[idx] = slice_id
+            self._counts[idx] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        return self._counts[idx]
+    
+    def record(self, latency_ms: float) -> None:
+        self._current()[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+    
+    def _merged(self) -> List[int]:
+        oldest = int(time.monotonic() // self.slice_seconds) - len(self._counts) + 1
+        merged = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for slice_id, counts in zip(self._slice_ids, self._counts):
+            if slice_id >= oldest:
+                for i, count in enumerate(counts):
+                    merged[i] += count
+        return merged
+    
+    def count(self) -> int:
+        return sum(self._merged())
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the q-th quantile, or None without enough samples"""
+        merged = self._merged()
+        total = sum(merged)
+        if total < MIN_SAMPLES:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(merged):
+            cumulative += count
+            if cumulative >= rank:
+                return LATENCY_BUCKETS_MS[min(i, len(LATENCY_BUCKETS_MS) - 1)]
+        return LATENCY_BUCKETS_MS[-1]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures, rejects calls for
+    `cooldown_seconds`, then lets a single probe through (half-open).
+    """
+    
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+    
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+    
+    def release_probe(self) -> None:
+        """A probe was abandoned without a result; let another one through"""
+        self._probe_in_flight = False
+    
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._probe_in_flight or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+
+class CallHealth:
+    """Breaker, latency histogram and counters for one provider/model"""
+    
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            settings.ai_breaker_failure_threshold, settings.ai_breaker_cooldown_seconds
+        )
+        self.latency = RollingHistogram()
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.rejected = 0
+    
+    def timeout_seconds(self) -> float:
+        """p99 latency times the configured multiplier, clamped to the configured bounds"""
+        ceiling = settings.ai_generation_timeout_seconds
+        p99 = self.latency.percentile(0.99)
+        if p99 is None:
+            return ceiling
+        adaptive = p99 / 1000 * settings.ai_timeout_p99_multiplier
+        return max(settings.ai_timeout_min_seconds, min(adaptive, ceiling))
+    
+    def hedge_delay_seconds(self) -> Optional[float]:
+        """Observed p95 latency; None until there are enough samples"""
+        p95 = self.latency.percentile(0.95)
+        return p95 / 1000 if p95 is not None else None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "samples": self.latency.count(),
+            "p50_ms": self.latency.percentile(0.5),
+            "p95_ms": self.latency.percentile(0.95),
+            "p99_ms": self.latency.percentile(0.99),
+            "timeout_seconds": round(self.timeout_seconds(), 2),
+        }
+
+
+class ProviderResilience:
+    """Resilient call wrapper for one provider, tracking health per model"""
+    
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._health: Dict[str, CallHealth] = {}
+    
+    def health(self, model: str) -> CallHealth:
+        if model not in self._health:
+            self._health[model] = CallHealth()
+        return self._health[model]
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Health of every model called through this provider"""
+        return {model: health.snapshot() for model, health in self._health.items()}
+    
+    async def _attempt(self, health: CallHealth, model: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(call(), timeout=health.timeout_seconds())
+        except asyncio.TimeoutError:
+            health.timeouts += 1
+            health.failures += 1
+            health.breaker.record_failure()
+            raise RuntimeError(f"{self.provider}:{model} timed out") from None
+        except asyncio.CancelledError:
+            health.breaker.release_probe()
+            raise
+        except Exception:
+            health.failures += 1
+            health.breaker.record_failure()
+            raise
+        health.latency.record((time.perf_counter() - started) * 1000)
+        health.successes += 1
+        health.breaker.record_success()
+        return result
+    
+    async def call(
+        self,
+        model: str,
+        call: Callable[[], Awaitable[Any]],
+        can_hedge: Optional[Callable[[], bool]] = None
+    ) -> Any:
+        """
+        Run `call` behind the model's circuit breaker with an adaptive timeout.
+        If it is still running after the observed p95 latency and `can_hedge()`
+        allows it, a second identical request is raced against it.
+        """
+        health = self.health(model)
+        if not health.breaker.allow():
+            health.rejected += 1
+            raise RuntimeError(f"Circuit open for {self.provider}:{model}")
+        
+        primary = asyncio.create_task(self._attempt(health, model, call))
+        hedge = None
+        hedge_delay = health.hedge_delay_seconds() if settings.ai_hedging_enabled else None
+        try:
+            if hedge_delay is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if done or (can_hedge is not None and not can_hedge()):
+                return await primary
+            
+            health.hedges += 1
+            hedge = asyncio.create_task(self._attempt(health, model, call))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if winners:
+                    if winners[0] is hedge:
+                        health.hedge_wins += 1
+                    return winners[0].result()
+            # Both attempts failed
+            return primary.result()
+        finally:
+            losers = [task for task in (primary, hedge) if task is not None and not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
@@ -0,0 +1,239 @@
+"""
+Provider response cache
+Content-addressed by the normalized prompt, model and sampling parameters so
+repeated questions (differing only in whitespace, casing or sentence
+punctuation) do not trigger paid provider calls. Redis is the hot tier with
+TTL and LRU eviction; Postgres holds zlib-compressed responses behind it.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "aicache:"
+LRU_KEY = "aicache:lru"
+STATS_KEY = "aicache:stats"
+
+# Sentence punctuation is dropped; decimal/thousands separators and ratios
+# (punctuation between digits) and math operators are kept, since "2 + 2"
+# and "2 - 2" are different questions
+_TRIVIAL_PUNCTUATION_RE = re.compile(r"(?<!\d)[.,:;](?!\d)|[!?\"'`‘’“”]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Store an entry and evict the least recently used ones beyond the limit.
+# KEYS[1] = entry key, KEYS[2] = LRU sorted set
+# ARGV = value, ttl, now, max_entries
+_PUT_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', tonumber(ARGV[3]) - tonumber(ARGV[2]))
+local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+if excess > 0 then
+    local evicted = redis.call('ZRANGE', KEYS[2], 0, excess - 1)
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, excess - 1)
+    redis.call('DEL', unpack(evicted))
+end
+return excess
+"""
+
+
+def normalize_prompt(text: str) -> str:
+    """Casefold, drop sentence punctuation and collapse whitespace"""
+    text = _TRIVIAL_PUNCTUATION_RE.sub(" ", (text or "").casefold())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def response_cache_key(
+    provider: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    temperature: float
+) -> str:
+    """sha256 of the normalized request"""
+    payload = json.dumps({
+        "provider": provider,
+        "model": model,
+        "messages": [[m["role"], normalize_prompt(m["content"])] for m in messages],
+        "max_tokens": max_tokens,
+        "temperature": round(float(temperature), 3),
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (Redis, Postgres) cache of provider responses with per-model hit rates"""
+    
+    def __init__(self):
+        self._put_script = None
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+    
+    @property
+    def client(self):
+        """Shared async Redis client (None when Redis is unavailable)"""
+        return cache.client
+    
+    async def _count(self, provider: str, model: str, outcome: str) -> None:
+        """Count a hit ('redis_hits', 'db_hits') or a 'misses' for the model"""
+        name = f"{provider}:{model}"
+        counters = self._stats.setdefault(name, {"redis_hits": 0, "db_hits": 0, "misses": 0})
+        counters[outcome] += 1
+        if self.client:
+            try:
+                await self.client.hincrby(STATS_KEY, f"{name}|{outcome}", 1)
+            except Exception as e:
+                logger.error(f"Response cache stats update failed: {e}")
+    
+    async def get(self, provider: str, model: str, key: str) -> Optional[Dict[str, Any]]:
+        """Cached response for `key`: Redis first, then Postgres (promoted back to Redis)"""
+        if self.client:
+            try:
+                value = await self.client.get(f"{KEY_PREFIX}{key}")
+                if value is not None:
+                    await self.client.zadd(LRU_KEY, {f"{KEY_PREFIX}{key}": time.time()})
+                    await self._count(provider, model, "redis_hits")
+                    return json.loads(value)
+            except Exception as e:
+                logger.error(f"Response cache read failed: {e}")
+        
+        if db.pool:
+            from app.crud.ai import response_cache as cache_crud
+            try:
+                async with db.acquire("background") as conn:
+                    compressed = await cache_crud.get_cached_response(conn, key)
+                if compressed is not None:
+                    value = zlib.decompress(compressed).decode()
+                    await self._put_redis(key, value)
+                    await self._count(provider, model, "db_hits")
+                    return json.loads(value)
+            except Exception as e:
+                logger.error(f"Response cache database read failed: {e}")
+        
+        await self._count(provider, model, "misses")
+        return None
+    
+    async def _put_redis(self, key: str, value: str) -> None:
+        if not self.client:
+            return
+        try:
+            if self._put_script is None:
+                self._put_script = self.client.register_script(_PUT_SCRIPT)
+            await self._put_script(
+                keys=[f"{KEY_PREFIX}{key}", LRU_KEY],
+                args=[value, settings.ai_response_cache_ttl_seconds, time.time(),
+                      settings.ai_response_cache_max_entries]
+            )
+        except Exception as e:
+            logger.error(f"Response cache write failed: {e}")
+    
+    async def put(self, provider: str, model: str, key: str, response: Dict[str, Any]) -> None:
+        """Store a provider response in both tiers"""
+        value = json.dumps(response)
+        await self._put_redis(key, value)
+        if db.pool:
+            from app.crud.ai import response_cache as cache_crud
+            try:
+                async with db.acquire("background") as conn:
+                    await cache_crud.save_cached_response(
+                        conn, key, provider, model, zlib.compress(value.encode(), 6),
+                        settings.ai_response_cache_ttl_seconds
+                    )
+            except Exception as e:
+                logger.error(f"Response cache database write failed: {e}")
+    
+    async def get_stats(self, conn) -> Dict[str, Any]:
+        """Per-model hit rates (all workers when Redis is up) and tier sizes"""
+        from app.crud.ai import response_cache as cache_crud
+        
+        counters: Dict[str, Dict[str, int]] = {}
+        raw = None
+        redis_entries = None
+        if self.client:
+            try:
+                raw = await self.client.hgetall(STATS_KEY)
+                redis_entries = await self.client.zcard(LRU_KEY)
+            except Exception as e:
+                logger.error(f"Response cache stats read failed: {e}")
+        if raw is not None:
+            for field, count in raw.items():
+                name, outcome = field.rsplit("|", 1)
+                counters.setdefault(name, {"redis_hits": 0, "db_hits": 0, "misses": 0})[outcome] = int(count)
+        else:
+            counters = {name: dict(values) for name, values in self._stats.items()}
+        
+        models = []
+        for name, values in sorted(counters.items()):
+            hits = values["redis_hits"] + values["db_hits"]
+            lookups = hits + values["misses"]
+            models.append({
+                "model": name,
+                "hits": hits,
+                "redis_hits": values["redis_hits"],
+                "db_hits": values["db_hits"],
+                "misses": values["misses"],
+                "hit_rate": hits / lookups if lookups else 0.0
+            })
+        hits = sum(m["hits"] for m in models)
+        lookups = hits + sum(m["misses"] for m in models)
+        usage = await cache_crud.get_response_cache_usage(conn)
+        
+        return {
+            "enabled": settings.ai_response_cache_enabled,
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "redis_entries": redis_entries,
+            "db_entries": usage["entries"],
+            "db_size_bytes": usage["size_bytes"],
+            "models": models
+        }
+    
+    async def _cleanup_loop(self):
+        """Periodically evict expired and over-size entries from the Postgres tier"""
+        from app.crud.ai import response_cache as cache_crud
+        while True:
+            await asyncio.sleep(settings.ai_response_cache_cleanup_interval_seconds)
+            try:
+                if db.pool:
+                    async with db.acquire("background") as conn:
+                        evicted = await cache_crud.evict_cached_responses(
+                            conn, settings.ai_response_cache_max_bytes
+                        )
+                    if evicted:
+                        logger.info(f"Evicted {evicted} AI response cache entries")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Response cache cleanup failed: {e}")
+    
+    def start(self):
+        """Start the background eviction task"""
+        if settings.ai_response_cache_enabled and self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+            logger.info("Response cache cleanup task started")
+    
+    async def stop(self):
+        """Stop the background eviction task"""
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+
+
+# Global response cache instance
+response_cache = ResponseCache()
@@ -0,0 +1,357 @@
+"""
+Answer scoring stage
+Micro-batches answers from the queue and scores AI-content likelihood
+(stylometric features) and originality (MinHash against the near-duplicate
+index) for the whole batch with NumPy. External detectors are only asked
+about borderline scores, and a batch is written back in one executemany.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import httpx
+import numpy as np
+
+from app.core.config import settings
+from app.utils.runtime_settings import runtime_settings
+from app.crud.admin import compliance as compliance_crud
+from app.crud.ai import scoring as scoring_crud
+from app.db.session import db
+from app.utils.near_duplicates import flag_severity, near_duplicates
+from app.utils.queue import queue_service
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = "answer_scoring"
+
+# Below this many words the stylometric score is unreliable and treated as borderline
+MIN_WORDS = 40
+TTR_WINDOW = 200
+
+_SENTENCE_RE = re.compile(r"[^.!?\n]+")
+_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_CONTRACTION_RE = re.compile(r"[a-z]+'(?:t|s|re|ve|ll|d|m)\b")
+AI_MARKERS = (
+    "as an ai", "it is important to note", "it's important to note", "in conclusion",
+    "in summary", "delve", "furthermore", "moreover", "additionally", "overall,",
+)
+
+# Logistic model over the features below: low sentence-length burstiness, low
+# vocabulary variety, long words, stock phrases and no contractions read as AI
+FEATURE_NAMES = ("burstiness", "type_token_ratio", "mean_word_length", "marker_rate", "contraction_rate")
+AI_WEIGHTS = np.array([-4.0, -3.0, 0.8, 1.5, -2.0])
+AI_BIAS = 0.95
+
+
+def stylometric_features(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (len(texts), len(FEATURE_NAMES)) feature matrix and the word count of each text.
+    Per-sentence statistics are reduced for the whole batch at once.
+    """
+    count = len(texts)
+    sentence_lengths: List[int] = []
+    segments: List[int] = []
+    word_counts = np.zeros(count)
+    unique_ratio = np.zeros(count)
+    word_chars = np.zeros(count)
+    markers = np.zeros(count)
+    contractions = np.zeros(count)
+    
+    for idx, text in enumerate(texts):
+        lowered = (text or "").lower()
+        words = _WORD_RE.findall(lowered)
+        lengths = [n for n in (len(_WORD_RE.findall(s)) for s in _SENTENCE_RE.findall(lowered)) if n]
+        sentence_lengths.extend(lengths)
+        segments.extend([idx] * len(lengths))
+        word_counts[idx] = len(words)
+        window = words[:TTR_WINDOW]
+        unique_ratio[idx] = len(set(window)) / len(window) if window else 0.0
+        word_chars[idx] = sum(map(len, words))
+        markers[idx] = sum(lowered.count(marker) for marker in AI_MARKERS)
+        contractions[idx] = len(_CONTRACTION_RE.findall(lowered))
+    
+    segments_arr = np.asarray(segments, dtype=np.int64)
+    lengths_arr = np.asarray(sentence_lengths, dtype=float)
+    sentences = np.bincount(segments_arr, minlength=count)
+    total = np.bincount(segments_arr, weights=lengths_arr, minlength=count)
+    total_sq = np.bincount(segments_arr, weights=lengths_arr * lengths_arr, minlength=count)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / sentences
+        std = np.sqrt(np.maximum(total_sq / sentences - mean * mean, 0.0))
+        per_100_words = 100.0 / word_counts
+        features = np.column_stack([
+            std / mean,
+            unique_ratio,
+            word_chars / word_counts,
+            markers * per_100_words,
+            contractions * per_100_words,
+        ])
+    return np.nan_to_num(features, nan=0.0, posinf=0.0), word_counts
+
+
+def ai_likelihood(features: np.ndarray) -> np.ndarray:
+    """Probability each row of a stylometric feature matrix is AI-written"""
+    return 1.0 / (1.0 + np.exp(-(features @ AI_WEIGHTS + AI_BIAS)))
+
+
+def borderline(scores: np.ndarray, threshold: float) -> np.ndarray:
+    """Mask of scores within the configured margin of `threshold`"""
+    return np.abs(scores - threshold) <= settings.scoring_borderline_margin
+
+
+class ExternalDetector:
+    """
+    Batched client for an external detector endpoint.
+    POSTs {"texts": [...]} and reads `field` from each entry of "results".
+    Disabled (returns None) when the API key or base URL is not configured.
+    """
+    
+    def __init__(self, name: str, base_url: str, api_key: str, path: str, field: str):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.path = path
+        self.field = field
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key and self.base_url)
+    
+    async def score(self, texts: List[str]) -> Optional[List[Optional[float]]]:
+        """One score per text, or None if the detector is disabled or failed"""
+        if not self.enabled or not texts:
+            return None
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=settings.scoring_detector_timeout_seconds
+            )
+        try:
+            response = await self._client.post(
+                self.path, json={"texts": texts},
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            response.raise_for_status()
+            results = response.json()["results"]
+            return [
+                float(result[self.field]) if result.get(self.field) is not None else None
+                for result in results
+            ]
+        except Exception as e:
+            logger.warning(f"{self.name} detector failed for {len(texts)} answers: {e}")
+            return None
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class ScoringService:
+    """Batched AI-content and originality scoring"""
+    
+    def __init__(self):
+        self.ai_detector = ExternalDetector(
+            "stealth", settings.stealth_base_url, settings.stealth_api_key, "/detect", "ai_probability"
+        )
+        self.originality_detector = ExternalDetector(
+            "turnitin", settings.turnitin_base_url, settings.turnitin_api_key, "/similarity", "similarity"
+        )
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+    
+    def originality(self, answer_ids: List[UUID], texts: List[str]) -> np.ndarray:
+        """1 - similarity to the closest other answer in the near-duplicate index"""
+        signatures = near_duplicates.hasher.signatures(texts)
+        scores = np.ones(len(texts))
+        for idx, (answer_id, signature) in enumerate(zip(answer_ids, signatures)):
+            matches = near_duplicates.index.query(
+                signature, content_type="answer", limit=2, min_similarity=0.0
+            )
+            others = [m["similarity"] for m in matches if m["content_id"] != str(answer_id)]
+            if others:
+                scores[idx] = 1.0 - max(others)
+        return scores
+    
+    async def score_batch(self, conn, answer_ids: List[UUID]) -> List[Dict[str, Any]]:
+        """Score a batch of answers and write the scores back in one round trip"""
+        rows = [row for row in await scoring_crud.get_answers_for_scoring(conn, answer_ids) if row["answer_text"]]
+        if not rows:
+            return []
+        ids = [row["id"] for row in rows]
+        texts = [row["answer_text"] for row in rows]
+        
+        features, word_counts = stylometric_features(texts)
+        ai_scores = ai_likelihood(features)
+        originality = self.originality(ids, texts)
+        
+        # Only borderline (or too short to judge) answers go to the paid detectors
+        ai_threshold = runtime_settings.get_float("ai_content_threshold")
+        ai_borderline = np.flatnonzero(
+            borderline(ai_scores, ai_threshold) | (word_counts < MIN_WORDS)
+        )
+        uniqueness_threshold = runtime_settings.get_float("uniqueness_threshold")
+        # Answers an admin passed on originality (override) are not sent for a second opinion
+        bypassed = np.array([row["originality_bypassed"] for row in rows], dtype=bool)
+        originality_borderline = np.flatnonzero(
+            borderline(originality, uniqueness_threshold) & ~bypassed
+        )
+        ai_external, similarity_external = await asyncio.gather(
+            self.ai_detector.score([texts[i] for i in ai_borderline]),
+            self.originality_detector.score([texts[i] for i in originality_borderline])
+        )
+        ai_source = np.full(len(rows), "local", dtype=object)
+        originality_source = np.full(len(rows), "local", dtype=object)
+        for idx, value in zip(ai_borderline, ai_external or ()):
+            if value is not None:
+                ai_scores[idx], ai_source[idx] = value, self.ai_detector.name
+        for idx, value in zip(originality_borderline, similarity_external or ()):
+            if value is not None:
+                originality[idx], originality_source[idx] = 1.0 - value, self.originality_detector.name
+        
+        results = []
+        for idx, row in enumerate(rows):
+            results.append({
+                "answer_id": row["id"],
+                "ai_content_score": round(float(ai_scores[idx]), 4),
+                "originality_score": round(float(originality[idx]), 4),
+                "details": {
+                    "ai_content_source": ai_source[idx],
+                    "originality_source": originality_source[idx],
+                    "originality_bypassed": row["originality_bypassed"],
+                    "features": {
+                        name: round(float(value), 4) for name, value in zip(FEATURE_NAMES, features[idx])
+                    }
+                }
+            })
+        await scoring_crud.save_answer_scores(conn, [
+            (r["answer_id"], r["ai_content_score"], r["originality_score"], r["details"]) for r in results
+        ])
+        
+        # AI drafts are expected to score high until humanized and reviewed
+        for row, result in zip(rows, results):
+            if row["status"] in ("ai_generated", "draft"):
+                continue
+            if not row["ai_bypassed"] and result["ai_content_score"] > ai_threshold:
+                await compliance_crud.create_compliance_flag(
+                    conn, row["id"], "answer", "ai_content",
+                    "high" if result["ai_content_score"] >= 0.8 else "medium",
+                    details={"ai_content_score": result["ai_content_score"],
+                             "source": result["details"]["ai_content_source"]},
+                    user_id=row["client_id"]
+                )
+            if not row["originality_bypassed"] and result["originality_score"] < uniqueness_threshold:
+                await compliance_crud.create_compliance_flag(
+                    conn, row["id"], "answer", "plagiarism",
+                    flag_severity(1 - result["originality_score"]),
+                    details={"originality_score": result["originality_score"],
+                             "source": result["details"]["originality_source"]},
+                    user_id=row["client_id"]
+                )
+        return results
+    
+    async def _next_batch(self) -> List[Tuple[UUID, Optional[asyncio.Future]]]:
+        """Wait for one queued answer, then take more until the batch is full or the wait is over"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.scoring_batch_wait_ms / 1000
+        while len(batch) < settings.scoring_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    async def _batch_loop(self):
+        while True:
+            batch = await self._next_batch()
+            answer_ids = list(dict.fromkeys(answer_id for answer_id, _ in batch))
+            error = None
+            try:
+                if not db.pool:
+                    raise RuntimeError("Database not connected")
+                async with db.acquire("background") as conn:
+                    await self.score_batch(conn, answer_ids)
+                logger.debug(f"Scored {len(answer_ids)} answers")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scoring failed for a batch of {len(answer_ids)} answers: {e}")
+                error = e
+            for _, future in batch:
+                if future is not None and not future.done():
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+    
+    async def submit(self, answer_id: UUID) -> None:
+        """Add an answer to the next batch and wait until it has been scored"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((answer_id, future))
+        await future
+    
+    async def _on_message(self, message: Dict[str, Any]):
+        await self.submit(UUID(message["answer_id"]))
+    
+    async def enqueue(self, answer_id: UUID):
+        """Queue an answer for scoring (RabbitMQ when connected, otherwise the in-process batcher)"""
+        if queue_service.channel:
+            try:
+                await queue_service.publish(QUEUE_NAME, {"answer_id": str(answer_id)})
+                return
+            except Exception as e:
+                logger.warning(f"Could not queue answer {answer_id}, scoring in-process: {e}")
+        if self._queue is not None:
+            self._queue.put_nowait((answer_id, None))
+    
+    async def _backfill(self):
+        """Queue answers stored before the scoring stage was running"""
+        try:
+            async with db.acquire("background") as conn:
+                answer_ids = await scoring_crud.get_unscored_answer_ids(conn)
+            for answer_id in answer_ids:
+                await self.enqueue(answer_id)
+            if answer_ids:
+                logger.info(f"Queued {len(answer_ids)} unscored answers")
+        except Exception as e:
+            logger.error(f"Scoring backfill failed: {e}")
+    
+    async def start(self):
+        """Start the batcher and consume the scoring queue when RabbitMQ is connected"""
+        if self._batcher is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        if queue_service.channel:
+            await queue_service.consume(QUEUE_NAME, self._on_message)
+        if db.pool:
+            task = asyncio.create_task(self._backfill())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def stop(self):
+        """Stop the batcher and close detector connections"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._batcher:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        await self.ai_detector.close()
+        await self.originality_detector.close()
+
+
+# Global scoring service instance
+scoring_service = ScoringService()
@@ -6,6 +6,7 @@ from typing import Dict, Any
 import asyncpg
 from uuid import UUID
 from app.crud.client import dashboard as dashboard_crud
+from app.utils.user_directory import user_directory
 
 
 class DashboardService:
@@ -17,5 +18,13 @@ class DashboardService:
         user_id: UUID
     ) -> Dict[str, Any]:
         """Get dashboard data"""
-        return await dashboard_crud.get_dashboard_data(db, user_id)
+        data = await dashboard_crud.get_dashboard_data(db, user_id)
+        
+        # Expert names live in the auth database: one batched directory lookup
+        recent_answers = data.get("recent_answers") or []
+        names = await user_directory.names(answer.get("expert_id") for answer in recent_answers)
+        for answer in recent_answers:
+            answer["expert_name"] = names.get(str(answer.get("expert_id")), "Expert")
+        
+        return data
 
@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional
 import asyncpg
 from uuid import UUID
 from app.crud.client import profile as profile_crud
+from app.utils.user_directory import user_directory
 
 
 class ProfileService:
@@ -31,7 +32,9 @@ class ProfileService:
         preferences: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Update user profile"""
-        return await profile_crud.update_user_profile(
+        profile = await profile_crud.update_user_profile(
             db, user_id, first_name, last_name, phone, avatar_url, bio, preferences
         )
+        await user_directory.invalidate(user_id)
+        return profile
 
@@ -2,10 +2,16 @@
 Client question service
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import asyncpg
 from uuid import UUID
 from app.crud.client import questions as question_crud
+from app.utils.near_duplicates import near_duplicates
+from app.utils.answer_reuse import answer_reuse
+from app.utils.metrics import metrics
+from app.services.ai.generation_service import generation_service
+from app.services.ai.ocr_service import ocr_service
+from app.utils.uploads import upload_hash_from_url
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,15 +28,45 @@ class QuestionService:
         subject: Optional[str] = None,
         priority: str = "normal",
         image_urls: Optional[list] = None,
-        credits_required: int = 1
+        credits_required: int = 1,
+        images: Optional[List[bytes]] = None
     ) -> Dict[str, Any]:
-        """Submit a new question"""
+        """Submit a new question; text is read from `images` (raw bytes) and `image_urls` before generation"""
         try:
             result = await question_crud.submit_question(
                 db, user_id, question_text, subject, priority, image_urls, credits_required
             )
             
-            # TODO: Queue question for AI processing via RabbitMQ
+            # Count the client as active for the dashboard
+            await metrics.record_active_client(user_id)
+            
+            # Flag near-duplicates of other clients' questions and index this one
+            try:
+                await near_duplicates.check_and_index(
+                    db, result["question_id"], "question", question_text, user_id
+                )
+            except Exception as e:
+                logger.warning(f"Near-duplicate check failed for question {result['question_id']}: {e}")
+            
+            # Offer a previously delivered answer to the same question as a draft
+            try:
+                await answer_reuse.find_offer(db, result["question_id"], question_text)
+            except Exception as e:
+                logger.warning(f"Answer reuse lookup failed for question {result['question_id']}: {e}")
+            
+            # Queue question for AI processing; image questions are read first
+            # and the OCR stage queues generation once their text is appended
+            try:
+                has_image_urls = any(
+                    url.startswith(("http://", "https://")) or upload_hash_from_url(url)
+                    for url in image_urls or []
+                )
+                if ocr_service.enabled and (images or has_image_urls):
+                    await ocr_service.enqueue(result["question_id"], images or [], image_urls)
+                else:
+                    await generation_service.enqueue(result["question_id"])
+            except Exception as e:
+                logger.warning(f"Could not queue question {result['question_id']} for generation: {e}")
             
             return {
                 "question_id": result["question_id"],
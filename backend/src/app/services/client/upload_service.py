@@ -0,0 +1,126 @@
+"""
+Client image upload service
+"""
+
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import os
+import tempfile
+import asyncpg
+from uuid import UUID
+from app.core.config import settings
+from app.crud.client import uploads as upload_crud
+from app.utils.storage import get_storage
+from app.utils.uploads import IncomingImage, IMAGE_EXTENSIONS, make_thumbnail
+import logging
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_URL_PREFIX = "/api/v1/client/uploads/images"
+
+
+class UploadService:
+    """Client image upload service"""
+    
+    @staticmethod
+    def _to_response(upload: Dict[str, Any], filename: Optional[str]) -> Dict[str, Any]:
+        # Identical bytes may have been stored for another user first; nothing of
+        # theirs (that it was, or their file name) is returned
+        url = f"{UPLOAD_URL_PREFIX}/{upload['sha256']}"
+        return {
+            "sha256": upload["sha256"],
+            "url": url,
+            "thumbnail_url": f"{url}/thumbnail" if upload.get("thumbnail_key") else None,
+            "content_type": upload["content_type"],
+            "size_bytes": upload["size_bytes"],
+            "width": upload.get("width"),
+            "height": upload.get("height"),
+            "original_filename": filename
+        }
+    
+    @staticmethod
+    async def store_image(
+        db: asyncpg.Connection,
+        user_id: Optional[UUID],
+        incoming: IncomingImage
+    ) -> Dict[str, Any]:
+        """
+        Store a spooled upload under its SHA-256. Bytes that were uploaded
+        before are not stored again; the existing record is returned.
+        Either way the user is recorded as an uploader, so they can view it.
+        """
+        existing = await upload_crud.get_image_upload(db, incoming.sha256)
+        if existing:
+            if user_id:
+                await upload_crud.add_image_upload_owner(db, incoming.sha256, user_id)
+            return UploadService._to_response(existing, incoming.filename)
+        
+        storage = get_storage()
+        sha256 = incoming.sha256
+        storage_key = f"images/{sha256[:2]}/{sha256}.{IMAGE_EXTENSIONS[incoming.content_type]}"
+        thumbnail_key = f"thumbnails/{sha256[:2]}/{sha256}.jpg"
+        
+        fd, thumbnail_path = tempfile.mkstemp(prefix="thumb-", suffix=".jpg")
+        os.close(fd)
+        try:
+            # Decoding also proves the file is a readable image, not just a matching header
+            try:
+                dimensions = await asyncio.to_thread(
+                    make_thumbnail, incoming.path, thumbnail_path, settings.upload_thumbnail_size
+                )
+            except Exception as e:
+                raise ValueError(f"{incoming.filename or 'File'} could not be read as an image: {e}")
+            
+            if not await storage.exists(storage_key):
+                await storage.save(storage_key, incoming.path, incoming.content_type)
+            await storage.save(thumbnail_key, thumbnail_path, "image/jpeg")
+        finally:
+            os.unlink(thumbnail_path)
+        
+        upload = await upload_crud.save_image_upload(db, {
+            "sha256": sha256,
+            "content_type": incoming.content_type,
+            "size_bytes": incoming.size,
+            "width": dimensions["width"],
+            "height": dimensions["height"],
+            "storage_backend": storage.name,
+            "storage_key": storage_key,
+            "thumbnail_key": thumbnail_key,
+            "original_filename": incoming.filename
+        }, user_id)
+        if user_id:
+            await upload_crud.add_image_upload_owner(db, sha256, user_id)
+        return UploadService._to_response(upload, incoming.filename)
+    
+    @staticmethod
+    async def can_view_image(db: asyncpg.Connection, sha256: str, user) -> bool:
+        """Images are served to their uploaders, admins and users who can see a question referencing them"""
+        if user.is_admin_or_super():
+            return True
+        return await upload_crud.can_view_image(db, sha256, user.id)
+    
+    @staticmethod
+    async def get_image_location(
+        db: asyncpg.Connection,
+        sha256: str,
+        thumbnail: bool = False
+    ) -> Optional[Tuple[Dict[str, Any], str, Optional[str]]]:
+        """
+        Stored image (or its thumbnail) as (record, storage key, download URL).
+        The URL is None when the API serves the file itself (local storage).
+        """
+        upload = await upload_crud.get_image_upload(db, sha256)
+        if not upload:
+            return None
+        key = upload["thumbnail_key"] if thumbnail else upload["storage_key"]
+        if not key:
+            return None
+        return upload, key, await get_storage().download_url(key)
+    
+    @staticmethod
+    async def read_image(db: asyncpg.Connection, sha256: str) -> bytes:
+        """Bytes of a stored image"""
+        upload = await upload_crud.get_image_upload(db, sha256)
+        if not upload:
+            raise ValueError(f"Image {sha256} not found")
+        return await get_storage().read(upload["storage_key"])
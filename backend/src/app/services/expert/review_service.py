@@ -6,6 +6,9 @@ from typing import Dict, Any, Optional
 import asyncpg
 from uuid import UUID
 from app.crud.expert import reviews as review_crud
+from app.services.ai.scoring_service import scoring_service
+from app.utils.leaderboard import leaderboard
+from app.utils.answer_reuse import answer_reuse
 
 
 class ReviewService:
@@ -29,6 +32,14 @@ class ReviewService:
             rejection_reason, corrections, review_notes, review_time_seconds
         )
         
+        if result["is_approved"]:
+            await leaderboard.record_delivery(expert_id, result["earnings"])
+            # Generated drafts were scored before review; score the answer the expert submitted
+            await scoring_service.enqueue(answer_id)
+        
+        # A reuse offer still open at review time was not used
+        await answer_reuse.decline(db, question_id)
+        
         return {
             "review_id": result["review_id"],
             "answer_id": result["answer_id"],
@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional
 import asyncpg
 from uuid import UUID
 from app.crud.expert import tasks as task_crud
+from app.utils.answer_reuse import answer_reuse
 
 
 class TaskService:
@@ -28,8 +29,18 @@ class TaskService:
         task_id: UUID,
         expert_id: UUID
     ) -> Optional[Dict[str, Any]]:
-        """Get task detail"""
-        return await task_crud.get_task_detail(db, task_id, expert_id)
+        """Get task detail, including any previously delivered answer offered for reuse"""
+        task = await task_crud.get_task_detail(db, task_id, expert_id)
+        if task:
+            offer = await answer_reuse.get_offer(db, task["question_id"])
+            if offer and offer["status"] == "offered":
+                task["reuse_offer"] = {
+                    "source_question_id": offer["source_question_id"],
+                    "match_type": offer["match_type"],
+                    "similarity": offer["similarity"],
+                    "answer_text": offer["answer_text"]
+                }
+        return task
     
     @staticmethod
     async def start_task(
@@ -42,4 +53,18 @@ class TaskService:
         if not success:
             raise ValueError("Task not found or already started")
         return {"success": True, "task_id": task_id, "status": "in_progress"}
-
+    
+    @staticmethod
+    async def accept_reuse_offer(
+        db: asyncpg.Connection,
+        task_id: UUID,
+        expert_id: UUID
+    ) -> Dict[str, Any]:
+        """Use the offered previously delivered answer as the task's draft answer"""
+        task = await task_crud.get_task_detail(db, task_id, expert_id)
+        if not task:
+            raise ValueError("Task not found")
+        answer_id = await answer_reuse.accept(db, task["question_id"], expert_id)
+        if not answer_id:
+            raise ValueError("No open answer reuse offer for this task")
+        return {"success": True, "task_id": task_id, "answer_id": answer_id}
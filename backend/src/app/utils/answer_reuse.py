@@ -0,0 +1,132 @@
+"""
+Answer reuse for repeated questions
+Looks up previously delivered answers for exact (normalized text) and
+near-duplicate (MinHash/LSH) matches and offers them as drafts
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.utils.runtime_settings import runtime_settings
+from app.crud.admin import answer_reuse as reuse_crud
+from app.utils.minhash import normalize_text
+from app.utils.near_duplicates import near_duplicates
+
+logger = logging.getLogger(__name__)
+
+
+def text_fingerprint(text: str) -> str:
+    """md5 of the normalized text; must match the questions.text_fingerprint column (migrations 009, 021)"""
+    return hashlib.md5(" ".join(normalize_text(text)).encode()).hexdigest()
+
+
+class AnswerReuseService:
+    """Offers delivered answers as drafts for new questions"""
+    
+    async def find_offer(
+        self,
+        conn,
+        question_id: UUID,
+        question_text: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look for a delivered answer to the same or a near-duplicate question
+        and record it as an offer. Exact matches win over near-duplicates.
+        """
+        if not runtime_settings.get_bool("answer_reuse_enabled") or not normalize_text(question_text):
+            return None
+        
+        match = await reuse_crud.find_delivered_by_fingerprint(
+            conn, text_fingerprint(question_text), question_id
+        )
+        if match:
+            match.update(match_type="exact", similarity=1.0)
+        else:
+            candidates = [
+                c for c in near_duplicates.find_similar(question_text, content_type="question")
+                if c["content_id"] != str(question_id)
+                and c["similarity"] >= runtime_settings.get_float("answer_reuse_min_similarity")
+            ]
+            answers = await reuse_crud.get_delivered_answers(
+                conn, [UUID(c["content_id"]) for c in candidates]
+            )
+            # Candidates are most similar first
+            for candidate in candidates:
+                if candidate["content_id"] in answers:
+                    match = answers[candidate["content_id"]]
+                    match.update(match_type="near", similarity=candidate["similarity"])
+                    break
+        
+        if not match:
+            return None
+        
+        await reuse_crud.create_reuse_offer(
+            conn, question_id, match["source_question_id"], match["source_answer_id"],
+            match["match_type"], match["similarity"]
+        )
+        logger.info(
+            f"Answer reuse offer for question {question_id}: "
+            f"{match['match_type']} match with {match['source_question_id']} ({match['similarity']:.2f})"
+        )
+        return match
+    
+    async def get_offer(self, conn, question_id: UUID) -> Optional[Dict[str, Any]]:
+        """Open or resolved offer for a question, with the offered answer text"""
+        return await reuse_crud.get_reuse_offer(conn, question_id)
+    
+    async def accept(self, conn, question_id: UUID, accepted_by: Optional[UUID] = None) -> Optional[UUID]:
+        """Use the offered answer as the question's draft; returns the draft answer id"""
+        return await reuse_crud.accept_reuse_offer(conn, question_id, accepted_by)
+    
+    async def use_for_draft(self, conn, question_id: UUID) -> Optional[UUID]:
+        """
+        Use the offered answer in place of generating a draft. The offer is
+        resolved as 'system_accepted', so it does not count as an expert acceptance.
+        """
+        return await reuse_crud.accept_reuse_offer(conn, question_id, status="system_accepted")
+    
+    async def decline(self, conn, question_id: UUID) -> bool:
+        """Close an open offer that was not used"""
+        return await reuse_crud.decline_reuse_offer(conn, question_id)
+    
+    async def get_stats(self, conn, days: int = 30) -> Dict[str, Any]:
+        """Hit rate, acceptance rate and estimated savings over the last `days` days"""
+        stats = await reuse_crud.get_answer_reuse_stats(conn, days)
+        questions = stats["questions"] or 0
+        offers = stats["offers"] or 0
+        accepted = stats["accepted"] or 0
+        system_accepted = stats["system_accepted"] or 0
+        # Offers generation took over were never put to an expert
+        expert_offers = offers - system_accepted
+        reused = accepted + system_accepted
+        
+        review_seconds_saved = None
+        if stats["avg_review_seconds_fresh"] is not None and stats["avg_review_seconds_reused"] is not None:
+            review_seconds_saved = max(
+                stats["avg_review_seconds_fresh"] - stats["avg_review_seconds_reused"], 0.0
+            ) * reused
+        
+        return {
+            "period_days": days,
+            "questions": questions,
+            "offers": offers,
+            "exact_offers": stats["exact_offers"] or 0,
+            "near_offers": stats["near_offers"] or 0,
+            "accepted": accepted,
+            "system_accepted": system_accepted,
+            "declined": stats["declined"] or 0,
+            "hit_rate": offers / questions if questions else 0.0,
+            "acceptance_rate": accepted / expert_offers if expert_offers else 0.0,
+            "ai_generations_saved": reused,
+            "estimated_cost_saved": round(reused * settings.answer_reuse_generation_cost, 2),
+            "avg_review_seconds_reused": stats["avg_review_seconds_reused"],
+            "avg_review_seconds_fresh": stats["avg_review_seconds_fresh"],
+            "review_seconds_saved": review_seconds_saved
+        }
+
+
+# Global answer reuse instance
+answer_reuse = AnswerReuseService()
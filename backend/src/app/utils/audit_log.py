@@ -0,0 +1,163 @@
+"""
+Admin action audit log
+Admin mutations used to insert their audit row inline, one round trip per
+action on the request's connection. Actions are now buffered in process and
+written in batches with COPY by a background task; security-critical actions
+(AUDIT_SYNC_ACTIONS) are still inserted inline, in the request's transaction.
+The buffer is drained on shutdown. Ids are generated here, so callers get an
+action id either way.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+import asyncpg
+
+from app.core.config import settings
+from app.db.session import db
+
+logger = logging.getLogger(__name__)
+
+
+def sync_actions() -> frozenset:
+    return frozenset(action.strip() for action in settings.audit_sync_actions.split(",") if action.strip())
+
+
+class AuditLog:
+    """Write-behind buffer for admin_actions rows"""
+    
+    def __init__(self):
+        self._buffer: List[tuple] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.inline_writes = 0
+        self.batched_writes = 0
+        self.batches = 0
+        self.failed = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+    
+    def is_durable(self, action_type: str) -> bool:
+        """Whether an action is inserted inline rather than buffered"""
+        return not settings.audit_write_behind or action_type in sync_actions()
+    
+    async def log(
+        self,
+        conn: asyncpg.Connection,
+        admin_id: UUID,
+        action_type: str,
+        target_type: Optional[str] = None,
+        target_id: Optional[UUID] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        durable: Optional[bool] = None
+    ) -> UUID:
+        """
+        Record an admin action and return its id. `durable` overrides
+        AUDIT_SYNC_ACTIONS; actions are also written inline while the writer
+        is not running or its buffer is full.
+        """
+        from app.crud.admin import admin_actions as action_crud
+        row = (
+            uuid4(), admin_id, action_type, target_type, target_id,
+            json.dumps(details) if details else None, ip_address, user_agent,
+            datetime.now(timezone.utc)
+        )
+        if durable is None:
+            durable = self.is_durable(action_type)
+        if durable or not self.running or len(self._buffer) >= settings.audit_buffer_max:
+            await action_crud.insert_admin_action(conn, row)
+            self.inline_writes += 1
+            return row[0]
+        
+        self._buffer.append(row)
+        if len(self._buffer) >= settings.audit_batch_size:
+            self._wakeup.set()
+        return row[0]
+    
+    async def flush(self) -> int:
+        """Write everything buffered; returns the number of rows written"""
+        from app.crud.admin import admin_actions as action_crud
+        if not self._buffer or not db.pool:
+            return 0
+        rows, self._buffer = self._buffer, []
+        written = len(rows)
+        try:
+            async with db.acquire("background") as conn:
+                try:
+                    await action_crud.copy_admin_actions(conn, rows)
+                except asyncpg.PostgresError as e:
+                    # A bad row fails the whole COPY; write the rest one by one
+                    logger.warning(f"Audit batch of {len(rows)} failed ({e}), writing rows individually")
+                    written = 0
+                    for row in rows:
+                        try:
+                            await action_crud.insert_admin_action(conn, row)
+                            written += 1
+                        except asyncpg.PostgresError as row_error:
+                            self.failed += 1
+                            logger.error(f"Audit row for {row[2]} by {row[1]} dropped: {row_error}")
+        except BaseException:
+            # Database unreachable or cancelled: keep the rows (oldest first) for the next flush
+            self._buffer = (rows + self._buffer)[-settings.audit_buffer_max:]
+            raise
+        self.batches += 1
+        self.batched_writes += written
+        return written
+    
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.audit_flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Audit log flush failed: {e}")
+    
+    def start(self):
+        """Start buffering non-critical actions (written inline until then)"""
+        if self._task is None and settings.audit_write_behind:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop())
+            logger.info("Audit log writer started")
+    
+    async def stop(self):
+        """Stop the writer and drain the buffer"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            written = await self.flush()
+            if written:
+                logger.info(f"Audit log drained {written} actions")
+        except Exception as e:
+            logger.error(f"Audit log drain failed, {len(self._buffer)} actions lost: {e}")
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "inline_writes": self.inline_writes,
+            "batched_writes": self.batched_writes,
+            "batches": self.batches,
+            "failed": self.failed
+        }
+
+
+# Global audit log instance
+audit_log = AuditLog()
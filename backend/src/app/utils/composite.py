@@ -0,0 +1,144 @@
+"""
+Composite endpoint loading
+Aggregate endpoints (dashboards, stats pages) declare their independent
+sections; the sections run concurrently, each on its own pooled connection,
+under a per-request connection budget. A section that fails or runs past its
+timeout is replaced by its default and reported as unavailable, so the
+response is partial instead of failing or waiting on the slowest query.
+Sections can be cached in Redis independently of each other.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_USE_SETTINGS = object()
+
+
+class Section:
+    """One independently loaded part of a composite response"""
+    
+    __slots__ = ("name", "load", "default", "timeout", "cache_ttl")
+    
+    def __init__(
+        self,
+        name: str,
+        load: Callable[[Any], Awaitable[Any]],
+        default: Any = None,
+        timeout: Optional[float] = None,
+        cache_ttl: Any = _USE_SETTINGS
+    ):
+        """
+        `load` receives a connection and returns the section's value.
+        `timeout` defaults to COMPOSITE_SECTION_TIMEOUT_SECONDS and `cache_ttl`
+        to COMPOSITE_SECTION_CACHE_SECONDS; a cache_ttl of 0 disables caching.
+        """
+        self.name = name
+        self.load = load
+        self.default = default
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+
+
+class CompositeResult:
+    """Section values by name, and the sections that could not be loaded"""
+    
+    __slots__ = ("data", "unavailable", "timings")
+    
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.unavailable: List[str] = []
+        self.timings: Dict[str, float] = {}  # seconds per loaded section (0 when cached)
+    
+    def __getitem__(self, name: str) -> Any:
+        return self.data[name]
+    
+    @property
+    def partial(self) -> bool:
+        return bool(self.unavailable)
+
+
+async def load_sections(
+    name: str,
+    sections: List[Section],
+    pool=None,
+    max_connections: Optional[int] = None,
+    primary: bool = False
+) -> CompositeResult:
+    """
+    Load every section of the composite `name` concurrently.
+    At most `max_connections` (default COMPOSITE_MAX_CONNECTIONS) connections
+    are taken from `pool` at a time. Sections are read-only, so by default
+    they read from a replica when one is within its lag limit, else from the
+    primary under the reporting class's connection limit. `primary` (the
+    caller is pinned to the primary, see app.db.routing) reads from the
+    primary and skips cached sections so the caller sees their own writes.
+    """
+    if pool is not None:
+        acquire = pool.acquire
+    else:
+        acquire = lambda: db.acquire("reporting", db.pool if primary else db.read_pool())
+    budget = asyncio.Semaphore(max(1, min(
+        max_connections or settings.composite_max_connections, len(sections) or 1
+    )))
+    result = CompositeResult()
+    
+    async def run(section: Section):
+        ttl = settings.composite_section_cache_seconds if section.cache_ttl is _USE_SETTINGS else section.cache_ttl
+        key = f"composite:{name}:{section.name}"
+        if ttl and not primary:
+            cached = await cache.get(key)
+            if cached is not None:
+                result.data[section.name] = cached["value"]
+                result.timings[section.name] = 0.0
+                return
+        
+        async def load():
+            async with budget:
+                async with acquire() as conn:
+                    return await section.load(conn)
+        
+        started = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(
+                load(), section.timeout or settings.composite_section_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Section {name}.{section.name} timed out")
+            result.data[section.name] = section.default
+            result.unavailable.append(section.name)
+            return
+        except Exception as e:
+            logger.error(f"Section {name}.{section.name} failed: {e}")
+            result.data[section.name] = section.default
+            result.unavailable.append(section.name)
+            return
+        result.data[section.name] = value
+        result.timings[section.name] = time.perf_counter() - started
+        if ttl:
+            # Stored as JSON types, which is what the response carries either way
+            await cache.set(key, {"value": jsonable_encoder(value)}, ttl)
+    
+    await asyncio.gather(*(run(section) for section in sections))
+    # Report in declaration order rather than completion order
+    failed = set(result.unavailable)
+    result.unavailable = [section.name for section in sections if section.name in failed]
+    return result
+
+
+async def invalidate(name: str, *section_names: str) -> None:
+    """Drop cached sections of a composite (all of them if none are named)"""
+    if section_names:
+        for section_name in section_names:
+            await cache.delete(f"composite:{name}:{section_name}")
+    else:
+        await cache.delete_pattern(f"composite:{name}:*")
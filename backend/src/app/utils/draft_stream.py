@@ -0,0 +1,359 @@
+"""
+Streaming delivery of AI drafts
+Per-question channels carrying coalesced, offset-tagged draft frames to
+WebSocket subscribers. Redis pub/sub fans frames out across workers (in-process
+delivery without Redis); the draft text is kept in Redis and checkpointed to
+answer_drafts so reconnecting clients can resume from an offset. Without Redis
+the text is kept by the worker until the final checkpoint is persisted, for at
+most draft_stream_local_max_drafts drafts.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "draft:"
+TEXT_TTL_SECONDS = 24 * 3600
+
+
+def _channel(question_id) -> str:
+    return f"{CHANNEL_PREFIX}{question_id}"
+
+
+def _text_key(question_id) -> str:
+    return f"{CHANNEL_PREFIX}{question_id}:text"
+
+
+class DraftSubscriber:
+    """
+    One client's view of a question's draft.
+    Frames queue up to a fixed size; a subscriber that falls behind is resynced
+    from the stored draft text instead of slowing the producer down.
+    """
+    
+    def __init__(self, service: "DraftStreamService", question_id: str, offset: int = 0):
+        self.service = service
+        self.question_id = question_id
+        self.offset = offset
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.draft_stream_queue_size)
+        self.lagged = True  # start with a catch-up from the stored text
+        self.closed = False
+        self._held: Optional[Dict[str, Any]] = None
+    
+    def push(self, frame: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.lagged = True
+            # Drain so the next read resyncs rather than replaying stale frames
+            while not self.queue.empty():
+                self.queue.get_nowait()
+    
+    async def _catch_up(self) -> Optional[Dict[str, Any]]:
+        self.lagged = False
+        self._held = None
+        text = await self.service.get_text(self.question_id)
+        if text is None or len(text) <= self.offset:
+            return None
+        frame = {
+            "type": "draft_chunk",
+            "question_id": self.question_id,
+            "offset": self.offset,
+            "text": text[self.offset:]
+        }
+        self.offset = len(text)
+        return frame
+    
+    def _apply(self, frame: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Drop or trim chunks the client already has; track the delivered offset"""
+        if frame["type"] == "draft_reset":
+            self.offset = len(frame["text"])
+            return frame
+        if frame["type"] != "draft_chunk":
+            return frame
+        end = frame["offset"] + len(frame["text"])
+        if end <= self.offset:
+            return None
+        if frame["offset"] > self.offset:
+            # A gap: frames were lost, resync from the stored text
+            self.lagged = True
+            return None
+        text = frame["text"][self.offset - frame["offset"]:]
+        frame = dict(frame, offset=self.offset, text=text)
+        self.offset = end
+        return frame
+    
+    async def next_frame(self) -> Dict[str, Any]:
+        """Next frame to send; consecutive queued chunks are coalesced into one frame"""
+        while True:
+            if self.lagged:
+                frame = await self._catch_up()
+                if frame:
+                    return frame
+                continue
+            if self._held is not None:
+                frame, self._held = self._held, None
+            else:
+                frame = self._apply(await self.queue.get())
+            if frame is None:
+                continue
+            while frame["type"] == "draft_chunk" and not self.queue.empty():
+                following = self._apply(self.queue.get_nowait())
+                if following is None:
+                    continue
+                if following["type"] != "draft_chunk":
+                    self._held = following
+                    break
+                frame = dict(frame, text=frame["text"] + following["text"])
+            return frame
+    
+    def close(self) -> None:
+        self.closed = True
+        self.service._unsubscribe(self)
+
+
+class DraftWriter:
+    """
+    Producer side of a question's draft stream.
+    Tokens are buffered and published as one frame once the buffer reaches
+    draft_stream_frame_chars or draft_stream_frame_interval_ms has passed;
+    the full text is checkpointed every draft_checkpoint_interval_seconds.
+    """
+    
+    def __init__(self, service: "DraftStreamService", question_id: str, conn=None):
+        self.service = service
+        self.question_id = question_id
+        self.conn = conn
+        self.length = 0
+        self._text = []
+        self._buffer = []
+        self._buffer_len = 0
+        self._last_flush = time.monotonic()
+        self._last_checkpoint = time.monotonic()
+    
+    @property
+    def text(self) -> str:
+        return "".join(self._text) + "".join(self._buffer)
+    
+    async def write(self, token: str) -> None:
+        """Add a token to the draft"""
+        self._buffer.append(token)
+        self._buffer_len += len(token)
+        now = time.monotonic()
+        if (self._buffer_len >= settings.draft_stream_frame_chars
+                or (now - self._last_flush) * 1000 >= settings.draft_stream_frame_interval_ms):
+            await self.flush()
+    
+    async def flush(self) -> None:
+        """Publish buffered tokens as one frame and checkpoint if one is due"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        chunk = "".join(self._buffer)
+        self._buffer = []
+        self._buffer_len = 0
+        offset = self.length
+        self._text.append(chunk)
+        self.length += len(chunk)
+        await self.service.append_text(self.question_id, chunk)
+        await self.service.publish(self.question_id, {
+            "type": "draft_chunk",
+            "question_id": self.question_id,
+            "offset": offset,
+            "text": chunk
+        })
+        if time.monotonic() - self._last_checkpoint >= settings.draft_checkpoint_interval_seconds:
+            await self.checkpoint("streaming")
+    
+    async def checkpoint(self, status: str) -> bool:
+        """Persist the draft so far; True if it was saved"""
+        self._last_checkpoint = time.monotonic()
+        if self.conn is None:
+            return False
+        from app.crud.ai import generation as generation_crud
+        try:
+            await generation_crud.save_draft_checkpoint(
+                self.conn, UUID(self.question_id), "".join(self._text), status
+            )
+        except Exception as e:
+            logger.warning(f"Draft checkpoint failed for question {self.question_id}: {e}")
+            return False
+        return True
+    
+    async def finish(self, final_text: str) -> None:
+        """
+        Close the stream with the chosen answer. If it differs from what was
+        streamed (another model won), subscribers get a reset with the full text.
+        """
+        await self.flush()
+        if final_text != "".join(self._text):
+            self._text = [final_text]
+            self.length = len(final_text)
+            await self.service.set_text(self.question_id, final_text)
+            await self.service.publish(self.question_id, {
+                "type": "draft_reset",
+                "question_id": self.question_id,
+                "offset": 0,
+                "text": final_text
+            })
+        persisted = await self.checkpoint("complete")
+        await self.service.publish(self.question_id, {
+            "type": "draft_complete",
+            "question_id": self.question_id,
+            "length": self.length
+        })
+        if persisted:
+            # Catch-ups read the checkpoint from here on
+            self.service.discard_local_text(self.question_id)
+
+
+class DraftStreamService:
+    """Per-question draft channels"""
+    
+    def __init__(self):
+        self._subscribers: Dict[str, Set[DraftSubscriber]] = {}
+        self._local_text: "OrderedDict[str, str]" = OrderedDict()
+        self._listener: Optional[asyncio.Task] = None
+        self._pubsub = None
+    
+    @property
+    def client(self):
+        """Shared async Redis client (None when Redis is unavailable)"""
+        return cache.client
+    
+    def writer(self, question_id, conn=None) -> DraftWriter:
+        """Producer for a question's draft; `conn` is used for checkpoints"""
+        return DraftWriter(self, str(question_id), conn)
+    
+    def subscribe(self, question_id, offset: int = 0) -> DraftSubscriber:
+        """Subscribe to a question's draft, resuming after `offset` characters"""
+        subscriber = DraftSubscriber(self, str(question_id), offset)
+        self._subscribers.setdefault(subscriber.question_id, set()).add(subscriber)
+        return subscriber
+    
+    def _unsubscribe(self, subscriber: DraftSubscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.question_id)
+        if subscribers:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.question_id]
+    
+    def _dispatch(self, question_id: str, frame: Dict[str, Any]) -> None:
+        for subscriber in list(self._subscribers.get(question_id, ())):
+            subscriber.push(frame)
+    
+    async def publish(self, question_id: str, frame: Dict[str, Any]) -> None:
+        """Send a frame to every subscriber of the question, on any worker"""
+        if self.client and self._listener:
+            try:
+                await self.client.publish(_channel(question_id), json.dumps(frame))
+                return
+            except Exception as e:
+                logger.error(f"Draft publish failed for question {question_id}: {e}")
+        self._dispatch(question_id, frame)
+    
+    async def append_text(self, question_id: str, chunk: str) -> None:
+        if self.client:
+            try:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    pipe.append(_text_key(question_id), chunk)
+                    pipe.expire(_text_key(question_id), TEXT_TTL_SECONDS)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                logger.error(f"Draft text append failed for question {question_id}: {e}")
+        self._set_local_text(question_id, self._local_text.get(question_id, "") + chunk)
+    
+    async def set_text(self, question_id: str, text: str) -> None:
+        if self.client:
+            try:
+                await self.client.set(_text_key(question_id), text, ex=TEXT_TTL_SECONDS)
+                return
+            except Exception as e:
+                logger.error(f"Draft text write failed for question {question_id}: {e}")
+        self._set_local_text(question_id, text)
+    
+    def _set_local_text(self, question_id: str, text: str) -> None:
+        self._local_text[question_id] = text
+        self._local_text.move_to_end(question_id)
+        while len(self._local_text) > settings.draft_stream_local_max_drafts:
+            self._local_text.popitem(last=False)
+    
+    def discard_local_text(self, question_id: str) -> None:
+        """Forget this worker's copy of a draft"""
+        self._local_text.pop(question_id, None)
+    
+    async def get_text(self, question_id: str) -> Optional[str]:
+        """Draft streamed so far: Redis, then this worker, then the last DB checkpoint"""
+        if self.client:
+            try:
+                text = await self.client.get(_text_key(question_id))
+                if text is not None:
+                    return text
+            except Exception as e:
+                logger.error(f"Draft text read failed for question {question_id}: {e}")
+        if question_id in self._local_text:
+            return self._local_text[question_id]
+        if db.pool:
+            from app.crud.ai import generation as generation_crud
+            async with db.acquire("interactive") as conn:
+                draft = await generation_crud.get_draft_checkpoint(conn, UUID(question_id))
+            if draft:
+                return draft["draft_text"]
+        return None
+    
+    async def _listen(self):
+        """Relay frames published by any worker to this worker's subscribers"""
+        while True:
+            try:
+                self._pubsub = self.client.pubsub()
+                await self._pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in self._pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    question_id = message["channel"][len(CHANNEL_PREFIX):]
+                    if question_id in self._subscribers:
+                        self._dispatch(question_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Draft stream listener failed: {e}")
+                await asyncio.sleep(1)
+    
+    def start(self):
+        """Start relaying Redis draft channels (in-process delivery without Redis)"""
+        if self.client and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            logger.info("Draft stream listener started")
+    
+    async def stop(self):
+        """Stop the relay"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+
+
+# Global draft stream instance
+draft_streams = DraftStreamService()
@@ -0,0 +1,293 @@
+"""
+Expert leaderboard backed by Redis sorted sets
+Per-period rankings updated on delivery/rating/earning events and
+periodically rebuilt from SQL to correct drift
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("week", "month", "all_time")
+
+# Week/month buckets only need to outlive the period they describe
+PERIOD_TTL_SECONDS = {
+    "week": 8 * 7 * 24 * 3600,
+    "month": 400 * 24 * 3600,
+    "all_time": 0,
+}
+
+STAT_FIELDS = ("answered", "rating_sum", "rating_count", "earnings")
+
+# Apply deltas to an expert's stats and re-score them in one round trip.
+# Score = questions answered, ties broken by average rating (avg / 10 < 1).
+# KEYS[1] = sorted set, KEYS[2] = stats hash
+# ARGV = expert_id, d_answered, d_rating_sum, d_rating_count, d_earnings, ttl
+_RECORD_SCRIPT = """
+local id = ARGV[1]
+local answered = tonumber(redis.call('HINCRBY', KEYS[2], id .. ':answered', ARGV[2]))
+local rating_sum = tonumber(redis.call('HINCRBYFLOAT', KEYS[2], id .. ':rating_sum', ARGV[3]))
+local rating_count = tonumber(redis.call('HINCRBY', KEYS[2], id .. ':rating_count', ARGV[4]))
+redis.call('HINCRBYFLOAT', KEYS[2], id .. ':earnings', ARGV[5])
+local avg = 0
+if rating_count > 0 then avg = rating_sum / rating_count end
+redis.call('ZADD', KEYS[1], answered + avg / 10, id)
+local ttl = tonumber(ARGV[6])
+if ttl > 0 then
+    redis.call('EXPIRE', KEYS[1], ttl)
+    redis.call('EXPIRE', KEYS[2], ttl)
+end
+return answered
+"""
+
+
+def normalize_period(period: str) -> str:
+    """Map unknown periods to all_time (matches the SQL leaderboard behaviour)"""
+    return period if period in PERIODS else "all_time"
+
+
+def period_bucket(period: str, now: Optional[datetime] = None) -> str:
+    """Bucket name for the period containing `now` (UTC calendar week/month)"""
+    now = now or datetime.now(timezone.utc)
+    if period == "week":
+        year, week, _ = now.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "month":
+        return f"{now.year}-{now.month:02d}"
+    return "all"
+
+
+def leaderboard_score(answered: int, rating_sum: float, rating_count: int) -> float:
+    """Sorted set score: questions answered, ties broken by average rating"""
+    average = rating_sum / rating_count if rating_count else 0.0
+    return answered + average / 10
+
+
+class LeaderboardService:
+    """Redis sorted set leaderboard with SQL rebuilds"""
+
+    def __init__(self):
+        self._record_script = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self):
+        """Shared async Redis client (None when Redis is unavailable)"""
+        return cache.client
+
+    @staticmethod
+    def _keys(period: str, bucket: Optional[str] = None) -> tuple:
+        bucket = bucket or period_bucket(period)
+        base = f"leaderboard:{period}:{bucket}"
+        return base, f"{base}:stats"
+
+    async def is_ready(self, period: str) -> bool:
+        """True once the period has been rebuilt at least once and can be served from Redis"""
+        if not self.client:
+            return False
+        try:
+            return bool(await self.client.hexists("leaderboard:meta", period_bucket(period)))
+        except Exception as e:
+            logger.error(f"Leaderboard readiness check failed for {period}: {e}")
+            return False
+
+    async def _record(
+        self,
+        expert_id: UUID,
+        answered: int = 0,
+        rating_sum: float = 0.0,
+        rating_count: int = 0,
+        earnings: float = 0.0
+    ) -> None:
+        """Apply deltas to every period the event falls into"""
+        if not self.client:
+            return
+        try:
+            if self._record_script is None:
+                self._record_script = self.client.register_script(_RECORD_SCRIPT)
+            now = datetime.now(timezone.utc)
+            for period in PERIODS:
+                zset_key, stats_key = self._keys(period, period_bucket(period, now))
+                await self._record_script(
+                    keys=[zset_key, stats_key],
+                    args=[str(expert_id), answered, rating_sum, rating_count, earnings,
+                          PERIOD_TTL_SECONDS[period]]
+                )
+        except Exception as e:
+            logger.error(f"Leaderboard update failed for expert {expert_id}: {e}")
+
+    async def record_delivery(self, expert_id: UUID, earnings: float = 0.0) -> None:
+        """Count a delivered question (and the earnings it paid) for the expert"""
+        await self._record(expert_id, answered=1, earnings=earnings)
+
+    async def record_rating(self, expert_id: UUID, score: int) -> None:
+        """Add a client rating to the expert's average"""
+        await self._record(expert_id, rating_sum=score, rating_count=1)
+
+    async def record_earning(self, expert_id: UUID, amount: float) -> None:
+        """Add earnings for the expert"""
+        await self._record(expert_id, earnings=amount)
+
+    @staticmethod
+    def _entry(expert_id: str, values: List[Optional[str]]) -> Dict[str, Any]:
+        answered, rating_sum, rating_count, earnings = values
+        rating_sum = float(rating_sum or 0)
+        rating_count = int(rating_count or 0)
+        return {
+            "expert_id": expert_id,
+            "questions_answered": int(answered or 0),
+            "average_rating": rating_sum / rating_count if rating_count else None,
+            "total_earnings": float(earnings or 0),
+        }
+
+    async def get_top(self, period: str, limit: int = 50) -> Optional[List[Dict[str, Any]]]:
+        """
+        Top-N experts for the period, best first.
+        Returns None when Redis cannot serve the request and the caller should use SQL.
+        """
+        period = normalize_period(period)
+        if not await self.is_ready(period):
+            return None
+        try:
+            zset_key, stats_key = self._keys(period)
+            expert_ids = await self.client.zrevrange(zset_key, 0, limit - 1)
+            if not expert_ids:
+                return []
+            fields = [f"{expert_id}:{field}" for expert_id in expert_ids for field in STAT_FIELDS]
+            values = await self.client.hmget(stats_key, fields)
+            width = len(STAT_FIELDS)
+            entries = []
+            for idx, expert_id in enumerate(expert_ids):
+                entry = self._entry(expert_id, values[idx * width:(idx + 1) * width])
+                entry["rank"] = idx + 1
+                entries.append(entry)
+            return entries
+        except Exception as e:
+            logger.error(f"Leaderboard read failed for {period}: {e}")
+            return None
+
+    async def get_rank(self, period: str, expert_id: UUID) -> Optional[Dict[str, Any]]:
+        """An expert's rank and totals for the period, or None if unavailable"""
+        period = normalize_period(period)
+        if not await self.is_ready(period):
+            return None
+        try:
+            zset_key, stats_key = self._keys(period)
+            member = str(expert_id)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.zrevrank(zset_key, member)
+                pipe.zcard(zset_key)
+                pipe.hmget(stats_key, [f"{member}:{field}" for field in STAT_FIELDS])
+                rank, total, values = await pipe.execute()
+            entry = self._entry(member, values)
+            entry["rank"] = rank + 1 if rank is not None else None
+            entry["total_experts"] = total
+            return entry
+        except Exception as e:
+            logger.error(f"Leaderboard rank lookup failed for expert {expert_id}: {e}")
+            return None
+
+    async def rebuild(self, conn, force: bool = False) -> bool:
+        """
+        Recompute every period from SQL and swap it in atomically.
+        Without `force`, a Redis lock makes sure only one worker rebuilds per interval.
+        """
+        if not self.client:
+            return False
+        from app.crud.admin import experts as expert_crud
+
+        interval = settings.leaderboard_rebuild_interval_seconds
+        if not force:
+            acquired = await self.client.set("leaderboard:rebuild_lock", "1", nx=True, ex=max(interval - 5, 1))
+            if not acquired:
+                return False
+
+        now = datetime.now(timezone.utc)
+        for period in PERIODS:
+            bucket = period_bucket(period, now)
+            zset_key, stats_key = self._keys(period, bucket)
+            rows = await expert_crud.get_expert_leaderboard_totals(conn, period)
+
+            scores = {}
+            stats = {}
+            for row in rows:
+                member = str(row["expert_id"])
+                scores[member] = leaderboard_score(
+                    row["questions_answered"], float(row["rating_sum"]), row["rating_count"]
+                )
+                stats[f"{member}:answered"] = row["questions_answered"]
+                stats[f"{member}:rating_sum"] = float(row["rating_sum"])
+                stats[f"{member}:rating_count"] = row["rating_count"]
+                stats[f"{member}:earnings"] = float(row["total_earnings"])
+
+            tmp_zset, tmp_stats = f"{zset_key}:rebuild", f"{stats_key}:rebuild"
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.delete(tmp_zset, tmp_stats)
+                if scores:
+                    pipe.zadd(tmp_zset, scores)
+                    pipe.hset(tmp_stats, mapping=stats)
+                    pipe.rename(tmp_zset, zset_key)
+                    pipe.rename(tmp_stats, stats_key)
+                    if PERIOD_TTL_SECONDS[period]:
+                        pipe.expire(zset_key, PERIOD_TTL_SECONDS[period])
+                        pipe.expire(stats_key, PERIOD_TTL_SECONDS[period])
+                else:
+                    pipe.delete(zset_key, stats_key)
+                pipe.hset("leaderboard:meta", bucket, now.isoformat())
+                await pipe.execute()
+
+        logger.info("Leaderboard rebuilt from SQL")
+        return True
+
+    async def get_updated_at(self, period: str) -> Optional[datetime]:
+        """Timestamp of the last SQL rebuild for the period"""
+        if not self.client:
+            return None
+        try:
+            value = await self.client.hget("leaderboard:meta", period_bucket(normalize_period(period)))
+            return datetime.fromisoformat(value) if value else None
+        except Exception as e:
+            logger.error(f"Leaderboard meta read failed: {e}")
+            return None
+
+    async def _refresh_loop(self):
+        """Periodically rebuild the leaderboard from SQL"""
+        while True:
+            try:
+                if db.pool:
+                    async with db.acquire("background") as conn:
+                        await self.rebuild(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Leaderboard rebuild failed: {e}")
+            await asyncio.sleep(settings.leaderboard_rebuild_interval_seconds)
+
+    def start(self):
+        """Start the background rebuild task"""
+        if self.client and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+            logger.info("Leaderboard refresh task started")
+
+    async def stop(self):
+        """Stop the background rebuild task"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+            logger.info("Leaderboard refresh task stopped")
+
+
+# Global leaderboard instance
+leaderboard = LeaderboardService()
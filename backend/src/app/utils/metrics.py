@@ -0,0 +1,152 @@
+"""
+Time-series metrics
+Hourly counters (questions by status and subject, ratings, users by role) are
+kept in Postgres by triggers as rows change (migration 015), so dashboard
+stats and charts are range reads over a bounded number of buckets. Distinct
+active clients are counted with per-day Redis HyperLogLogs, recorded as
+questions are submitted; reads fall back to SQL while Redis is unavailable.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Dashboard trends compare the last WINDOW_DAYS with the WINDOW_DAYS before
+WINDOW_DAYS = 30
+# Day keys must outlive both windows
+ACTIVE_CLIENTS_TTL_SECONDS = (2 * WINDOW_DAYS + 2) * 24 * 3600
+META_KEY = "metrics:meta"
+
+
+def hour_start(moment: Optional[datetime] = None) -> datetime:
+    """Start of the UTC hour containing `moment`"""
+    moment = moment or datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(moment: Optional[datetime] = None) -> datetime:
+    """Start of the UTC day containing `moment`"""
+    return hour_start(moment).replace(hour=0)
+
+
+def active_clients_key(day: datetime) -> str:
+    return f"metrics:active_clients:{day.strftime('%Y-%m-%d')}"
+
+
+class MetricsService:
+    """Active-client HyperLogLogs and upkeep of the hourly metrics"""
+    
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def client(self):
+        """Shared async Redis client (None when Redis is unavailable)"""
+        return cache.client
+    
+    async def record_active_client(self, client_id: UUID, at: Optional[datetime] = None) -> None:
+        """Count a client as active on the (UTC) day of `at`"""
+        if not self.client:
+            return
+        key = active_clients_key(day_start(at))
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.pfadd(key, str(client_id))
+                pipe.expire(key, ACTIVE_CLIENTS_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Active client metric update failed: {e}")
+    
+    async def count_active_clients(self, start: datetime, days: int) -> Optional[int]:
+        """
+        Approximate distinct clients active in the `days` UTC days from `start`.
+        Returns None when Redis cannot answer and the caller should use SQL.
+        """
+        if not self.client:
+            return None
+        try:
+            if not await self.client.hexists(META_KEY, "active_clients"):
+                return None
+            keys = [active_clients_key(day_start(start) + timedelta(days=i)) for i in range(days)]
+            return int(await self.client.pfcount(*keys))
+        except Exception as e:
+            logger.error(f"Active client metric read failed: {e}")
+            return None
+    
+    async def backfill_active_clients(self, conn, force: bool = False) -> bool:
+        """
+        Load the active clients of both trend windows from SQL, once per
+        Redis dataset (a meta flag marks it done; a lock keeps it to one worker).
+        """
+        if not self.client:
+            return False
+        from app.crud.admin import metrics as metrics_crud
+        
+        if not force:
+            if await self.client.hexists(META_KEY, "active_clients"):
+                return False
+            if not await self.client.set("metrics:backfill_lock", "1", nx=True, ex=600):
+                return False
+        
+        today = day_start()
+        for offset in range(2 * WINDOW_DAYS, -1, -1):
+            day = today - timedelta(days=offset)
+            client_ids = await metrics_crud.get_active_client_ids(conn, day, day + timedelta(days=1))
+            if not client_ids:
+                continue
+            key = active_clients_key(day)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.pfadd(key, *client_ids)
+                pipe.expire(key, ACTIVE_CLIENTS_TTL_SECONDS)
+                await pipe.execute()
+        await self.client.hset(META_KEY, "active_clients", datetime.now(timezone.utc).isoformat())
+        logger.info("Active client metrics backfilled from SQL")
+        return True
+    
+    async def prune(self, conn) -> int:
+        """Drop hourly buckets past METRICS_RETENTION_DAYS"""
+        from app.crud.admin import metrics as metrics_crud
+        before = hour_start() - timedelta(days=settings.metrics_retention_days)
+        return await metrics_crud.delete_hourly_before(conn, before)
+    
+    async def _maintenance_loop(self):
+        while True:
+            try:
+                if db.pool:
+                    async with db.acquire("background") as conn:
+                        await self.backfill_active_clients(conn)
+                        deleted = await self.prune(conn)
+                        if deleted:
+                            logger.info(f"Pruned {deleted} hourly metric buckets")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Metrics maintenance failed: {e}")
+            await asyncio.sleep(settings.metrics_maintenance_interval_seconds)
+    
+    def start(self):
+        """Start the background backfill/retention task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._maintenance_loop())
+            logger.info("Metrics maintenance task started")
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global metrics instance
+metrics = MetricsService()
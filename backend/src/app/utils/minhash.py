@@ -0,0 +1,191 @@
+"""
+MinHash signatures and LSH banding
+Vectorized with NumPy; used for near-duplicate detection of questions and answers
+"""
+
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text: str) -> List[str]:
+    """Lowercase and tokenize into alphanumeric words (punctuation and spacing are ignored)"""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def shingle_hashes(text: str, shingle_size: int = 3) -> np.ndarray:
+    """Stable 32-bit hashes of the word k-shingles of `text`"""
+    tokens = normalize_text(text)
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = [
+            " ".join(tokens[i:i + shingle_size])
+            for i in range(len(tokens) - shingle_size + 1)
+        ]
+    unique = set(shingles)
+    return np.fromiter(
+        (zlib.crc32(s.encode()) for s in unique),
+        dtype=np.uint64,
+        count=len(unique)
+    )
+
+
+def optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose LSH threshold
+    (1/bands)^(1/rows) is the highest one not above `threshold`.
+    """
+    best = (num_perm, 1)
+    best_threshold = -1.0
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        lsh_threshold = (1.0 / bands) ** (1.0 / rows)
+        if best_threshold < lsh_threshold <= threshold:
+            best, best_threshold = (bands, rows), lsh_threshold
+    return best
+
+
+class MinHasher:
+    """Computes MinHash signatures with a fixed, seeded permutation family"""
+    
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+    
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (uint32 array of length num_perm) for `text`"""
+        hashes = shingle_hashes(text, self.shingle_size)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        # (num_perm, 1) x (1, shingles) -> permuted hashes, min over shingles
+        with np.errstate(over="ignore"):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+    
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        """Signatures for many texts, stacked into a (len(texts), num_perm) matrix"""
+        rows = [self.signature(text) for text in texts]
+        if not rows:
+            return np.empty((0, self.num_perm), dtype=np.uint32)
+        return np.vstack(rows)
+
+
+class LSHIndex:
+    """
+    In-memory LSH bucket index over MinHash signatures.
+    Signatures live in one growing matrix so candidate similarity is a single
+    vectorized comparison.
+    """
+    
+    def __init__(self, num_perm: int = 128, threshold: float = 0.5):
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._matrix = np.empty((1024, num_perm), dtype=np.uint32)
+        self._keys: List[Optional[Tuple[str, str]]] = []
+        self._owners: List[Optional[str]] = []
+        self._rows_by_key: Dict[Tuple[str, str], int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._rows_by_key)
+    
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._rows_by_key
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+    
+    def add(self, key: Tuple[str, str], signature: np.ndarray, owner: Optional[str] = None) -> None:
+        """Index `signature` under `key` (content_type, content_id)"""
+        if key in self._rows_by_key:
+            return
+        row = len(self._keys)
+        if row >= self._matrix.shape[0]:
+            grown = np.empty((self._matrix.shape[0] * 2, self.num_perm), dtype=np.uint32)
+            grown[:row] = self._matrix[:row]
+            self._matrix = grown
+        self._matrix[row] = signature
+        self._keys.append(key)
+        self._owners.append(owner)
+        self._rows_by_key[key] = row
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, []).append(row)
+    
+    def remove(self, key: Tuple[str, str]) -> None:
+        """Stop returning `key` from queries (its matrix row is left as a tombstone)"""
+        row = self._rows_by_key.pop(key, None)
+        if row is None:
+            return
+        for band, band_key in enumerate(self._band_keys(self._matrix[row])):
+            bucket = self._buckets[band].get(band_key)
+            if bucket and row in bucket:
+                bucket.remove(row)
+        self._keys[row] = None
+    
+    def query(
+        self,
+        signature: np.ndarray,
+        content_type: Optional[str] = None,
+        exclude_owner: Optional[str] = None,
+        limit: int = 10,
+        min_similarity: Optional[float] = None
+    ) -> List[Dict[str, object]]:
+        """
+        Near-duplicates of `signature`, most similar first.
+        Only candidates sharing an LSH band are compared; their estimated
+        Jaccard similarity must reach `min_similarity` (default: the index threshold).
+        """
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        candidates = [
+            row for row in candidates
+            if self._keys[row] is not None
+            and (content_type is None or self._keys[row][0] == content_type)
+            and (exclude_owner is None or self._owners[row] != exclude_owner)
+        ]
+        if not candidates:
+            return []
+        
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._matrix[rows] == signature[None, :]).mean(axis=1)
+        order = np.argsort(-similarity)
+        threshold = self.threshold if min_similarity is None else min_similarity
+        matches = []
+        for idx in order[:limit]:
+            if similarity[idx] < threshold:
+                break
+            content_type_, content_id = self._keys[rows[idx]]
+            matches.append({
+                "content_type": content_type_,
+                "content_id": content_id,
+                "owner_id": self._owners[rows[idx]],
+                "similarity": float(similarity[idx]),
+            })
+        return matches
+
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    """Serialize a signature for storage"""
+    return signature.astype("<u4").tobytes()
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    """Deserialize a stored signature"""
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
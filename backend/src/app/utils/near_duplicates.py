@@ -0,0 +1,219 @@
+"""
+Near-duplicate detection for questions and answers
+Keeps an in-process MinHash/LSH index (see utils/minhash.py), flags
+near-duplicates as plagiarism and persists signatures in content_signatures
+so the index can be reloaded incrementally at startup. Each worker has its
+own index, so after the startup load it re-reads the signatures other
+workers stored every NEAR_DUPLICATE_REFRESH_SECONDS.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.utils.runtime_settings import runtime_settings
+from app.crud.admin import compliance as compliance_crud
+from app.crud.admin import similarity as similarity_crud
+from app.db.session import db
+from app.utils.minhash import LSHIndex, MinHasher, signature_from_bytes, signature_to_bytes
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 5000
+BACKFILL_BATCH_SIZE = 500
+# Refreshes re-read this far behind the newest signature seen, so rows whose
+# transaction committed after a later-stamped one are still picked up
+REFRESH_OVERLAP = timedelta(minutes=2)
+
+
+def flag_severity(similarity: float) -> str:
+    """Compliance flag severity for a near-duplicate match"""
+    if similarity >= 0.95:
+        return "high"
+    if similarity >= 0.85:
+        return "medium"
+    return "low"
+
+
+class NearDuplicateService:
+    """MinHash/LSH near-duplicate index with plagiarism flagging"""
+    
+    def __init__(self):
+        self.hasher = MinHasher(
+            num_perm=settings.near_duplicate_num_perm,
+            shingle_size=settings.near_duplicate_shingle_size
+        )
+        self.index = LSHIndex(
+            num_perm=settings.near_duplicate_num_perm,
+            threshold=settings.near_duplicate_threshold
+        )
+        self._load_task: Optional[asyncio.Task] = None
+        self._loaded = False
+        # created_at of the newest stored signature read so far
+        self._seen_until: Optional[datetime] = None
+    
+    @property
+    def ready(self) -> bool:
+        """True once the startup load from the database has finished"""
+        return self._loaded
+    
+    def find_similar(
+        self,
+        text: str,
+        content_type: Optional[str] = None,
+        exclude_owner: Optional[UUID] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Indexed content whose estimated Jaccard similarity to `text` reaches the index threshold"""
+        signature = self.hasher.signature(text)
+        return self.index.query(
+            signature,
+            content_type=content_type,
+            exclude_owner=str(exclude_owner) if exclude_owner else None,
+            limit=limit
+        )
+    
+    async def check_and_index(
+        self,
+        conn,
+        content_id: UUID,
+        content_type: str,
+        text: str,
+        owner_id: Optional[UUID] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Flag near-duplicates of new content from other owners, then add it to the index.
+        Returns the matches that were flagged.
+        """
+        signature = self.hasher.signature(text)
+        owner = str(owner_id) if owner_id else None
+        matches = self.index.query(signature, content_type=content_type, exclude_owner=owner)
+        uniqueness_threshold = runtime_settings.get_float("uniqueness_threshold")
+        flagged = [m for m in matches if 1 - m["similarity"] < uniqueness_threshold]
+        
+        if flagged:
+            best = flagged[0]
+            await compliance_crud.create_compliance_flag(
+                conn,
+                content_id,
+                content_type,
+                "plagiarism",
+                flag_severity(best["similarity"]),
+                details={
+                    "similarity": round(best["similarity"], 4),
+                    "originality": round(1 - best["similarity"], 4),
+                    "matches": [
+                        {"content_id": m["content_id"], "similarity": round(m["similarity"], 4)}
+                        for m in flagged
+                    ]
+                },
+                user_id=owner_id
+            )
+        
+        if text and text.strip():
+            self.index.add((content_type, str(content_id)), signature, owner)
+            await similarity_crud.save_content_signatures(
+                conn, self.hasher.num_perm,
+                [(content_type, content_id, owner_id, signature_to_bytes(signature))]
+            )
+        return flagged
+    
+    async def load_signatures(self, conn, after=None) -> int:
+        """Add stored signatures after the `after` cursor to the index; returns how many were new"""
+        added = 0
+        while True:
+            rows = await similarity_crud.get_content_signatures(conn, self.hasher.num_perm, after, LOAD_BATCH_SIZE)
+            for row in rows:
+                key = (row["content_type"], str(row["content_id"]))
+                if key not in self.index:
+                    self.index.add(
+                        key,
+                        signature_from_bytes(row["signature"]),
+                        str(row["owner_id"]) if row["owner_id"] else None
+                    )
+                    added += 1
+            if rows:
+                last = rows[-1]
+                after = (last["created_at"], last["content_type"], last["content_id"])
+                if self._seen_until is None or last["created_at"] > self._seen_until:
+                    self._seen_until = last["created_at"]
+            if len(rows) < LOAD_BATCH_SIZE:
+                return added
+            await asyncio.sleep(0)
+    
+    async def refresh(self, conn) -> int:
+        """Add the signatures stored since the last read (by any worker); returns how many were new"""
+        if self._seen_until is None:
+            return await self.load_signatures(conn)
+        # Empty type and nil id sort before every real row at that timestamp
+        after = (self._seen_until - REFRESH_OVERLAP, "", UUID(int=0))
+        return await self.load_signatures(conn, after)
+    
+    async def load(self, conn) -> int:
+        """Load stored signatures, then sign any content that has none yet"""
+        num_perm = self.hasher.num_perm
+        loaded = await self.load_signatures(conn)
+        
+        signed = 0
+        while True:
+            rows = await similarity_crud.get_unsigned_content(conn, num_perm, BACKFILL_BATCH_SIZE)
+            if not rows:
+                break
+            signatures = self.hasher.signatures(row["text"] for row in rows)
+            batch = []
+            for row, signature in zip(rows, signatures):
+                owner = str(row["owner_id"]) if row["owner_id"] else None
+                self.index.add((row["content_type"], str(row["content_id"])), signature, owner)
+                batch.append((row["content_type"], row["content_id"], row["owner_id"],
+                              signature_to_bytes(signature)))
+            await similarity_crud.save_content_signatures(conn, num_perm, batch)
+            signed += len(batch)
+            await asyncio.sleep(0)
+        
+        logger.info(f"Near-duplicate index loaded: {loaded} stored, {signed} newly signed")
+        return loaded + signed
+    
+    async def _load_from_db(self):
+        try:
+            if db.pool:
+                async with db.acquire("background") as conn:
+                    await self.load(conn)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Near-duplicate index load failed: {e}")
+        self._loaded = True
+        
+        interval = settings.near_duplicate_refresh_seconds
+        while interval > 0:
+            await asyncio.sleep(interval)
+            try:
+                if db.pool:
+                    async with db.acquire("background") as conn:
+                        await self.refresh(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Near-duplicate index refresh failed: {e}")
+    
+    def start(self):
+        """Load the index from the database in the background, then keep it refreshed"""
+        if self._load_task is None:
+            self._load_task = asyncio.create_task(self._load_from_db())
+    
+    async def stop(self):
+        """Cancel the load/refresh task"""
+        if self._load_task:
+            self._load_task.cancel()
+            try:
+                await self._load_task
+            except asyncio.CancelledError:
+                pass
+            self._load_task = None
+
+
+# Global near-duplicate service instance
+near_duplicates = NearDuplicateService()
@@ -0,0 +1,100 @@
+"""
+Image pre-processing and OCR
+Plain functions so they can run in a worker process: downscale, grayscale,
+autocontrast and deskew an image, then read it with Tesseract.
+"""
+
+import io
+import time
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+try:
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    pytesseract = None
+    TESSERACT_AVAILABLE = False
+
+# Skew search range and step in degrees
+MAX_SKEW_DEGREES = 10.0
+SKEW_STEP_DEGREES = 0.25
+# Width the image is reduced to for skew estimation
+SKEW_SAMPLE_WIDTH = 800
+
+
+def estimate_skew(image: Image.Image) -> float:
+    """
+    Skew (degrees, counter-clockwise) of the text lines of a grayscale image.
+    Every candidate angle is scored at once: ink pixel coordinates are
+    projected onto the rotated vertical axis and the angle whose row
+    histogram has the sharpest peaks wins.
+    """
+    sample = image
+    if image.width > SKEW_SAMPLE_WIDTH:
+        sample = image.resize(
+            (SKEW_SAMPLE_WIDTH, max(1, round(image.height * SKEW_SAMPLE_WIDTH / image.width)))
+        )
+    pixels = np.asarray(sample, dtype=np.float32)
+    ink = pixels < min(pixels.mean() - pixels.std(), 128)
+    ys, xs = np.nonzero(ink)
+    if ys.size < 50:
+        return 0.0
+    
+    angles = np.deg2rad(np.arange(-MAX_SKEW_DEGREES, MAX_SKEW_DEGREES + SKEW_STEP_DEGREES, SKEW_STEP_DEGREES))
+    xs = xs - sample.width / 2
+    ys = ys - sample.height / 2
+    # (angles, pixels) row position of every ink pixel after rotating by each angle
+    rows = ys[None, :] * np.cos(angles)[:, None] + xs[None, :] * np.sin(angles)[:, None]
+    rows = np.rint(rows - rows.min()).astype(np.int64)
+    height = int(rows.max()) + 1
+    offsets = (np.arange(len(angles)) * height)[:, None]
+    histograms = np.bincount((rows + offsets).ravel(), minlength=len(angles) * height)
+    sharpness = (histograms.reshape(len(angles), height).astype(np.float64) ** 2).sum(axis=1)
+    return float(np.rad2deg(angles[int(np.argmax(sharpness))]))
+
+
+def preprocess_image(image: Image.Image, max_dimension: int) -> Tuple[Image.Image, float]:
+    """Upright, grayscale, size-capped, contrast-stretched and deskewed copy of `image`"""
+    image = ImageOps.exif_transpose(image).convert("L")
+    if max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    image = ImageOps.autocontrast(image)
+    angle = estimate_skew(image)
+    if abs(angle) >= SKEW_STEP_DEGREES:
+        image = image.rotate(-angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return image, angle
+
+
+def tesseract_version() -> str:
+    """Installed Tesseract version; raises RuntimeError if it cannot be run"""
+    if not TESSERACT_AVAILABLE:
+        raise RuntimeError("pytesseract is not installed")
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception as e:
+        raise RuntimeError(f"Tesseract not available: {e}") from None
+
+
+def run_ocr(data: bytes, max_dimension: int, languages: str) -> Dict[str, Any]:
+    """OCR an encoded image (runs in the OCR process pool)"""
+    if not TESSERACT_AVAILABLE:
+        raise RuntimeError("pytesseract is not installed")
+    started = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        processed, angle = preprocess_image(image, max_dimension)
+    try:
+        text = pytesseract.image_to_string(processed, lang=languages)
+    except Exception as e:
+        # pytesseract's exceptions do not survive pickling back to the parent process
+        raise RuntimeError(f"Tesseract failed: {e}") from None
+    return {
+        "text": text.strip(),
+        "skew_angle": round(angle, 2),
+        "width": processed.width,
+        "height": processed.height,
+        "processing_ms": (time.perf_counter() - started) * 1000
+    }
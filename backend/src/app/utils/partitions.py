@@ -0,0 +1,157 @@
+"""
+Table partition maintenance
+admin_actions, audit_logs, notifications and transactions are range
+partitioned by UTC month of created_at (migration 016). Queries bounded on
+created_at only touch the months they cover, and old data leaves by the
+partition instead of by DELETE. A background task keeps them up:
+
+- partitions for the current month and PARTITION_MONTHS_AHEAD months after it
+  are created before any row needs them, so inserts never fall through to
+  the default partition
+- partitions older than the table's PARTITION_RETENTION_<TABLE>_MONTHS are
+  detached, then moved to the archive schema, left in place or dropped
+  (PARTITION_RETENTION_ACTION)
+
+Each table is maintained in its own transaction under an advisory lock, so
+one worker does it at a time.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.db.session import db
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("admin_actions", "audit_logs", "notifications", "transactions")
+RETENTION_ACTIONS = ("archive", "detach", "drop")
+
+
+def month_start(moment: Optional[datetime] = None) -> date:
+    """First day of the UTC month containing `moment`"""
+    moment = moment or datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc).date().replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(parent: str, month: date) -> str:
+    return f"{parent}_p{month.strftime('%Y%m')}"
+
+
+def partition_month(parent: str, name: str) -> Optional[date]:
+    """Month a partition covers, or None for the default partition"""
+    match = re.fullmatch(re.escape(parent) + r"_p(\d{4})(\d{2})", name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def retention_months(parent: str) -> int:
+    return getattr(settings, f"partition_retention_{parent}_months", 0)
+
+
+def expired_partitions(parent: str, partitions: Iterable[str], current: date) -> List[str]:
+    """Partitions of months before the retention window that ends with `current`"""
+    months = retention_months(parent)
+    if months <= 0:
+        return []
+    cutoff = add_months(current, -months)
+    return [
+        name for name in partitions
+        if (month := partition_month(parent, name)) is not None and month < cutoff
+    ]
+
+
+class PartitionManager:
+    """Creates upcoming partitions and retires expired ones"""
+    
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+    
+    async def maintain_table(self, conn, parent: str, current: Optional[date] = None) -> Dict[str, List[str]]:
+        """Bring one table's partitions up to date; returns what was created and retired"""
+        from app.crud.admin import partitions as partition_crud
+        current = current or month_start()
+        action = settings.partition_retention_action
+        if action not in RETENTION_ACTIONS:
+            raise ValueError(f"Unknown PARTITION_RETENTION_ACTION {action!r}")
+        done: Dict[str, List[str]] = {"created": [], "retired": []}
+        
+        async with conn.transaction():
+            if not await conn.fetchval("SELECT pg_try_advisory_xact_lock(hashtext($1))", f"partitions:{parent}"):
+                return done
+            attached = await partition_crud.get_partitions(conn, parent)
+            if not attached:
+                # Not partitioned (migration 016 not applied)
+                return done
+            
+            for offset in range(settings.partition_months_ahead + 1):
+                month = add_months(current, offset)
+                if await partition_crud.create_month_partition(conn, parent, month):
+                    done["created"].append(partition_name(parent, month))
+            
+            for partition in expired_partitions(parent, attached, current):
+                await partition_crud.detach_partition(conn, parent, partition)
+                if action == "archive":
+                    await partition_crud.archive_partition(conn, partition)
+                elif action == "drop":
+                    await partition_crud.drop_partition(conn, partition)
+                done["retired"].append(partition)
+        return done
+    
+    async def maintain(self, conn) -> None:
+        """Maintain every partitioned table; one failing does not stop the others"""
+        for parent in PARTITIONED_TABLES:
+            try:
+                done = await self.maintain_table(conn, parent)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Partition maintenance of {parent} failed: {e}")
+                continue
+            if done["created"]:
+                logger.info(f"Created partitions {', '.join(done['created'])}")
+            if done["retired"]:
+                logger.info(
+                    f"Retired partitions {', '.join(done['retired'])} "
+                    f"({settings.partition_retention_action})"
+                )
+    
+    async def _maintenance_loop(self):
+        while True:
+            try:
+                if db.pool:
+                    async with db.acquire("background") as conn:
+                        await self.maintain(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+            await asyncio.sleep(settings.partition_maintenance_interval_seconds)
+    
+    def start(self):
+        """Start the background partition maintenance task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._maintenance_loop())
+            logger.info("Partition maintenance task started")
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global partition manager instance
+partitions = PartitionManager()
@@ -0,0 +1,215 @@
+"""
+Question archive
+Delivered questions stay in the hot tables forever with their full text and
+JSONB metadata, which every history, list and stats query has to scan past.
+Questions delivered more than QUESTION_ARCHIVE_AFTER_MONTHS ago are archived
+by a background task: the question with its answers, expert reviews and
+ratings is stored as one zlib-compressed JSON bundle in archive.questions,
+and the rows stay behind as stubs with their bodies emptied (migration 017),
+so counts and stats do not change.
+
+Readers fill emptied bodies back in from the bundle on demand (load and
+fill); bundles never change once written, so each worker keeps a small LRU
+of decompressed ones. Full-text search and exact answer reuse still find
+archived questions: the stub keeps the search vector (migration 020) and text
+fingerprint (migration 021) of its archived text. Queries over the emptied
+columns themselves (e.g. ILIKE on question_text) do not.
+"""
+
+import asyncio
+import calendar
+import json
+import logging
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.partitions import add_months
+
+logger = logging.getLogger(__name__)
+
+# Batches per maintenance pass, so one pass cannot run unbounded
+MAX_BATCHES_PER_PASS = 50
+
+
+def archive_cutoff(months: int, now: Optional[datetime] = None) -> datetime:
+    """`months` calendar months before `now`"""
+    now = now or datetime.now(timezone.utc)
+    month = add_months(now.date().replace(day=1), -months)
+    last_day = calendar.monthrange(month.year, month.month)[1]
+    return now.replace(year=month.year, month=month.month, day=min(now.day, last_day))
+
+
+def compress_bundle(document: str) -> bytes:
+    return zlib.compress(document.encode(), settings.question_archive_compression_level)
+
+
+def decompress_bundle(bundle: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(bundle))
+
+
+def archived_answer(bundle: Dict[str, Any], answer_id: Optional[UUID] = None) -> Optional[Dict[str, Any]]:
+    """The bundle's answer with `answer_id`, else its latest one"""
+    answers = bundle.get("answers") or []
+    if answer_id is not None:
+        for answer in answers:
+            if answer.get("id") == str(answer_id):
+                return answer
+    return answers[-1] if answers else None
+
+
+def fill(live: Any, archived: Any) -> Any:
+    """The live value, unless the archiver emptied it"""
+    if live is not None and live != "":
+        return live
+    if isinstance(archived, (dict, list)):
+        # asyncpg returns JSONB columns as text
+        return json.dumps(archived)
+    return archived
+
+
+def fill_row(row: Dict[str, Any], table: str, archived: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fill a row's emptied body columns (those it has) from its archived copy"""
+    from app.crud.admin.archive import BODY_COLUMNS
+    if not archived:
+        return row
+    for column in BODY_COLUMNS[table]:
+        if column in row:
+            row[column] = fill(row[column], archived.get(column))
+    return row
+
+
+def fill_texts(
+    bundle: Optional[Dict[str, Any]],
+    answer_id: Optional[UUID],
+    question_text: Optional[str],
+    answer_text: Optional[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """Question and answer text of a history/status row, from its bundle where emptied"""
+    if not bundle:
+        return question_text, answer_text
+    answer = archived_answer(bundle, answer_id) or {}
+    return (
+        fill(question_text, bundle["question"].get("question_text")),
+        fill(answer_text, answer.get("answer_text"))
+    )
+
+
+class QuestionArchive:
+    """Archives old delivered questions and loads their bundles back"""
+    
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._bundles: "OrderedDict[UUID, Dict[str, Any]]" = OrderedDict()
+    
+    async def load(self, conn, question_ids: Iterable[UUID]) -> Dict[UUID, Dict[str, Any]]:
+        """Decompressed bundles of the given questions that are archived"""
+        from app.crud.admin import archive as archive_crud
+        found: Dict[UUID, Dict[str, Any]] = {}
+        missing = []
+        for question_id in dict.fromkeys(question_ids):
+            bundle = self._bundles.get(question_id)
+            if bundle is None:
+                missing.append(question_id)
+            else:
+                self._bundles.move_to_end(question_id)
+                found[question_id] = bundle
+        if not missing:
+            return found
+        
+        for question_id, data in (await archive_crud.get_archived_bundles(conn, missing)).items():
+            bundle = found[question_id] = decompress_bundle(data)
+            self._bundles[question_id] = bundle
+        while len(self._bundles) > settings.question_archive_cache_size:
+            self._bundles.popitem(last=False)
+        return found
+    
+    async def fill_answer_texts(
+        self,
+        conn,
+        rows: List[Dict[str, Any]],
+        question_key: str = "source_question_id",
+        answer_key: str = "source_answer_id"
+    ) -> List[Dict[str, Any]]:
+        """Fill the emptied answer_text of rows pointing at archived answers"""
+        emptied = [row for row in rows if row.get("answer_text") == ""]
+        if not emptied:
+            return rows
+        bundles = await self.load(conn, [row[question_key] for row in emptied])
+        for row in emptied:
+            bundle = bundles.get(row[question_key])
+            answer = archived_answer(bundle, row[answer_key]) if bundle else None
+            if answer:
+                row["answer_text"] = fill(row["answer_text"], answer.get("answer_text"))
+        return rows
+    
+    async def archive_batch(self, conn) -> int:
+        """Archive one batch of questions due for it; returns how many"""
+        from app.crud.admin import archive as archive_crud
+        months = settings.question_archive_after_months
+        if months <= 0:
+            return 0
+        before = archive_cutoff(months)
+        async with conn.transaction():
+            records = await archive_crud.get_archivable_bundles(conn, before, settings.question_archive_batch_size)
+            if not records:
+                return 0
+            rows = [
+                (record["id"], record["client_id"], record["delivered_at"],
+                 compress_bundle(record["document"]), len(record["document"].encode()))
+                for record in records
+            ]
+            await archive_crud.save_archived_questions(conn, rows)
+        return len(rows)
+    
+    async def restore(self, conn, question_id: UUID) -> bool:
+        """Put an archived question's bodies back in the hot tables"""
+        from app.crud.admin import archive as archive_crud
+        bundle = (await self.load(conn, [question_id])).get(question_id)
+        if bundle is None:
+            return False
+        await archive_crud.restore_archived_question(conn, question_id, bundle)
+        self._bundles.pop(question_id, None)
+        return True
+    
+    async def _archive_loop(self):
+        while True:
+            try:
+                if db.pool:
+                    archived = 0
+                    async with db.acquire("background") as conn:
+                        for _ in range(MAX_BATCHES_PER_PASS):
+                            count = await self.archive_batch(conn)
+                            archived += count
+                            if count < settings.question_archive_batch_size:
+                                break
+                    if archived:
+                        logger.info(f"Archived {archived} delivered questions")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Question archiving failed: {e}")
+            await asyncio.sleep(settings.question_archive_interval_seconds)
+    
+    def start(self):
+        """Start the background archiver (QUESTION_ARCHIVE_AFTER_MONTHS=0 disables it)"""
+        if self._task is None and settings.question_archive_after_months > 0:
+            self._task = asyncio.create_task(self._archive_loop())
+            logger.info("Question archiver started")
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global question archive instance
+question_archive = QuestionArchive()
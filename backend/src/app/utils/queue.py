@@ -116,6 +116,14 @@ class QueueService:
         
         await queue.consume(process_message)
         logger.info(f"Started consuming from queue: {queue_name}")
+    
+    async def message_count(self, queue_name: str, durable: bool = True) -> Optional[int]:
+        """Messages waiting in a queue across all consumers (None when not connected)"""
+        if not self.channel:
+            return None
+        # Re-declaring is idempotent and returns the broker's current counts
+        queue = await self.channel.declare_queue(queue_name, durable=durable)
+        return queue.declaration_result.message_count
 
 
 # Global queue service instance
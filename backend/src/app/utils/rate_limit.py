@@ -0,0 +1,368 @@
+"""
+Token-bucket rate limiting
+An ASGI middleware that limits requests per route group (auth, client,
+expert, admin) and role. Buckets live in Redis and are checked and updated
+atomically by one Lua script per request; an in-process pre-filter rejects
+clients that are already known to be over their limit without a Redis round
+trip, and takes over entirely while Redis is unavailable.
+"""
+
+import ipaddress
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.security import SecurityUtils
+from app.core.tokens import token_verifier
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Path prefix -> route group; only sign-in and sign-up are limited per IP,
+# the rest of /auth is counted like any other route
+ROUTE_GROUPS = (
+    ("/api/v1/auth/login", "auth"),
+    ("/api/v1/auth/register", "auth"),
+    ("/api/v1/client", "client"),
+    ("/api/v1/expert", "expert"),
+    ("/api/v1/admin", "admin"),
+)
+EXEMPT_PATHS = ("/api/v1/health", "/docs", "/redoc", "/openapi.json")
+
+HOUR_SECONDS = 3600
+
+# Refill and take `cost` tokens from every bucket, or from none of them.
+# KEYS = bucket hashes; ARGV = cost, then capacity and refill rate (tokens/s) per key.
+# Returns {allowed, index of the tightest bucket, its tokens left, seconds until
+# a denied request could pass, seconds until the tightest bucket is full}
+# (numbers as strings; Lua numbers would be truncated to integers)
+_TAKE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local tokens = {}
+local allowed = 1
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    if level < cost then
+        allowed = 0
+        retry_after = math.max(retry_after, (cost - level) / rate)
+    end
+    tokens[i] = level
+end
+local tightest = 1
+local tightest_reset = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    if allowed == 1 then tokens[i] = tokens[i] - cost end
+    redis.call('HSET', key, 'tokens', tokens[i], 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+    if tokens[i] / capacity < tokens[tightest] / tonumber(ARGV[tightest * 2]) then tightest = i end
+end
+tightest_reset = (tonumber(ARGV[tightest * 2]) - tokens[tightest]) / tonumber(ARGV[tightest * 2 + 1])
+return {allowed, tightest, tostring(tokens[tightest]), tostring(retry_after), tostring(tightest_reset)}
+"""
+
+
+def parse_rate_limit_rules(rules: str) -> Dict[Tuple[str, Optional[str]], int]:
+    """
+    Parse "group[:role]=requests per minute" pairs, e.g.
+    "auth=10,client=60,admin:super_admin=600". A group of * matches every group.
+    """
+    parsed = {}
+    for rule in rules.split(","):
+        rule = rule.strip()
+        if not rule:
+            continue
+        target, _, limit = rule.partition("=")
+        group, _, role = target.strip().partition(":")
+        try:
+            parsed[(group, role or None)] = int(limit)
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit rule: {rule}")
+    return parsed
+
+
+class Bucket:
+    """An in-process token bucket"""
+    
+    __slots__ = ("capacity", "rate", "tokens", "updated", "blocked_until")
+    
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # set when Redis reports the client over its limit
+    
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimitResult:
+    """Outcome of a check, with the values for the RateLimit-* headers"""
+    
+    __slots__ = ("allowed", "limit", "remaining", "reset", "retry_after")
+    
+    def __init__(self, allowed: bool, limit: int, remaining: float, reset: float, retry_after: float = 0.0):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+    
+    def headers(self) -> List[Tuple[bytes, bytes]]:
+        headers = [
+            (b"ratelimit-limit", str(self.limit).encode()),
+            (b"ratelimit-remaining", str(max(0, math.floor(self.remaining))).encode()),
+            (b"ratelimit-reset", str(math.ceil(self.reset)).encode()),
+        ]
+        if not self.allowed:
+            headers.append((b"retry-after", str(max(1, math.ceil(self.retry_after))).encode()))
+        return headers
+
+
+class RateLimiter:
+    """Per-minute (per group and role) and per-hour (per client) token buckets"""
+    
+    def __init__(self):
+        self._take_script = None
+        self._rules: Optional[Dict[Tuple[str, Optional[str]], int]] = None
+        self._local: "OrderedDict[str, Bucket]" = OrderedDict()
+        self.redis_checks = 0
+        self.local_rejections = 0
+    
+    @property
+    def client(self):
+        """Shared async Redis client (None when Redis is unavailable)"""
+        return cache.client
+    
+    def per_minute(self, group: str, role: Optional[str]) -> int:
+        """Requests per minute for a route group and role (most specific rule wins)"""
+        if self._rules is None:
+            self._rules = parse_rate_limit_rules(settings.rate_limit_rules)
+        for key in ((group, role), (group, None), ("*", role), ("*", None)):
+            if key in self._rules:
+                return self._rules[key]
+        return settings.rate_limit_per_minute
+    
+    def _buckets(self, group: str, identity: str, role: Optional[str]) -> List[Tuple[str, float, float]]:
+        """(key, capacity, refill rate per second) of every bucket a request draws from"""
+        per_minute = self.per_minute(group, role)
+        buckets = [(SecurityUtils.rate_limit_key(identity, group), per_minute, per_minute / 60)]
+        if settings.rate_limit_per_hour > 0:
+            buckets.append((
+                SecurityUtils.rate_limit_key(identity, "hour"),
+                settings.rate_limit_per_hour, settings.rate_limit_per_hour / HOUR_SECONDS
+            ))
+        return buckets
+    
+    def _local_bucket(self, key: str, capacity: float, rate: float) -> Bucket:
+        bucket = self._local.get(key)
+        if bucket is None or bucket.capacity != capacity:
+            bucket = Bucket(capacity, rate)
+            self._local[key] = bucket
+            while len(self._local) > settings.rate_limit_local_max_keys:
+                self._local.popitem(last=False)
+        else:
+            self._local.move_to_end(key)
+        return bucket
+    
+    def _check_local(self, buckets: List[Tuple[str, float, float]]) -> RateLimitResult:
+        """
+        Check this worker's copy of the buckets. While Redis is down they are
+        the limit; otherwise they reject clients Redis has already reported as
+        over their limit, or that exceeded it on this worker alone.
+        """
+        now = time.monotonic()
+        local = [self._local_bucket(key, capacity, rate) for key, capacity, rate in buckets]
+        for bucket in local:
+            bucket.refill(now)
+        blocked = max(bucket.blocked_until for bucket in local) - now
+        allowed = blocked <= 0 and all(bucket.tokens >= 1 for bucket in local)
+        if allowed:
+            for bucket in local:
+                bucket.tokens -= 1
+        tightest = min(local, key=lambda b: b.tokens / b.capacity)
+        retry_after = max(
+            [blocked] + [(1 - b.tokens) / b.rate for b in local if b.tokens < 1]
+        )
+        return RateLimitResult(
+            allowed, int(tightest.capacity), tightest.tokens,
+            (tightest.capacity - tightest.tokens) / tightest.rate, retry_after
+        )
+    
+    async def _check_redis(self, buckets: List[Tuple[str, float, float]]) -> RateLimitResult:
+        if self._take_script is None:
+            self._take_script = self.client.register_script(_TAKE_SCRIPT)
+        args = [1]
+        for _, capacity, rate in buckets:
+            args.extend([capacity, rate])
+        allowed, tightest, remaining, retry_after, reset = await self._take_script(
+            keys=[key for key, _, _ in buckets], args=args
+        )
+        self.redis_checks += 1
+        return RateLimitResult(
+            bool(allowed), int(buckets[int(tightest) - 1][1]), float(remaining),
+            float(reset), float(retry_after)
+        )
+    
+    async def check(self, group: str, identity: str, role: Optional[str] = None) -> RateLimitResult:
+        """Take one request from the client's buckets"""
+        buckets = self._buckets(group, identity, role)
+        if not self.client:
+            return self._check_local(buckets)
+        
+        local = self._check_local(buckets)
+        if not local.allowed:
+            self.local_rejections += 1
+            return local
+        try:
+            result = await self._check_redis(buckets)
+        except Exception as e:
+            logger.error(f"Rate limit check failed, limiting locally: {e}")
+            return local
+        if not result.allowed:
+            # Reject further requests on this worker until the bucket has refilled
+            until = time.monotonic() + result.retry_after
+            for key, _, _ in buckets:
+                if key in self._local:
+                    self._local[key].blocked_until = until
+        return result
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "redis_checks": self.redis_checks,
+            "local_rejections": self.local_rejections,
+            "local_buckets": len(self._local)
+        }
+
+
+def route_group(path: str) -> Optional[str]:
+    """Route group of a request path, or None for paths that are not limited"""
+    if path.startswith(EXEMPT_PATHS):
+        return None
+    for prefix, group in ROUTE_GROUPS:
+        if path.startswith(prefix):
+            return group
+    return "default" if path.startswith("/api/") else None
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies: Tuple[str, ...]) -> tuple:
+    networks = []
+    for proxy in proxies:
+        try:
+            networks.append(ipaddress.ip_network(proxy, strict=False))
+        except ValueError:
+            logger.warning(f"Ignoring invalid trusted proxy {proxy!r}")
+    return tuple(networks)
+
+
+def _is_trusted(address: str, networks) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_address(scope) -> Optional[str]:
+    """
+    The client's IP: the connecting peer, unless it is a trusted proxy, in
+    which case X-Forwarded-For is read right to left up to the first address
+    that is not a trusted proxy
+    """
+    client = scope.get("client")
+    peer = client[0] if client else None
+    networks = _trusted_networks(tuple(settings.rate_limit_trusted_proxies))
+    if peer is None or not networks or not _is_trusted(peer, networks):
+        return peer
+    forwarded = []
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            forwarded.extend(part.strip() for part in value.decode("latin-1").split(","))
+    for address in reversed(forwarded):
+        if address and not _is_trusted(address, networks):
+            return address
+    return peer
+
+
+def request_identity(scope, group: str) -> Tuple[str, Optional[str]]:
+    """
+    (identity, role) a request is counted against: the user of a valid
+    bearer token, otherwise (and always for auth routes) the client IP.
+    """
+    if group != "auth":
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not token:
+                    break
+                # Cached after the first request, so usually a dict lookup
+                payload = token_verifier.decode(token)
+                if payload is None:
+                    break
+                user_id = payload.get("user_id") or payload.get("sub")
+                if user_id:
+                    return f"user:{user_id}", payload.get("role")
+                break
+    return f"ip:{client_address(scope) or 'unknown'}", None
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing the rate limiter and adding RateLimit-* headers"""
+    
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+        group = route_group(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+        
+        identity, role = request_identity(scope, group)
+        result = await self.limiter.check(group, identity, role)
+        headers = result.headers()
+        
+        if not result.allowed:
+            body = json.dumps({"detail": "Rate limit exceeded. Try again later."}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + headers)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
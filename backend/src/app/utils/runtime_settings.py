@@ -0,0 +1,258 @@
+"""
+Runtime system settings
+An immutable in-process snapshot of the system_settings table. Reads are a
+dict lookup with fallback to the static Settings; the snapshot is reloaded
+and swapped in whole when a setting changes (Postgres LISTEN/NOTIFY, or Redis
+pub/sub where LISTEN is unavailable, e.g. behind a transaction pooler), with a
+periodic reload as a safety net.
+"""
+
+import asyncio
+import json
+import logging
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "system_settings"
+# Changes arriving within this window are applied with a single reload
+RELOAD_DEBOUNCE_SECONDS = 0.05
+
+_MISSING = object()
+_TRUE_STRINGS = ("1", "true", "yes", "on")
+
+
+def _unwrap(value: Any) -> Any:
+    """Scalar of a stored setting: {"value": x} and {"enabled": x} objects unwrap to x"""
+    if isinstance(value, dict):
+        if "value" in value:
+            return value["value"]
+        if "enabled" in value:
+            return value["enabled"]
+    return value
+
+
+class RuntimeSettings:
+    """Snapshot of system_settings with typed accessors"""
+    
+    def __init__(self):
+        self._snapshot: Mapping[str, Any] = MappingProxyType({})
+        self.version = 0
+        self._reload_requested = asyncio.Event()
+        self._tasks: list = []
+        self._listen_conn: Optional[asyncpg.Connection] = None
+        self._pubsub = None
+    
+    @property
+    def snapshot(self) -> Mapping[str, Any]:
+        """Current settings by key (read-only; replaced, never mutated, on reload)"""
+        return self._snapshot
+    
+    # Accessors
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Stored value of `key`, else the Settings attribute of the same name, else `default`"""
+        value = self._snapshot.get(key, _MISSING)
+        if value is not _MISSING:
+            return _unwrap(value)
+        return getattr(settings, key, default)
+    
+    def _typed(self, key: str, cast, default: Any) -> Any:
+        value = self._snapshot.get(key, _MISSING)
+        if value is not _MISSING:
+            try:
+                return cast(_unwrap(value))
+            except (TypeError, ValueError):
+                logger.warning(f"System setting {key} has an invalid value: {value!r}")
+        return getattr(settings, key, default)
+    
+    def get_bool(self, key: str, default: Optional[bool] = None) -> Optional[bool]:
+        def to_bool(value):
+            if isinstance(value, str):
+                return value.strip().lower() in _TRUE_STRINGS
+            return bool(value)
+        return self._typed(key, to_bool, default)
+    
+    def get_int(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        return self._typed(key, int, default)
+    
+    def get_float(self, key: str, default: Optional[float] = None) -> Optional[float]:
+        return self._typed(key, float, default)
+    
+    def get_str(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self._typed(key, str, default)
+    
+    @property
+    def maintenance_mode(self) -> bool:
+        return bool(self.get_bool("maintenance_mode", False))
+    
+    @property
+    def maintenance_message(self) -> Optional[str]:
+        value = self._snapshot.get("maintenance_mode")
+        return value.get("message") if isinstance(value, dict) else None
+    
+    # Loading
+    
+    async def reload(self, conn: Optional[asyncpg.Connection] = None) -> None:
+        """Load every setting and swap the snapshot in one assignment"""
+        if conn is None:
+            async with db.acquire("background") as conn:
+                rows = await conn.fetch("SELECT key, value FROM system_settings")
+        else:
+            rows = await conn.fetch("SELECT key, value FROM system_settings")
+        values = {}
+        for row in rows:
+            value = row["value"]
+            values[row["key"]] = json.loads(value) if isinstance(value, str) else value
+        self._snapshot = MappingProxyType(values)
+        self.version += 1
+    
+    async def changed(self, key: Optional[str] = None) -> None:
+        """
+        A setting was written: reload here now and tell the other workers.
+        (The database also notifies listeners; this covers workers that
+        cannot LISTEN.)
+        """
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"System settings reload failed: {e}")
+        if cache.client:
+            try:
+                await cache.client.publish(CHANNEL, key or "")
+            except Exception as e:
+                logger.error(f"System settings change publish failed: {e}")
+    
+    def _request_reload(self, *args) -> None:
+        self._reload_requested.set()
+    
+    async def _reload_loop(self):
+        """Reload on change notifications and every runtime_settings_refresh_seconds"""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._reload_requested.wait(), settings.runtime_settings_refresh_seconds
+                )
+                await asyncio.sleep(RELOAD_DEBOUNCE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._reload_requested.clear()
+            try:
+                await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"System settings reload failed: {e}")
+    
+    async def _listen_postgres(self):
+        """Hold a dedicated connection LISTENing for setting changes; reconnect if it drops"""
+        while True:
+            try:
+                self._listen_conn = await asyncpg.connect(db.listen_url())
+                await self._listen_conn.add_listener(CHANNEL, self._request_reload)
+                # Changes made while disconnected are picked up by this reload
+                self._request_reload()
+                while not self._listen_conn.is_closed():
+                    await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"System settings LISTEN failed: {e}")
+            finally:
+                if self._listen_conn is not None and not self._listen_conn.is_closed():
+                    await self._listen_conn.close()
+                self._listen_conn = None
+            await asyncio.sleep(5)
+    
+    async def _listen_redis(self):
+        while True:
+            try:
+                self._pubsub = cache.client.pubsub()
+                await self._pubsub.subscribe(CHANNEL)
+                async for message in self._pubsub.listen():
+                    if message.get("type") == "message":
+                        self._request_reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"System settings listener failed: {e}")
+                await asyncio.sleep(1)
+    
+    async def start(self):
+        """Load the settings and follow changes"""
+        if self._tasks:
+            return
+        await self.reload()
+        self._tasks.append(asyncio.create_task(self._reload_loop()))
+        if settings.runtime_settings_listen and db.listen_url():
+            self._tasks.append(asyncio.create_task(self._listen_postgres()))
+        if cache.client:
+            self._tasks.append(asyncio.create_task(self._listen_redis()))
+        logger.info(f"Loaded {len(self._snapshot)} system settings")
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+
+
+def _is_admin_request(scope) -> bool:
+    """Whether the request carries a valid admin bearer token"""
+    from app.core.tokens import token_verifier
+    from app.models.user import UserRole
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            claims = token_verifier.decode(token) if scheme.lower() == "bearer" and token else None
+            return bool(claims) and UserRole.is_admin(claims.get("role"))
+    return False
+
+
+class MaintenanceModeMiddleware:
+    """Answers client and expert API requests with 503 while maintenance mode is on (admins pass)"""
+    
+    BLOCKED_PREFIXES = ("/api/v1/client", "/api/v1/expert")
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not runtime_settings.maintenance_mode
+                or not scope["path"].startswith(self.BLOCKED_PREFIXES)):
+            await self.app(scope, receive, send)
+            return
+        if _is_admin_request(scope):
+            await self.app(scope, receive, send)
+            return
+        body = json.dumps({
+            "detail": runtime_settings.maintenance_message or "The platform is under maintenance. Please try again later."
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", b"300"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global runtime settings instance
+runtime_settings = RuntimeSettings()
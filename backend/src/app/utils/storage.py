@@ -0,0 +1,141 @@
+"""
+File storage backends
+Uploaded files live under content-addressed keys in either a local directory
+or an S3 bucket (any S3-compatible endpoint, e.g. MinIO or LocalStack in
+development, via AWS_S3_ENDPOINT_URL). Files are always stored from a path on
+disk (never buffered in memory) so memory use does not depend on file size.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+    BOTO3_AVAILABLE = True
+except ImportError:
+    boto3 = None
+    ClientError = Exception
+    BOTO3_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class LocalStorage:
+    """Files under a local directory"""
+    
+    name = "local"
+    
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+    
+    def path(self, key: str) -> Path:
+        """Absolute path of a key; refuses keys that escape the storage root"""
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+    
+    async def exists(self, key: str) -> bool:
+        return self.path(key).is_file()
+    
+    def _save(self, key: str, source_path: str) -> None:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Copy next to the target, then rename, so readers never see a partial file
+        partial = target.with_name(f".{target.name}.{os.getpid()}.partial")
+        shutil.copyfile(source_path, partial)
+        os.replace(partial, target)
+    
+    async def save(self, key: str, source_path: str, content_type: str) -> None:
+        """Store the file at `source_path` under `key`"""
+        await asyncio.to_thread(self._save, key, source_path)
+    
+    async def read(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.path(key).read_bytes)
+    
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.path(key).unlink, True)
+    
+    async def download_url(self, key: str) -> Optional[str]:
+        """Local files are served by the API itself"""
+        return None
+
+
+class S3Storage:
+    """Files in an S3 (or S3-compatible) bucket"""
+    
+    name = "s3"
+    
+    def __init__(self, bucket: str, region: str, endpoint_url: Optional[str] = None):
+        if not BOTO3_AVAILABLE:
+            raise RuntimeError("boto3 is not installed")
+        if not bucket:
+            raise RuntimeError("AWS_S3_BUCKET is not set")
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            region_name=region,
+            endpoint_url=endpoint_url or None,
+            aws_access_key_id=settings.aws_access_key_id or None,
+            aws_secret_access_key=settings.aws_secret_access_key or None,
+        )
+    
+    async def exists(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+    
+    async def save(self, key: str, source_path: str, content_type: str) -> None:
+        """Upload the file at `source_path`; large files go up as a multipart upload streamed from disk"""
+        await asyncio.to_thread(
+            self.client.upload_file, source_path, self.bucket, key,
+            ExtraArgs={"ContentType": content_type}
+        )
+    
+    async def read(self, key: str) -> bytes:
+        def _read() -> bytes:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        return await asyncio.to_thread(_read)
+    
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+    
+    async def download_url(self, key: str) -> Optional[str]:
+        """Short-lived presigned URL so downloads bypass the API"""
+        return await asyncio.to_thread(
+            self.client.generate_presigned_url, "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=settings.upload_url_expiry_seconds
+        )
+
+
+def create_storage():
+    """Storage backend selected by STORAGE_BACKEND (local or s3)"""
+    if settings.storage_backend == "s3":
+        return S3Storage(settings.aws_s3_bucket, settings.aws_region, settings.aws_s3_endpoint_url)
+    if settings.storage_backend != "local":
+        raise RuntimeError(f"Unknown storage backend: {settings.storage_backend}")
+    return LocalStorage(settings.upload_dir)
+
+
+_storage = None
+
+
+def get_storage():
+    """Shared storage backend, created on first use"""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+        logger.info(f"Using {_storage.name} file storage")
+    return _storage
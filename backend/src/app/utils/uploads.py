@@ -0,0 +1,242 @@
+"""
+Streaming image uploads
+Multipart bodies are parsed as they arrive: each file part is hashed and
+spooled to a temporary file chunk by chunk, its type is sniffed from the
+first bytes and the size limit is enforced mid-stream, so memory per upload
+stays constant and oversized or non-image uploads are refused early.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageOps
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Magic bytes of the accepted image types
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+]
+IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/bmp": "bmp",
+    "image/tiff": "tiff",
+    "image/webp": "webp",
+}
+SNIFF_BYTES = 16
+# Bytes requested from an UploadFile per read
+READ_CHUNK_SIZE = 64 * 1024
+
+UPLOAD_URL_RE = re.compile(r"/uploads/images/([0-9a-f]{64})$")
+
+
+class UploadTooLargeError(ValueError):
+    """The upload exceeded its size limit"""
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """MIME type of an image from its leading bytes, or None if it is not an accepted image"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def upload_hash_from_url(url: str) -> Optional[str]:
+    """SHA-256 of an image uploaded to this API, given its URL"""
+    match = UPLOAD_URL_RE.search(url.split("?", 1)[0])
+    return match.group(1) if match else None
+
+
+class IncomingImage:
+    """One uploaded file being hashed and spooled to disk"""
+    
+    def __init__(self, filename: Optional[str], max_bytes: int):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.content_type: Optional[str] = None
+        self._sha256 = hashlib.sha256()
+        self._head = b""
+        fd, self.path = tempfile.mkstemp(prefix="upload-")
+        self._file = os.fdopen(fd, "wb")
+    
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+    
+    async def write(self, data: bytes) -> None:
+        """Add a chunk; raises once the file is too large or is clearly not an image"""
+        if not data:
+            return
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeError(f"File larger than {self.max_bytes // (1024 * 1024)}MB")
+        if self.content_type is None:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+        self._sha256.update(data)
+        await asyncio.to_thread(self._file.write, data)
+    
+    def _sniff(self) -> None:
+        self.content_type = sniff_image_type(self._head)
+        if self.content_type is None:
+            raise ValueError(f"{self.filename or 'File'} is not a supported image (JPEG, PNG, GIF, WebP, BMP or TIFF)")
+    
+    async def finish(self) -> None:
+        """Flush to disk and check the type of files shorter than the sniff window"""
+        await asyncio.to_thread(self._file.close)
+        if self.size == 0:
+            raise ValueError(f"{self.filename or 'File'} is empty")
+        if self.content_type is None:
+            self._sniff()
+    
+    def discard(self) -> None:
+        """Remove the temporary file"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def receive_image_uploads(
+    request,
+    max_file_bytes: int,
+    max_files: int,
+    field_name: str = "files"
+) -> List[IncomingImage]:
+    """
+    Parse a multipart/form-data request body as it streams in and spool every
+    file in `field_name` to disk. Other parts are ignored. On error every
+    temporary file is removed before the exception propagates.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data body")
+    
+    # The parser is synchronous and calls back with slices of the chunk being
+    # written; events are collected and handled after each write
+    events: List[tuple] = []
+    header_field = bytearray()
+    header_value = bytearray()
+    headers: Dict[bytes, bytes] = {}
+    
+    def on_part_begin():
+        headers.clear()
+    
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+    
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+    
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+    
+    def on_headers_finished():
+        events.append(("headers", dict(headers)))
+    
+    def on_part_data(data, start, end):
+        events.append(("data", data[start:end]))
+    
+    def on_part_end():
+        events.append(("end", None))
+    
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    
+    uploads: List[IncomingImage] = []
+    current: Optional[IncomingImage] = None
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, value in events:
+                if kind == "headers":
+                    _, disposition = parse_options_header(value.get(b"content-disposition", b""))
+                    filename = disposition.get(b"filename")
+                    if disposition.get(b"name", b"").decode() != field_name or filename is None:
+                        current = None
+                        continue
+                    if len(uploads) >= max_files:
+                        raise ValueError(f"At most {max_files} files per upload")
+                    current = IncomingImage(filename.decode(errors="replace"), max_file_bytes)
+                    uploads.append(current)
+                elif kind == "data" and current is not None:
+                    await current.write(value)
+                elif kind == "end" and current is not None:
+                    await current.finish()
+                    current = None
+            events.clear()
+        parser.finalize()
+        if current is not None:
+            raise ValueError("Upload ended before the file was complete")
+        if not uploads:
+            raise ValueError(f"No files in the '{field_name}' field")
+    except BaseException:
+        for upload in uploads:
+            upload.discard()
+        raise
+    return uploads
+
+
+async def receive_upload_file(upload_file, max_file_bytes: int) -> IncomingImage:
+    """Spool a FastAPI UploadFile through the same size and type checks"""
+    incoming = IncomingImage(upload_file.filename, max_file_bytes)
+    try:
+        while True:
+            chunk = await upload_file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            await incoming.write(chunk)
+        await incoming.finish()
+    except BaseException:
+        incoming.discard()
+        raise
+    return incoming
+
+
+def make_thumbnail(path: str, thumbnail_path: str, max_dimension: int) -> Dict[str, int]:
+    """
+    Decode the image at `path`, write a JPEG thumbnail to `thumbnail_path` and
+    return the original dimensions. Blocking; run it in a thread. JPEGs are
+    decoded at reduced scale.
+    """
+    with Image.open(path) as image:
+        width, height = image.size
+        image.draft("RGB", (max_dimension, max_dimension))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image.save(thumbnail_path, "JPEG", quality=80, optimize=True)
+    return {"width": width, "height": height}
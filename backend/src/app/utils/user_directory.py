@@ -0,0 +1,295 @@
+"""
+User directory
+Users live in the auth database, while questions, answers and ratings live in
+the main one, so list endpoints cannot join to user names. The directory keeps
+a compact projection of each user's profile (name, email, role, status) in
+process and in Redis, and answers batched lookups with at most one auth-DB
+query per call. Entries are dropped when the auth database notifies a change
+(LISTEN/NOTIFY on the users table; existing auth databases get the trigger
+from database/add_user_directory_notify.sql), and expire after a while
+regardless. A load that overlaps a change notification is returned to its
+caller but not cached, since it may have read the row before the change.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import asyncpg
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "user_directory"
+KEY_PREFIX = "userdir:"
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+
+class UserProfile(NamedTuple):
+    """Directory entry of one user"""
+    id: str
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    role: str
+    status: str  # active, inactive or banned
+    
+    @property
+    def name(self) -> str:
+        full = " ".join(part for part in (self.first_name, self.last_name) if part)
+        return full or self.email
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._asdict(), name=self.name)
+    
+    @classmethod
+    def from_row(cls, row) -> "UserProfile":
+        if row["is_banned"]:
+            status = "banned"
+        elif not row["is_active"]:
+            status = "inactive"
+        else:
+            status = "active"
+        return cls(
+            str(row["user_id"]), row["email"], row["first_name"], row["last_name"],
+            str(row["role"]), status
+        )
+
+
+class UserDirectory:
+    """Batched user profile lookups across the auth and main databases"""
+    
+    def __init__(self):
+        # user id -> (profile, or None for unknown ids, local expiry)
+        self._local: "OrderedDict[str, Tuple[Optional[UserProfile], float]]" = OrderedDict()
+        self._tasks: list = []
+        self._listen_conn: Optional[asyncpg.Connection] = None
+        self._pubsub = None
+        self._pending: set = set()  # shared-cache deletions in flight
+        self._loading: Counter = Counter()  # user id -> auth-DB loads in flight
+        self._stale: set = set()  # ids invalidated while being loaded
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.db_loads = 0
+    
+    @property
+    def client(self):
+        """Shared async Redis client (None when Redis is unavailable)"""
+        return cache.client
+    
+    def _remember(self, user_id: str, profile: Optional[UserProfile]) -> None:
+        self._local[user_id] = (profile, time.monotonic() + settings.user_directory_local_ttl_seconds)
+        self._local.move_to_end(user_id)
+        while len(self._local) > settings.user_directory_cache_size:
+            self._local.popitem(last=False)
+    
+    async def _load(self, user_ids: List[str]) -> Dict[str, UserProfile]:
+        """Profiles from the auth database, in one query"""
+        async with db.auth_pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT user_id, email, first_name, last_name, role, is_active, is_banned
+                FROM users
+                WHERE user_id = ANY($1::uuid[])
+            """, user_ids)
+        self.db_loads += 1
+        return {str(row["user_id"]): UserProfile.from_row(row) for row in rows}
+    
+    async def _load_missing(self, missing: List[str], found: Dict[str, UserProfile]) -> None:
+        """Load profiles into `found` and cache those not invalidated meanwhile"""
+        try:
+            loaded = await self._load(missing)
+        except Exception as e:
+            logger.error(f"User directory load failed: {e}")
+            return
+        found.update(loaded)
+        fresh = [user_id for user_id in missing if user_id not in self._stale]
+        for user_id in fresh:
+            self._remember(user_id, loaded.get(user_id))
+        shared = [user_id for user_id in fresh if user_id in loaded]
+        if not shared or not self.client:
+            return
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for user_id in shared:
+                    pipe.set(KEY_PREFIX + user_id, json.dumps(loaded[user_id]),
+                             ex=settings.user_directory_ttl_seconds)
+                await pipe.execute()
+            # Invalidated while the write was in flight; its delete may have landed first
+            late = [KEY_PREFIX + user_id for user_id in shared if user_id in self._stale]
+            if late:
+                await self.client.delete(*late)
+        except Exception as e:
+            logger.error(f"User directory Redis write failed: {e}")
+    
+    async def get_many(self, user_ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """Profiles (as dicts) of the given users by id; unknown ids are left out"""
+        ids = list(dict.fromkeys(str(user_id) for user_id in user_ids if user_id))
+        ids = [user_id for user_id in ids if _is_uuid(user_id)]
+        found: Dict[str, UserProfile] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        for user_id in ids:
+            entry = self._local.get(user_id)
+            if entry is not None and entry[1] > now:
+                self.local_hits += 1
+                if entry[0] is not None:
+                    found[user_id] = entry[0]
+            else:
+                missing.append(user_id)
+        
+        if missing and self.client:
+            try:
+                values = await self.client.mget([KEY_PREFIX + user_id for user_id in missing])
+                still_missing = []
+                for user_id, value in zip(missing, values):
+                    if value is None:
+                        still_missing.append(user_id)
+                        continue
+                    profile = UserProfile(*json.loads(value))
+                    self.redis_hits += 1
+                    found[user_id] = profile
+                    self._remember(user_id, profile)
+                missing = still_missing
+            except Exception as e:
+                logger.error(f"User directory Redis read failed: {e}")
+        
+        if missing:
+            self._loading.update(missing)
+            try:
+                await self._load_missing(missing, found)
+            finally:
+                self._loading.subtract(missing)
+                for user_id in missing:
+                    if self._loading[user_id] <= 0:
+                        del self._loading[user_id]
+                        self._stale.discard(user_id)
+        
+        return {user_id: found[user_id].to_dict() for user_id in ids if user_id in found}
+    
+    async def get(self, user_id: Any) -> Optional[Dict[str, Any]]:
+        return (await self.get_many([user_id])).get(str(user_id))
+    
+    async def names(self, user_ids: Iterable[Any]) -> Dict[str, str]:
+        """Display names by user id"""
+        return {user_id: profile["name"] for user_id, profile in (await self.get_many(user_ids)).items()}
+    
+    def _evict_local(self, user_id: str) -> None:
+        self._local.pop(user_id, None)
+        if user_id in self._loading:
+            self._stale.add(user_id)
+    
+    async def invalidate(self, user_id: Any) -> None:
+        """
+        Forget a user everywhere: here, in Redis and in the other workers.
+        (The auth database also notifies listeners; this covers writes where
+        nobody can LISTEN.)
+        """
+        user_id = str(user_id)
+        self._evict_local(user_id)
+        if self.client:
+            try:
+                await self.client.delete(KEY_PREFIX + user_id)
+                await self.client.publish(CHANNEL, user_id)
+            except Exception as e:
+                logger.error(f"User directory invalidation failed: {e}")
+    
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        self._forget(payload)
+    
+    def _forget(self, user_id: str) -> None:
+        self._evict_local(user_id)
+        if self.client:
+            # Every worker deletes, after any write of its own that raced the
+            # change; deleting twice is harmless
+            task = asyncio.get_running_loop().create_task(self._delete_shared(user_id))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+    
+    async def _delete_shared(self, user_id: str) -> None:
+        try:
+            await self.client.delete(KEY_PREFIX + user_id)
+        except Exception as e:
+            logger.error(f"User directory invalidation failed: {e}")
+    
+    async def _listen_postgres(self):
+        """Hold a dedicated auth-DB connection LISTENing for user changes; reconnect if it drops"""
+        while True:
+            try:
+                self._listen_conn = await asyncpg.connect(db.listen_url(auth=True))
+                await self._listen_conn.add_listener(CHANNEL, self._on_notify)
+                # Changes made while disconnected were missed
+                self._local.clear()
+                while not self._listen_conn.is_closed():
+                    await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"User directory LISTEN failed: {e}")
+            finally:
+                if self._listen_conn is not None and not self._listen_conn.is_closed():
+                    await self._listen_conn.close()
+                self._listen_conn = None
+            await asyncio.sleep(5)
+    
+    async def _listen_redis(self):
+        while True:
+            try:
+                self._pubsub = self.client.pubsub()
+                await self._pubsub.subscribe(CHANNEL)
+                async for message in self._pubsub.listen():
+                    if message.get("type") == "message":
+                        self._forget(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"User directory listener failed: {e}")
+                await asyncio.sleep(1)
+    
+    def start(self):
+        """Follow user changes (entries only expire by TTL without either listener)"""
+        if self._tasks:
+            return
+        if settings.user_directory_listen and db.listen_url(auth=True):
+            self._tasks.append(asyncio.create_task(self._listen_postgres()))
+        if self.client:
+            self._tasks.append(asyncio.create_task(self._listen_redis()))
+        logger.info("User directory started")
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached_users": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "db_loads": self.db_loads
+        }
+
+
+# Global user directory instance
+user_directory = UserDirectory()
@@ -46,10 +46,12 @@ async def db_session(test_db):
 
 
 @pytest.fixture(autouse=True)
-async def setup_test_db(test_db):
-    """Setup test database before each test"""
-    # Run migrations or create test schema
-    # This is a placeholder - implement based on your needs
+def setup_test_db(request):
+    """Setup test database before each test (skipped for tests marked no_db)"""
+    if request.node.get_closest_marker("no_db") is None:
+        request.getfixturevalue("test_db")
+        # Run migrations or create test schema
+        # This is a placeholder - implement based on your needs
     yield
     # Cleanup after test
 
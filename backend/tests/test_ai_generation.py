@@ -0,0 +1,474 @@
+"""
+AI generation engine tests
+Runs the engine against a local mock provider server, so no API keys or
+network access are needed
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from uuid import uuid4
+
+import pytest
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.config import settings
+from app.crud.ai import generation as generation_crud
+from app.services.ai.generation_service import GenerationService
+from app.services.ai.providers import (
+    AnthropicProvider,
+    GoogleProvider,
+    OpenAICompatibleProvider,
+    TokenBudget,
+    estimate_tokens,
+    score_confidence,
+)
+from app.services.ai.resilience import CircuitBreaker, ProviderResilience
+from app.services.ai.response_cache import response_cache_key
+from app.utils.answer_reuse import answer_reuse
+from app.utils.draft_stream import DraftStreamService
+
+pytestmark = pytest.mark.no_db
+
+# Mock model behaviour: (delay seconds, logprob per token, finish reason)
+MOCK_MODELS = {
+    "fast-good": (0.05, -0.05, "stop"),
+    "fast-weak": (0.05, -2.0, "stop"),
+    "medium-good": (0.3, -0.05, "stop"),
+    "slow-good": (3.0, -0.05, "stop"),
+    "truncated": (0.05, -0.05, "length"),
+}
+
+
+def create_mock_provider_app() -> FastAPI:
+    """OpenAI, Anthropic and Gemini compatible endpoints with scripted latency"""
+    app = FastAPI()
+    # Per model: a cancelled request keeps running server-side after the client goes away
+    app.state.in_flight = {}
+    app.state.max_in_flight = {}
+    app.state.calls = 0
+    
+    async def simulate(model: str):
+        if model == "error":
+            return None
+        delay, logprob, finish_reason = MOCK_MODELS[model]
+        app.state.calls += 1
+        in_flight = app.state.in_flight.get(model, 0) + 1
+        app.state.in_flight[model] = in_flight
+        app.state.max_in_flight[model] = max(app.state.max_in_flight.get(model, 0), in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            app.state.in_flight[model] -= 1
+        return logprob, finish_reason
+    
+    async def stream_events(model: str, finish_reason: str):
+        for word in f"Answer from {model}".split(" "):
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': word + ' '}}]})}\n\n"
+        yield f"data: {json.dumps({'choices': [{'delta': {}, 'finish_reason': finish_reason}]})}\n\n"
+        yield f"data: {json.dumps({'choices': [], 'usage': {'prompt_tokens': 20, 'completion_tokens': 3}})}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    @app.post("/openai/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        outcome = await simulate(body["model"])
+        if outcome is None:
+            return JSONResponse({"error": {"message": "upstream failure"}}, status_code=500)
+        logprob, finish_reason = outcome
+        if body.get("stream"):
+            return StreamingResponse(stream_events(body["model"], finish_reason), media_type="text/event-stream")
+        return {
+            "choices": [{
+                "message": {"role": "assistant", "content": f"Answer from {body['model']}"},
+                "finish_reason": finish_reason,
+                "logprobs": {"content": [{"token": "x", "logprob": logprob}] * 4},
+            }],
+            "usage": {"prompt_tokens": 20, "completion_tokens": 4},
+        }
+    
+    @app.post("/anthropic/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        await simulate(body["model"])
+        return {
+            "content": [{"type": "text", "text": f"Answer from {body['model']}"}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": 20, "output_tokens": 4},
+        }
+    
+    @app.post("/google/models/{model}:generateContent")
+    async def generate_content(model: str):
+        await simulate(model)
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": f"Answer from {model}"}]},
+                "finishReason": "STOP",
+                "avgLogprobs": -0.1,
+            }],
+            "usageMetadata": {"promptTokenCount": 20, "candidatesTokenCount": 4},
+        }
+    
+    return app
+
+
+@pytest.fixture(scope="module")
+def mock_server():
+    """Run the mock provider server on a free local port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    
+    app = create_mock_provider_app()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    
+    yield app, f"http://127.0.0.1:{port}"
+    
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+async def engine(mock_server):
+    """Generation engine wired to the mock server"""
+    _, base_url = mock_server
+    providers = {
+        "openai": OpenAICompatibleProvider("openai", f"{base_url}/openai", supports_logprobs=True,
+                                           max_concurrency=4, tokens_per_minute=0, timeout=10),
+        "anthropic": AnthropicProvider("anthropic", f"{base_url}/anthropic",
+                                       max_concurrency=4, tokens_per_minute=0, timeout=10),
+        "google": GoogleProvider("google", f"{base_url}/google",
+                                 max_concurrency=4, tokens_per_minute=0, timeout=10),
+    }
+    service = GenerationService(providers=providers)
+    yield service
+    await service.stop()
+
+
+def target(model: str, provider: str = "openai"):
+    return {"provider": provider, "model": model, "api_key": "test-key"}
+
+
+async def test_first_good_answer_wins_and_stragglers_are_cancelled(engine):
+    started = time.perf_counter()
+    result = await engine.generate(
+        "What is 2 + 2?", min_confidence=0.7,
+        targets=[target("slow-good"), target("fast-good")]
+    )
+    elapsed = time.perf_counter() - started
+    
+    assert result["accepted"] is True
+    assert result["answer"]["model"] == "fast-good"
+    assert result["cancelled"] == 1
+    assert elapsed < 2.0
+
+
+async def test_low_confidence_answer_does_not_stop_fan_out(engine):
+    result = await engine.generate(
+        "What is 2 + 2?", min_confidence=0.7,
+        targets=[target("fast-weak"), target("medium-good")]
+    )
+    
+    assert result["answer"]["model"] == "medium-good"
+    assert result["accepted"] is True
+    assert len(result["attempts"]) == 2
+
+
+async def test_best_answer_returned_when_none_clears_threshold(engine):
+    result = await engine.generate(
+        "What is 2 + 2?", min_confidence=0.99,
+        targets=[target("fast-weak"), target("truncated")]
+    )
+    
+    assert result["accepted"] is False
+    assert result["answer"]["model"] == "truncated"
+    assert result["cancelled"] == 0
+
+
+async def test_provider_errors_are_tolerated(engine):
+    result = await engine.generate(
+        "What is 2 + 2?", min_confidence=0.7,
+        targets=[target("error"), target("medium-good")]
+    )
+    
+    assert result["answer"]["model"] == "medium-good"
+    assert any("error" in attempt for attempt in result["attempts"])
+
+
+async def test_all_providers_supported(engine):
+    for provider in ("openai", "anthropic", "google"):
+        result = await engine.generate(
+            "What is 2 + 2?", min_confidence=0.5, targets=[target("fast-good", provider)]
+        )
+        assert result["answer"]["text"] == "Answer from fast-good"
+        assert result["answer"]["provider"] == provider
+        assert result["answer"]["completion_tokens"] == 4
+
+
+async def test_per_provider_concurrency_limit(mock_server, engine):
+    app, _ = mock_server
+    app.state.max_in_flight["medium-good"] = 0
+    
+    await asyncio.gather(*[
+        engine.generate("What is 2 + 2?", min_confidence=0.5, targets=[target("medium-good")])
+        for _ in range(12)
+    ])
+    
+    assert app.state.max_in_flight["medium-good"] == 4
+
+
+async def test_token_budget_exhaustion_skips_provider(mock_server):
+    _, base_url = mock_server
+    provider = OpenAICompatibleProvider("openai", f"{base_url}/openai", tokens_per_minute=100, timeout=10)
+    service = GenerationService(providers={"openai": provider})
+    try:
+        result = await service.generate(
+            "What is 2 + 2?", min_confidence=0.5, targets=[target("fast-good")], max_tokens=500
+        )
+        assert result["answer"] is None
+        assert "budget" in result["attempts"][0]["error"]
+    finally:
+        await service.stop()
+
+
+def test_token_budget_settles_to_actual_usage():
+    budget = TokenBudget(tokens_per_minute=1000)
+    reservation = budget.reserve(900)
+    assert budget.reserve(200) is None
+    budget.settle(reservation, 24)
+    assert budget.reserve(200) is not None
+
+
+async def test_hedge_reservation_settled():
+    provider = OpenAICompatibleProvider("openai", "http://provider.invalid", tokens_per_minute=10000)
+    messages = [{"role": "user", "content": "What is 2 + 2?"}]
+    
+    async def hedged_call(model, call, can_hedge):
+        assert can_hedge()
+        return {"text": "4", "prompt_tokens": 10, "completion_tokens": 2}
+    
+    provider.resilience.call = hedged_call
+    await provider.generate("model", "key", messages, max_tokens=4000, temperature=0.3)
+    # The winner's actual usage plus the losing hedge's prompt, not two full reservations
+    assert provider.budget.used() == 12 + estimate_tokens(messages[0]["content"])
+
+
+def test_score_confidence():
+    assert score_confidence({"text": ""}) == 0.0
+    assert score_confidence({"text": "42", "avg_logprob": 0.0}) == 1.0
+    assert score_confidence({"text": "42", "finish_reason": "length"}) == pytest.approx(0.4)
+    assert score_confidence({"text": "I'm sorry, I can't help with that"}) < 0.2
+
+
+async def test_circuit_breaker_opens_after_consecutive_failures():
+    resilience = ProviderResilience("openai")
+    
+    async def failing():
+        raise ValueError("boom")
+    
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            await resilience.call("flaky", failing)
+    
+    with pytest.raises(RuntimeError, match="Circuit open"):
+        await resilience.call("flaky", failing)
+    assert resilience.snapshot()["flaky"]["circuit"] == "open"
+
+
+def test_circuit_breaker_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+async def test_hedged_request_after_p95():
+    resilience = ProviderResilience("openai")
+    health = resilience.health("model")
+    for _ in range(50):
+        health.latency.record(20)
+    calls = []
+    cancelled = []
+    
+    async def first_slow_then_fast():
+        calls.append(len(calls))
+        try:
+            await asyncio.sleep(2.0 if len(calls) == 1 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return len(calls)
+    
+    started = time.perf_counter()
+    result = await resilience.call("model", first_slow_then_fast)
+    
+    assert time.perf_counter() - started < 1.0
+    assert result == 2
+    assert health.hedges == 1 and health.hedge_wins == 1
+    # The losing request has finished cancelling by the time the call returns
+    assert cancelled == [True]
+
+
+def test_response_cache_key_normalization():
+    def key(question, model="gpt-4o", temperature=0.3):
+        return response_cache_key("openai", model, [{"role": "user", "content": question}], 512, temperature)
+    
+    assert key("What is  the derivative of x^2?") == key("what is the derivative of X^2")
+    assert key("What is 2 + 2?") != key("What is 2 - 2?")
+    assert key("Is 3.5 > 3,5?") != key("Is 35 > 35?")
+    assert key("What is 2 + 2?") != key("What is 2 + 2?", model="gpt-4o-mini")
+    assert key("What is 2 + 2?") != key("What is 2 + 2?", temperature=0.7)
+
+
+async def test_draft_streamed_to_subscriber(engine):
+    streams = DraftStreamService()
+    subscriber = streams.subscribe("q1")
+    frames = []
+    
+    async def collect():
+        while True:
+            frame = await subscriber.next_frame()
+            frames.append(frame)
+            if frame["type"] == "draft_complete":
+                return
+    
+    collector = asyncio.create_task(collect())
+    result = await engine.generate(
+        "What is 2 + 2?", min_confidence=0.5, targets=[target("fast-good")], draft=streams.writer("q1")
+    )
+    await asyncio.wait_for(collector, timeout=5)
+    
+    chunks = [frame for frame in frames if frame["type"] == "draft_chunk"]
+    assert "".join(frame["text"] for frame in chunks) == result["answer"]["text"] == "Answer from fast-good "
+    assert [frame["offset"] for frame in chunks] == sorted(frame["offset"] for frame in chunks)
+    assert frames[-1]["length"] == len(result["answer"]["text"])
+
+
+async def test_lagging_subscriber_resyncs_from_stored_text():
+    streams = DraftStreamService()
+    subscriber = streams.subscribe("q2", offset=3)
+    writer = streams.writer("q2")
+    for _ in range(200):
+        await writer.write("ab")
+    await writer.flush()
+    
+    # Overflowed frames are dropped; the client gets everything after its offset in one frame
+    frame = await subscriber.next_frame()
+    assert frame == {"type": "draft_chunk", "question_id": "q2", "offset": 3, "text": ("ab" * 200)[3:]}
+
+
+async def test_local_draft_text_pruned(monkeypatch):
+    streams = DraftStreamService()
+    saved = []
+    
+    async def save_draft_checkpoint(conn, question_id, text, status):
+        saved.append(status)
+    
+    monkeypatch.setattr(generation_crud, "save_draft_checkpoint", save_draft_checkpoint)
+    question_id = str(uuid4())
+    writer = streams.writer(question_id, conn=object())
+    await writer.write("Answer")
+    await writer.finish("Answer")
+    assert saved[-1] == "complete"
+    assert question_id not in streams._local_text
+    
+    # Drafts that are never persisted are capped
+    monkeypatch.setattr(settings, "draft_stream_local_max_drafts", 2)
+    for question in ("q1", "q2", "q3"):
+        await streams.append_text(question, "text")
+    assert list(streams._local_text) == ["q2", "q3"]
+
+
+async def test_cancelled_generation_releases_question(monkeypatch, engine):
+    question_id = uuid4()
+    released = []
+    started = asyncio.Event()
+    
+    async def claim_question(conn, claimed_id):
+        return {"question_text": "What is entropy?", "subject": None, "metadata": {}}
+    
+    async def release_question(conn, released_id, error):
+        released.append((released_id, error))
+    
+    async def get_offer(conn, offered_id):
+        return None
+    
+    async def generate(*args, **kwargs):
+        started.set()
+        await asyncio.Event().wait()
+    
+    monkeypatch.setattr(generation_crud, "claim_question", claim_question)
+    monkeypatch.setattr(generation_crud, "release_question", release_question)
+    monkeypatch.setattr(answer_reuse, "get_offer", get_offer)
+    monkeypatch.setattr(engine, "generate", generate)
+    
+    task = asyncio.create_task(engine.process_question(None, question_id))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert released == [(question_id, "CancelledError")]
+
+
+async def test_sweep_requeues_orphaned_questions(monkeypatch, engine):
+    orphaned = [uuid4(), uuid4()]
+    calls = []
+    queued = []
+    
+    async def release_stale_questions(conn, lease_seconds):
+        calls.append(("release_stale", lease_seconds))
+        return 1
+    
+    async def take_retryable_questions(conn, retry_after_seconds, max_attempts, limit):
+        calls.append(("take", retry_after_seconds, max_attempts))
+        return orphaned
+    
+    async def enqueue(question_id):
+        queued.append(question_id)
+    
+    monkeypatch.setattr(generation_crud, "release_stale_questions", release_stale_questions)
+    monkeypatch.setattr(generation_crud, "take_retryable_questions", take_retryable_questions)
+    monkeypatch.setattr(engine, "enqueue", enqueue)
+    monkeypatch.setattr(settings, "ai_generation_lease_seconds", 600)
+    monkeypatch.setattr(settings, "ai_generation_retry_after_seconds", 300)
+    monkeypatch.setattr(settings, "ai_generation_max_attempts", 3)
+    
+    assert await engine.requeue_orphans(None) == 2
+    # Abandoned 'processing' questions are released before pending ones are taken
+    assert calls == [("release_stale", 600), ("take", 300, 3)]
+    assert queued == orphaned
+
+
+@pytest.mark.slow
+async def test_load_many_concurrent_questions(mock_server, engine):
+    """Offline load test: many questions fanned out to three providers at once"""
+    app, _ = mock_server
+    calls_before = app.state.calls
+    started = time.perf_counter()
+    
+    results = await asyncio.gather(*[
+        engine.generate(
+            f"Question {i}", min_confidence=0.7,
+            targets=[target("fast-good"), target("slow-good", "anthropic"), target("medium-good", "google")]
+        )
+        for i in range(200)
+    ])
+    elapsed = time.perf_counter() - started
+    
+    assert all(result["accepted"] for result in results)
+    assert app.state.calls > calls_before
+    # Stragglers are cancelled, so the slow model (3s behind a limit of 4)
+    # does not bound throughput: 200 questions would take 150s otherwise
+    assert elapsed < 15
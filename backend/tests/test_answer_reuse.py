@@ -0,0 +1,65 @@
+"""
+Answer reuse tests
+text_fingerprint must produce the questions.text_fingerprint column computed
+by the generated-column expression of migration 009
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+import asyncpg
+import pytest
+
+from app.core.config import settings
+from app.utils.answer_reuse import text_fingerprint
+
+
+pytestmark = pytest.mark.no_db
+
+FINGERPRINT_SQL = "md5(btrim(regexp_replace(lower(COALESCE(question_text, '')), '[^a-z0-9]+', ' ', 'g')))"
+
+TEXTS = [
+    "What is entropy?",
+    "  WHAT is   entropy ?!  ",
+    "what_is-entropy\n\tin 2 sentences",
+    "Café résumé naïve",
+    "3.14159 × r² = area",
+    "...",
+    "",
+    None,
+]
+
+
+def _sql_fingerprint(text):
+    """FINGERPRINT_SQL, step by step"""
+    collapsed = re.sub(r"[^a-z0-9]+", " ", (text or "").lower())
+    return hashlib.md5(collapsed.strip(" ").encode()).hexdigest()
+
+
+def test_migration_expression():
+    migration = Path(__file__).parents[1] / "alembic" / "versions" / "009_add_answer_reuse.py"
+    assert FINGERPRINT_SQL in migration.read_text()
+
+
+def test_fingerprint_matches_expression():
+    for text in TEXTS:
+        assert text_fingerprint(text) == _sql_fingerprint(text), text
+    assert text_fingerprint("What is entropy?") == text_fingerprint("  WHAT is   entropy ?!  ")
+    assert text_fingerprint("") == hashlib.md5(b"").hexdigest()
+
+
+async def test_fingerprint_matches_postgres():
+    try:
+        conn = await asyncpg.connect(settings.database_url)
+    except Exception as e:
+        pytest.skip(f"Database not available: {e}")
+    try:
+        rows = await conn.fetch(f"""
+            SELECT {FINGERPRINT_SQL} AS fingerprint
+            FROM unnest($1::text[]) WITH ORDINALITY AS t(question_text, position)
+            ORDER BY t.position
+        """, TEXTS)
+    finally:
+        await conn.close()
+    assert [row["fingerprint"] for row in rows] == [text_fingerprint(text) for text in TEXTS]
@@ -0,0 +1,86 @@
+"""
+Answer scoring stage tests
+Stylometric scoring runs on NumPy only, so no database or detectors are needed;
+batch scoring runs against stand-in crud functions
+"""
+
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.crud.admin import compliance as compliance_crud
+from app.crud.ai import scoring as scoring_crud
+from app.services.ai.scoring_service import ScoringService, ai_likelihood, borderline, stylometric_features
+
+AI_STYLE = (
+    "Photosynthesis is the process by which plants convert light energy into chemical energy. "
+    "It is important to note that this process occurs in the chloroplasts of plant cells. "
+    "Furthermore, the process requires carbon dioxide and water as essential inputs. "
+    "Additionally, oxygen is released as a byproduct of the overall reaction. "
+    "In conclusion, photosynthesis is fundamental to sustaining life on our planet."
+)
+HUMAN_STYLE = (
+    "So basically plants eat light. Weird, right? They've got these little green things called "
+    "chloroplasts and that's where it all happens, you take in CO2 and water and sunlight and out "
+    "comes sugar plus oxygen which we breathe. I always forget the equation. Don't worry about it "
+    "too much for the test though, the teacher said it's mostly the concept."
+)
+
+
+pytestmark = pytest.mark.no_db
+
+
+def test_stylometric_scores_separate_ai_and_human_writing():
+    features, word_counts = stylometric_features([AI_STYLE, HUMAN_STYLE, ""])
+    scores = ai_likelihood(features)
+
+    assert features.shape == (3, 5)
+    assert word_counts.tolist() == [61, 60, 0]
+    assert scores[0] > 0.9
+    assert scores[1] < 0.1
+
+
+def test_batch_scoring_matches_single_scoring():
+    texts = [AI_STYLE, HUMAN_STYLE] * 50
+    batch = ai_likelihood(stylometric_features(texts)[0])
+    single = np.array([ai_likelihood(stylometric_features([text])[0])[0] for text in texts])
+
+    assert np.allclose(batch, single)
+    assert borderline(np.array([0.04, 0.1, 0.15, 0.2]), 0.1).tolist() == [False, True, True, False]
+
+
+async def test_reviewed_answers_flagged_unless_bypassed(monkeypatch):
+    draft, reviewed, bypassed = uuid4(), uuid4(), uuid4()
+    rows = [
+        {"id": draft, "answer_text": AI_STYLE, "status": "ai_generated"},
+        {"id": reviewed, "answer_text": AI_STYLE, "status": "approved"},
+        {"id": bypassed, "answer_text": AI_STYLE, "status": "approved",
+         "ai_bypassed": True, "originality_bypassed": True},
+    ]
+    saved, flags = [], []
+    
+    async def get_answers_for_scoring(conn, answer_ids):
+        return [
+            dict({"question_id": uuid4(), "client_id": None, "ai_bypassed": False, "originality_bypassed": False}, **row)
+            for row in rows
+        ]
+    
+    async def save_answer_scores(conn, scores):
+        saved.extend(scores)
+    
+    async def create_compliance_flag(conn, content_id, content_type, reason, severity, details=None, user_id=None):
+        flags.append((content_id, reason))
+    
+    monkeypatch.setattr(scoring_crud, "get_answers_for_scoring", get_answers_for_scoring)
+    monkeypatch.setattr(scoring_crud, "save_answer_scores", save_answer_scores)
+    monkeypatch.setattr(compliance_crud, "create_compliance_flag", create_compliance_flag)
+    service = ScoringService()
+    monkeypatch.setattr(service, "originality", lambda ids, texts: np.full(len(texts), 0.2))
+    
+    results = await service.score_batch(None, [draft, reviewed, bypassed])
+    
+    assert len(saved) == 3
+    assert results[2]["details"]["originality_bypassed"] is True
+    # Drafts are not flagged; admin overrides suppress their flag type
+    assert flags == [(reviewed, "ai_content"), (reviewed, "plagiarism")]
@@ -0,0 +1,102 @@
+"""
+Audit log writer tests
+Inline writes for critical actions, batched COPY for the rest, and draining
+on stop, with a stand-in connection
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import asyncpg
+import pytest
+
+from app.core.config import settings
+from app.db.session import db
+from app.utils.audit_log import AuditLog
+
+
+pytestmark = pytest.mark.no_db
+
+
+class Connection:
+    """Connection stand-in recording inserts and COPY batches"""
+    
+    def __init__(self):
+        self.inserted = []
+        self.copied = []
+        self.reject = set()  # action types the database refuses
+    
+    async def execute(self, query, *row):
+        if row[2] in self.reject:
+            raise asyncpg.PostgresError("invalid input syntax")
+        self.inserted.append(row)
+    
+    async def copy_records_to_table(self, table, records, columns):
+        if any(row[2] in self.reject for row in records):
+            raise asyncpg.PostgresError("invalid input syntax")
+        self.copied.append(list(records))
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = Connection()
+    
+    @asynccontextmanager
+    async def acquire(route="background", pool=None):
+        yield conn
+    
+    monkeypatch.setattr(db, "pool", object())
+    monkeypatch.setattr(db, "acquire", acquire)
+    monkeypatch.setattr(settings, "audit_write_behind", True)
+    monkeypatch.setattr(settings, "audit_sync_actions", "ban_user,reset_password")
+    monkeypatch.setattr(settings, "audit_flush_interval_seconds", 60)
+    monkeypatch.setattr(settings, "audit_batch_size", 3)
+    return conn
+
+
+async def test_critical_actions_inline_others_batched(conn):
+    audit = AuditLog()
+    # Not started: everything is written inline
+    await audit.log(conn, "admin", "pause_queue")
+    assert len(conn.inserted) == 1
+    
+    audit.start()
+    ban_id = await audit.log(conn, "admin", "ban_user", "user", "u1", {"reason": "spam"})
+    assert conn.inserted[-1][0] == ban_id and conn.inserted[-1][5] == '{"reason": "spam"}'
+    
+    ids = [await audit.log(conn, "admin", "flag_content") for _ in range(2)]
+    assert len(conn.inserted) == 2 and audit.stats()["buffered"] == 2
+    
+    # Reaching the batch size wakes the writer
+    ids.append(await audit.log(conn, "admin", "flag_content"))
+    await asyncio.sleep(0.05)
+    assert [row[0] for row in conn.copied[0]] == ids
+    
+    # Remaining entries are drained on stop
+    await audit.log(conn, "admin", "resume_queue")
+    await audit.stop()
+    assert conn.copied[1][0][2] == "resume_queue"
+    assert audit.stats() == {
+        "buffered": 0, "inline_writes": 2, "batched_writes": 4, "batches": 2, "failed": 0
+    }
+
+
+async def test_bad_row_does_not_lose_the_batch(conn):
+    audit = AuditLog()
+    audit.start()
+    conn.reject.add("broken")
+    for action_type in ("flag_content", "broken", "escalate_question"):
+        await audit.log(conn, "admin", action_type, durable=False)
+    await audit.stop()
+    assert conn.copied == []
+    assert [row[2] for row in conn.inserted] == ["flag_content", "escalate_question"]
+    assert audit.stats()["failed"] == 1
+
+
+def test_compliance_bypasses_are_written_inline():
+    from app.utils.audit_log import sync_actions
+    actions = sync_actions()
+    assert "promote_to_expert" in actions
+    for override in ("ai_bypass", "originality_pass", "confidence", "humanization_skip",
+                     "expert_bypass", "response_cache_bypass"):
+        assert f"override_{override}" in actions
@@ -0,0 +1,101 @@
+"""
+Composite endpoint loading tests
+Concurrency, connection budget, partial results and read-your-writes
+routing, with stand-in pools
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db.session import db
+from app.utils.cache import cache
+from app.utils.composite import Section, load_sections
+
+
+pytestmark = pytest.mark.no_db
+
+
+class Pool:
+    """Pool stand-in that tracks how many connections are out at once"""
+    
+    def __init__(self):
+        self.in_use = 0
+        self.peak = 0
+    
+    @asynccontextmanager
+    async def acquire(self):
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+        try:
+            yield object()
+        finally:
+            self.in_use -= 1
+
+
+def sleeper(seconds, value):
+    async def load(conn):
+        await asyncio.sleep(seconds)
+        return value
+    return load
+
+
+async def test_sections_run_concurrently_with_partial_results():
+    async def broken(conn):
+        raise RuntimeError("relation does not exist")
+    
+    pool = Pool()
+    started = time.perf_counter()
+    result = await load_sections("test", [
+        Section("a", sleeper(0.2, 1)),
+        Section("b", sleeper(0.2, 2)),
+        Section("slow", sleeper(5, 3), default=0, timeout=0.3),
+        Section("broken", broken, default=[]),
+    ], pool=pool)
+    elapsed = time.perf_counter() - started
+    
+    # Bounded by the slowest section (the timeout), not the sum
+    assert elapsed < 0.6
+    assert (result["a"], result["b"]) == (1, 2)
+    assert result["slow"] == 0 and result["broken"] == []
+    assert sorted(result.unavailable) == ["broken", "slow"]
+    assert pool.in_use == 0
+
+
+async def test_connection_budget():
+    pool = Pool()
+    result = await load_sections(
+        "test", [Section(str(i), sleeper(0.05, i)) for i in range(6)],
+        pool=pool, max_connections=2
+    )
+    assert pool.peak == 2
+    assert [result[str(i)] for i in range(6)] == list(range(6))
+    assert not result.partial
+
+
+async def test_pinned_caller_reads_primary_uncached(monkeypatch):
+    primary, replica = Pool(), Pool()
+    used = []
+    
+    def acquire(route, pool):
+        used.append((route, pool))
+        return pool.acquire()
+    
+    async def cached(key):
+        return {"value": "cached"}
+    
+    async def store(key, value, ttl):
+        pass
+    
+    monkeypatch.setattr(db, "pool", primary)
+    monkeypatch.setattr(db, "read_pool", lambda: replica)
+    monkeypatch.setattr(db, "acquire", acquire)
+    monkeypatch.setattr(cache, "get", cached)
+    monkeypatch.setattr(cache, "set", store)
+    
+    assert (await load_sections("test", [Section("a", sleeper(0, "fresh"))]))["a"] == "cached"
+    assert not used
+    assert (await load_sections("test", [Section("a", sleeper(0, "fresh"))], primary=True))["a"] == "fresh"
+    assert used == [("reporting", primary)]
@@ -0,0 +1,99 @@
+"""
+Leaderboard tests
+The Lua record script and SQL rebuilds against a fake Redis (fakeredis runs
+the script), ranking order and period buckets
+"""
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import fakeredis
+import pytest
+
+from app.crud.admin import experts as expert_crud
+from app.utils.cache import cache
+from app.utils.leaderboard import LeaderboardService, leaderboard_score, normalize_period, period_bucket
+
+
+pytestmark = pytest.mark.no_db
+
+
+def test_buckets_and_score():
+    assert period_bucket("week", datetime(2026, 1, 1, tzinfo=timezone.utc)) == "2026-W01"
+    assert period_bucket("week", datetime(2027, 1, 1, tzinfo=timezone.utc)) == "2026-W53"
+    assert period_bucket("month", datetime(2026, 10, 19, tzinfo=timezone.utc)) == "2026-10"
+    assert period_bucket("all_time") == "all"
+    assert normalize_period("year") == "all_time"
+    
+    # Average rating only breaks ties between equal answer counts
+    assert leaderboard_score(3, 0, 0) == 3.0
+    assert leaderboard_score(3, 9, 2) == 3.45
+    assert leaderboard_score(2, 5, 1) < leaderboard_score(3, 1, 1)
+
+
+async def test_rebuild_then_record(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "client", client)
+    first, second, third = uuid4(), uuid4(), uuid4()
+    periods = []
+    
+    async def get_expert_leaderboard_totals(conn, period):
+        periods.append(period)
+        return [
+            {"expert_id": first, "questions_answered": 4, "rating_sum": 16, "rating_count": 4, "total_earnings": 40},
+            {"expert_id": second, "questions_answered": 4, "rating_sum": 10, "rating_count": 4, "total_earnings": 30},
+        ]
+    
+    monkeypatch.setattr(expert_crud, "get_expert_leaderboard_totals", get_expert_leaderboard_totals)
+    
+    service = LeaderboardService()
+    # Nothing is served from Redis before the first rebuild
+    await service.record_delivery(first)
+    assert await service.get_top("week") is None
+    
+    assert await service.rebuild(None)
+    assert periods == ["week", "month", "all_time"]
+    # Another worker holding the lock skips the rebuild
+    assert not await service.rebuild(None)
+    
+    top = await service.get_top("week")
+    assert [entry["expert_id"] for entry in top] == [str(first), str(second)]
+    assert top[0] == {
+        "expert_id": str(first), "questions_answered": 4, "average_rating": 4.0, "total_earnings": 40.0, "rank": 1
+    }
+    
+    # The script applies deltas and re-scores in every period
+    await service.record_delivery(second, earnings=12.5)
+    await service.record_rating(second, 5)
+    await service.record_delivery(third)
+    for period in ("week", "month", "all_time"):
+        top = await service.get_top(period)
+        assert [entry["expert_id"] for entry in top] == [str(second), str(first), str(third)]
+        assert top[0]["questions_answered"] == 5
+        assert top[0]["average_rating"] == 3.0
+        assert top[0]["total_earnings"] == 42.5
+        assert top[2]["average_rating"] is None
+    
+    rank = await service.get_rank("month", first)
+    assert (rank["rank"], rank["total_experts"], rank["questions_answered"]) == (2, 3, 4)
+    assert (await service.get_rank("month", uuid4()))["rank"] is None
+    assert await service.get_updated_at("all_time") is not None
+    
+    # Week and month buckets expire; all-time does not
+    week_key = f"leaderboard:week:{period_bucket('week')}"
+    assert await client.ttl(week_key) > 0
+    assert await client.ttl(f"{week_key}:stats") > 0
+    assert await client.ttl("leaderboard:all_time:all") == -1
+    
+    # A rebuild replaces drifted counts with the SQL totals
+    assert await service.rebuild(None, force=True)
+    assert [entry["expert_id"] for entry in await service.get_top("all_time")] == [str(first), str(second)]
+
+
+async def test_redis_unavailable(monkeypatch):
+    monkeypatch.setattr(cache, "client", None)
+    service = LeaderboardService()
+    await service.record_rating(uuid4(), 5)
+    assert await service.get_top("month") is None
+    assert await service.get_rank("month", uuid4()) is None
+    assert not await service.rebuild(None)
@@ -0,0 +1,201 @@
+"""
+Near-duplicate index tests
+MinHash estimates and LSH banding, flagging matches from other owners, the
+startup backfill past archived stubs, and refreshing a worker's index from
+signatures stored by other workers
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.crud.admin import compliance as compliance_crud
+from app.crud.admin import similarity as similarity_crud
+from app.utils.minhash import (
+    LSHIndex, MinHasher, normalize_text, optimal_bands, shingle_hashes, signature_from_bytes, signature_to_bytes
+)
+from app.utils import near_duplicates as near_duplicates_module
+from app.utils.near_duplicates import NearDuplicateService, flag_severity
+
+
+pytestmark = pytest.mark.no_db
+
+QUESTION = "Explain how photosynthesis converts light energy into chemical energy in green plants and algae"
+
+
+def _jaccard(first, second):
+    first, second = set(shingle_hashes(first).tolist()), set(shingle_hashes(second).tolist())
+    return len(first & second) / len(first | second)
+
+
+def test_minhash_estimates_jaccard():
+    assert normalize_text("  What's the GDP, of France?") == ["what", "s", "the", "gdp", "of", "france"]
+    assert len(shingle_hashes("Light; light LIGHT light")) == 1
+    
+    hasher = MinHasher(num_perm=256)
+    near = QUESTION + " in summer"
+    signature = hasher.signature(QUESTION)
+    # Signatures are deterministic across workers and survive storage
+    assert (signature == MinHasher(num_perm=256).signature(QUESTION)).all()
+    assert (signature_from_bytes(signature_to_bytes(signature)) == signature).all()
+    
+    estimate = (signature == hasher.signature(near)).mean()
+    assert abs(estimate - _jaccard(QUESTION, near)) < 0.1
+    assert (signature == hasher.signature("Describe the causes of the French revolution")).mean() < 0.1
+    # Punctuation and case do not change the signature
+    assert (signature == hasher.signature(QUESTION.upper() + "?!")).all()
+
+
+def test_optimal_bands():
+    for num_perm, threshold in [(128, 0.7), (128, 0.5), (64, 0.8)]:
+        bands, rows = optimal_bands(num_perm, threshold)
+        assert bands * rows == num_perm
+        assert (1 / bands) ** (1 / rows) <= threshold
+    # 16 bands of 8 rows would put the LSH threshold just above 0.7
+    assert optimal_bands(128, 0.7) == (32, 4)
+
+
+def test_lsh_query_filters_and_remove():
+    hasher = MinHasher()
+    index = LSHIndex(threshold=0.7)
+    near = QUESTION + " in summer"
+    index.add(("question", "a"), hasher.signature(QUESTION), owner="client-1")
+    index.add(("answer", "b"), hasher.signature(QUESTION), owner="client-2")
+    index.add(("question", "c"), hasher.signature(near), owner="client-2")
+    index.add(("question", "d"), hasher.signature("Describe the causes of the French revolution"), owner="client-3")
+    # Adding a key twice is a no-op
+    index.add(("question", "a"), hasher.signature(near), owner="client-1")
+    assert len(index) == 4
+    
+    matches = index.query(hasher.signature(QUESTION), content_type="question")
+    assert [m["content_id"] for m in matches] == ["a", "c"]
+    assert matches[0]["similarity"] == 1.0 and matches[0]["owner_id"] == "client-1"
+    assert [m["content_id"] for m in index.query(hasher.signature(QUESTION), exclude_owner="client-1")] == ["b", "c"]
+    assert index.query(hasher.signature(QUESTION), min_similarity=1.0, limit=1)[0]["content_id"] in ("a", "b")
+    
+    index.remove(("question", "a"))
+    assert ("question", "a") not in index
+    assert [m["content_id"] for m in index.query(hasher.signature(QUESTION), content_type="question")] == ["c"]
+
+
+def test_lsh_grows_past_initial_capacity():
+    hasher = MinHasher(num_perm=32)
+    index = LSHIndex(num_perm=32, threshold=0.5)
+    for i in range(1500):
+        index.add(("question", str(i)), hasher.signature(f"question number {i} about topic {i * 7}"))
+    assert len(index) == 1500
+    assert index.query(hasher.signature("question number 1234 about topic 8638"))[0]["content_id"] == "1234"
+
+
+async def test_check_and_index_flags_other_owners(monkeypatch):
+    flags = []
+    saved = []
+    
+    async def create_compliance_flag(conn, content_id, content_type, flag_type, severity, details, user_id):
+        flags.append((content_id, flag_type, severity, details))
+    
+    async def save_content_signatures(conn, num_perm, rows):
+        saved.extend(rows)
+    
+    monkeypatch.setattr(compliance_crud, "create_compliance_flag", create_compliance_flag)
+    monkeypatch.setattr(similarity_crud, "save_content_signatures", save_content_signatures)
+    
+    service = NearDuplicateService()
+    first_owner, second_owner = uuid4(), uuid4()
+    first, own, copied = uuid4(), uuid4(), uuid4()
+    assert await service.check_and_index(None, first, "question", QUESTION, first_owner) == []
+    # Resubmitting your own question is not plagiarism
+    assert await service.check_and_index(None, own, "question", QUESTION, first_owner) == []
+    
+    flagged = await service.check_and_index(None, copied, "question", QUESTION + " please", second_owner)
+    assert {m["content_id"] for m in flagged} == {str(first), str(own)}
+    content_id, flag_type, severity, details = flags[0]
+    assert (content_id, flag_type) == (copied, "plagiarism")
+    assert severity == flag_severity(details["similarity"])
+    assert len(saved) == 3 and len(service.index) == 3
+    
+    # Blank text is neither flagged nor indexed
+    assert await service.check_and_index(None, uuid4(), "question", "   ", second_owner) == []
+    assert len(saved) == 3
+    assert (flag_severity(0.96), flag_severity(0.9), flag_severity(0.7)) == ("high", "medium", "low")
+
+
+class BackfillConnection:
+    """Connection stand-in for get_unsigned_content over oldest-first questions"""
+    
+    def __init__(self, texts):
+        self.questions = [{"content_id": uuid4(), "text": text} for text in texts]
+        self.signed = set()
+    
+    async def fetch(self, query, num_perm, limit):
+        # The query's filter on text with something to sign
+        assert "q.question_text ~* '[a-z0-9]'" in query and "a.answer_text ~* '[a-z0-9]'" in query
+        rows = [
+            {"content_type": "question", "owner_id": None, **question}
+            for question in self.questions
+            if question["content_id"] not in self.signed and re.search("[a-z0-9]", question["text"], re.I)
+        ]
+        return rows[:limit]
+
+
+async def test_backfill_skips_archived_stubs(monkeypatch):
+    # Archived stubs (text emptied) are the oldest rows and fill more than a batch
+    conn = BackfillConnection(["", " ", "?!"] * 3 + [QUESTION, "Describe the causes of the French revolution"])
+    
+    async def get_content_signatures(conn, num_perm, after, limit):
+        return []
+    
+    async def save_content_signatures(db, num_perm, rows):
+        conn.signed.update(row[1] for row in rows)
+    
+    monkeypatch.setattr(similarity_crud, "get_content_signatures", get_content_signatures)
+    monkeypatch.setattr(similarity_crud, "save_content_signatures", save_content_signatures)
+    monkeypatch.setattr(near_duplicates_module, "BACKFILL_BATCH_SIZE", 4)
+    
+    service = NearDuplicateService()
+    assert await service.load(conn) == 2
+    assert conn.signed == {question["content_id"] for question in conn.questions[-2:]}
+    assert service.find_similar(QUESTION)[0]["content_id"] == str(conn.questions[-2]["content_id"])
+
+
+async def test_refresh_picks_up_other_workers_signatures(monkeypatch):
+    service = NearDuplicateService()
+    now = datetime.now(timezone.utc)
+    stored = []
+    cursors = []
+    
+    def store(text, created_at):
+        stored.append({
+            "content_type": "question",
+            "content_id": uuid4(),
+            "owner_id": uuid4(),
+            "signature": signature_to_bytes(service.hasher.signature(text)),
+            "created_at": created_at
+        })
+        stored.sort(key=lambda row: (row["created_at"], row["content_type"], row["content_id"]))
+    
+    async def get_content_signatures(conn, num_perm, after, limit):
+        cursors.append(after)
+        rows = [
+            row for row in stored
+            if after is None or (row["created_at"], row["content_type"], row["content_id"]) > after
+        ]
+        return rows[:limit]
+    
+    monkeypatch.setattr(similarity_crud, "get_content_signatures", get_content_signatures)
+    
+    text = QUESTION
+    store("Describe the causes of the French revolution", now - timedelta(hours=1))
+    assert await service.refresh(None) == 1
+    assert not service.find_similar(text)
+    
+    # Another worker stored a near-duplicate; a late commit can carry an older timestamp
+    store(text, now - timedelta(hours=1, seconds=30))
+    assert await service.refresh(None) == 1
+    assert cursors[-1][0] == now - timedelta(hours=1) - timedelta(minutes=2)
+    assert service.find_similar(text + " today")[0]["similarity"] > 0.7
+    
+    # Rows already indexed are not counted again
+    assert await service.refresh(None) == 0
@@ -0,0 +1,75 @@
+"""
+OCR pre-processing tests
+Synthetic text-like images, so Tesseract itself is not needed; image URL
+checks and queueing run without network access
+"""
+
+from uuid import uuid4
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.services.ai import ocr_service as ocr_module
+from app.services.ai.ocr_service import OCRService, check_image_url
+from app.utils.ocr import estimate_skew, preprocess_image
+
+
+pytestmark = pytest.mark.no_db
+
+
+def text_like_image(width: int = 1200, height: int = 800) -> Image.Image:
+    """Rows of word-sized black boxes on white"""
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for row in range(12):
+        y = 60 + row * 55
+        x = 60
+        while x < width - 100:
+            word = 20 + (x * 7 % 60)
+            draw.rectangle([x, y, x + word, y + 22], fill=0)
+            x += word + 15
+    return image
+
+
+@pytest.mark.parametrize("skew", [-6.0, -2.5, 0.0, 3.0, 7.0])
+def test_estimate_skew(skew):
+    rotated = text_like_image().rotate(skew, expand=True, fillcolor=255)
+    assert estimate_skew(rotated) == pytest.approx(skew, abs=0.25)
+
+
+def test_preprocess_downscales_grayscales_and_deskews():
+    skewed = text_like_image(3000, 2000).rotate(4, expand=True, fillcolor=255).convert("RGB")
+    processed, angle = preprocess_image(skewed, max_dimension=1500)
+    
+    assert angle == pytest.approx(4.0, abs=0.25)
+    assert processed.mode == "L"
+    assert estimate_skew(processed) == pytest.approx(0.0, abs=0.25)
+
+
+async def test_image_urls_limited_to_public_allowed_hosts(monkeypatch):
+    monkeypatch.setattr(settings, "ocr_image_url_hosts", ["127.0.0.1", "169.254.169.254"])
+    with pytest.raises(ValueError, match="not fetched"):
+        await check_image_url("https://images.example.com/a.png")
+    with pytest.raises(ValueError, match="http"):
+        await check_image_url("file:///etc/passwd")
+    for url in ("http://127.0.0.1:8000/a.png", "http://169.254.169.254/latest/meta-data"):
+        with pytest.raises(ValueError, match="non-public"):
+            await check_image_url(url)
+
+
+async def test_ocr_routed_through_queue(monkeypatch):
+    published = []
+    
+    async def publish(queue_name, message):
+        published.append((queue_name, message))
+    
+    monkeypatch.setattr(ocr_module.queue_service, "channel", object())
+    monkeypatch.setattr(ocr_module.queue_service, "publish", publish)
+    question_id = uuid4()
+    await OCRService().enqueue(question_id, [], ["/api/v1/client/uploads/images/" + "a" * 64])
+    
+    assert published == [("ocr", {
+        "question_id": str(question_id),
+        "image_urls": ["/api/v1/client/uploads/images/" + "a" * 64]
+    })]
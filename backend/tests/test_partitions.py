@@ -0,0 +1,80 @@
+"""
+Partition maintenance tests
+Month arithmetic, retention windows, and one maintenance pass over a
+stand-in connection
+"""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.crud.admin import partitions as partition_crud
+from app.utils.partitions import (
+    PartitionManager, add_months, expired_partitions, month_start, partition_month, partition_name
+)
+
+
+pytestmark = pytest.mark.no_db
+
+
+def test_months_and_retention(monkeypatch):
+    assert month_start(datetime(2026, 1, 31, 23, 30, tzinfo=timezone.utc)) == date(2026, 1, 1)
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+    assert partition_name("audit_logs", date(2026, 3, 1)) == "audit_logs_p202603"
+    assert partition_month("audit_logs", "audit_logs_p202603") == date(2026, 3, 1)
+    assert partition_month("audit_logs", "audit_logs_default") is None
+    
+    attached = ["notifications_default", "notifications_p202508", "notifications_p202509", "notifications_p202510"]
+    monkeypatch.setattr(settings, "partition_retention_notifications_months", 12)
+    assert expired_partitions("notifications", attached, date(2026, 10, 1)) == ["notifications_p202508", "notifications_p202509"]
+    monkeypatch.setattr(settings, "partition_retention_notifications_months", 0)
+    assert expired_partitions("notifications", attached, date(2026, 10, 1)) == []
+
+
+class Connection:
+    """Connection stand-in with an advisory lock that is always free"""
+    
+    async def fetchval(self, query, *args):
+        return True
+    
+    def transaction(self):
+        @asynccontextmanager
+        async def transaction():
+            yield
+        return transaction()
+
+
+async def test_maintain_creates_ahead_and_archives(monkeypatch):
+    existing = {"admin_actions_default", "admin_actions_p202409", "admin_actions_p202410", "admin_actions_p202610"}
+    calls = []
+    
+    async def get_partitions(conn, parent):
+        return sorted(existing)
+    
+    async def create_month_partition(conn, parent, month):
+        name = partition_name(parent, month)
+        created = name not in existing
+        existing.add(name)
+        return created
+    
+    async def detach_partition(conn, parent, partition):
+        calls.append(("detach", partition))
+    
+    async def archive_partition(conn, partition):
+        calls.append(("archive", partition))
+    
+    monkeypatch.setattr(partition_crud, "get_partitions", get_partitions)
+    monkeypatch.setattr(partition_crud, "create_month_partition", create_month_partition)
+    monkeypatch.setattr(partition_crud, "detach_partition", detach_partition)
+    monkeypatch.setattr(partition_crud, "archive_partition", archive_partition)
+    monkeypatch.setattr(settings, "partition_months_ahead", 2)
+    monkeypatch.setattr(settings, "partition_retention_admin_actions_months", 24)
+    monkeypatch.setattr(settings, "partition_retention_action", "archive")
+    
+    done = await PartitionManager().maintain_table(Connection(), "admin_actions", date(2026, 10, 1))
+    assert done["created"] == ["admin_actions_p202611", "admin_actions_p202612"]
+    assert done["retired"] == ["admin_actions_p202409"]
+    assert calls == [("detach", "admin_actions_p202409"), ("archive", "admin_actions_p202409")]
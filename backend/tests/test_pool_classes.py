@@ -0,0 +1,80 @@
+"""
+Connection pool class tests
+Per-class limits, wait metrics and adaptive shedding, without a database
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.db.pool_classes import PoolClass, PoolClasses, route_class, shared_limits
+
+
+pytestmark = pytest.mark.no_db
+
+
+def test_route_classes():
+    assert route_class("/api/v1/admin/compliance/audit-logs/export") == "reporting"
+    assert route_class("/api/v1/expert/tasks") == "expert"
+    assert route_class("/api/v1/client/questions/submit") == "interactive"
+    assert route_class("/api/v1/auth/login") == "interactive"
+
+
+async def test_class_limit_and_timeout():
+    reporting = PoolClass("reporting", 2)
+    await reporting.enter(1)
+    await reporting.enter(1)
+    
+    with pytest.raises(asyncio.TimeoutError):
+        await reporting.enter(0.05)
+    assert reporting.timeouts == 1 and reporting.waiting == 0
+    
+    # A released slot goes to the next waiter
+    waiter = asyncio.create_task(reporting.enter(1))
+    await asyncio.sleep(0.01)
+    assert reporting.waiting == 1
+    await reporting.leave()
+    await waiter
+    assert reporting.in_use == 2 and reporting.peak == 2
+    assert reporting.stats()["utilization"] == 1.0
+
+
+async def test_adaptive_limits_follow_interactive_waits(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_interactive_wait_target_ms", 50)
+    monkeypatch.setattr(settings, "db_pool_max_size", 40)
+    monkeypatch.setattr(settings, "db_pool_reporting_limit", 8)
+    monkeypatch.setattr(settings, "db_pool_background_limit", 4)
+    classes = PoolClasses()
+    
+    for _ in range(20):
+        classes.get("interactive").record_wait(0.2)
+    await classes.adapt()
+    assert classes.get("reporting").limit == 4
+    assert classes.get("background").limit == 2
+    
+    # Healthy waits: slots come back one at a time, up to the configured limit
+    for _ in range(6):
+        classes.get("interactive").record_wait(0.001)
+        await classes.adapt()
+    assert classes.get("reporting").limit == 8
+    assert classes.get("background").limit == 4
+    assert classes.get("interactive").stats()["p95_wait_ms"] == 200.0
+
+
+def test_shared_classes_leave_the_interactive_reserve(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_max_size", 20)
+    monkeypatch.setattr(settings, "db_pool_interactive_reserved", 4)
+    monkeypatch.setattr(settings, "db_pool_expert_limit", 12)
+    monkeypatch.setattr(settings, "db_pool_reporting_limit", 6)
+    monkeypatch.setattr(settings, "db_pool_background_limit", 4)
+    limits = shared_limits()
+    assert limits == {"expert": 8, "reporting": 4, "background": 2}
+    assert sum(limits.values()) <= 16
+    assert PoolClasses().get("expert").limit == 8
+    
+    # Limits that already fit are kept
+    monkeypatch.setattr(settings, "db_pool_expert_limit", 8)
+    monkeypatch.setattr(settings, "db_pool_reporting_limit", 4)
+    monkeypatch.setattr(settings, "db_pool_background_limit", 3)
+    assert shared_limits() == {"expert": 8, "reporting": 4, "background": 3}
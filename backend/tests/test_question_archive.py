@@ -0,0 +1,218 @@
+"""
+Question archive tests
+Bundle round trips, filling emptied bodies from a bundle (history and rating
+rows), one archiving pass over a stand-in connection, and archived questions
+still offered as exact answer reuse matches
+"""
+
+import importlib.util
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import asyncpg
+import pytest
+
+from app.core.config import settings
+from app.crud.admin import answer_reuse as reuse_crud
+from app.crud.admin import archive as archive_crud
+from app.utils.answer_reuse import answer_reuse, text_fingerprint
+from app.utils.question_archive import (
+    QuestionArchive, archive_cutoff, compress_bundle, decompress_bundle, fill_row, fill_texts
+)
+
+
+pytestmark = pytest.mark.no_db
+
+
+def _document(question_id, answer_ids):
+    return json.dumps({
+        "question": {"id": str(question_id), "question_text": "What is entropy?", "metadata": {"image_urls": []}},
+        "answers": [{"id": str(answer_id), "answer_text": f"Answer {i}"} for i, answer_id in enumerate(answer_ids)],
+        "reviews": [],
+        "ratings": [{"id": str(uuid4()), "comment": "Clear"}]
+    })
+
+
+def test_cutoff_and_fill():
+    assert archive_cutoff(12, datetime(2026, 10, 19, 8, tzinfo=timezone.utc)) == datetime(2025, 10, 19, 8, tzinfo=timezone.utc)
+    assert archive_cutoff(1, datetime(2026, 3, 31, tzinfo=timezone.utc)) == datetime(2026, 2, 28, tzinfo=timezone.utc)
+    
+    question_id, first, second = uuid4(), uuid4(), uuid4()
+    document = _document(question_id, [first, second])
+    bundle = decompress_bundle(compress_bundle(document))
+    assert bundle == json.loads(document)
+    
+    # Emptied bodies come from the bundle; the question's own answer wins over the latest
+    assert fill_texts(bundle, first, "", "") == ("What is entropy?", "Answer 0")
+    assert fill_texts(bundle, None, "", "") == ("What is entropy?", "Answer 1")
+    # Text written after archiving is kept
+    assert fill_texts(bundle, first, "", "Corrected") == ("What is entropy?", "Corrected")
+    assert fill_texts(None, first, "", "") == ("", "")
+    
+    row = fill_row({"question_text": "", "metadata": None, "status": "delivered"}, "questions", bundle["question"])
+    assert row == {"question_text": "What is entropy?", "metadata": '{"image_urls": []}', "status": "delivered"}
+
+
+class Connection:
+    """Connection stand-in with a no-op transaction"""
+    
+    def transaction(self):
+        @asynccontextmanager
+        async def transaction():
+            yield
+        return transaction()
+
+
+async def test_archive_batch_and_load(monkeypatch):
+    question_id, answer_id = uuid4(), uuid4()
+    document = _document(question_id, [answer_id])
+    stored = {}
+    lookups = []
+    
+    async def get_archivable_bundles(conn, delivered_before, limit):
+        assert delivered_before < datetime.now(timezone.utc) and limit == 2
+        return [] if stored else [{"id": question_id, "client_id": None, "delivered_at": None, "document": document}]
+    
+    async def save_archived_questions(conn, rows):
+        for row in rows:
+            stored[row[0]] = row
+    
+    async def get_archived_bundles(conn, question_ids):
+        lookups.append(list(question_ids))
+        return {qid: stored[qid][3] for qid in question_ids if qid in stored}
+    
+    monkeypatch.setattr(archive_crud, "get_archivable_bundles", get_archivable_bundles)
+    monkeypatch.setattr(archive_crud, "save_archived_questions", save_archived_questions)
+    monkeypatch.setattr(archive_crud, "get_archived_bundles", get_archived_bundles)
+    monkeypatch.setattr(settings, "question_archive_after_months", 12)
+    monkeypatch.setattr(settings, "question_archive_batch_size", 2)
+    
+    archive = QuestionArchive()
+    assert await archive.archive_batch(Connection()) == 1
+    row = stored[question_id]
+    assert row[4] == len(document.encode()) and len(row[3]) < row[4]
+    assert await archive.archive_batch(Connection()) == 0
+    
+    # Loaded once, then served from the worker's cache
+    assert (await archive.load(Connection(), [question_id]))[question_id]["answers"][0]["answer_text"] == "Answer 0"
+    assert question_id in await archive.load(Connection(), [question_id])
+    assert lookups == [[question_id]]
+    
+    rows = await archive.fill_answer_texts(Connection(), [
+        {"source_question_id": question_id, "source_answer_id": answer_id, "answer_text": ""}
+    ])
+    assert rows[0]["answer_text"] == "Answer 0"
+
+
+async def test_rating_rows_filled_from_bundle(monkeypatch):
+    from app.crud.expert import ratings as ratings_crud
+    question_id, answer_id = uuid4(), uuid4()
+    bundle = json.loads(_document(question_id, [answer_id]))
+    rating_id = bundle["ratings"][0]["id"]
+    
+    async def load(conn, question_ids):
+        return {qid: bundle for qid in question_ids if qid == question_id}
+    
+    monkeypatch.setattr(ratings_crud.question_archive, "load", load)
+    live_id = uuid4()
+    rows = await ratings_crud._fill_archived(None, [
+        {"rating_id": rating_id, "question_id": question_id, "answer_id": answer_id, "archived_at": datetime.now(timezone.utc),
+         "question_text": "", "answer_text": "", "comment": None},
+        {"rating_id": uuid4(), "question_id": live_id, "answer_id": None, "archived_at": None,
+         "question_text": "Live", "answer_text": "Live answer", "comment": "Good"},
+    ])
+    assert (rows[0]["question_text"], rows[0]["answer_text"], rows[0]["comment"]) == ("What is entropy?", "Answer 0", "Clear")
+    assert (rows[1]["question_text"], rows[1]["comment"]) == ("Live", "Good")
+
+
+def _migration(name):
+    path = Path(__file__).parents[1] / "alembic" / "versions" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FingerprintConnection:
+    """Connection stand-in holding one archived delivered question's stub"""
+    
+    def __init__(self, question_id, answer_id, fingerprint):
+        self.stub = {"source_question_id": question_id, "source_answer_id": answer_id, "answer_text": ""}
+        self.fingerprint = fingerprint
+    
+    async def fetchrow(self, query, fingerprint, exclude_question_id):
+        assert "q.text_fingerprint = $1" in query
+        return dict(self.stub) if fingerprint == self.fingerprint else None
+
+
+async def test_archived_question_offered_as_exact_reuse(monkeypatch):
+    question_id, answer_id = uuid4(), uuid4()
+    bundle = json.loads(_document(question_id, [answer_id]))
+    offers = []
+    
+    async def load(conn, question_ids):
+        return {qid: bundle for qid in question_ids if qid == question_id}
+    
+    async def create_reuse_offer(conn, new_question_id, source_question_id, source_answer_id, match_type, similarity):
+        offers.append((new_question_id, source_question_id, source_answer_id, match_type))
+    
+    monkeypatch.setattr(reuse_crud.question_archive, "load", load)
+    monkeypatch.setattr(reuse_crud, "create_reuse_offer", create_reuse_offer)
+    monkeypatch.setattr(settings, "answer_reuse_enabled", True)
+    
+    # The stub keeps the fingerprint of its archived text (migration 021)
+    conn = FingerprintConnection(question_id, answer_id, text_fingerprint("What is entropy?"))
+    new_question_id = uuid4()
+    match = await answer_reuse.find_offer(conn, new_question_id, "what is ENTROPY")
+    assert (match["match_type"], match["similarity"]) == ("exact", 1.0)
+    # The emptied answer is served from the bundle
+    assert match["answer_text"] == "Answer 0"
+    assert offers == [(new_question_id, question_id, answer_id, "exact")]
+    
+    # Same expression as the generated column it replaces
+    migration = _migration("021_keep_archived_text_fingerprints")
+    assert migration.FINGERPRINT.format(text="question_text") in (
+        Path(__file__).parents[1] / "alembic" / "versions" / "009_add_answer_reuse.py"
+    ).read_text()
+
+
+async def test_fingerprint_trigger_keeps_archived_value():
+    migration = _migration("021_keep_archived_text_fingerprints")
+    try:
+        conn = await asyncpg.connect(settings.database_url)
+    except Exception as e:
+        pytest.skip(f"Database not available: {e}")
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        await conn.execute("""
+            CREATE TEMP TABLE stub_questions (
+                id uuid PRIMARY KEY, question_text text, archived_at timestamptz, text_fingerprint text
+            )
+        """)
+        await conn.execute(migration.FINGERPRINT_FUNCTION)
+        await conn.execute("""
+            CREATE TRIGGER trg_stub_questions_text_fingerprint
+            BEFORE INSERT OR UPDATE OF question_text, archived_at ON stub_questions
+            FOR EACH ROW EXECUTE FUNCTION questions_text_fingerprint()
+        """)
+        question_id = uuid4()
+        fingerprint = "SELECT text_fingerprint FROM stub_questions WHERE id = $1"
+        await conn.execute("INSERT INTO stub_questions (id, question_text) VALUES ($1, 'What is entropy?')", question_id)
+        assert await conn.fetchval(fingerprint, question_id) == text_fingerprint("What is entropy?")
+        
+        # Archiving empties the text but keeps the fingerprint
+        await conn.execute("UPDATE stub_questions SET question_text = '', archived_at = NOW() WHERE id = $1", question_id)
+        assert await conn.fetchval(fingerprint, question_id) == text_fingerprint("What is entropy?")
+        
+        # Restoring recomputes it
+        await conn.execute(
+            "UPDATE stub_questions SET question_text = 'What is enthalpy?', archived_at = NULL WHERE id = $1", question_id
+        )
+        assert await conn.fetchval(fingerprint, question_id) == text_fingerprint("What is enthalpy?")
+    finally:
+        await transaction.rollback()
+        await conn.close()
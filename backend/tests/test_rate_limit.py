@@ -0,0 +1,98 @@
+"""
+Rate limiter tests
+Local (Redis unavailable) limiting through the ASGI middleware, route groups
+and client addresses behind trusted proxies
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.security import SecurityUtils
+from app.utils.cache import cache
+from app.utils.rate_limit import (
+    RateLimiter, RateLimitMiddleware, client_address, parse_rate_limit_rules, route_group
+)
+
+
+pytestmark = pytest.mark.no_db
+
+
+@pytest.fixture
+def limited_app(monkeypatch):
+    monkeypatch.setattr(cache, "client", None)
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_per_hour", 1000)
+    monkeypatch.setattr(settings, "rate_limit_rules", "auth=2,client=3,client:super_admin=10")
+    app = FastAPI()
+    
+    @app.get("/api/v1/client/ping")
+    async def client_ping():
+        return {"ok": True}
+    
+    @app.post("/api/v1/auth/login")
+    async def login():
+        return {"ok": True}
+    
+    @app.get("/api/v1/health")
+    async def health():
+        return {"ok": True}
+    
+    app.add_middleware(RateLimitMiddleware, limiter=RateLimiter())
+    return app
+
+
+def test_parse_rate_limit_rules():
+    assert parse_rate_limit_rules("auth=10, admin:super_admin=600,bad=x") == {
+        ("auth", None): 10,
+        ("admin", "super_admin"): 600,
+    }
+
+
+async def test_requests_over_the_limit_get_429_with_headers(limited_app):
+    async with httpx.AsyncClient(app=limited_app, base_url="http://test") as client:
+        responses = [await client.get("/api/v1/client/ping") for _ in range(4)]
+        assert [r.status_code for r in responses] == [200, 200, 200, 429]
+        assert responses[0].headers["RateLimit-Limit"] == "3"
+        assert responses[0].headers["RateLimit-Remaining"] == "2"
+        assert int(responses[3].headers["Retry-After"]) >= 1
+        
+        # Other groups and exempt paths have their own budgets
+        assert (await client.post("/api/v1/auth/login")).status_code == 200
+        assert (await client.get("/api/v1/health")).status_code == 200
+        assert "RateLimit-Limit" not in (await client.get("/api/v1/health")).headers
+
+
+async def test_limits_follow_the_token_role(limited_app):
+    token = SecurityUtils.generate_jwt_token("user-1", "super_admin", "a@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(app=limited_app, base_url="http://test") as client:
+        responses = [await client.get("/api/v1/client/ping", headers=headers) for _ in range(4)]
+        assert all(r.status_code == 200 for r in responses)
+        assert responses[0].headers["RateLimit-Limit"] == "10"
+        # Anonymous requests from the same IP are counted separately
+        assert (await client.get("/api/v1/client/ping")).headers["RateLimit-Remaining"] == "2"
+
+
+def test_only_sign_in_and_sign_up_are_limited_per_ip():
+    assert route_group("/api/v1/auth/login") == "auth"
+    assert route_group("/api/v1/auth/register") == "auth"
+    for path in ("/api/v1/auth/me", "/api/v1/auth/refresh", "/api/v1/auth/logout"):
+        assert route_group(path) == "default"
+
+
+def test_client_address_behind_trusted_proxies(monkeypatch):
+    def scope(peer, forwarded=None):
+        headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+        return {"client": (peer, 443), "headers": headers}
+    
+    monkeypatch.setattr(settings, "rate_limit_trusted_proxies", [])
+    assert client_address(scope("10.0.0.5", "203.0.113.9")) == "10.0.0.5"
+    
+    monkeypatch.setattr(settings, "rate_limit_trusted_proxies", ["10.0.0.0/8", "192.0.2.1"])
+    # The nearest untrusted hop is the client; earlier entries can be spoofed
+    assert client_address(scope("10.0.0.5", "198.51.100.7, 203.0.113.9, 192.0.2.1")) == "203.0.113.9"
+    assert client_address(scope("10.0.0.5", "10.1.1.1")) == "10.0.0.5"
+    # Untrusted peers cannot pick their own address
+    assert client_address(scope("203.0.113.50", "198.51.100.7")) == "203.0.113.50"
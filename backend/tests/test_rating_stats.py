@@ -0,0 +1,137 @@
+"""
+Incremental rating statistics tests
+The ratings trigger (migration 006) is replayed over a stand-in connection as
++1/-1 deltas; the stats read back must match recomputing from the ratings
+"""
+
+import statistics
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.crud.expert import rating_stats as rating_stats_crud
+
+
+pytestmark = pytest.mark.no_db
+
+
+class Connection:
+    """
+    Connection stand-in holding expert_rating_stats / expert_rating_daily,
+    kept up to date like trg_ratings_expert_stats does
+    """
+    
+    def __init__(self):
+        self.stats = {}
+        self.daily = defaultdict(lambda: {"rating_count": 0, "rating_sum": 0})
+    
+    def _apply(self, expert_id, score, created_at, sign):
+        # apply_expert_rating_delta
+        row = self.stats.setdefault(expert_id, {
+            "rating_count": 0, "rating_sum": 0, "rating_sum_squares": 0,
+            **{f"count_{s}": 0 for s in range(1, 6)}
+        })
+        row["rating_count"] += sign
+        row["rating_sum"] += sign * score
+        row["rating_sum_squares"] += sign * score * score
+        row[f"count_{score}"] += sign
+        day = self.daily[(expert_id, created_at.astimezone(timezone.utc).date())]
+        day["rating_count"] += sign
+        day["rating_sum"] += sign * score
+    
+    def insert(self, rating):
+        self._apply(rating["expert_id"], rating["score"], rating["created_at"], 1)
+    
+    def delete(self, rating):
+        self._apply(rating["expert_id"], rating["score"], rating["created_at"], -1)
+    
+    def update(self, old, new):
+        self.delete(old)
+        self.insert(new)
+    
+    def _days(self, expert_id, since):
+        return [
+            (day, values) for (owner, day), values in sorted(self.daily.items())
+            if owner == expert_id and day >= since
+        ]
+    
+    async def fetchrow(self, query, expert_id, *args):
+        if "FROM expert_rating_stats" in query:
+            return self.stats.get(expert_id)
+        days = self._days(expert_id, args[0])
+        return {
+            "count": sum(values["rating_count"] for _, values in days),
+            "total": sum(values["rating_sum"] for _, values in days)
+        }
+    
+    async def fetch(self, query, expert_id, since):
+        today = datetime.now(timezone.utc).date()
+        if "as age" in query:
+            return [{"age": (today - day).days, **values} for day, values in self._days(expert_id, since)]
+        return [
+            {"date": day, "count": values["rating_count"], "rating_sum": values["rating_sum"]}
+            for day, values in self._days(expert_id, today - timedelta(days=since))
+            if values["rating_count"] > 0
+        ]
+
+
+def test_summarize_and_windows():
+    scores = [5, 4, 4, 2, 1, 5]
+    summary = rating_stats_crud._summarize(len(scores), sum(scores), sum(s * s for s in scores))
+    assert summary["average_rating"] == pytest.approx(statistics.mean(scores))
+    assert summary["rating_stddev"] == pytest.approx(statistics.pstdev(scores))
+    # Identical scores have no spread
+    assert rating_stats_crud._summarize(3, 15, 75)["rating_stddev"] == 0.0
+    assert rating_stats_crud._summarize(0, 0, 0) == {"average_rating": 0.0, "rating_stddev": None}
+    
+    assert rating_stats_crud.window_start(7, date(2026, 10, 19)) == date(2026, 10, 13)
+    assert rating_stats_crud.window_start(1, date(2026, 10, 19)) == date(2026, 10, 19)
+
+
+async def test_deltas_match_recomputed_stats():
+    conn = Connection()
+    expert_id, other_id = uuid4(), uuid4()
+    now = datetime.now(timezone.utc)
+    ratings = [
+        {"expert_id": expert_id, "score": score, "created_at": now - timedelta(days=age)}
+        for score, age in [(5, 0), (4, 1), (3, 6), (2, 7), (5, 29), (1, 30), (4, 89), (2, 200)]
+    ]
+    for rating in ratings:
+        conn.insert(rating)
+    conn.insert({"expert_id": other_id, "score": 1, "created_at": now})
+    
+    # A rescored rating and a deleted one, as UPDATE / DELETE reach the trigger
+    rescored = dict(ratings[2], score=5)
+    conn.update(ratings[2], rescored)
+    ratings[2] = rescored
+    conn.delete(ratings.pop(3))
+    
+    scores = [rating["score"] for rating in ratings]
+    stats = await rating_stats_crud.get_rating_stats(conn, expert_id)
+    assert stats["total_ratings"] == len(scores)
+    assert stats["average_rating"] == pytest.approx(statistics.mean(scores))
+    assert stats["rating_stddev"] == pytest.approx(statistics.pstdev(scores))
+    # Emptied histogram buckets are left out
+    assert stats["rating_distribution"] == {5: 3, 4: 2, 2: 1, 1: 1}
+    
+    def average(days):
+        window = [r["score"] for r in ratings if (now - r["created_at"]).days < days]
+        return statistics.mean(window) if window else None
+    
+    rolling = await rating_stats_crud.get_rolling_averages(conn, expert_id)
+    assert rolling == {
+        "7d": pytest.approx(average(7)), "30d": pytest.approx(average(30)), "90d": pytest.approx(average(90))
+    }
+    window = await rating_stats_crud.get_rating_window(conn, expert_id, rating_stats_crud.window_start(30))
+    assert window == {"count": 4, "average_rating": pytest.approx(average(30))}
+    assert (await rating_stats_crud.get_rating_window(conn, expert_id))["count"] == len(scores)
+    
+    # The deleted rating's day is empty now and is not reported
+    daily = await rating_stats_crud.get_daily_rating_stats(conn, expert_id, days=30)
+    assert [row["count"] for row in daily] == [1, 1, 1, 1, 1]
+    assert daily[-1] == {"date": now.date(), "avg_score": 5.0, "count": 1}
+    
+    empty = await rating_stats_crud.get_rating_stats(conn, uuid4())
+    assert empty["total_ratings"] == 0 and empty["rating_distribution"] == {}
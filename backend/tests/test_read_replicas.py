@@ -0,0 +1,49 @@
+"""
+Read replica routing tests
+Lag-aware pool selection and read-your-writes pinning, without a database
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.db import routing
+from app.db.session import Database, db
+
+
+pytestmark = pytest.mark.no_db
+
+
+def test_read_pool_skips_lagging_and_unreachable_replicas(monkeypatch):
+    monkeypatch.setattr(settings, "db_replica_max_lag_seconds", 5)
+    database = Database()
+    database.pool = "primary"
+    database.replica_pools = ["fresh", "lagging", None]
+    database.replica_lag = [0.5, 30.0, None]
+    
+    assert database.has_replicas
+    assert {database.read_pool() for _ in range(4)} == {"fresh"}
+    
+    # Nothing within the limit: reads go to the primary
+    database.replica_lag = [12.0, 30.0, None]
+    assert database.read_pool() == "primary"
+
+
+async def test_writes_pin_reads_to_primary(monkeypatch):
+    monkeypatch.setattr(db, "replica_pools", ["replica"])
+    monkeypatch.setattr(settings, "db_read_your_writes_seconds", 10)
+    monkeypatch.setattr(routing, "session_identity", lambda scope: scope.get("user"))
+    monkeypatch.setattr(routing, "_pins", routing.OrderedDict())
+    
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 201})
+    
+    async def send(message):
+        pass
+    
+    middleware = routing.ReadYourWritesMiddleware(app)
+    assert not await routing.is_pinned_to_primary({"user": "u1"})
+    await middleware({"type": "http", "method": "GET", "user": "u1"}, None, send)
+    assert not await routing.is_pinned_to_primary({"user": "u1"})
+    await middleware({"type": "http", "method": "POST", "user": "u1"}, None, send)
+    assert await routing.is_pinned_to_primary({"user": "u1"})
+    assert not await routing.is_pinned_to_primary({"user": "u2"})
@@ -0,0 +1,72 @@
+"""
+Runtime settings tests
+Snapshot accessors and maintenance mode, loaded from a stand-in connection
+"""
+
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.security import SecurityUtils
+from app.utils import runtime_settings as runtime_module
+from app.utils.runtime_settings import MaintenanceModeMiddleware, RuntimeSettings
+
+
+pytestmark = pytest.mark.no_db
+
+
+class SettingsRows:
+    """Connection stand-in returning system_settings rows (values as JSON text, like asyncpg)"""
+    
+    def __init__(self, values):
+        self.values = values
+    
+    async def fetch(self, query):
+        return [{"key": key, "value": json.dumps(value)} for key, value in self.values.items()]
+
+
+async def test_typed_accessors_fall_back_to_static_settings():
+    runtime = RuntimeSettings()
+    assert runtime.get_float("min_confidence_score") == settings.min_confidence_score
+    
+    await runtime.reload(SettingsRows({
+        "min_confidence_score": {"value": "0.55"},
+        "answer_reuse_enabled": {"enabled": "false"},
+        "uniqueness_threshold": {"value": "not a number"},
+        "pricing": {"credits_per_question": 2},
+    }))
+    assert runtime.version == 1
+    assert runtime.get_float("min_confidence_score") == 0.55
+    assert runtime.get_bool("answer_reuse_enabled") is False
+    assert runtime.get_float("uniqueness_threshold") == settings.uniqueness_threshold
+    assert runtime.get("pricing") == {"credits_per_question": 2}
+    assert runtime.get("unknown", 7) == 7
+    with pytest.raises(TypeError):
+        runtime.snapshot["pricing"] = {}
+
+
+async def test_maintenance_mode_blocks_client_routes_but_not_admins(monkeypatch):
+    runtime = RuntimeSettings()
+    await runtime.reload(SettingsRows({"maintenance_mode": {"enabled": True, "message": "Back soon"}}))
+    monkeypatch.setattr(runtime_module, "runtime_settings", runtime)
+    
+    app = FastAPI()
+    
+    @app.get("/api/v1/client/ping")
+    async def ping():
+        return {"ok": True}
+    
+    app.add_middleware(MaintenanceModeMiddleware)
+    admin_token = SecurityUtils.generate_jwt_token("admin-1", "super_admin", "admin@example.com")
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        blocked = await client.get("/api/v1/client/ping")
+        assert blocked.status_code == 503
+        assert blocked.json()["detail"] == "Back soon"
+        allowed = await client.get("/api/v1/client/ping", headers={"Authorization": f"Bearer {admin_token}"})
+        assert allowed.status_code == 200
+        
+        await runtime.reload(SettingsRows({"maintenance_mode": {"enabled": False}}))
+        assert (await client.get("/api/v1/client/ping")).status_code == 200
@@ -0,0 +1,98 @@
+"""
+Prepared statement registry tests
+Preparation on connection init, reuse counting, the unprepared fallback and
+per-combination filter variants
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.db.statements import StatementRegistry
+
+
+pytestmark = pytest.mark.no_db
+
+
+class PreparedStatement:
+    def __init__(self, sql):
+        self.sql = sql
+    
+    async def fetchval(self, *args):
+        return ("prepared", args)
+
+
+class Connection:
+    """Connection stand-in; `prepared` marks it as a registry connection"""
+    
+    def __init__(self, registry_connection=True):
+        if registry_connection:
+            self.prepared = {}
+        self.prepare_calls = []
+    
+    async def prepare(self, sql):
+        self.prepare_calls.append(sql)
+        return PreparedStatement(sql)
+    
+    async def fetchval(self, sql, *args):
+        return ("plain", args)
+
+
+async def test_hot_statements_are_prepared_once_per_connection(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_cache_size", 256)
+    monkeypatch.setattr(settings, "db_prepare_statements", True)
+    registry = StatementRegistry()
+    hot = registry.register("hot", "SELECT $1::int", hot=True)
+    cold = registry.register("cold", "SELECT $1::text IS NULL", hot=False)
+    with pytest.raises(ValueError):
+        registry.register("hot", "SELECT 1")
+    
+    conn = Connection()
+    await registry.init_connection(conn)
+    assert list(conn.prepared) == ["hot"]
+    
+    assert await hot.fetchval(conn, 1) == ("prepared", (1,))
+    assert await cold.fetchval(conn, None) == ("prepared", (None,))
+    assert await cold.fetchval(conn, "x") == ("prepared", ("x",))
+    assert len(conn.prepare_calls) == 2
+    
+    stats = registry.stats()
+    assert stats["hits"] == 2 and stats["prepares"] == 2
+    assert stats["statements"]["cold"]["hit_rate"] == 0.5
+
+
+async def test_plain_queries_without_preparing(monkeypatch):
+    monkeypatch.setattr(settings, "db_prepare_statements", True)
+    registry = StatementRegistry()
+    statement = registry.register("hot", "SELECT $1::int", hot=True)
+    
+    # Not a registry connection (e.g. a one-off asyncpg.connect)
+    assert await statement.fetchval(Connection(registry_connection=False), 1) == ("plain", (1,))
+    
+    # PgBouncer transaction mode: no named statements at all
+    monkeypatch.setattr(settings, "db_statement_cache_size", 0)
+    conn = Connection()
+    await registry.init_connection(conn)
+    assert await statement.fetchval(conn, 2) == ("plain", (2,))
+    assert conn.prepare_calls == []
+    assert registry.stats()["unprepared"] == 2
+
+
+async def test_filtered_statement_registers_each_combination_used(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_cache_size", 256)
+    monkeypatch.setattr(settings, "db_prepare_statements", True)
+    registry = StatementRegistry()
+    users = registry.filtered("users", "SELECT * FROM users WHERE {where} LIMIT {p1}", {
+        "role": "role = {}", "is_banned": "is_banned = {}"
+    })
+    conn = Connection()
+    
+    assert await users.fetchval(conn, {"role": None, "is_banned": False}, 10) == ("prepared", (False, 10))
+    assert await users.fetchval(conn, {"role": "expert", "is_banned": True}, 5) == ("prepared", ("expert", True, 5))
+    assert await users.fetchval(conn, {"role": None, "is_banned": True}, 5) == ("prepared", (True, 5))
+    assert await users.fetchval(conn, {}, 1) == ("prepared", (1,))
+    assert conn.prepare_calls == [
+        "SELECT * FROM users WHERE is_banned = $1 LIMIT $2",
+        "SELECT * FROM users WHERE role = $1 AND is_banned = $2 LIMIT $3",
+        "SELECT * FROM users WHERE TRUE LIMIT $1",
+    ]
+    assert sorted(registry.statements) == ["users[]", "users[is_banned]", "users[role,is_banned]"]
@@ -0,0 +1,100 @@
+"""
+JWT verifier tests
+Key rotation, the claims cache and local revocation (no Redis needed), and
+single-use refresh claims across workers (fakeredis)
+"""
+
+import asyncio
+from datetime import timedelta
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.core.tokens import BloomFilter, TokenVerifier
+from app.utils.cache import cache
+
+
+pytestmark = pytest.mark.no_db
+
+
+@pytest.fixture
+def verifier(monkeypatch):
+    monkeypatch.setattr(cache, "client", None)
+    monkeypatch.setattr(settings, "jwt_signing_keys", "2026a:first-secret,2026b:second-secret")
+    monkeypatch.setattr(settings, "jwt_active_kid", "2026a")
+    return TokenVerifier()
+
+
+def test_tokens_signed_with_a_rotated_out_key_still_verify(verifier, monkeypatch):
+    old = verifier.create_access_token("user-1", "client", "a@example.com")
+    monkeypatch.setattr(settings, "jwt_active_kid", "2026b")
+    new = verifier.create_access_token("user-1", "client", "a@example.com")
+    
+    rotated = TokenVerifier()
+    assert rotated.decode(old)["user_id"] == "user-1"
+    assert rotated.decode(new)["user_id"] == "user-1"
+    
+    # Retiring the old key invalidates its tokens
+    monkeypatch.setattr(settings, "jwt_signing_keys", "2026b:second-secret")
+    retired = TokenVerifier()
+    assert retired.decode(old) is None
+    assert retired.decode(new) is not None
+
+
+def test_claims_are_cached_until_expiry(verifier):
+    token = verifier.create_access_token("user-1", "client", "a@example.com")
+    assert verifier.decode(token) is verifier.decode(token)
+    assert (verifier.cache_hits, verifier.cache_misses) == (1, 1)
+    assert token not in verifier._claims
+    
+    expired = verifier.create_access_token("user-1", "client", "a@example.com", timedelta(seconds=-1))
+    assert verifier.decode(expired) is None
+    assert verifier.decode(verifier.create_refresh_token("user-1", "client", "a@example.com")) is None
+
+
+async def test_revoked_tokens_are_rejected(verifier):
+    access = verifier.create_access_token("user-1", "client", "a@example.com")
+    refresh = verifier.create_refresh_token("user-1", "client", "a@example.com")
+    claims = await verifier.verify(refresh, token_type="refresh")
+    assert claims is not None
+    
+    await verifier.revoke(claims)
+    assert await verifier.verify(refresh, token_type="refresh") is None
+    assert await verifier.verify(access) is not None
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1 << 16)
+    items = [f"jti-{i}" for i in range(2000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(2000))
+    assert false_positives < 40
+
+
+async def test_refresh_token_claimed_once_across_workers(verifier, monkeypatch):
+    monkeypatch.setattr(cache, "client", fakeredis.FakeAsyncRedis(decode_responses=True))
+    workers = [TokenVerifier(), TokenVerifier()]
+    refresh = workers[0].create_refresh_token("user-1", "client", "a@example.com")
+    claims = [await worker.verify(refresh, token_type="refresh") for worker in workers]
+    
+    results = await asyncio.gather(*[worker.claim(c) for worker, c in zip(workers, claims)])
+    assert sorted(results) == [False, True]
+    assert await workers[1].claim(claims[1]) is False
+
+
+async def test_unconfirmed_bloom_match_refuses_refresh_tokens(verifier, monkeypatch):
+    access = verifier.decode(verifier.create_access_token("user-1", "client", "a@example.com"))
+    refresh = verifier.decode(verifier.create_refresh_token("user-1", "client", "a@example.com"), "refresh")
+    for claims in (access, refresh):
+        verifier._bloom.add(claims["jti"])
+    
+    class Unreachable:
+        async def zscore(self, key, member):
+            raise ConnectionError("Redis is down")
+    
+    monkeypatch.setattr(cache, "client", Unreachable())
+    assert await verifier.is_revoked(refresh) is True
+    assert await verifier.is_revoked(access) is False
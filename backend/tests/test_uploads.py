@@ -0,0 +1,136 @@
+"""
+Streaming image upload tests
+Multipart parsing, type sniffing and thumbnails, and what a repeat upload
+reveals; no database or storage needed
+"""
+
+import io
+import os
+import hashlib
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from PIL import Image
+
+from app.crud.client import uploads as upload_crud
+from app.services.client.upload_service import UploadService
+from app.utils.uploads import (
+    UploadTooLargeError,
+    make_thumbnail,
+    receive_image_uploads,
+    sniff_image_type,
+)
+
+BOUNDARY = "testboundary"
+
+
+pytestmark = pytest.mark.no_db
+
+
+class StreamingRequest:
+    """Just enough of a Starlette request: headers and a chunked body"""
+    
+    def __init__(self, body: bytes, chunk_size: int = 1024):
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        self.body = body
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+    
+    async def stream(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            chunk = self.body[start:start + self.chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+def multipart_body(parts) -> bytes:
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def png_bytes(width: int = 640, height: int = 480) -> bytes:
+    output = io.BytesIO()
+    Image.effect_noise((width, height), 64).save(output, "PNG")
+    return output.getvalue()
+
+
+def test_sniff_image_type():
+    assert sniff_image_type(png_bytes(8, 8)[:16]) == "image/png"
+    assert sniff_image_type(b"\xff\xd8\xff\xe0" + b"\x00" * 12) == "image/jpeg"
+    assert sniff_image_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff_image_type(b"<svg xmlns='http") is None
+
+
+async def test_files_are_spooled_and_hashed_while_streaming():
+    image = png_bytes()
+    request = StreamingRequest(multipart_body([
+        ("note", None, b"not a file"),
+        ("files", "one.png", image),
+        ("files", "two.png", image),
+    ]))
+    uploads = await receive_image_uploads(request, max_file_bytes=len(image), max_files=5)
+    try:
+        assert [u.filename for u in uploads] == ["one.png", "two.png"]
+        for upload in uploads:
+            assert upload.content_type == "image/png"
+            assert upload.size == len(image)
+            assert upload.sha256 == hashlib.sha256(image).hexdigest()
+            with open(upload.path, "rb") as f:
+                assert f.read() == image
+    finally:
+        for upload in uploads:
+            upload.discard()
+    assert not any(os.path.exists(u.path) for u in uploads)
+
+
+@pytest.mark.parametrize("data, error", [
+    (png_bytes() * 4, UploadTooLargeError),
+    (b"MZ\x90\x00" + b"\x00" * 200_000, ValueError),
+])
+async def test_bad_uploads_are_rejected_before_the_body_is_read(data, error):
+    request = StreamingRequest(multipart_body([("files", "file.png", data)]))
+    with pytest.raises(error):
+        await receive_image_uploads(request, max_file_bytes=100_000, max_files=5)
+    assert request.bytes_read < len(request.body)
+
+
+def test_make_thumbnail(tmp_path):
+    source = tmp_path / "photo.png"
+    Image.new("RGBA", (1600, 900), (10, 20, 30, 128)).save(source)
+    thumbnail = tmp_path / "thumb.jpg"
+    assert make_thumbnail(str(source), str(thumbnail), 320) == {"width": 1600, "height": 900}
+    with Image.open(thumbnail) as image:
+        assert image.format == "JPEG"
+        assert image.size == (320, 180)
+
+
+async def test_repeat_upload_reveals_nothing_about_the_first_uploader(monkeypatch):
+    sha256 = "ab" * 32
+    first, second = uuid4(), uuid4()
+    owners = {(sha256, first)}
+    stored = {
+        "sha256": sha256, "content_type": "image/png", "size_bytes": 10, "width": 1, "height": 1,
+        "thumbnail_key": "thumbnails/ab/x.jpg", "original_filename": "first-users-homework.png",
+        "uploaded_by": first
+    }
+    
+    async def get_image_upload(db, digest):
+        return stored if digest == sha256 else None
+    
+    async def add_image_upload_owner(db, digest, user_id):
+        owners.add((digest, user_id))
+    
+    monkeypatch.setattr(upload_crud, "get_image_upload", get_image_upload)
+    monkeypatch.setattr(upload_crud, "add_image_upload_owner", add_image_upload_owner)
+    
+    response = await UploadService.store_image(None, second, SimpleNamespace(sha256=sha256, filename="mine.png"))
+    assert response["original_filename"] == "mine.png"
+    assert "deduplicated" not in response
+    # The second uploader can now view the image
+    assert (sha256, second) in owners
@@ -0,0 +1,94 @@
+"""
+User directory tests
+Batched lookups, local caching and change notifications, with a stand-in auth pool
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+
+import fakeredis
+import pytest
+
+from app.db.session import db
+from app.utils.cache import cache
+from app.utils.user_directory import KEY_PREFIX, UserDirectory
+
+
+pytestmark = pytest.mark.no_db
+
+
+class AuthPool:
+    """Auth pool stand-in serving users rows and counting queries"""
+    
+    def __init__(self, users):
+        self.users = users
+        self.queries = []
+    
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+    
+    async def fetch(self, query, user_ids):
+        self.queries.append(list(user_ids))
+        return [self.users[user_id] for user_id in user_ids if user_id in self.users]
+
+
+def user_row(user_id, first_name, last_name, role="expert", is_active=True, is_banned=False):
+    return {
+        "user_id": uuid.UUID(user_id), "email": f"{first_name.lower()}@example.com",
+        "first_name": first_name, "last_name": last_name, "role": role,
+        "is_active": is_active, "is_banned": is_banned
+    }
+
+
+async def test_batched_lookup_and_invalidation(monkeypatch):
+    ada, alan, unknown = (str(uuid.uuid4()) for _ in range(3))
+    pool = AuthPool({
+        ada: user_row(ada, "Ada", "Lovelace"),
+        alan: user_row(alan, "Alan", "Turing", is_banned=True),
+    })
+    monkeypatch.setattr(db, "auth_pool", pool)
+    directory = UserDirectory()
+    
+    profiles = await directory.get_many([ada, alan, unknown, ada, None, "not-a-uuid"])
+    assert len(pool.queries) == 1
+    assert sorted(pool.queries[0]) == sorted([ada, alan, unknown])
+    assert profiles[ada]["name"] == "Ada Lovelace"
+    assert profiles[alan]["status"] == "banned"
+    assert unknown not in profiles
+    
+    # Served from memory, unknown ids included
+    assert await directory.names([uuid.UUID(ada), unknown]) == {ada: "Ada Lovelace"}
+    assert len(pool.queries) == 1
+    
+    # A change notification drops the entry; the next lookup reloads it
+    pool.users[ada] = user_row(ada, "Ada", "King")
+    directory._on_notify(None, 0, "user_directory", ada)
+    assert (await directory.get(ada))["name"] == "Ada King"
+    assert pool.queries[-1] == [ada]
+
+
+async def test_load_racing_a_change_is_not_cached(monkeypatch):
+    ada = str(uuid.uuid4())
+    pool = AuthPool({ada: user_row(ada, "Ada", "Lovelace")})
+    monkeypatch.setattr(db, "auth_pool", pool)
+    monkeypatch.setattr(cache, "client", fakeredis.FakeAsyncRedis(decode_responses=True))
+    directory = UserDirectory()
+    
+    # The change commits (and is notified) after the load read the old row
+    fetch = pool.fetch
+    
+    async def fetch_then_change(query, user_ids):
+        rows = await fetch(query, user_ids)
+        pool.users[ada] = user_row(ada, "Ada", "King")
+        directory._on_notify(None, 0, "user_directory", ada)
+        return rows
+    
+    monkeypatch.setattr(pool, "fetch", fetch_then_change)
+    assert (await directory.get(ada))["name"] == "Ada Lovelace"
+    assert await cache.client.get(KEY_PREFIX + ada) is None
+    assert not directory._loading and not directory._stale
+    
+    monkeypatch.setattr(pool, "fetch", fetch)
+    assert (await directory.get(ada))["name"] == "Ada King"
+    assert await cache.client.get(KEY_PREFIX + ada) is not None